@@ -2,7 +2,25 @@
 """
 Setup script for XtendedFiniteVolume project
 """
-from setuptools import setup, find_packages
+import sys
+from setuptools import setup, find_packages, Extension
+
+# Compiled VNR internal energy solver with the Mie-Gruneisen equation of state.
+# Optional : if it can not be built, the python solver is used.
+# Floating point contraction is disabled to get the same results as the python solver.
+# The cell loop is parallelized with OpenMP.
+if sys.platform == 'win32':
+    OPENMP_COMPILE_ARGS, OPENMP_LINK_ARGS = ['/openmp'], []
+else:
+    OPENMP_COMPILE_ARGS, OPENMP_LINK_ARGS = ['-fopenmp'], ['-fopenmp']
+VNR_EXTENSION = Extension('xfv.src.equationsofstate.launch_vnr_resolution_c',
+                          sources=['xfv/src/equationsofstate/c_implementation/miegruneisen.c',
+                                   'xfv/src/equationsofstate/c_implementation/'
+                                   'launch_vnr_resolution.c'],
+                          depends=['xfv/src/equationsofstate/c_implementation/miegruneisen.h'],
+                          extra_compile_args=['-O3', '-ffp-contract=off'] + OPENMP_COMPILE_ARGS,
+                          extra_link_args=OPENMP_LINK_ARGS,
+                          optional=True)
 
 
 setup(python_requires='>3.6',
@@ -15,7 +33,9 @@ setup(python_requires='>3.6',
       maintainer_email='guillaume.peillex@gmail.com',
       url='https://github.com/hippo91/XVOF',
       packages=find_packages(),
+      ext_modules=[VNR_EXTENSION],
       scripts=['xfv/XtendedFiniteVolume.py'],
+      entry_points={'console_scripts': ['xfv-sweep = xfv.src.sweep.gridsweep:command_line']},
       install_requires=['h5py',
                         'matplotlib',
                         'numpy>=1.16.0',
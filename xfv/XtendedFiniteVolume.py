@@ -10,19 +10,30 @@ import time
 import matplotlib.pyplot as plt
 import numpy as np
 
+from xfv.src.context.simulationcontext         import SimulationContext, current_context
 from xfv.src.figure_manager.figure_manager      import FigureManager
 from xfv.src.data.data_container                import DataContainer, BoundaryType, \
-                                                       ConstitutiveModelProps, MaterialProps
+                                                       ConstitutiveModelProps, MaterialProps, \
+                                                       CheckpointProps
 from xfv.src.mesh.mesh1denriched                import Mesh1dEnriched
 from xfv.src.output_manager.outputmanager       import OutputManager
 from xfv.src.output_manager.outputdatabase      import OutputDatabase
+from xfv.src.output_manager.asyncoutputdatabase import AsyncOutputDatabase
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+from xfv.src.output_manager.hdf5settings   import Hdf5Settings
+from xfv.src.output_manager.probedatabase  import ProbeDatabase, resolve_probe_ids
+from xfv.src.checkpoint.checkpointmanager       import CheckpointManager, load_checkpoint
 from xfv.src.rupturetreatment.enrichelement     import EnrichElement
+from xfv.src.discontinuity.discontinuity        import Discontinuity
+from xfv.src.cell.one_dimension_cell            import get_vnr_solver_backend, \
+                                                       set_vnr_solver_threads
 from xfv.src.rupturetreatment.imposedpressure   import ImposedPressure
 from xfv.src.custom_functions.custom_function   import CustomFunction
 from xfv.src.rheology.shearmodulus              import ShearModulus
 from xfv.src.rheology.yieldstress               import YieldStress
 from xfv.src.plasticitycriterion.plasticitycriterion import PlasticityCriterion
 from xfv.src.porosity_model.porositymodel_base import PorosityModelBase
+from xfv.src.utilities.profilingperso import PhaseProfiler, NoPhaseProfiler
 
 def __create_mesh(meshfile: Path) -> Mesh1dEnriched:
     """
@@ -81,18 +92,30 @@ def __init_velocity(nodes, data):
                .format(vitesse_interface, node_interface)))
 
 
-def __init_output(data: DataContainer, mesh: Mesh1dEnriched) -> OutputManager:
+def __init_output(data: DataContainer, mesh: Mesh1dEnriched,
+                  append: bool = False) -> OutputManager:
     """
     Returns the OutputManager initialized
     :param data: the case data
     :param mesh: the mesh
+    :param append: if True the databases are opened in append mode (restart)
     """
     enrichment_registration = \
         data.material_target.failure_model.failure_treatment == "Enrichment"
     np.set_printoptions(formatter={'float': '{: 25.23g}'.format})
     the_output_mng = OutputManager()
     for db_el in data.output.databases:
-        output_db = OutputDatabase(db_el.path)
+        settings = Hdf5Settings(db_el.flush_period, db_el.flush_interval,
+                                db_el.chunk_cache_size, db_el.libver_latest, db_el.swmr)
+        if db_el.layout == "time-series":
+            output_db = TimeSeriesOutputDatabase(db_el.path, append=append,
+                                                 compression=db_el.compression,
+                                                 compression_level=db_el.compression_level,
+                                                 shuffle=db_el.shuffle, settings=settings)
+        else:
+            output_db = OutputDatabase(db_el.path, append=append, settings=settings)
+        if db_el.asynchronous:
+            output_db = AsyncOutputDatabase(output_db, queue_size=db_el.queue_size)
         if db_el.iteration_period is not None:
             the_output_mng.register_database_iteration_ctrl(db_el.identifier, output_db,
                                                             db_el.iteration_period)
@@ -101,6 +124,22 @@ def __init_output(data: DataContainer, mesh: Mesh1dEnriched) -> OutputManager:
                                                        db_el.time_period)
         the_output_mng.register_all_fields(enrichment_registration, mesh.cells,
                                            mesh.nodes, db_el.identifier)
+    # Probes : the coordinates are resolved on the initial mesh
+    cell_centers = mesh.cells.get_coordinates(mesh.cells.number_of_cells, mesh.topology,
+                                              mesh.nodes.xt)
+    for probe_el in data.output.probes:
+        node_ids = resolve_probe_ids(probe_el.nodes, probe_el.node_coordinates, mesh.nodes.xt)
+        cell_ids = resolve_probe_ids(probe_el.cells, probe_el.cell_coordinates, cell_centers)
+        probe_db = ProbeDatabase(probe_el.path, node_ids, cell_ids,
+                                 buffer_size=probe_el.buffer_size, append=append)
+        if probe_el.iteration_period is not None:
+            the_output_mng.register_database_iteration_ctrl(probe_el.identifier, probe_db,
+                                                            probe_el.iteration_period)
+        else:
+            the_output_mng.register_database_time_ctrl(probe_el.identifier, probe_db,
+                                                       probe_el.time_period)
+        the_output_mng.register_probe_fields(probe_el.identifier, probe_el.variables,
+                                             mesh.cells, mesh.nodes, cell_ids, node_ids)
     return the_output_mng
 
 
@@ -171,18 +210,56 @@ def _build_material_porosity_model(
 
     return (has_porosity_model, val_porosity_model)
 
-def main(directory: Path) -> None:
+def main(directory: Path, threads: Optional[int] = None,  # pylint: disable=too-many-arguments
+         restart: Optional[Path] = None, stop_at_first_rupture: bool = False,
+         context: Optional[SimulationContext] = None,
+         profile: Optional[Path] = None) -> SimulationContext:
+    """
+    Launch the program in its own simulation context and returns this context (data, mesh,
+    discontinuities and outputs of the simulation)
+
+    :param directory: path toward the data directory
+    :param threads: number of threads of the compiled internal energy solver
+                    (overrides the value of the data file)
+    :param restart: path toward the checkpoint file the simulation is restarted from
+    :param stop_at_first_rupture: if True the state just before the first rupture is
+                                  saved and the simulation is stopped
+    :param context: context of the simulation (a new one by default)
+    :param profile: if not None, the time spent in each phase of the time loop is measured,
+                    printed at the end and written in this JSON file (relative to the data
+                    directory)
+    """
+    context = SimulationContext(str(directory)) if context is None else context
+    with context:
+        __run(directory, threads, restart, stop_at_first_rupture, profile)
+    return context
+
+
+def __run(directory: Path, threads: Optional[int], restart: Optional[Path],  # pylint: disable=too-many-arguments
+          stop_at_first_rupture: bool, profile: Optional[Path] = None) -> None:
     # pylint: disable=too-many-locals, too-many-branches, too-many-statements
     """
-    Launch the program
+    Run the simulation in the active simulation context
+
+    :param directory: path toward the data directory
+    :param threads: number of threads of the compiled internal energy solver
+                    (overrides the value of the data file)
+    :param restart: path toward the checkpoint file the simulation is restarted from
+    :param stop_at_first_rupture: if True the state just before the first rupture is
+                                  saved and the simulation is stopped
+    :param profile: path of the JSON file of the time spent in each phase of the time loop
+                    (no profiling if None)
     """
     # ------------------------------------------------------------------
     #             PARAMETERS INITIALIZATION
     # ------------------------------------------------------------------
     # ---- # DATA FILES
+    context = current_context()
     data = DataContainer(directory / "XDATA.json")
     meshfile = directory / "mesh.txt"
     print("Running simulation for {}".format(directory.resolve()))
+    set_vnr_solver_threads(threads if threads is not None else data.numeric.number_of_threads)
+    print("Internal energy solver : {}".format(get_vnr_solver_backend()))
 
     # ---- # TIME MANAGEMENT
     final_time = data.time.final_time
@@ -208,6 +285,10 @@ def main(directory: Path) -> None:
         rupture_treatment = EnrichElement(
             data.material_target.failure_model.failure_treatment_value,
             data.material_target.failure_model.lump_mass_matrix)
+        max_disc_number = data.material_target.failure_model.max_expected_discontinuities
+        if max_disc_number is not None:
+            # Allocation of the discontinuities storage so that no reallocation happens mid-run
+            Discontinuity.reserve(max_disc_number)
     else:
         rupture_treatment = None
 
@@ -235,7 +316,20 @@ def main(directory: Path) -> None:
     # ---------------------------------------------#
     #  OUTPUT MANAGER SETUP                        #
     # ---------------------------------------------#
-    the_output_mng = __init_output(data, my_mesh)
+    the_output_mng = __init_output(data, my_mesh, append=restart is not None)
+
+    # ---------------------------------------------#
+    #  CHECKPOINTS SETUP                           #
+    # ---------------------------------------------#
+    checkpoint_mng = None
+    checkpoint_props = data.output.checkpoint
+    if checkpoint_props is None and stop_at_first_rupture:
+        checkpoint_props = CheckpointProps("checkpoints", None, None, 1, True)
+    if checkpoint_props is not None:
+        checkpoint_mng = CheckpointManager(
+            directory / checkpoint_props.path, checkpoint_props.time_period,
+            checkpoint_props.iteration_period, checkpoint_props.retention,
+            checkpoint_props.before_first_rupture or stop_at_first_rupture)
 
     # ---------------------------------------------#
     #         NODAL MASS COMPUTATION               #
@@ -291,6 +385,21 @@ def main(directory: Path) -> None:
     # init a t=0 et pas t = -1/2 dt (pour garder l'ordre 2 a l'init).
     # Le dt_staggered est ensuite remis a dt a la fin de la boucle en temps
     dt_crit = 2 * dt
+    if restart is not None:
+        print("Restarting from checkpoint : {}".format(restart))
+        if checkpoint_mng is not None:
+            loop_state = checkpoint_mng.restore(restart, my_mesh, rupture_treatment,
+                                                the_output_mng, the_figure_mng)
+        else:
+            loop_state = load_checkpoint(restart, my_mesh, rupture_treatment,
+                                         the_output_mng, the_figure_mng)
+        simulation_time = loop_state["simulation_time"]
+        step = loop_state["step"]
+        dt, dt_staggered = loop_state["dt"], loop_state["dt_staggered"]  # pylint: disable=invalid-name
+        dt_crit = loop_state["dt_crit"]
+        compute_time = loop_state["compute_time"]
+    profiler = PhaseProfiler() if profile is not None else NoPhaseProfiler()
+    profiler.start()
     while simulation_time < final_time:
         loop_begin_time = time.time()
         if step % 1000 == 0:
@@ -299,13 +408,30 @@ def main(directory: Path) -> None:
                    format(step, simulation_time, dt))
             print(msg)
 
+        # ---------------------------------------------#
+        #                CHECKPOINTS                   #
+        # ---------------------------------------------#
+        if checkpoint_mng is not None:
+            loop_state = {"simulation_time": simulation_time, "step": step, "dt": dt,
+                          "dt_staggered": dt_staggered, "dt_crit": dt_crit,
+                          "compute_time": compute_time}
+            if checkpoint_mng.has_to_be_saved(simulation_time, step):
+                checkpoint_path = checkpoint_mng.save(my_mesh, loop_state,
+                                                      the_output_mng, the_figure_mng)
+                print("Checkpoint saved in {} (iteration {:d})".format(checkpoint_path, step))
+            if checkpoint_mng.watches_first_rupture:
+                checkpoint_mng.capture_before_rupture(my_mesh, loop_state,
+                                                      the_output_mng, the_figure_mng)
+
         # ---------------------------------------------#
         #                OUTPUT MANAGEMENT             #
         # ---------------------------------------------#
         the_output_mng.update(simulation_time, step,
                               data.material_target.failure_model.failure_treatment_value,
                               my_mesh.get_discontinuity_list())
+        profiler.lap("output")
         the_figure_mng.update(simulation_time, step)
+        profiler.lap("figures")
         # ---------------------------------------------#
         #         NODES VELOCITIES COMPUTATION         #
         # ---------------------------------------------#
@@ -323,10 +449,12 @@ def main(directory: Path) -> None:
         #         NODES COORDINATES COMPUTATION        #
         # ---------------------------------------------#
         my_mesh.compute_new_nodes_coordinates(dt)
+        profiler.lap("velocities")
         # ---------------------------------------------#
         #         CONTACT CORRECTION                   #
         # ---------------------------------------------#
         my_mesh.apply_contact_correction(dt)
+        profiler.lap("contact")
         # ---------------------------------------------#
         #         CELLS VOLUMES COMPUTATION            #
         # ---------------------------------------------#
@@ -335,15 +463,18 @@ def main(directory: Path) -> None:
         #         CELLS COORDS COMPUTATION             #
         # ---------------------------------------------#
         my_mesh.compute_new_cell_coordinates()
+        profiler.lap("sizes")
         # ---------------------------------------------#
         #         CELLS DENSITIES COMPUTATION          #
         # ---------------------------------------------#
         my_mesh.compute_new_cells_densities()
+        profiler.lap("density")
         # ---------------------------------------------#
         #          POROSITY MODEL COMPUTATION          #
         # ---------------------------------------------#
         if target_porosity_model_bool:
             my_mesh.compute_new_cells_porosity(dt, target_porosity_model)
+        profiler.lap("porosity")
         # ---------------------------------------------#
         #    CELLS DEVIATOR STRESSES COMPUTATION       #
         # ---------------------------------------------#
@@ -351,6 +482,7 @@ def main(directory: Path) -> None:
             my_mesh.apply_elasticity(dt, projectile_shear_modulus, my_mesh.cells.cell_in_projectile)
         if target_elasticity:
             my_mesh.apply_elasticity(dt, target_shear_modulus, my_mesh.cells.cell_in_target)
+        profiler.lap("elasticity")
         # ---------------------------------------------#
         #           PLASTICITY COMPUTATION             #
         # ---------------------------------------------#
@@ -360,10 +492,12 @@ def main(directory: Path) -> None:
         if target_plasticity:
             my_mesh.apply_plasticity(dt, target_yield_stress, target_plasticity_criterion,
                                      my_mesh.cells.cell_in_target)
+        profiler.lap("plasticity")
         # ---------------------------------------------#
         #         PSEUDOVISCOSITY COMPUTATION          #
         # ---------------------------------------------#
         my_mesh.compute_new_cells_pseudo_viscosity(dt)
+        profiler.lap("pseudo")
         # ---------------------------------------------#
         #         CELLS PRESSURES COMPUTATION          #
         # ---------------------------------------------#
@@ -372,12 +506,21 @@ def main(directory: Path) -> None:
         #         STRESS TENSOR COMPUTATION            #
         # ---------------------------------------------#
         my_mesh.assemble_complete_stress_tensor()
+        profiler.lap("pressure")
         # ---------------------------------------------#
         #              RUPTURE                         #
         # ---------------------------------------------#
         if rupture_treatment is not None:
             my_mesh.get_ruptured_cells(rupture_criterion)
             my_mesh.apply_rupture_treatment(rupture_treatment, simulation_time)
+            if checkpoint_mng is not None:
+                checkpoint_path = checkpoint_mng.save_if_first_rupture()
+                if checkpoint_path is not None:
+                    print("State before the first rupture saved in {} (iteration {:d})"
+                          .format(checkpoint_path, step))
+                    if stop_at_first_rupture:
+                        break
+        profiler.lap("rupture")
         # ---------------------------------------------#
         #         NODES FORCES COMPUTATION             #
         # ---------------------------------------------#
@@ -390,6 +533,7 @@ def main(directory: Path) -> None:
             my_mesh.apply_pressure('left', left_boundary_condition.evaluate(simulation_time))
         if right_boundary_condition.is_pressure():
             my_mesh.apply_pressure('right', right_boundary_condition.evaluate(simulation_time))
+        profiler.lap("forces")
         # ---------------------------------------------#
         #         TIME STEP COMPUTATION                #
         # ---------------------------------------------#
@@ -407,10 +551,23 @@ def main(directory: Path) -> None:
         else:
             dt_staggered = dt
         step += 1
+        profiler.lap("time step")
+        profiler.end_step()
+        context.step, context.time = step, simulation_time
+        for callback in context.step_callbacks:
+            callback(context)
         loop_end_time = time.time()
         compute_time += loop_end_time - loop_begin_time
 
     print("Total time spent in compute operation is : {:15.9g} seconds".format(compute_time))
+    if profile is not None:
+        print("Time spent in the phases of the time loop :")
+        print(profiler.table())
+        profiler.write_json(directory / profile, case=str(directory),
+                            solver=get_vnr_solver_backend())
+        print("Profile written in {}".format(directory / profile))
+    if my_mesh.cells.newton_telemetry is not None:
+        print(my_mesh.cells.newton_telemetry.summary())
     plt.show(block=False)
 
     print('Done !')
@@ -425,8 +582,23 @@ if __name__ == "__main__":
     parser.add_argument("data_directory", help="Path toward the data directory")
     parser.add_argument("--use-internal-solver", action="store_true",
                         help="Do not use external library to solve internal energy evolution")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Number of threads of the compiled internal energy solver "
+                             "(0 for all the available processors). "
+                             "Overrides the numeric-parameters/number-of-threads data")
+    parser.add_argument("--restart", type=Path, default=None, metavar="CHECKPOINT",
+                        help="Restart the simulation from a checkpoint file "
+                             "(see output/checkpoint in the data file)")
+    parser.add_argument("--stop-at-first-rupture", action="store_true",
+                        help="Save the state at the beginning of the iteration of the first "
+                             "rupture and stop the simulation")
+    parser.add_argument("--profile", nargs="?", type=Path, default=None,
+                        const=Path("profile.json"), metavar="JSON_FILE",
+                        help="Measure the time spent in each phase of the time loop, print it "
+                             "at the end and write it in JSON_FILE (relative to the data "
+                             "directory, default profile.json)")
     args = parser.parse_args()
-    if args.use_internal_solver:
-        import xfv.src.cell.one_dimension_cell as cell
-        cell.USE_INTERNAL_SOLVER = True
-    main(Path(args.data_directory))
+    simulation_context = SimulationContext(args.data_directory)
+    simulation_context.use_internal_solver = args.use_internal_solver
+    main(Path(args.data_directory), args.threads, args.restart, args.stop_at_first_rupture,
+         context=simulation_context, profile=args.profile)
@@ -10,9 +10,63 @@ import matplotlib.pyplot as plt
 from collections import namedtuple
 
 from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.post_processing.tools.hdf5_postprocessing_tools import open_live_database
 
 CellInfo = namedtuple("CellInfo", ["ouverture_min", "ouverture_max", "temps_apparition"])
 
+
+def read_openings(hd_band, times, opening_dict):
+    """
+    Append the discontinuity openings at the times to the history of each enriched cell
+
+    :param hd_band: hdf5 band containing the output results
+    :param times: times to be read
+    :param opening_dict: lists of [time, opening] by enriched cell id
+    """
+    for time in times:
+        cell_status = hd_band.extract_field_at_time("CellStatus", time)[:]
+        enriched_cells = np.where(cell_status)[0]
+        if len(enriched_cells) > 0:
+            opening = hd_band.extract_field_at_time("AdditionalDiscontinuityOpening", time)[:]
+            for i in range(len(opening[:, 0])):
+                cell_id = opening[i, 0]
+                op = opening[i, 1]
+                try:
+                    opening_dict[cell_id].append([time, op])
+                except KeyError:  # 1ere fois que la maille est enrichie => init list opening
+                    opening_dict[cell_id] = [[time, op]]
+
+
+def follow_openings(paths_to_db, period):
+    """
+    Plot the discontinuity openings of running simulations (databases written with the
+    time-series layout in SWMR mode), reading only the new times every period seconds until
+    the figure is closed
+
+    :param paths_to_db: paths to the databases by case
+    :param period: number of seconds between two readings
+    """
+    databases = {case: open_live_database(path, period) for case, path in paths_to_db.items()}
+    openings = {case: {} for case in databases}
+    lines = {}
+    nb_read_times = {case: 0 for case in databases}
+    while plt.fignum_exists(1):
+        for case, hd_band in databases.items():
+            hd_band.refresh()
+            new_times = hd_band.saved_times[nb_read_times[case]:]
+            nb_read_times[case] = hd_band.nb_saved_times
+            read_openings(hd_band, new_times, openings[case])
+            for cell_id, history in openings[case].items():
+                history = np.array(history)
+                if (case, cell_id) not in lines:
+                    lines[case, cell_id] = plt.plot([], [], label="{} cell {:d}".format(
+                        case, int(cell_id)))[0]
+                    print(case + " : " + str(len(openings[case])) + " disc créées")
+                lines[case, cell_id].set_data(history[:, 0] * 1.e+6, history[:, 1])
+        plt.gca().relim()
+        plt.gca().autoscale_view()
+        plt.pause(period)
+
 def run():
     """
     Run post processing program
@@ -25,6 +79,11 @@ def run():
                         help="the path to the output repository")
     parser.add_argument("--output_filename", default="all_fields.hdf5",
                         help="the name of the output hdf5 band (default = all_fields.hdf5)")
+    parser.add_argument("--follow", type=float, metavar="PERIOD",
+                        help="Follow running simulations whose databases are written with the "
+                             "time-series layout in SWMR mode : the openings are plotted and "
+                             "the new times are read every PERIOD seconds until the figure "
+                             "is closed")
     args = parser.parse_args()
 
     if args.case is None:
@@ -39,6 +98,16 @@ def run():
     plt.ylabel("Free surface velocity [m/s]", fontsize=16)
 
 
+    # ----------------------------------------------------------
+    # Follow the discontinuity openings of running cases
+    # ----------------------------------------------------------
+    if args.follow is not None:
+        plt.title("Evolution of the discontinuity opening", fontweight='bold', fontsize=18)
+        plt.ylabel("Discontinuity opening [m]", fontsize=16)
+        follow_openings({case: pathlib.Path.cwd().joinpath(case, args.output_filename)
+                         for case in args.case[0]}, args.follow)
+        return
+
     # ----------------------------------------------------------
     # Read discontinuity opening for each cell
     # ----------------------------------------------------------
@@ -47,18 +116,7 @@ def run():
         path_to_db = pathlib.Path.cwd().joinpath(case, args.output_filename)
         # Read database :
         hd_band = OutputDatabaseExploit(path_to_db)
-        for time in hd_band.saved_times:
-            cell_status = hd_band.extract_field_at_time("CellStatus", time)[:]
-            enriched_cells = np.where(cell_status)[0]
-            if len(enriched_cells) > 0:
-                opening = hd_band.extract_field_at_time("AdditionalDiscontinuityOpening", time)[:]
-                for i in range(len(opening[:, 0])):
-                    cell_id = opening[i, 0]
-                    op = opening[i, 1]
-                    try:
-                        opening_dict[cell_id].append([time, op])
-                    except KeyError:  # 1ere fois que la maille est enrichie => init list opening
-                        opening_dict[cell_id] = [[time, op]]
+        read_openings(hd_band, hd_band.saved_times, opening_dict)
 
         #Transformation en array
         for key in opening_dict:
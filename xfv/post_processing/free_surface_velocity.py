@@ -8,7 +8,41 @@ import pathlib
 import numpy as np
 import matplotlib.pyplot as plt
 
-from xfv.post_processing.tools.hdf5_postprocessing_tools import get_field_evolution_in_time_for_item
+from xfv.post_processing.tools.hdf5_postprocessing_tools import \
+    get_field_evolution_in_time_for_item, open_live_database, poll_field_evolution_for_item
+
+
+def follow_free_surface_velocity(paths_to_db, period, shift_t0):
+    """
+    Plot the free surface velocity of running simulations (databases written with the
+    time-series layout in SWMR mode), reading the new times every period seconds until the
+    figure is closed
+
+    :param paths_to_db: paths to the databases by case
+    :param period: number of seconds between two readings
+    :param shift_t0: if True the time origin is the arrival of the signal on the free surface
+    :return: the history (time, velocity) of each case
+    """
+    databases = {case: open_live_database(path, period) for case, path in paths_to_db.items()}
+    histories = {case: np.zeros([0, 2]) for case in databases}
+    lines = {case: plt.plot([], [], label=case)[0] for case in databases}
+    plt.legend(loc="best")
+    while plt.fignum_exists(1):
+        for case, database in databases.items():
+            new_history = poll_field_evolution_for_item(database, -1, "ClassicalNodeVelocity",
+                                                        len(histories[case]))
+            if not len(new_history):
+                continue
+            histories[case] = np.concatenate([histories[case], new_history])
+            time, velocity = histories[case][:, 0], histories[case][:, 1]
+            time_0 = 0.
+            if shift_t0 and np.any(velocity > 1):
+                time_0 = time[velocity > 1][0]  # 1st time where non zero velocity
+            lines[case].set_data((time - time_0) * 1.e+6, velocity)
+        plt.gca().relim()
+        plt.gca().autoscale_view()
+        plt.pause(period)
+    return histories
 
 
 def run():
@@ -32,6 +66,10 @@ def run():
                         help="Write a file with time and velocity")
     parser.add_argument("--file_write_data", default="free_surface_velocity.dat",
                         help="Name of the output file to write time and velocity")
+    parser.add_argument("--follow", type=float, metavar="PERIOD",
+                        help="Follow running simulations whose databases are written with the "
+                             "time-series layout in SWMR mode : the new times are read every "
+                             "PERIOD seconds until the figure is closed")
     args = parser.parse_args()
 
     if args.case is None:
@@ -54,6 +92,28 @@ def run():
     plt.xlabel("Time [mus]", fontsize=16)
     plt.ylabel("Free surface velocity [m/s]", fontsize=16)
 
+    # ----------------------------------------------------------
+    # Plot experimental data
+    # ----------------------------------------------------------
+    if exp_data is not None:
+        experimental_velocity = np.loadtxt(exp_data)
+        plt.plot(experimental_velocity[:, 0], experimental_velocity[:, 1], "--",
+                 color="black", label="Experiment")
+
+    # ----------------------------------------------------------
+    # Follow the free surface velocity of running cases
+    # ----------------------------------------------------------
+    if args.follow is not None:
+        histories = follow_free_surface_velocity(
+            {case: pathlib.Path.cwd().joinpath(case, args.output_filename)
+             for case in args.case[0]}, args.follow, args.shift_t0)
+        if args.write_data:
+            for case, history in histories.items():
+                data_path = pathlib.Path.cwd().joinpath(case, args.file_write_data)
+                np.savetxt(data_path, history, fmt="%20.18g", delimiter="\t")
+                print("Data written in {:s}".format(str(data_path)))
+        return
+
     # ----------------------------------------------------------
     # Plot free surface velocity for each case
     # ----------------------------------------------------------
@@ -88,19 +148,12 @@ def run():
                     file_object.write("{:20.18g}\t{:20.18g}\n".format(x_data, y_data))
             print("Data written in {:s}".format(data_path))
 
-    # ----------------------------------------------------------
-    # Plot experimental data
-    # ----------------------------------------------------------
-    if exp_data is not None:
-        experimental_velocity = np.loadtxt(exp_data)
-        plt.plot(experimental_velocity[:, 0], experimental_velocity[:, 1], "--",
-                 color="black", label="Experiment")
-
 
 if __name__ == "__main__":
     run()
     # ----------------------------------------------------------
-    # Show figure
+    # Show figure (closed by the user at the end of the follow mode)
     # ----------------------------------------------------------
-    plt.legend(loc="best")
-    plt.show()
+    if plt.get_fignums():
+        plt.legend(loc="best")
+        plt.show()
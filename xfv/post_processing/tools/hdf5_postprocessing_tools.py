@@ -4,6 +4,7 @@
 Tools for post processing of the hdf5 band to write the true fields for cells and nodes selected
 """
 
+from time import sleep
 import numpy as np
 from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
 
@@ -20,6 +21,14 @@ def get_field_evolution_in_time_for_item(path_to_hdf5_db: str, id_item: int, fie
     """
     my_hd = OutputDatabaseExploit(path_to_hdf5_db)
     field_item_history = np.zeros([len(my_hd.saved_times), 2])
+    if "Classical" in field:
+        # Only the values of the item are read (time series layout)
+        times, values = my_hd.extract_field_history(field, id_item)
+        nb_times = len(times[::modulo])
+        field_item_history[:nb_times, 0] = times[::modulo]
+        # The node fields are stored with a last axis of size 1
+        field_item_history[:nb_times, 1] = np.reshape(values, len(times))[::modulo]
+        return field_item_history
     index_time = 0
     for i in range(len(my_hd.saved_times)):
         # if i correspond to one over modulo time of the database, get field at time t
@@ -31,6 +40,41 @@ def get_field_evolution_in_time_for_item(path_to_hdf5_db: str, id_item: int, fie
     return field_item_history
 
 
+def open_live_database(path_to_hdf5_db: str, period: float = 1.):
+    """
+    Open the database written by a running simulation (time series layout in SWMR mode),
+    waiting until the file can be read (once its first time is written)
+
+    :param path_to_hdf5_db: path to the hdf5 database
+    :param period: number of seconds between two attempts
+    :return: the database opened in live mode (see OutputDatabaseExploit.refresh)
+    """
+    while True:
+        try:
+            return OutputDatabaseExploit(path_to_hdf5_db, live=True)
+        except OSError:
+            sleep(period)
+
+
+def poll_field_evolution_for_item(hdf5_band: OutputDatabaseExploit, id_item: int, field: str,
+                                  nb_read_times: int):
+    """
+    Read the times written since the previous poll of a database opened in live mode and
+    returns the values of a classical field at an item at the times not read yet. Only the
+    new rows of the item are read.
+
+    :param hdf5_band: hdf5 band opened in live mode
+    :param id_item: id of the item to be post processed
+    :param field: classical field to be post processed
+    :param nb_read_times: number of times already read
+    :return: np.array(new times, field at these times)
+    """
+    hdf5_band.refresh()
+    times, values = hdf5_band.extract_field_history(field, id_item, nb_read_times)
+    # The node fields are stored with a last axis of size 1
+    return np.stack([times, np.reshape(values, len(times))], axis=1)
+
+
 def get_field_profile_at_time(hdf5_band: OutputDatabaseExploit, field: str, time: float):
     """
     Extracts a profile of field at time t
@@ -6,9 +6,10 @@ Implementing class cell
 from abc import abstractmethod
 from copy import deepcopy
 import os
+from typing import Optional
 import numpy as np
 
-from xfv.src.data.data_container import DataContainer
+from xfv.src.context.simulationcontext import SimulationContext, current_context
 from xfv.src.fields.field import Field
 from xfv.src.fields.fieldsmanager import FieldManager
 
@@ -51,13 +52,15 @@ class Cell:  # pylint: disable=too-many-public-methods, too-many-instance-attrib
                 vec_coord[ielem][2] = z_coord[nodes_index].mean()
         return vec_coord
 
-    def __init__(self, nbr_of_cells: int):
+    def __init__(self, nbr_of_cells: int, context: Optional[SimulationContext] = None):
         """
         Constructor of the array of cells
 
         :param nbr_of_cells: number of cells
+        :param context: context of the simulation (default the active one)
         """
-        self.data = DataContainer()  # pylint: disable=no-value-for-parameter
+        self.context = current_context() if context is None else context
+        self.data = self.context.data
         self._nbr_of_cells = nbr_of_cells
         self._dt = np.zeros(self._nbr_of_cells, dtype=np.float64, order='C')
         self._size_t = np.zeros(self._nbr_of_cells, dtype=np.float64, order='C')
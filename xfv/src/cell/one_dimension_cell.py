@@ -2,20 +2,99 @@
 """
 Implementation of the OneDimensionCell class
 """
-from typing import Tuple
+from typing import Optional, Tuple
 import numpy as np
 
 from xfv.src.cell import Cell
+from xfv.src.context.simulationcontext import SimulationContext, current_context
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
 from xfv.src.solver.functionstosolve.vnrenergyevolutionforveformulation import (
     VnrEnergyEvolutionForVolumeEnergyFormulation)
 from xfv.src.solver.newtonraphson import NewtonRaphson
+from xfv.src.solver.warmstartednewtonraphson import WarmStartedNewtonRaphson
 from xfv.src.utilities.stress_invariants_calculation import compute_second_invariant
 
-USE_INTERNAL_SOLVER = False
+# The solver and its number of threads are chosen by each simulation context
+# (use_internal_solver and vnr_solver_threads attributes)
+COMPILED_SOLVER_AVAILABLE = True
 try:
-    from launch_vnr_resolution_c import launch_vnr_resolution, MieGruneisenParams
+    # Compiled solver bundled with xfv (built by setup.py)
+    from xfv.src.equationsofstate.launch_vnr_resolution_c import (launch_vnr_resolution,
+                                                                  openmp_enabled)
+    EXTERNAL_SOLVER_NAME = "compiled (bundled C extension)"
+    EXTERNAL_SOLVER_IS_THREADED = openmp_enabled()
+
+    def _build_vnr_params(eos):
+        """
+        Returns the parameters of the eos as expected by the bundled solver
+        """
+        return tuple(eos.eos_param)
+
+    def _launch_vnr_resolution(params, *arrays, nb_threads=1, linear_in_energy=False):
+        """
+        Launch the bundled solver with the required number of threads, using the exact
+        solution if the eos is linear in energy
+        """
+        launch_vnr_resolution(params, *arrays, nb_threads, linear_in_energy)
 except ImportError:
-    USE_INTERNAL_SOLVER = True
+    try:
+        # External vnr-internal-energy package
+        from launch_vnr_resolution_c import launch_vnr_resolution, MieGruneisenParams
+        EXTERNAL_SOLVER_NAME = "compiled (external vnr-internal-energy library)"
+        EXTERNAL_SOLVER_IS_THREADED = False
+
+        def _build_vnr_params(eos):
+            """
+            Returns the parameters of the eos as expected by the external solver
+            """
+            return MieGruneisenParams(**eos.eos_param._asdict())
+
+        def _launch_vnr_resolution(params, *arrays, nb_threads=1, linear_in_energy=False):  # pylint: disable=unused-argument
+            """
+            Launch the external solver (always iterative)
+            """
+            launch_vnr_resolution(params, *arrays)
+    except ImportError:
+        COMPILED_SOLVER_AVAILABLE = False
+
+
+def uses_internal_solver(context: Optional[SimulationContext] = None) -> bool:
+    """
+    Returns True if the internal energy evolution is solved by the python solver in the
+    simulation context (asked by the context or no compiled solver available)
+
+    :param context: context of the simulation (default the active one)
+    """
+    context = current_context() if context is None else context
+    return context.use_internal_solver or not COMPILED_SOLVER_AVAILABLE
+
+
+def get_vnr_solver_backend(context: Optional[SimulationContext] = None) -> str:
+    """
+    Returns the name of the backend used to solve the internal energy evolution
+
+    :param context: context of the simulation (default the active one)
+    """
+    context = current_context() if context is None else context
+    if uses_internal_solver(context):
+        return "python (internal NewtonRaphson solver)"
+    if EXTERNAL_SOLVER_IS_THREADED:
+        threads = context.vnr_solver_threads if context.vnr_solver_threads else "all available"
+        return "{} with {} thread(s)".format(EXTERNAL_SOLVER_NAME, threads)
+    return EXTERNAL_SOLVER_NAME
+
+
+def set_vnr_solver_threads(nb_threads: int, context: Optional[SimulationContext] = None) -> None:
+    """
+    Set the number of threads used by the compiled solver to share the cells of the
+    simulation context. Without effect if the solver has not been built with OpenMP.
+
+    :param nb_threads: number of threads (0 for all the available processors)
+    :param context: context of the simulation (default the active one)
+    """
+    if nb_threads < 0:
+        raise ValueError("The number of threads must be positive or null")
+    (current_context() if context is None else context).vnr_solver_threads = nb_threads
 
 
 def consecutive(data: np.ndarray, stepsize=1):
@@ -52,7 +131,7 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
     def apply_equation_of_state(cls, cell: Cell, eos, density: np.array, density_new: np.array,
                                 pressure: np.array, pressure_new: np.array,
                                 energy: np.array, energy_new: np.array,
-                                pseudo: np.array, cson_new: np.array):
+                                pseudo: np.array, cson_new: np.array, energy_guess=None):
         """
         Apply the equation of state to get the new internal energy, pressure and sound speed
 
@@ -66,14 +145,30 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
         :param energy_new: array of new energy [out]
         :param pseudo: array of artificial viscosity [in]
         :param cson_new: array of sound speed [out]
+        :param energy_guess: initial guess of the new energy for the iterative solver [in]
         """
         # pylint: disable=protected-access
 
-        if not USE_INTERNAL_SOLVER:
-            params = MieGruneisenParams(**eos.eos_param._asdict())
+        # Exact solution of the energy evolution instead of the Newton-Raphson iterations
+        exact_energy_update = cell._exact_energy_update and eos.is_linear_in_energy
+        # The compiled solvers only implement the Mie-Gruneisen equation of state, with the
+        # same parameters for all the cells (no ensemble of members, see xfv.src.ensemble)
+        if isinstance(eos, MieGruneisen) and density.ndim == 1 and \
+                not uses_internal_solver(cell.context):
+            params = _build_vnr_params(eos)
             pressure = pressure + 2. * pseudo
-            launch_vnr_resolution(params, 1. / density, 1. / density_new, pressure, energy,
-                                  energy_new, pressure_new, cson_new)
+            _launch_vnr_resolution(params, 1. / density, 1. / density_new, pressure,
+                                   np.ascontiguousarray(energy, dtype=np.float64),
+                                   energy_new, pressure_new, cson_new,
+                                   nb_threads=cell.context.vnr_solver_threads,
+                                   linear_in_energy=exact_energy_update)
+            if np.isnan(cson_new).any():
+                negative_vson = np.where(np.isnan(cson_new))
+                msg = "Sound speed square < 0 in cells {}\n".format(negative_vson)
+                msg += "density = {}\n".format(density_new[negative_vson])
+                msg += "energy = {}\n".format(energy_new[negative_vson])
+                msg += "pressure = {}\n".format(pressure_new[negative_vson])
+                raise ValueError(msg)
             return energy_new, pressure_new, cson_new
         else:
             my_variables = {'EquationOfState': eos,
@@ -82,7 +177,11 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
                             'Pressure': (pressure + 2. * pseudo),
                             'OldEnergy': energy}
             cell._function_to_vanish.set_variables(my_variables)
-            energy_new_value = cell._solver.compute_solution(energy)
+            if exact_energy_update:
+                # Exact solution : no need of the iterative solver
+                energy_new_value = cell._function_to_vanish.compute_solution_linear_in_energy()
+            else:
+                energy_new_value = cell._solver.compute_solution(energy, energy_guess)
 
             # Eos call to determine final pressure and sound speed values
             shape = energy_new.shape
@@ -96,7 +195,7 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
             if np.isnan(sound_velocity_new_value).any():
                 negative_vson = np.where(np.isnan(sound_velocity_new_value))
                 msg = "Sound speed square < 0 in cells {}\n".format(np.where(negative_vson))
-                msg += "density = {}\n".format(my_variables['NewDensity'][negative_vson])
+                msg += "density = {}\n".format(density_new[negative_vson])
                 msg += "energy = {}\n".format(energy_new_value[negative_vson])
                 msg += "pressure = {}\n".format(pressure_new_value[negative_vson])
                 raise ValueError(msg)
@@ -212,13 +311,14 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
         delta_t = cfl * size_new / local_cson
         return delta_t
 
-    def __init__(self, number_of_elements: int):
+    def __init__(self, number_of_elements: int, context: Optional[SimulationContext] = None):
         """
         Build the array of cells (1D)
 
         :param number_of_elements: number of cells
+        :param context: context of the simulation (default the active one)
         """
-        super().__init__(number_of_elements)
+        super().__init__(number_of_elements, context)
 
         # By default :all cells are classical (non enriched)
         self._classical = np.ones([number_of_elements, ], dtype=np.bool, order='C')
@@ -244,9 +344,34 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
             self._projectile_eos = \
                 self.data.material_projectile.constitutive_model.eos.build_eos_obj()
         self._function_to_vanish = VnrEnergyEvolutionForVolumeEnergyFormulation()
+        self._exact_energy_update = self.data.numeric.exact_energy_update
 
         # Solver EOS
-        self._solver = NewtonRaphson(self._function_to_vanish)
+        if self.data.numeric.newton_solver == 'warm-started':
+            self._solver = WarmStartedNewtonRaphson(self._function_to_vanish)
+        else:
+            self._solver = NewtonRaphson(self._function_to_vanish)
+        # Energy at the previous time step (predictor of the new energy)
+        self._energy_previous = np.copy(self.energy.current_value)
+
+    @property
+    def newton_telemetry(self):
+        """
+        Returns the convergence statistics of the internal energy solver (None if
+        not recorded)
+        """
+        return self._solver.telemetry
+
+    def _energy_predictor(self, mask):
+        """
+        Returns the initial guess of the new energy, extrapolated from the two
+        previous steps, if the solver can take advantage of it
+
+        :param mask: boolean mask of the cells
+        """
+        if not self._solver.uses_initial_guess:
+            return None
+        return 2. * self.energy.current_value[mask] - self._energy_previous[mask]
 
     def compute_mass(self):
         """
@@ -369,7 +494,8 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
                 self.density.current_value[mask_p], self.density.new_value[mask_p],
                 self.pressure.current_value[mask_p], self.pressure.new_value[mask_p],
                 self.energy.current_value[mask_p], self.energy.new_value[mask_p],
-                self.pseudo.current_value[mask_p], self.sound_velocity.new_value[mask_p])
+                self.pseudo.current_value[mask_p], self.sound_velocity.new_value[mask_p],
+                self._energy_predictor(mask_p))
 
         # Equation of state for the target
         mask_t = np.logical_and(mask, self.cell_in_target)
@@ -391,7 +517,7 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
                 self.pressure.current_value[mask_t], self.pressure.new_value[mask_t],
                 self.energy.current_value[mask_t], self.energy.new_value[mask_t],
                 self.pseudo.current_value[mask_t],
-                self.sound_velocity.new_value[mask_t])
+                self.sound_velocity.new_value[mask_t], self._energy_predictor(mask_t))
 
             if self.data.material_target.porosity_model is not None:
                 self.density.current_value[mask_t],\
@@ -743,8 +869,11 @@ class OneDimensionCell(Cell):  # pylint: disable=too-many-public-methods
         """
         Increment cells variables from one iteration to another
         """
+        self._energy_previous[:] = self.energy.current_value
         super().increment_variables()
         self._deviatoric_stress_current[:, :] = self._deviatoric_stress_new[:, :]
+        if self._solver.telemetry is not None:
+            self._solver.telemetry.end_step()
 
     def compute_new_coordinates(self, topology, x_coord):
         """
@@ -3,11 +3,12 @@
 Implementing the Element1dEnriched class for Hansbo&Hansbo enrichment
 """
 import os
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 
 from xfv.src.cell.one_dimension_cell import OneDimensionCell, Cell
+from xfv.src.context.simulationcontext import SimulationContext
 from xfv.src.discontinuity.discontinuity import Discontinuity
 from xfv.src.utilities.stress_invariants_calculation import compute_second_invariant
 from xfv.src.fields.field import Field
@@ -59,13 +60,14 @@ class OneDimensionHansboEnrichedCell(OneDimensionCell):  # pylint: disable=too-m
         ud = u2d * epsilon + u1d * (1. - epsilon)  # pylint: disable=invalid-name
         return ug, ud
 
-    def __init__(self, n_cells: int):
+    def __init__(self, n_cells: int, context: Optional[SimulationContext] = None):
         """
         Build the class OneDimensionHansboEnrichedCell
 
         :param n_cells: total number of cells
+        :param context: context of the simulation (default the active one)
         """
-        super().__init__(n_cells)
+        super().__init__(n_cells, context)
         #
         print(self._fields_manager)
         self._classical = np.ones(n_cells, dtype=np.bool, order='C')
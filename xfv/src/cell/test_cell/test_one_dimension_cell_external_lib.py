@@ -5,10 +5,14 @@
 one_dimension_cell module unit tests
 """
 import unittest
+import unittest.mock as mock
 import os
 import numpy as np
 
+from xfv.src.cell import one_dimension_cell
 from xfv.src.cell.one_dimension_cell import OneDimensionCell as Cell
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
 from xfv.src.data.data_container import DataContainer
 
 
@@ -21,9 +25,9 @@ class OneDimensionCellExternalLibTest(unittest.TestCase):
         """
         Tests setup for class
         """
-        data_file_path = os.path.join(os.path.dirname(__file__),
-                                      "../../../tests/0_UNITTEST/XDATA.json")
-        DataContainer(data_file_path)
+        cls.data_file_path = os.path.join(os.path.dirname(__file__),
+                                          "../../../tests/0_UNITTEST/XDATA.json")
+        DataContainer(cls.data_file_path)
 
     @classmethod
     def tearDownClass(cls):
@@ -36,29 +40,104 @@ class OneDimensionCellExternalLibTest(unittest.TestCase):
     def tearDown(self):
         pass
 
-    @unittest.skip("No yet ready")
+    @unittest.skipIf(not one_dimension_cell.COMPILED_SOLVER_AVAILABLE, "No compiled solver available")
     def test_compute_new_pressure_external(self):
         """
-        Test of compute_new_pressure method with external solver
+        Test of compute_new_pressure method with external solver : the results must be
+        the same as the ones of the internal solver
         """
-        self.test_cell._external_library = ""  #Â pylint:disable=protected-access
-        self.test_cell.energy.current_value = np.array([1.e+06, 0.5e+05, 2.4e+07])
-        self.test_cell.pressure.current_value = np.array([1.5e+09, 0.5e+08, 1.2e+10])
-        self.test_cell.density.current_value = np.array([8000., 8500., 9500.])
-        self.test_cell.pseudo.current_value = np.array([1.e+08, 0., 2.4e+09])
-        self.test_cell.density.new_value = np.array([8120., 8440., 9620.])
-        self.test_cell.energy.new_value = np.array([0., 0., 0.])
-        self.test_cell.pressure.new_value = np.array([0., 0., 0.])
-        self.test_cell.sound_velocity.new_value = np.array([0., 0., 0.])
-        self.test_cell.cell_in_target = np.array([True, True, True])
-        self.test_cell.compute_new_pressure(np.array([True, True, True]), 1.e-6)
-        # Function to vanish
-        delta_v = 1. / self.test_cell.density.new_value - 1. / self.test_cell.density.current_value
-        func = (self.test_cell.energy.new_value + self.test_cell.pressure.new_value * delta_v / 2. +
-                (self.test_cell.pressure.current_value + 2. * self.test_cell.pseudo.current_value)
-                * delta_v / 2. - self.test_cell.energy.current_value)
-        np.testing.assert_allclose(func, [0., 0., 0.])
+        results = []
+        for use_internal_solver in (True, False):
+            self.test_cell.energy.current_value = np.array([1.e+06, 0.5e+05, 2.4e+07])
+            self.test_cell.pressure.current_value = np.array([1.5e+09, 0.5e+08, 1.2e+10])
+            self.test_cell.density.current_value = np.array([8000., 8500., 9500.])
+            self.test_cell.pseudo.current_value = np.array([1.e+08, 0., 2.4e+09])
+            self.test_cell.density.new_value = np.array([8120., 8440., 9620.])
+            self.test_cell.energy.new_value = np.array([0., 0., 0.])
+            self.test_cell.pressure.new_value = np.array([0., 0., 0.])
+            self.test_cell.sound_velocity.new_value = np.array([0., 0., 0.])
+            with mock.patch.object(self.test_cell.context, "use_internal_solver",
+                                   use_internal_solver):
+                self.test_cell.compute_new_pressure(np.array([True, True, True]), 1.e-6)
+            results.append((np.copy(self.test_cell.energy.new_value),
+                            np.copy(self.test_cell.pressure.new_value),
+                            np.copy(self.test_cell.sound_velocity.new_value)))
+        for internal, external in zip(*results):
+            np.testing.assert_array_equal(external, internal)
 
+    @unittest.skipIf(not one_dimension_cell.COMPILED_SOLVER_AVAILABLE, "No compiled solver available")
+    def test_negative_sound_speed_square_external(self):
+        """
+        Test that the external solver raises a ValueError if the square of the sound speed
+        is negative
+        """
+        eos = MieGruneisen()
+        with mock.patch.object(self.test_cell.context, "use_internal_solver", False):
+            with self.assertRaises(ValueError):
+                Cell.apply_equation_of_state(self.test_cell, eos, np.array([8930.]),
+                                             np.array([6000.]), np.array([0.]), np.zeros([1]),
+                                             np.array([-1.e+06]), np.zeros([1]), np.zeros([1]),
+                                             np.zeros([1]))
+
+    @unittest.skipIf(not one_dimension_cell.COMPILED_SOLVER_AVAILABLE, "No compiled solver available")
+    def test_apply_equation_of_state_threads(self):
+        """
+        Test that the results of the compiled solver do not depend on the number of threads
+        """
+        eos = MieGruneisen()
+        size = 5000
+        rng = np.random.RandomState(3)
+        density = rng.uniform(8930., 11000., size)
+        density_new = density * rng.uniform(0.99, 1.01, size)
+        pressure = rng.uniform(0., 5.e+10, size)
+        energy = rng.uniform(0., 1.e+06, size)
+        results = []
+        for nb_threads in (1, 4, 0):
+            with mock.patch.object(self.test_cell.context, "use_internal_solver", False), \
+                    mock.patch.object(self.test_cell.context, "vnr_solver_threads", nb_threads):
+                results.append(Cell.apply_equation_of_state(
+                    self.test_cell, eos, density, density_new, pressure, np.zeros(size),
+                    energy, np.zeros(size), np.zeros(size), np.zeros(size)))
+        for other in results[1:]:
+            for res, ref in zip(other, results[0]):
+                np.testing.assert_array_equal(res, ref)
+
+    def test_set_vnr_solver_threads(self):
+        """
+        Test of the set_vnr_solver_threads function
+        """
+        context = SimulationContext("threads")
+        other_context = SimulationContext("other")
+        one_dimension_cell.set_vnr_solver_threads(4, context)
+        self.assertEqual(context.vnr_solver_threads, 4)
+        self.assertEqual(other_context.vnr_solver_threads, 1)
+        with self.assertRaises(ValueError):
+            one_dimension_cell.set_vnr_solver_threads(-1, context)
+
+    def test_solver_per_context(self):
+        """
+        Test that each cell uses the solver chosen in its own simulation context
+        """
+        internal_context = SimulationContext("internal")
+        internal_context.use_internal_solver = True
+        self.assertTrue(one_dimension_cell.uses_internal_solver(internal_context))
+        self.assertTrue(one_dimension_cell.get_vnr_solver_backend(internal_context)
+                        .startswith("python"))
+        with internal_context:
+            DataContainer(self.data_file_path)
+            internal_cell = Cell(3)
+        self.assertIs(internal_cell.context, internal_context)
+        self.assertIs(self.test_cell.context.use_internal_solver, False)
+        eos = MieGruneisen()
+        arrays = (np.array([8930.]), np.array([8950.]), np.array([1.e+09]), np.zeros([1]),
+                  np.array([1.e+05]), np.zeros([1]), np.zeros([1]), np.zeros([1]))
+        with mock.patch.object(one_dimension_cell, "_launch_vnr_resolution",
+                               wraps=one_dimension_cell._launch_vnr_resolution) as launch:
+            Cell.apply_equation_of_state(internal_cell, eos, *arrays)
+            self.assertEqual(launch.call_count, 0)
+            if one_dimension_cell.COMPILED_SOLVER_AVAILABLE:
+                Cell.apply_equation_of_state(self.test_cell, eos, *arrays)
+                self.assertEqual(launch.call_count, 1)
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
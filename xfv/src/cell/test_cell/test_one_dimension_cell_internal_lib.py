@@ -4,10 +4,12 @@
 one_dimension_cell module unit tests
 """
 import unittest
+import unittest.mock as mock
 import os
 import numpy as np
 from xfv.src.cell.one_dimension_cell import OneDimensionCell as Cell
 from xfv.src.data.data_container import DataContainer
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
 
 
 # TODO : move to the package solver !
@@ -59,6 +61,50 @@ class OneDimensionCellInternalLibTest(unittest.TestCase):
         np.testing.assert_allclose(func,
                                    np.array([-1001570.197044, -49979.091163, -24011029.653135]))
 
+    def test_apply_equation_of_state_linear_in_energy(self):
+        """
+        Test that the exact solution used for an eos linear in energy is the solution
+        found by the Newton algorithm
+        """
+        eos = MieGruneisen()
+        rng = np.random.RandomState(7)
+        density = rng.uniform(8000., 11000., 100)
+        density_new = density * rng.uniform(0.98, 1.02, 100)
+        pressure = rng.uniform(0., 2.e+10, 100)
+        energy = rng.uniform(0., 1.e+06, 100)
+        pseudo = rng.uniform(0., 1.e+09, 100)
+        results = []
+        for linear_in_energy in (True, False):
+            with mock.patch.object(self.test_cell.context, "use_internal_solver", True), \
+                    mock.patch.object(self.test_cell, "_exact_energy_update", True), \
+                    mock.patch.object(MieGruneisen, "is_linear_in_energy",
+                                      new_callable=mock.PropertyMock,
+                                      return_value=linear_in_energy):
+                results.append(Cell.apply_equation_of_state(
+                    self.test_cell, eos, density, density_new, pressure, np.zeros(100),
+                    energy, np.zeros(100), pseudo, np.zeros(100)))
+        for exact, newton in zip(*results):
+            np.testing.assert_allclose(exact, newton, rtol=1.e-12)
+
+    def test_exact_energy_update_opt_in(self):
+        """
+        Test that the exact energy update is only used if the exact-energy-update key of the
+        numeric parameters is set
+        """
+        self.assertFalse(self.test_cell._exact_energy_update)
+        arrays = (np.array([8930.]), np.array([8950.]), np.array([1.e+09]), np.zeros([1]),
+                  np.array([1.e+05]), np.zeros([1]), np.zeros([1]), np.zeros([1]))
+        with mock.patch.object(self.test_cell.context, "use_internal_solver", True), \
+                mock.patch.object(self.test_cell._function_to_vanish,
+                                  "compute_solution_linear_in_energy",
+                                  wraps=self.test_cell._function_to_vanish
+                                  .compute_solution_linear_in_energy) as exact:
+            Cell.apply_equation_of_state(self.test_cell, MieGruneisen(), *arrays)
+            self.assertEqual(exact.call_count, 0)
+            with mock.patch.object(self.test_cell, "_exact_energy_update", True):
+                Cell.apply_equation_of_state(self.test_cell, MieGruneisen(), *arrays)
+            self.assertEqual(exact.call_count, 1)
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,6 @@
+"""
+Package for checkpoint / restart modules
+"""
+from xfv.src.checkpoint.checkpointmanager import (CheckpointManager, capture_checkpoint,
+                                                  write_checkpoint, save_checkpoint,
+                                                  load_checkpoint)
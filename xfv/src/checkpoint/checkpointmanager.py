@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+Implementing the CheckpointManager class and the functions saving and restoring the
+state of a simulation
+
+A checkpoint is an HDF5 file holding :
+    - the loop variables (time, iteration, time steps) as attributes of the root group ;
+    - the arrays and scalars of the mesh, nodes, cells (classical and enriched) and mass
+      matrices in the group "mesh" ;
+    - the stacked variables of the discontinuities and the state of each of them in the
+      group "discontinuities" ;
+    - the next output time / iteration of the databases, figures and checkpoints in the
+      group "controlers", with the times already stored in each database.
+Restarting from a checkpoint gives the same results as the uninterrupted simulation.
+"""
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import h5py
+import numpy as np
+
+from xfv.src.cell.cell import Cell
+from xfv.src.discontinuity.discontinuity import Discontinuity
+from xfv.src.fields.field import Field
+from xfv.src.fields.fieldsmanager import FieldManager
+from xfv.src.mass_matrix.enriched_mass_matrix import EnrichedMassMatrix
+from xfv.src.mass_matrix.one_dimension_mass_matrix import OneDimensionMassMatrix
+from xfv.src.mesh.topology import Topology
+from xfv.src.node.node import Node
+from xfv.src.output_manager.outputtimecontroler import OutputTimeControler
+
+CHECKPOINT_FORMAT_VERSION = 1
+# Objects whose attributes are part of the state of the simulation
+STATE_CLASSES = (Node, Cell, OneDimensionMassMatrix, Topology, EnrichedMassMatrix)
+# Arrays smaller than this size are not compressed
+COMPRESSION_MIN_SIZE = 256
+# Loop variables stored in the checkpoint
+LOOP_VARIABLES = ("simulation_time", "step", "dt", "dt_staggered", "dt_crit", "compute_time")
+
+
+def _write_array(group: h5py.Group, name: str, value: np.ndarray):
+    """
+    Store the array in a dataset of the group (compressed if large enough)
+    """
+    if value.size >= COMPRESSION_MIN_SIZE:
+        group.create_dataset(name, data=value, compression="gzip", shuffle=True)
+    else:
+        group.create_dataset(name, data=value)
+
+
+def _write_snapshot(group: h5py.Group, snapshot: dict):
+    """
+    Store a snapshot in the group : the dicts are stored in sub groups, the arrays in
+    datasets and the scalars in attributes
+
+    :param group: HDF5 group
+    :param snapshot: the snapshot (see capture_checkpoint)
+    """
+    for name, value in snapshot.items():
+        if isinstance(value, dict):
+            _write_snapshot(group.create_group(name), value)
+        elif isinstance(value, np.ndarray):
+            _write_array(group, name, value)
+        else:
+            group.attrs[name] = value
+
+
+def _copy_array(snapshot: dict, name: str, value: np.ndarray):
+    """
+    Copy the array in the snapshot, reusing the array of a previous snapshot if possible
+    """
+    previous = snapshot.get(name)
+    if (isinstance(previous, np.ndarray) and previous.shape == value.shape
+            and previous.dtype == value.dtype):
+        np.copyto(previous, value)
+    else:
+        snapshot[name] = np.array(value)
+
+
+def _capture_field(snapshot: dict, field: Field) -> dict:
+    """
+    Copy the current and new values of the field in the snapshot
+    """
+    _copy_array(snapshot, "current", field.current_value)
+    _copy_array(snapshot, "new", field.new_value)
+    return snapshot
+
+
+def _capture_state(snapshot: dict, obj, exclude=()) -> dict:
+    """
+    Copy the arrays, fields and scalars attributes of obj in the snapshot. The attributes
+    that are instances of STATE_CLASSES are captured in sub snapshots.
+
+    :param snapshot: the snapshot (arrays of a previous snapshot are reused)
+    :param obj: the object to be saved
+    :param exclude: names of the attributes not to be saved
+    """
+    for name, value in vars(obj).items():
+        if name in exclude:
+            continue
+        if isinstance(value, np.ndarray):
+            _copy_array(snapshot, name, value)
+        elif isinstance(value, Field):
+            snapshot[name] = _capture_field(snapshot.get(name, {}), value)
+        elif isinstance(value, FieldManager):
+            fields_snapshot = snapshot.setdefault(name, {})
+            for field_name, field in value.items():
+                fields_snapshot[field_name] = _capture_field(
+                    fields_snapshot.get(field_name, {}), field)
+        elif isinstance(value, STATE_CLASSES):
+            snapshot[name] = _capture_state(snapshot.get(name, {}), value)
+        elif isinstance(value, (bool, int, float, np.generic)):
+            snapshot[name] = value
+    return snapshot
+
+
+def _read_field(group: h5py.Group, field: Field):
+    """
+    Restore the current and new values of the field from the group
+    """
+    field.current_value = group["current"][()]
+    field.new_value = group["new"][()]
+
+
+def _read_state(group: h5py.Group, obj):
+    """
+    Restore the attributes of obj captured by _capture_state and stored in the group. The arrays are
+    overwritten in place when their shape and type are unchanged so that the views and
+    references on them remain valid.
+
+    :param group: HDF5 group
+    :param obj: the object to be restored
+    """
+    attributes = vars(obj)
+    for name, item in group.items():
+        live = attributes.get(name)
+        if isinstance(item, h5py.Dataset):
+            value = item[()]
+            if (isinstance(live, np.ndarray) and live.shape == value.shape
+                    and live.dtype == value.dtype):
+                live[...] = value
+            else:
+                setattr(obj, name, value)
+        elif isinstance(live, Field):
+            _read_field(item, live)
+        elif isinstance(live, FieldManager):
+            for field_name, field_group in item.items():
+                _read_field(field_group, live[field_name])
+        elif live is not None:
+            _read_state(item, live)
+        else:
+            raise ValueError("Unable to restore the attribute {:s} of {}".format(name, obj))
+    for name, value in group.attrs.items():
+        live = attributes.get(name)
+        setattr(obj, name, value.item() if live is None else type(live)(value))
+
+
+def _capture_time_controler(time_ctrl: Optional[OutputTimeControler]) -> dict:
+    """
+    Returns the next output time and iteration of the controler (NaN and -1 stand for None)
+    """
+    if time_ctrl is None:
+        return {}
+    next_time, next_iteration = time_ctrl.next_output
+    return {"next_time": np.nan if next_time is None else next_time,
+            "next_iteration": -1 if next_iteration is None else next_iteration}
+
+
+def _read_time_controler(group: h5py.Group, time_ctrl: Optional[OutputTimeControler]):
+    """
+    Restore the next output time and iteration of the controler from the attributes of group
+    """
+    if time_ctrl is None or "next_time" not in group.attrs:
+        return
+    next_time = float(group.attrs["next_time"])
+    next_iteration = int(group.attrs["next_iteration"])
+    time_ctrl.set_next_output(None if np.isnan(next_time) else next_time,
+                              None if next_iteration < 0 else next_iteration)
+
+
+def capture_checkpoint(mesh, loop_state: Dict[str, float], output_mng,  # pylint: disable=too-many-arguments
+                       figure_mng, checkpoint_ctrl=None, snapshot: Optional[dict] = None) -> dict:
+    """
+    Returns an in memory snapshot of the state of the simulation (nested dicts of arrays
+    and scalars), to be written by write_checkpoint
+
+    :param mesh: the mesh (Mesh1dEnriched)
+    :param loop_state: loop variables (see LOOP_VARIABLES)
+    :param output_mng: the OutputManager
+    :param figure_mng: the FigureManager
+    :param checkpoint_ctrl: the controler of the checkpoints (OutputTimeControler)
+    :param snapshot: a previous snapshot whose arrays are reused (if the shapes are unchanged)
+    """
+    snapshot = {} if snapshot is None else snapshot
+    snapshot["format_version"] = CHECKPOINT_FORMAT_VERSION
+    snapshot["nodes_number"] = mesh.nodes.number_of_nodes
+    for name in LOOP_VARIABLES:
+        snapshot[name] = loop_state[name]
+    snapshot["mesh"] = _capture_state(snapshot.get("mesh", {}), mesh)
+
+    disc_snapshot = snapshot["discontinuities"] = {}
+    disc_snapshot["number"] = Discontinuity.discontinuity_number()
+    for name in Discontinuity.stacked_variables():
+        disc_snapshot[name] = np.array(getattr(Discontinuity, name))
+    for index, disc in enumerate(Discontinuity.discontinuity_list()):
+        disc_snapshot[str(index)] = {
+            "mask_in_nodes": np.array(disc.mask_in_nodes),
+            "mask_out_nodes": np.array(disc.mask_out_nodes),
+            "state": _capture_state({}, disc, exclude=Discontinuity.stacked_variables())}
+
+    output_snapshot = {}
+    for db_name, (database, time_ctrl) in output_mng.databases.items():
+        output_snapshot[db_name] = _capture_time_controler(time_ctrl)
+        output_snapshot[db_name]["saved_times"] = np.array(database.saved_times, dtype='S')
+    snapshot["controlers"] = {"output": output_snapshot,
+                              "figures": _capture_time_controler(figure_mng.time_controler),
+                              "checkpoints": _capture_time_controler(checkpoint_ctrl)}
+    return snapshot
+
+
+def write_checkpoint(path: Union[str, Path], snapshot: dict):
+    """
+    Write a snapshot of the simulation in the file path. The file is first written
+    under a temporary name and then renamed so that an interrupted writing does not
+    corrupt an existing checkpoint.
+
+    :param path: path of the checkpoint file
+    :param snapshot: the snapshot (see capture_checkpoint)
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with h5py.File(tmp_path, 'w') as file_out:
+        _write_snapshot(file_out, snapshot)
+    os.replace(tmp_path, path)
+
+
+def save_checkpoint(path: Union[str, Path], mesh, loop_state: Dict[str, float],  # pylint: disable=too-many-arguments
+                    output_mng, figure_mng, checkpoint_ctrl=None):
+    """
+    Save the state of the simulation in the file path
+
+    :param path: path of the checkpoint file
+    :param mesh: the mesh (Mesh1dEnriched)
+    :param loop_state: loop variables (see LOOP_VARIABLES)
+    :param output_mng: the OutputManager
+    :param figure_mng: the FigureManager
+    :param checkpoint_ctrl: the controler of the checkpoints (OutputTimeControler)
+    """
+    write_checkpoint(path, capture_checkpoint(mesh, loop_state, output_mng, figure_mng,
+                                              checkpoint_ctrl))
+
+
+def load_checkpoint(path: Union[str, Path], mesh, rupture_treatment,  # pylint: disable=too-many-arguments
+                    output_mng, figure_mng, checkpoint_ctrl=None) -> Dict[str, float]:
+    """
+    Restore the state of the simulation saved in the file path and returns the loop
+    variables. The mesh, the managers and the rupture treatment must have been built
+    from the same data as the checkpointed simulation and no discontinuity must exist.
+    The output databases must have been opened in append mode : the times stored
+    after the checkpoint are removed.
+
+    :param path: path of the checkpoint file
+    :param mesh: the mesh (Mesh1dEnriched)
+    :param rupture_treatment: the rupture treatment (EnrichElement if discontinuities exist)
+    :param output_mng: the OutputManager
+    :param figure_mng: the FigureManager
+    :param checkpoint_ctrl: the controler of the checkpoints (OutputTimeControler)
+    """
+    with h5py.File(path, 'r') as file_in:
+        if file_in.attrs["format_version"] != CHECKPOINT_FORMAT_VERSION:
+            raise ValueError("Unsupported checkpoint format version {}".format(
+                file_in.attrs["format_version"]))
+        if file_in.attrs["nodes_number"] != mesh.nodes.number_of_nodes:
+            raise ValueError("The checkpoint {} has been saved with {:d} nodes instead of {:d}"
+                             .format(path, file_in.attrs["nodes_number"],
+                                     mesh.nodes.number_of_nodes))
+        if Discontinuity.discontinuity_number() != 0:
+            raise ValueError("Discontinuities already exist. Unable to restart")
+
+        disc_group = file_in["discontinuities"]
+        nb_disc = int(disc_group.attrs["number"])
+        if nb_disc > 0 and not hasattr(rupture_treatment, "lump_style"):
+            raise ValueError("The checkpoint {} holds discontinuities but the failure treatment "
+                             "is not an enrichment".format(path))
+        for index in range(nb_disc):
+            group = disc_group[str(index)]
+            Discontinuity(int(disc_group["ruptured_cell_id"][index, 0]),
+                          group["mask_in_nodes"][()], group["mask_out_nodes"][()],
+                          float(disc_group["discontinuity_position"][index, 0]),
+                          rupture_treatment.lump_style)
+        if nb_disc > 0:
+            for name in Discontinuity.stacked_variables():
+                getattr(Discontinuity, name)[...] = disc_group[name][()]
+        for index, disc in enumerate(Discontinuity.discontinuity_list()):
+            _read_state(disc_group[str(index)]["state"], disc)
+
+        _read_state(file_in["mesh"], mesh)
+
+        ctrl_group = file_in["controlers"]
+        for db_name, (database, time_ctrl) in output_mng.databases.items():
+            group = ctrl_group["output/" + db_name]
+            _read_time_controler(group, time_ctrl)
+            database.keep_times([name.decode() for name in group["saved_times"][()]])
+        _read_time_controler(ctrl_group["figures"], figure_mng.time_controler)
+        _read_time_controler(ctrl_group["checkpoints"], checkpoint_ctrl)
+
+        return {name: file_in.attrs[name].item() for name in LOOP_VARIABLES}
+
+
+class CheckpointManager:
+    """
+    Periodically save the state of the simulation in a directory. Only the last
+    checkpoints are kept in order to bound the disk usage.
+
+    The state just before the first rupture can also be saved (for example to run
+    several simulations differing only by their cohesive or contact models from it).
+    As the rupture is only known during the iteration, the state at the beginning of each
+    iteration is captured in memory until the first discontinuity is created.
+    """
+    FILE_PATTERN = "checkpoint_{:09d}.h5"
+    PRE_RUPTURE_FILE = "before_first_rupture.h5"
+
+    def __init__(self, directory: Union[str, Path], time_period: Optional[float] = None,  # pylint: disable=too-many-arguments
+                 iteration_period: Optional[int] = None, retention: int = 2,
+                 before_first_rupture: bool = False):
+        """
+        :param directory: directory of the checkpoint files
+        :param time_period: simulated time between two checkpoints
+        :param iteration_period: number of iterations between two checkpoints
+                                 (no periodic checkpoint if both periods are None)
+        :param retention: number of checkpoint files kept
+        :param before_first_rupture: if True the state at the beginning of the iteration
+                                     of the first rupture is saved
+        """
+        if retention < 1:
+            raise ValueError("At least one checkpoint has to be kept (retention >= 1)")
+        self.__directory = Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__retention = retention
+        self.__time_ctrl = None
+        if time_period is not None or iteration_period is not None:
+            self.__time_ctrl = OutputTimeControler("Checkpoints", time_period=time_period,
+                                                   iteration_period=iteration_period)
+        # Files of the previous runs (restart) are the first ones to be removed
+        self.__files = sorted(self.__directory.glob(self.FILE_PATTERN.replace("{:09d}", "*")))
+        self.__before_first_rupture = before_first_rupture
+        self.__pre_rupture_snapshot = None
+        self.__pre_rupture_path = None
+
+    @property
+    def time_controler(self) -> Optional[OutputTimeControler]:
+        """
+        Returns the controler of the periodic checkpoints (None if no periodic checkpoint)
+        """
+        return self.__time_ctrl
+
+    @property
+    def files(self):
+        """
+        Returns the paths of the checkpoint files kept, from the oldest to the newest
+        """
+        return list(self.__files)
+
+    @property
+    def pre_rupture_path(self) -> Optional[Path]:
+        """
+        Returns the path of the checkpoint saved before the first rupture (None if not saved)
+        """
+        return self.__pre_rupture_path
+
+    @property
+    def watches_first_rupture(self) -> bool:
+        """
+        Returns True if the state has to be captured at the beginning of the iteration
+        because the first rupture may happen during it
+        """
+        return (self.__before_first_rupture and self.__pre_rupture_path is None
+                and Discontinuity.discontinuity_number() == 0)
+
+    def has_to_be_saved(self, time: float, iteration: int) -> bool:
+        """
+        Return True if a checkpoint has to be saved at this time or iteration
+        (no checkpoint is saved at the first iteration)
+
+        :param time: current time
+        :param iteration: current iteration
+        """
+        if self.__time_ctrl is None:
+            return False
+        return self.__time_ctrl.db_has_to_be_updated(time, iteration) and iteration > 0
+
+    def save(self, mesh, loop_state: Dict[str, float], output_mng, figure_mng) -> Path:
+        """
+        Save a checkpoint and remove the oldest ones beyond the retention.
+        Returns the path of the checkpoint file
+
+        :param mesh: the mesh (Mesh1dEnriched)
+        :param loop_state: loop variables (see LOOP_VARIABLES)
+        :param output_mng: the OutputManager
+        :param figure_mng: the FigureManager
+        """
+        path = self.__directory / self.FILE_PATTERN.format(loop_state["step"])
+        save_checkpoint(path, mesh, loop_state, output_mng, figure_mng, self.__time_ctrl)
+        if path in self.__files:
+            self.__files.remove(path)
+        self.__files.append(path)
+        while len(self.__files) > self.__retention:
+            try:
+                self.__files.pop(0).unlink()
+            except FileNotFoundError:
+                pass
+        return path
+
+    def capture_before_rupture(self, mesh, loop_state: Dict[str, float], output_mng,
+                               figure_mng):
+        """
+        Capture in memory the state at the beginning of the iteration. The arrays of the
+        previous capture are reused.
+
+        :param mesh: the mesh (Mesh1dEnriched)
+        :param loop_state: loop variables (see LOOP_VARIABLES)
+        :param output_mng: the OutputManager
+        :param figure_mng: the FigureManager
+        """
+        self.__pre_rupture_snapshot = capture_checkpoint(
+            mesh, loop_state, output_mng, figure_mng, self.__time_ctrl,
+            self.__pre_rupture_snapshot)
+
+    def save_if_first_rupture(self) -> Optional[Path]:
+        """
+        Write the state captured at the beginning of the iteration if the first
+        discontinuity has been created during it. Returns the path of the checkpoint
+        file if written, None otherwise
+        """
+        if self.__pre_rupture_snapshot is None or Discontinuity.discontinuity_number() == 0:
+            return None
+        self.__pre_rupture_path = self.__directory / self.PRE_RUPTURE_FILE
+        write_checkpoint(self.__pre_rupture_path, self.__pre_rupture_snapshot)
+        self.__pre_rupture_snapshot = None
+        return self.__pre_rupture_path
+
+    def restore(self, path: Union[str, Path], mesh, rupture_treatment,
+                output_mng, figure_mng) -> Dict[str, float]:
+        """
+        Restore the state of the simulation from a checkpoint file and returns the
+        loop variables (see load_checkpoint)
+        """
+        return load_checkpoint(path, mesh, rupture_treatment, output_mng, figure_mng,
+                               self.__time_ctrl)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+"""
+checkpointmanager module unit tests
+"""
+from pathlib import Path
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import h5py
+import numpy as np
+
+from xfv.src.checkpoint import checkpointmanager
+from xfv.src.checkpoint.checkpointmanager import CheckpointManager
+from xfv.src.data.data_container import CheckpointProps
+from xfv.src.fields.field import Field
+from xfv.src.fields.fieldsmanager import FieldManager
+from xfv.src.node.node import Node
+from xfv.src.output_manager.outputtimecontroler import OutputTimeControler
+
+
+class NodesWithFields(Node):  # pylint: disable=abstract-method
+    """
+    Nodes holding fields and scalars to be checkpointed
+    """
+    def __init__(self, nbr_of_nodes):
+        super().__init__(nbr_of_nodes, np.linspace(0., 1., nbr_of_nodes).reshape(-1, 1))
+        self.pressure = Field(nbr_of_nodes, 1., 2.)
+        self.fields_manager = FieldManager()
+        self.fields_manager["Energy"] = Field(nbr_of_nodes, 3., 4.)
+        self.counter = 0
+        self.active = False
+        self.optional_mask = None
+
+
+class CheckpointManagerTest(unittest.TestCase):
+    """
+    Test case for the checkpoint functions and the CheckpointManager class
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_state_round_trip(self):
+        """
+        Test that the state captured by _capture_state is restored by _read_state, the arrays
+        of same shape being overwritten in place
+        """
+        nodes = NodesWithFields(5)
+        nodes.upundemi[:, 0] = np.arange(5.)
+        nodes.pressure.new_value = np.linspace(10., 20., 5)
+        nodes.fields_manager["Energy"].current_value = np.linspace(-1., 1., 5)
+        nodes.counter = 12
+        nodes.active = True
+        nodes.optional_mask = np.array([True, False, True, False, True])
+        with h5py.File(self.directory / "state.h5", 'w') as file_out:
+            checkpointmanager._write_snapshot(
+                file_out, checkpointmanager._capture_state({}, nodes))
+
+        restored = NodesWithFields(5)
+        upundemi = restored.upundemi
+        with h5py.File(self.directory / "state.h5", 'r') as file_in:
+            checkpointmanager._read_state(file_in, restored)
+        self.assertIs(restored.upundemi, upundemi)
+        np.testing.assert_array_equal(restored.upundemi, nodes.upundemi)
+        np.testing.assert_array_equal(restored.xt, nodes.xt)
+        np.testing.assert_array_equal(restored.pressure.current_value, np.ones(5))
+        np.testing.assert_array_equal(restored.pressure.new_value, nodes.pressure.new_value)
+        np.testing.assert_array_equal(restored.fields_manager["Energy"].current_value,
+                                      np.linspace(-1., 1., 5))
+        np.testing.assert_array_equal(restored.optional_mask, nodes.optional_mask)
+        self.assertEqual(restored.counter, 12)
+        self.assertIs(restored.active, True)
+
+    def test_time_controler_round_trip(self):
+        """
+        Test that the next output time and iteration of the controlers are restored
+        """
+        time_ctrl = OutputTimeControler("time", time_period=1.e-06)
+        time_ctrl.db_has_to_be_updated(1.5e-06, 10)
+        iteration_ctrl = OutputTimeControler("iteration", iteration_period=100)
+        iteration_ctrl.db_has_to_be_updated(1.e-06, 250)
+        with h5py.File(self.directory / "ctrl.h5", 'w') as file_out:
+            checkpointmanager._write_snapshot(file_out, {
+                "time": checkpointmanager._capture_time_controler(time_ctrl),
+                "iteration": checkpointmanager._capture_time_controler(iteration_ctrl)})
+        restored_time = OutputTimeControler("time", time_period=1.e-06)
+        restored_iteration = OutputTimeControler("iteration", iteration_period=100)
+        with h5py.File(self.directory / "ctrl.h5", 'r') as file_in:
+            checkpointmanager._read_time_controler(file_in["time"], restored_time)
+            checkpointmanager._read_time_controler(file_in["iteration"], restored_iteration)
+        self.assertEqual(restored_time.next_output, time_ctrl.next_output)
+        self.assertEqual(restored_iteration.next_output, (None, 200))
+
+    def test_retention(self):
+        """
+        Test that only the last checkpoints are kept, even if the oldest one has already
+        been removed
+        """
+        (self.directory / "checkpoint_000000005.h5").touch()
+        with mock.patch.object(checkpointmanager, "save_checkpoint",
+                               side_effect=lambda path, *args: Path(path).touch()):
+            manager = CheckpointManager(self.directory, iteration_period=10, retention=2)
+            for step in (10, 20):
+                manager.save(None, {"step": step}, None, None)
+            (self.directory / "checkpoint_000000010.h5").unlink()
+            manager.save(None, {"step": 30}, None, None)
+        self.assertEqual([path.name for path in manager.files],
+                         ["checkpoint_000000020.h5", "checkpoint_000000030.h5"])
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()),
+                         ["checkpoint_000000020.h5", "checkpoint_000000030.h5"])
+
+    def test_has_to_be_saved(self):
+        """
+        Test that checkpoints are saved periodically but not at the first iteration
+        """
+        manager = CheckpointManager(self.directory, iteration_period=10)
+        saved = [step for step in range(35) if manager.has_to_be_saved(step * 1.e-09, step)]
+        self.assertEqual(saved, [10, 20, 30])
+
+    def test_before_first_rupture(self):
+        """
+        Test that the state captured at the beginning of the iteration is written only
+        once, when the first discontinuity has been created
+        """
+        manager = CheckpointManager(self.directory, before_first_rupture=True)
+        self.assertIsNone(manager.time_controler)
+        self.assertFalse(manager.has_to_be_saved(1.e-06, 100))
+        with mock.patch.object(checkpointmanager, "capture_checkpoint",
+                               return_value={"step": 12}), \
+                mock.patch.object(checkpointmanager, "write_checkpoint",
+                                  side_effect=lambda path, snapshot: Path(path).touch()), \
+                mock.patch.object(checkpointmanager.Discontinuity, "discontinuity_number",
+                                  return_value=0) as discontinuity_number:
+            self.assertTrue(manager.watches_first_rupture)
+            manager.capture_before_rupture(None, {"step": 12}, None, None)
+            self.assertIsNone(manager.save_if_first_rupture())
+            discontinuity_number.return_value = 1
+            path = manager.save_if_first_rupture()
+            self.assertEqual(path, self.directory / CheckpointManager.PRE_RUPTURE_FILE)
+            self.assertTrue(path.exists())
+            self.assertFalse(manager.watches_first_rupture)
+            self.assertIsNone(manager.save_if_first_rupture())
+
+    def test_checkpoint_props(self):
+        """
+        Test the validation of the checkpoint properties
+        """
+        props = CheckpointProps("checkpoints", None, 1000, 2)
+        self.assertEqual(props.retention, 2)
+        with self.assertRaises(ValueError):
+            CheckpointProps("checkpoints", 1.e-06, 1000, 2)
+        with self.assertRaises(ValueError):
+            CheckpointProps("checkpoints", None, None, 2)
+        self.assertTrue(CheckpointProps("checkpoints", None, None, 2, True).before_first_rupture)
+        with self.assertRaises(ValueError):
+            CheckpointProps("checkpoints", None, 1000, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,6 +47,27 @@ class CohesiveLaw:
                                                     self.cohesive_law_points[index - 1, 1],
                                                     self.cohesive_law_points[index, 1])
 
+    def compute_cohesive_force_arr(self, opening: np.ndarray) -> np.ndarray:
+        """
+        Returns the cohesive forces associated with the given openings
+
+        :param opening: openings of the discontinuities
+        :return: cohesive forces (array of the same size)
+        """
+        # Find the relevant points to interpolate cohesive law (all openings at once)
+        index = np.searchsorted(self.separation_points, opening)
+        above_critical = opening > self.separation_points[-1]
+        index[above_critical] = len(self.separation_points) - 1
+
+        # Interpolate the cohesive law
+        cohesive_force = CohesiveLaw.interpolate_cohesive_law(opening,
+                                                              self.cohesive_law_points[index - 1, 0],
+                                                              self.cohesive_law_points[index, 0],
+                                                              self.cohesive_law_points[index - 1, 1],
+                                                              self.cohesive_law_points[index, 1])
+        cohesive_force[above_critical] = 0.
+        return cohesive_force
+
     @classmethod
     def interpolate_cohesive_law(cls, opening, separation_1, separation_2, stress_1, stress_2):
         """
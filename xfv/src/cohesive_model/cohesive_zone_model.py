@@ -31,28 +31,57 @@ class CohesiveZoneModel:
 
         :param disc: discontinuity
         """
-        cohesive_force = 0.
-        new_opening = disc.discontinuity_opening.new_value[0]
+        cohesive_force = self.compute_cohesive_stress_arr(disc.discontinuity_opening.new_value,
+                                                          disc.history_max_opening,
+                                                          disc.history_min_cohesive_force,
+                                                          disc.damage_variable.new_value)
+        return cohesive_force[0]
 
-        if new_opening <= 0.:
-            cohesive_force = 0.
+    def compute_cohesive_stress_arr(self, new_opening: np.ndarray,
+                                    history_max_opening: np.ndarray,
+                                    history_min_cohesive_force: np.ndarray,
+                                    damage_variable: np.ndarray) -> np.ndarray:
+        """
+        Compute the cohesive forces of all the discontinuities at once according to their
+        new openings. The history and damage arrays are updated in place.
+
+        :param new_opening: new openings of the discontinuities
+        :param history_max_opening: maximal opening reached by each discontinuity
+        :param history_min_cohesive_force: cohesive force at the maximal opening of each disc
+        :param damage_variable: new damage of the discontinuities
+        :return: cohesive forces (array)
+        """
+        cohesive_force = np.zeros(new_opening.shape)
 
-        elif 0. < new_opening < disc.history_max_opening:
-            cohesive_force = \
-                self._unloading_model.compute_unloading_reloading_condition(disc, new_opening)
+        # new_opening <= 0. : no cohesive force
+        opened = new_opening > 0.
 
-        elif disc.history_max_opening <= new_opening < self._critical_separation:
-            cohesive_force = self._cohesive_law.compute_cohesive_force(new_opening)
+        # 0. < new_opening < history_max_opening : unloading or reloading
+        unloading = opened & (new_opening < history_max_opening)
+        if unloading.any():
+            cohesive_force[unloading] = \
+                self._unloading_model.compute_unloading_reloading_condition_arr(
+                    history_min_cohesive_force[unloading], history_max_opening[unloading],
+                    new_opening[unloading])
+
+        # history_max_opening <= new_opening < critical_separation : the damage grows
+        loading = opened & ~unloading & (new_opening < self._critical_separation)
+        if loading.any():
+            opening = new_opening[loading]
+            cohesive_force[loading] = self._cohesive_law.compute_cohesive_force_arr(opening)
             # Update the discontinuity indicators
-            disc.history_max_opening = max(abs(disc.history_max_opening), abs(new_opening))
-            disc.history_min_cohesive_force = \
-                self._cohesive_law.compute_cohesive_force(disc.history_max_opening)
-            disc.damage_variable.new_value = new_opening / self._critical_separation
-
-        elif new_opening >= self._critical_separation:
-            disc.damage_variable.new_value = 1.
-            cohesive_force = 0.
-            disc.history_max_opening = max(abs(disc.history_max_opening), abs(new_opening))
-            disc.history_min_cohesive_force = 0.
+            max_opening = np.maximum(np.abs(history_max_opening[loading]), np.abs(opening))
+            history_max_opening[loading] = max_opening
+            history_min_cohesive_force[loading] = \
+                self._cohesive_law.compute_cohesive_force_arr(max_opening)
+            damage_variable[loading] = opening / self._critical_separation
+
+        # new_opening >= critical_separation : the discontinuity is fully damaged
+        broken = opened & ~unloading & (new_opening >= self._critical_separation)
+        if broken.any():
+            damage_variable[broken] = 1.
+            history_max_opening[broken] = np.maximum(np.abs(history_max_opening[broken]),
+                                                     np.abs(new_opening[broken]))
+            history_min_cohesive_force[broken] = 0.
 
         return cohesive_force
@@ -92,6 +92,16 @@ class CohesiveLawTest(unittest.TestCase):
         expected = 0.
         self.assertEqual(result, expected)
 
+    def test_compute_cohesive_force_arr(self):
+        """
+        Test of the method compute_cohesive_force_arr of module CohesiveLaw
+        """
+        trilinear_law = CohesiveLaw(np.array([[0., 10.], [1., 8.], [3., 8], [5., 0.]]))
+        openings = np.array([0.5, 2., 4., 5., 20., 1.])
+        result = trilinear_law.compute_cohesive_force_arr(openings)
+        expected = [trilinear_law.compute_cohesive_force(opening) for opening in openings]
+        np.testing.assert_array_equal(result, expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Test of the CohesiveZoneModel
+"""
+import unittest
+import numpy as np
+from xfv.src.cohesive_model.cohesive_zone_model import CohesiveZoneModel
+from xfv.src.cohesive_model_unloading.constant_stiffness_unloading import ConstantStiffnessUnloading
+from xfv.src.cohesive_model_unloading.loss_of_stiffness_unloading import LossOfStiffnessUnloading
+
+
+class CohesiveZoneModelTest(unittest.TestCase):
+    """
+    Test case used to test the 'CohesiveZoneModel' module
+    """
+    def setUp(self):
+        """
+        Test initialisation
+        """
+        self.law_points = np.array([[0., 10.], [1., 8.], [3., 8], [5., 0.]])
+
+    def test_compute_cohesive_stress_arr(self):
+        """
+        Test of the method compute_cohesive_stress_arr on the different branches of the model:
+        closed, unloading, loading and broken discontinuities
+        """
+        model = CohesiveZoneModel(self.law_points, ConstantStiffnessUnloading(2.))
+        new_opening = np.array([-1., 2., 4., 6., 4.5, 0.])
+        history_max_opening = np.array([0., 3., 3.5, 4., 6., 1.])
+        history_min_cohesive_force = np.array([1.e+30, 8., 6., 4., 0., 8.])
+        damage = np.array([0., 0.6, 0.7, 0.8, 1., 0.2])
+
+        result = model.compute_cohesive_stress_arr(new_opening, history_max_opening,
+                                                   history_min_cohesive_force, damage)
+
+        np.testing.assert_allclose(result, [0., 6., 4., 0., -3., 0.])
+        np.testing.assert_allclose(history_max_opening, [0., 3., 4., 6., 6., 1.])
+        np.testing.assert_allclose(history_min_cohesive_force, [1.e+30, 8., 4., 0., 0., 8.])
+        np.testing.assert_allclose(damage, [0., 0.6, 0.8, 1., 1., 0.2])
+
+    def test_compute_cohesive_stress_arr_history(self):
+        """
+        Test that a loading - unloading - reloading history gives the same result
+        for all the discontinuities computed at once as for each discontinuity alone
+        """
+        model = CohesiveZoneModel(self.law_points, LossOfStiffnessUnloading())
+        openings = np.array([[0.5, 1.5, 1., 2.5, -0.1, 3.5, 6.],
+                             [0.2, 0.1, 0.4, 0.3, 4.5, 4., 4.2],
+                             [1., 2., 3., 4., 3., 2., 5.5]])
+        history_max_opening = np.zeros(3)
+        history_min_cohesive_force = np.full(3, 1.e+30)
+        damage = np.zeros(3)
+        for step in range(openings.shape[1]):
+            result = model.compute_cohesive_stress_arr(openings[:, step], history_max_opening,
+                                                       history_min_cohesive_force, damage)
+            for ind in range(3):
+                disc_max, disc_min, disc_damage = (np.copy(history_max_opening[ind:ind + 1]),
+                                                   np.copy(history_min_cohesive_force[ind:ind + 1]),
+                                                   np.copy(damage[ind:ind + 1]))
+                single = model.compute_cohesive_stress_arr(openings[ind:ind + 1, step],
+                                                           disc_max, disc_min, disc_damage)
+                self.assertEqual(single[0], result[ind])
+
+
+if __name__ == '__main__':
+    unittest.main()
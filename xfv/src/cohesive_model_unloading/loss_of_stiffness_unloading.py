@@ -24,7 +24,22 @@ class LossOfStiffnessUnloading(UnloadingModelBase):  # pylint: disable=too-few-p
         :param new_opening: opening of the discontinuity
         :return: cohesive stress (float)
         """
-        slope = disc.history_min_cohesive_force / disc.history_max_opening
-        cohesive_force = (disc.history_min_cohesive_force +
-                          slope * (new_opening - disc.history_max_opening))
+        return self.compute_unloading_reloading_condition_arr(disc.history_min_cohesive_force,
+                                                              disc.history_max_opening,
+                                                              new_opening)
+
+    def compute_unloading_reloading_condition_arr(self, history_min_cohesive_force,
+                                                  history_max_opening, new_opening):
+        """
+        Compute the cohesive stresses of several discontinuities in unloading or reloading
+        condition (new_opening is less than the discontinuities maximal opening)
+
+        :param history_min_cohesive_force: cohesive force at the maximal opening of each disc
+        :param history_max_opening: maximal opening reached by each discontinuity
+        :param new_opening: openings of the discontinuities
+        :return: cohesive stresses (array)
+        """
+        slope = history_min_cohesive_force / history_max_opening
+        cohesive_force = (history_min_cohesive_force +
+                          slope * (new_opening - history_max_opening))
         return cohesive_force
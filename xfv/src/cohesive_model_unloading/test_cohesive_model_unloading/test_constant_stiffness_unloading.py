@@ -34,12 +34,21 @@ class ConstantStiffnessUnloadingTest(unittest.TestCase):
         Test of the method compute_unloading_reloading_condition du module
         ConstantStiffnessUnloading
         """
-        self.disc.history_min_cohesive_force = 40.
-        self.disc.history_max_opening = 2.
+        self.disc.history_min_cohesive_force[:] = 40.
+        self.disc.history_max_opening[:] = 2.
         result = self.test_unloading_model.compute_unloading_reloading_condition(self.disc, 0.5)
         expected = 25.
         self.assertEqual(result, expected)
 
+    def test_compute_unloading_reloading_condition_arr(self):
+        """
+        Test of the method compute_unloading_reloading_condition_arr du module
+        ConstantStiffnessUnloading
+        """
+        result = self.test_unloading_model.compute_unloading_reloading_condition_arr(
+            np.array([40., 40., 70.]), np.array([2., 2., 7.]), np.array([0.5, 2., 6.5]))
+        np.testing.assert_allclose(result, [25., 40., 65.])
+
 
 if __name__ == '__main__':
     unittest.main()
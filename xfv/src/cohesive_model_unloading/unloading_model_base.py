@@ -3,6 +3,7 @@
 Definition of UnloadingModelBase
 """
 from abc import ABCMeta, abstractmethod
+import numpy as np
 
 
 class UnloadingModelBase(metaclass=ABCMeta):  # pylint: disable=too-few-public-methods
@@ -24,3 +25,17 @@ class UnloadingModelBase(metaclass=ABCMeta):  # pylint: disable=too-few-public-m
         :param new_opening: opening of the discontinuity
         :return: cohesive stress (float)
         """
+
+    @abstractmethod
+    def compute_unloading_reloading_condition_arr(self, history_min_cohesive_force: np.ndarray,
+                                                  history_max_opening: np.ndarray,
+                                                  new_opening: np.ndarray) -> np.ndarray:
+        """
+        Compute the cohesive stresses of several discontinuities in unloading or reloading
+        condition (new_opening is less than the discontinuities maximal opening)
+
+        :param history_min_cohesive_force: cohesive force at the maximal opening of each disc
+        :param history_max_opening: maximal opening reached by each discontinuity
+        :param new_opening: openings of the discontinuities
+        :return: cohesive stresses (array)
+        """
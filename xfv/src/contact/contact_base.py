@@ -28,3 +28,13 @@ class ContactBase(metaclass=ABCMeta):  # pylint: disable=too-few-public-methods
         :param disc: discontinuity to examine
         :param delta_t: time step
         """
+
+    @abstractmethod
+    def compute_contact_force_arr(self, node_velocity: np.array, delta_t: float) -> np.array:
+        """
+        Checks if contact for all the discontinuities at once and returns the contact forces
+        (null for the discontinuities that are not in contact)
+
+        :param node_velocity: node velocity array
+        :param delta_t: time step
+        """
@@ -34,6 +34,58 @@ class LagrangianMultiplierContact(ContactBase):  # pylint: disable=too-few-publi
         return LagrangianMultiplierContact._compute_lagrangian_multiplier(node_velocity,
                                                                           disc, delta_t)
 
+    def compute_contact_force_arr(self, node_velocity: np.array, delta_t: float) -> np.array:
+        """
+        Checks if contact for all the discontinuities at once and returns the contact forces
+        (null for the discontinuities that are not in contact)
+
+        :param node_velocity: node velocity array
+        :param delta_t: time step
+        """
+        opening = Discontinuity.discontinuity_opening_new[:, 0]
+        contact_force = np.zeros(opening.shape)
+        disc_ids = np.flatnonzero(~(opening >= 0.))
+        if disc_ids.size:
+            contact_force[disc_ids] = \
+                LagrangianMultiplierContact._compute_lagrangian_multiplier_arr(
+                    node_velocity, disc_ids, delta_t)
+        return contact_force
+
+    @staticmethod
+    def _compute_lagrangian_multiplier_arr(node_velocity: np.array, disc_ids: np.array,
+                                           time_step: float) -> np.array:
+        """
+        Compute the lagrangian multipliers representing the contact forces to apply to ensure
+        the non penetration of the boundaries of the selected discontinuities
+
+        :param node_velocity: array of the predicted velocities
+        :param disc_ids: indexes of the discontinuities in contact
+        :param time_step: time step
+        :return: lagrangian multipliers (array of size disc_ids.size)
+        """
+        epsilon = Discontinuity.discontinuity_position[disc_ids, 0]
+        # Computes fictive node mass for the discontinuity boundaries
+        disc_list = Discontinuity.discontinuity_list()
+        masses = np.zeros((disc_ids.size, 4))
+        for ind, disc_id in enumerate(disc_ids):
+            mass_matrix = disc_list[disc_id].mass_matrix_enriched
+            m_left = mass_matrix.get_mass_matrix_left()
+            m_right = mass_matrix.get_mass_matrix_right()
+            masses[ind] = (m_left[0, 0], m_left[1, 1], m_right[2, 2], m_right[3, 3])
+        m_1, m_2_enr, m_2, m_1_enr = masses.T
+        node_mass_g = m_1 * m_2_enr / (m_2_enr * (1 - epsilon) + m_1 * epsilon)
+        node_mass_d = m_1_enr * m_2 / (m_2 * (1 - epsilon) + m_1_enr * epsilon)
+        # Compute the velocities of the discontinuity boundaries
+        velocity_g = ((1 - epsilon) * node_velocity[Discontinuity.in_nodes[disc_ids, 0], 0]
+                      + epsilon * Discontinuity.enr_velocity_new[disc_ids, 0, 0])
+        velocity_d = ((1 - epsilon) * Discontinuity.enr_velocity_new[disc_ids, 1, 0]
+                      + epsilon * node_velocity[Discontinuity.out_nodes[disc_ids, 0], 0])
+        # Compute the contact force in order to have ug = ud afterward
+        lambda_multiplier = (velocity_d - velocity_g) / (
+            time_step * (node_mass_g + node_mass_d) / (node_mass_g * node_mass_d))
+        # signe inverse par rapport au papier car les forces ont un sens inverse
+        return lambda_multiplier
+
     @staticmethod
     def _compute_lagrangian_multiplier(node_velocity: np.array, disc: Discontinuity,
                                        time_step: float) -> float:
@@ -33,6 +33,17 @@ class PenaltyContact(ContactBase):  # pylint: disable=too-few-public-methods
         contact_force = self._compute_penalty_force(opening)
         return contact_force
 
+    def compute_contact_force_arr(self, node_velocity: np.array, delta_t: float) -> np.array:
+        """
+        Checks if contact for all the discontinuities at once and returns the contact forces
+        (null for the discontinuities that are not in contact)
+
+        :param node_velocity: node velocity array
+        :param delta_t: time step
+        """
+        opening = Discontinuity.discontinuity_opening_new[:, 0]
+        return np.where(opening > 0., 0., self.penalty_stiffness * opening)
+
     def _compute_penalty_force(self, opening) -> float:
         """
         Compute the penalty force to apply in order to penalize contact
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+"""
+Test of the LagrangianMultiplierContact
+"""
+import unittest
+import numpy as np
+from xfv.src.contact.lagrange_multiplier import LagrangianMultiplierContact
+from xfv.src.discontinuity.discontinuity import Discontinuity
+from xfv.src.data.enriched_mass_matrix_props import ConsistentMassMatrixProps
+
+
+class LagrangianMultiplierContactTest(unittest.TestCase):
+    """
+    Test case used to test the 'LagrangianMultiplierContact' module
+    """
+    def setUp(self):
+        """
+        Tests initialisation
+        """
+        self.disc = Discontinuity(0, np.array([True, False]), np.array([False, True]), 0.25,
+                                  ConsistentMassMatrixProps())
+        self.disc.mass_matrix_enriched.compute_enriched_mass_matrix_left_part(1., 2., 0.25)
+        self.disc.mass_matrix_enriched.compute_enriched_mass_matrix_right_part(3., 4., 0.25)
+        self.disc.enr_velocity_new[:] = [[-20.], [30.]]
+
+    def test_compute_lagrangian_multiplier_arr(self):
+        """
+        Test that the method _compute_lagrangian_multiplier_arr gives the same multiplier
+        as the method _compute_lagrangian_multiplier
+        """
+        node_velocity = np.array([[100., ], [50., ]])
+        expected = LagrangianMultiplierContact._compute_lagrangian_multiplier(
+            node_velocity, self.disc, 1.e-3)
+        result = LagrangianMultiplierContact._compute_lagrangian_multiplier_arr(
+            node_velocity, np.array([self.disc.label - 1]), 1.e-3)
+        np.testing.assert_array_equal(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
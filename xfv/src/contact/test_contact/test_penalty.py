@@ -4,6 +4,7 @@
 Test of the PenaltyContact
 """
 import unittest
+import unittest.mock as mock
 import numpy as np
 from xfv.src.contact.penalty import PenaltyContact
 from xfv.src.discontinuity.discontinuity import Discontinuity
@@ -45,6 +46,17 @@ class PenaltyContactTest(unittest.TestCase):
                                                                         delta_t)
         self.assertEqual(contact_force, -50.0)
 
+    def test_compute_contact_force_arr(self):
+        """
+        Test of the method compute_contact_force_arr
+        """
+        node_velocity = np.array([[100., ], [50., ]])
+        with mock.patch.object(Discontinuity, "discontinuity_opening_new",
+                               new=np.array([[-5.], [2.], [0.], [-1.]])):
+            contact_force = self.test_penalty_contact.compute_contact_force_arr(node_velocity,
+                                                                                1.)
+        np.testing.assert_array_equal(contact_force, [-50., 0., 0., -10.])
+
 
 if __name__ == '__main__':
     unittest.main()
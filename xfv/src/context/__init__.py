@@ -0,0 +1,4 @@
+"""
+Package for the simulation context modules
+"""
+from xfv.src.context.simulationcontext import SimulationContext, current_context
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Implementing the SimulationContext class
+
+A simulation context owns the state of one simulation : its data (DataContainer), its mesh,
+the registry of its discontinuities and its output managers (OutputManager, FigureManager).
+The classes built on the Singleton metaclass have one instance per context and the
+Discontinuity class works on the registry of the active context. Several independent
+simulations can thus live in one interpreter, each one running in its own context.
+
+The active context is held by a context variable, it is thus local to each thread (and to
+each asyncio task). Outside of any activated context the default context of the process
+is used, which gives back the behavior of process wide singletons.
+
+>>> context = SimulationContext("shot_1")
+>>> with context:
+...     data = DataContainer("XDATA.json")
+...     mesh = Mesh1dEnriched(coordinates, velocities)
+>>> context.data is data and context.mesh is mesh
+True
+"""
+import contextvars
+
+
+class SimulationContext:
+    """
+    The objects owned by one simulation
+    """
+
+    def __init__(self, name: str = ""):
+        """
+        :param name: name of the simulation (for messages only)
+        """
+        self.name = name
+        self.mesh = None
+        # Number of steps and simulation time reached by the simulation
+        self.step = 0
+        self.time = 0.
+        # Functions called with the context at the end of each time step
+        self.step_callbacks = []
+        # Internal energy solver of the cells : python solver if use_internal_solver (always
+        # used without compiled solver) and number of threads of the compiled solver (0 for
+        # all the available processors)
+        self.use_internal_solver = False
+        self.vnr_solver_threads = 1
+        # Instances of the Singleton classes, by class
+        self.__instances = {}
+        # Tokens to restore the previously active contexts
+        self.__tokens = []
+
+    def __repr__(self):
+        return "SimulationContext({!r})".format(self.name)
+
+    def __enter__(self):
+        """
+        Activate the context in the current thread (or task)
+        """
+        self.__tokens.append(_ACTIVE_CONTEXT.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Restore the context that was active before
+        """
+        _ACTIVE_CONTEXT.reset(self.__tokens.pop())
+
+    def get_instance(self, cls):
+        """
+        Returns the instance of the class cls owned by the context (None if there is none)
+
+        :param cls: a class built on the Singleton metaclass
+        """
+        return self.__instances.get(cls)
+
+    def set_instance(self, cls, instance):
+        """
+        Set the instance of the class cls owned by the context
+
+        :param cls: a class built on the Singleton metaclass
+        :param instance: the instance
+        """
+        self.__instances[cls] = instance
+
+    def clear_instance(self, cls):
+        """
+        Forget the instance of the class cls owned by the context
+
+        :param cls: a class built on the Singleton metaclass
+        """
+        self.__instances.pop(cls, None)
+
+    @property
+    def data(self):
+        """
+        Returns the data of the simulation (None if they have not been read yet)
+        """
+        from xfv.src.data.data_container import DataContainer  # pylint: disable=import-outside-toplevel
+        return self.get_instance(DataContainer)
+
+    @property
+    def discontinuities(self):
+        """
+        Returns the registry of the discontinuities of the simulation
+        """
+        from xfv.src.discontinuity.discontinuity import DiscontinuityRegistry  # pylint: disable=import-outside-toplevel
+        with self:
+            return DiscontinuityRegistry()
+
+    @property
+    def output_manager(self):
+        """
+        Returns the output manager of the simulation (None if it has not been built yet)
+        """
+        from xfv.src.output_manager.outputmanager import OutputManager  # pylint: disable=import-outside-toplevel
+        return self.get_instance(OutputManager)
+
+    @property
+    def figure_manager(self):
+        """
+        Returns the figure manager of the simulation (None if it has not been built yet)
+        """
+        from xfv.src.figure_manager.figure_manager import FigureManager  # pylint: disable=import-outside-toplevel
+        return self.get_instance(FigureManager)
+
+
+DEFAULT_CONTEXT = SimulationContext("default")
+_ACTIVE_CONTEXT = contextvars.ContextVar("xfv_simulation_context", default=DEFAULT_CONTEXT)
+
+
+def current_context() -> SimulationContext:
+    """
+    Returns the context active in the current thread (or task), the default context if none
+    has been activated
+    """
+    return _ACTIVE_CONTEXT.get()
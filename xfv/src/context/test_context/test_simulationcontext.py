@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+simulationcontext module unit tests
+"""
+import os
+import threading
+import unittest
+
+import numpy as np
+
+from xfv.src.context.simulationcontext import (SimulationContext, current_context,
+                                               DEFAULT_CONTEXT)
+from xfv.src.data.data_container import DataContainer
+from xfv.src.data.enriched_mass_matrix_props import LumpMenouillardMassMatrixProps
+from xfv.src.discontinuity.discontinuity import Discontinuity
+from xfv.src.mesh.mesh1denriched import Mesh1dEnriched
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "../../../tests/0_UNITTEST")
+
+
+def _build_discontinuities(number: int):
+    """
+    Build number discontinuities (in the first cells of the mesh) in the active context
+    """
+    for index in range(number):
+        mask_in = np.zeros(number + 1, dtype=bool)
+        mask_in[index] = True
+        Discontinuity(index, mask_in, np.roll(mask_in, 1), 0.5,
+                      LumpMenouillardMassMatrixProps())
+
+
+class SimulationContextTest(unittest.TestCase):
+    """
+    Test case for the SimulationContext class
+    """
+    def setUp(self):
+        self.context_1 = SimulationContext("first")
+        self.context_2 = SimulationContext("second")
+
+    def test_activation(self):
+        """
+        Test that the contexts are activated in a with statement and that the previous
+        context is restored at the end
+        """
+        self.assertIs(current_context(), DEFAULT_CONTEXT)
+        with self.context_1:
+            self.assertIs(current_context(), self.context_1)
+            with self.context_2:
+                self.assertIs(current_context(), self.context_2)
+            self.assertIs(current_context(), self.context_1)
+        self.assertIs(current_context(), DEFAULT_CONTEXT)
+
+    def test_singletons_per_context(self):
+        """
+        Test that each context owns its own DataContainer
+        """
+        with self.context_1:
+            data_1 = DataContainer(os.path.join(DATA_DIRECTORY, "XDATA_hydro.json"))
+            self.assertIs(DataContainer(), data_1)  # pylint: disable=no-value-for-parameter
+        with self.context_2:
+            data_2 = DataContainer(os.path.join(DATA_DIRECTORY, "XDATA_epp.json"))
+        self.assertIsNot(data_1, data_2)
+        self.assertIs(self.context_1.data, data_1)
+        self.assertIs(self.context_2.data, data_2)
+        self.assertIsNone(self.context_1.output_manager)
+        with self.context_1:
+            DataContainer.clear()
+        self.assertIsNone(self.context_1.data)
+        self.assertIs(self.context_2.data, data_2)
+
+    def test_discontinuities_per_context(self):
+        """
+        Test that the discontinuities and their storage are owned by the active context
+        """
+        with self.context_1:
+            _build_discontinuities(2)
+            Discontinuity.enr_force[:] = 1.
+        with self.context_2:
+            _build_discontinuities(1)
+            self.assertEqual(Discontinuity.discontinuity_number(), 1)
+            self.assertEqual(Discontinuity.enr_force.shape, (1, 2, 1))
+            np.testing.assert_equal(Discontinuity.enr_force, 0.)
+        with self.context_1:
+            self.assertEqual(Discontinuity.discontinuity_number(), 2)
+            np.testing.assert_equal(Discontinuity.enr_force, 1.)
+        self.assertEqual(len(self.context_1.discontinuities.discontinuities), 2)
+        self.assertEqual(len(self.context_2.discontinuities.discontinuities), 1)
+        self.assertIsNot(self.context_1.discontinuities.buffers["enr_force"],
+                         self.context_2.discontinuities.buffers["enr_force"])
+
+    def test_context_per_thread(self):
+        """
+        Test that the active context is local to each thread
+        """
+        contexts = {}
+
+        def run():
+            contexts["thread_default"] = current_context()
+            with self.context_2:
+                contexts["thread"] = current_context()
+                _build_discontinuities(1)
+
+        with self.context_1:
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+            self.assertIs(current_context(), self.context_1)
+            self.assertEqual(Discontinuity.discontinuity_number(), 0)
+        self.assertIs(contexts["thread_default"], DEFAULT_CONTEXT)
+        self.assertIs(contexts["thread"], self.context_2)
+        self.assertEqual(len(self.context_2.discontinuities.discontinuities), 1)
+
+    def test_mesh_in_context(self):
+        """
+        Test that the mesh, its cells and nodes are built on the data of their context
+        """
+        with self.context_1:
+            data = DataContainer(os.path.join(DATA_DIRECTORY, "XDATA_hydro.json"))
+        coordinates = np.linspace(0., 1.e-03, 5).reshape(-1, 1)
+        mesh = Mesh1dEnriched(coordinates, np.zeros_like(coordinates), context=self.context_1)
+        self.assertIs(self.context_1.mesh, mesh)
+        self.assertIs(mesh.data, data)
+        self.assertIs(mesh.cells.data, data)
+        self.assertIsNone(DEFAULT_CONTEXT.mesh)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@
 """
 Implementing the DataContainer class
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union, Any
@@ -24,7 +24,8 @@ from xfv.src.data.unloading_model_props import (UnloadingModelProps,
                                                 LossOfStiffnessUnloadingProps)
 from xfv.src.data.contact_props import (ContactProps, PenaltyContactProps,
                                         LagrangianMultiplierProps)
-from xfv.src.data.equation_of_state_props import (EquationOfStateProps, MieGruneisenProps)
+from xfv.src.data.equation_of_state_props import (EquationOfStateProps, MieGruneisenProps,
+                                                   TabulatedEquationOfStateProps)
 from xfv.src.data.yield_stress_props import (YieldStressProps, ConstantYieldStressProps)
 from xfv.src.data.shear_modulus_props import (ShearModulusProps, ConstantShearModulusProps)
 from xfv.src.data.plasticity_criterion_props import (PlasticityCriterionProps,
@@ -35,7 +36,8 @@ from xfv.src.data.rupture_criterion_props import (RuptureCriterionProps,
                                                   HalfRodComparisonCriterionProps,
                                                   MaximalStressCriterionProps,
                                                   MinimumPressureCriterionProps,
-                                                  NonLocalStressCriterionProps)
+                                                  NonLocalStressCriterionProps,
+                                                  ForcedNonLocalStressCriterionProps)
 from xfv.src.data.porosity_model_props import (PorosityModelProps,
                                                JohnsonModelProps)
 from xfv.src.data.enriched_mass_matrix_props import (EnrichedMassMatrixProps,
@@ -51,10 +53,14 @@ class NumericalProps(TypeCheckedDataClass):
     cfl: float
     cfl_pseudo: float
     consistent_mass_matrix_on_last_cells: bool
+    number_of_threads: int
+    newton_solver: str
+    exact_energy_update: bool
 
     def __post_init__(self):
         super().__post_init__()  # type checking first
-        self._ensure_positivity('a_pseudo', 'b_pseudo', 'cfl', 'cfl_pseudo')
+        self._ensure_positivity('a_pseudo', 'b_pseudo', 'cfl', 'cfl_pseudo', 'number_of_threads')
+        self._ensure_value_in('newton_solver', ('classical', 'warm-started'))
 
 
 @dataclass  # pylint: disable=missing-class-docstring
@@ -87,13 +93,55 @@ class DatabaseProps(TypeCheckedDataClass):
     path: str
     time_period: Optional[float]
     iteration_period: Optional[int]
+    asynchronous: bool = False
+    queue_size: int = 4
+    layout: str = "groups"
+    compression: Optional[str] = None
+    compression_level: Optional[int] = None
+    shuffle: bool = False
+    flush_period: Optional[int] = None
+    flush_interval: Optional[float] = None
+    chunk_cache_size: Optional[int] = None
+    libver_latest: bool = False
+    swmr: bool = False
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._ensure_strict_positivity('time_period', 'iteration_period', 'queue_size',
+                                       'flush_period', 'chunk_cache_size')
+        self._ensure_positivity('flush_interval')
+        self._ensure_value_in('layout', ("groups", "time-series"))
+        self._ensure_value_in('compression', (None, "gzip", "lzf"))
+        if self.compression is not None and self.layout != "time-series":
+            raise ValueError("Compression is only available for the time-series layout")
+        if self.swmr and self.layout != "time-series":
+            raise ValueError("SWMR is only available for the time-series layout")
+        if self.time_period is not None and self.iteration_period is not None:
+            raise ValueError("Please provide one of (time-period, iteration-period) "
+                             "but not both!")
+
+
+@dataclass  # pylint: disable=missing-class-docstring
+class CheckpointProps(TypeCheckedDataClass):
+    path: str
+    time_period: Optional[float]
+    iteration_period: Optional[int]
+    retention: int
+    before_first_rupture: bool = False
 
     def __post_init__(self):
         super().__post_init__()
         self._ensure_strict_positivity('time_period', 'iteration_period')
+        if self.retention < 1:
+            raise ValueError("At least one checkpoint has to be kept (retention >= 1)")
         if self.time_period is not None and self.iteration_period is not None:
             raise ValueError("Please provide one of (time-period, iteration-period) "
                              "but not both!")
+        if (self.time_period is None and self.iteration_period is None
+                and not self.before_first_rupture):
+            raise ValueError("Please provide one of (time-period, iteration-period) "
+                             "for the checkpoints or ask for the checkpoint before the "
+                             "first rupture")
 
 
 ALL_VARIABLES = ["NodeVelocity", "NodeCoordinates", "CellSize", "Pressure", "Density",
@@ -102,12 +150,50 @@ ALL_VARIABLES = ["NodeVelocity", "NodeCoordinates", "CellSize", "Pressure", "Den
                  "Porosity", "CohesiveForce", "DiscontinuityOpening", "ShearModulus", "YieldStress"]
 
 
+# Variables that can be sampled by the probes (fields of the nodes and of the cells)
+PROBE_VARIABLES = [var for var in ALL_VARIABLES
+                   if var not in ("CohesiveForce", "DiscontinuityOpening")]
+
+
+@dataclass  # pylint: disable=missing-class-docstring
+class ProbeProps(TypeCheckedDataClass):
+    identifier: str
+    path: str
+    variables: List[str]
+    time_period: Optional[float]
+    iteration_period: Optional[int]
+    nodes: List[int]
+    cells: List[int]
+    node_coordinates: List[float]
+    cell_coordinates: List[float]
+    buffer_size: int = 10000
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._ensure_strict_positivity('time_period', 'iteration_period')
+        self._ensure_list_value_in("variables", PROBE_VARIABLES)
+        if self.buffer_size < 1:
+            raise ValueError("The buffers of the probes should hold at least one time "
+                             "(buffer-size >= 1)")
+        if self.time_period is not None and self.iteration_period is not None:
+            raise ValueError("Please provide one of (time-period, iteration-period) "
+                             "but not both!")
+        if self.time_period is None and self.iteration_period is None:
+            # Probes are sampled at each iteration by default
+            self.iteration_period = 1
+        if not (self.nodes or self.cells or self.node_coordinates or self.cell_coordinates):
+            raise ValueError("Please provide the nodes or the cells (ids or coordinates) "
+                             "of the probes {:s}".format(self.identifier))
+
+
 @dataclass  # pylint: disable=missing-class-docstring
 class OutputProps(TypeCheckedDataClass):
     number_of_images: int
     dump: bool
     databases: List[DatabaseProps]
     variables: List[str]
+    checkpoint: Optional[CheckpointProps] = None
+    probes: List[ProbeProps] = field(default_factory=list)
 
     def __post_init__(self):
         super().__post_init__()
@@ -185,9 +271,11 @@ class FailureModelProps(TypeCheckedDataClass):
     failure_criterion: Optional[RuptureCriterionProps]
     failure_criterion_value: Optional[float]
     failure_criterion_index: Optional[int]
+    max_expected_discontinuities: Optional[int] = None
 
     def __post_init__(self):
         super().__post_init__()  # typecheck first
+        self._ensure_strict_positivity('max_expected_discontinuities')
         if self.failure_criterion is None and self.failure_treatment is not None:
             raise ValueError("A failure criterion is required if failure treatment is set")
 
@@ -242,19 +330,30 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
         if not (self.data_contains_a_projectile or self.data_contains_a_target):
             self.material_projectile = self.material_target
 
-    def __fill_in_numerical_props(self) -> Tuple[float, float, float, float, bool]:
+    def __fill_in_numerical_props(self) -> Tuple[float, float, float, float, bool, int, str,
+                                                 bool]:
         """
         Returns the quantities needed to fill numerical properties:
             - coefficient of linear artificial viscosity
             - coefficient of quadratic artificial viscosity
             - CFL coefficient
             - CFL coefficient of artificial viscosity
+            - number of threads of the compiled internal energy solver (0 for all the
+              available processors)
+            - type of Newton-Raphson solver of the internal energy for the equations of state
+              that are not linear in energy (classical or warm-started)
+            - exact update of the internal energy for the equations of state linear in energy
+              (instead of the Newton-Raphson iterations)
         """
         params: Dict[str, float] = self.__datadoc['numeric-parameters']
         last_cells_consistent_mass_matrix: bool = params.get(
             'consistent-mass-matrix-on-last-cells', False)
+        number_of_threads: int = params.get('number-of-threads', 1)
+        newton_solver: str = params.get('newton-solver', 'classical')
+        exact_energy_update: bool = params.get('exact-energy-update', False)
         return (params['quadratic-pseudo'], params['linear-pseudo'],
-                params['cfl'], params['cfl-pseudo'], last_cells_consistent_mass_matrix)
+                params['cfl'], params['cfl-pseudo'], last_cells_consistent_mass_matrix,
+                number_of_threads, newton_solver, exact_energy_update)
 
     def __fill_in_geometrical_props(self) -> Tuple[float, float]:
         """
@@ -283,13 +382,16 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
         time_step_reduction: Optional[float] = params.get('time-step-reduction-factor-for-failure')
         return initial_time_step, final_time, cst_dt, time_step_reduction
 
-    def __fill_in_output_props(self) -> Tuple[int, bool, List[DatabaseProps], List[str]]:
+    def __fill_in_output_props(self) -> Tuple[int, bool, List[DatabaseProps], List[str],
+                                              Optional[CheckpointProps], List[ProbeProps]]:
         """
         Returns the quantities needed to fill output properties
             - number of images
             - cell / node selected for extraction of time history
             - is display of times figures required?
             - list of output database properties
+            - checkpoints properties (None if no checkpoint is required)
+            - list of probes properties
         """
         params = self.__datadoc['output']
         number_of_images: int = params['number-of-images']
@@ -302,8 +404,21 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
             database_path: str = elem['path']
             iteration_period: Optional[int] = elem.get('iteration-period')
             time_period: Optional[float] = elem.get('time-period')
+            asynchronous: bool = elem.get('asynchronous', False)
+            queue_size: int = elem.get('queue-size', 4)
+            layout: str = elem.get('layout', "groups")
+            compression: Optional[str] = elem.get('compression')
+            compression_level: Optional[int] = elem.get('compression-level')
+            shuffle: bool = elem.get('shuffle', False)
+            flush_period: Optional[int] = elem.get('flush-period')
+            flush_interval: Optional[float] = elem.get('flush-interval')
+            chunk_cache_size: Optional[int] = elem.get('chunk-cache-size')
+            libver_latest: bool = elem.get('libver-latest', False)
+            swmr: bool = elem.get('swmr', False)
             db_props = DatabaseProps(identi, database_path, time_period,
-                                     iteration_period)
+                                     iteration_period, asynchronous, queue_size, layout,
+                                     compression, compression_level, shuffle, flush_period,
+                                     flush_interval, chunk_cache_size, libver_latest, swmr)
             db_prop_l.append(db_props)
 
         variables_l = []
@@ -313,7 +428,32 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
             for var in params['variables']:
                 variables_l.append(var)
 
-        return number_of_images, dump, db_prop_l, variables_l
+        # Checkpoints
+        checkpoint_props = None
+        checkpoint = params.get('checkpoint')
+        if checkpoint is not None:
+            checkpoint_props = CheckpointProps(checkpoint.get('path', 'checkpoints'),
+                                               checkpoint.get('time-period'),
+                                               checkpoint.get('iteration-period'),
+                                               checkpoint.get('retention', 2),
+                                               checkpoint.get('before-first-rupture', False))
+
+        # Probes
+        probe_prop_l = []
+        for elem in params.get('probes', []):
+            probe_props = ProbeProps(elem['identifier'], elem['path'], elem['variables'],
+                                     elem.get('time-period'), elem.get('iteration-period'),
+                                     elem.get('nodes', []), elem.get('cells', []),
+                                     [float(x) for x in elem.get('node-coordinates', [])],
+                                     [float(x) for x in elem.get('cell-coordinates', [])],
+                                     elem.get('buffer-size', 10000))
+            probe_prop_l.append(probe_props)
+        identifiers = [elem.identifier for elem in db_prop_l + probe_prop_l]
+        if len(set(identifiers)) != len(identifiers):
+            raise ValueError("The identifiers of the databases and of the probes should be "
+                             "unique: {}".format(identifiers))
+
+        return number_of_images, dump, db_prop_l, variables_l, checkpoint_props, probe_prop_l
 
     def __fill_in_bc_props(self) -> Tuple[BoundaryType, BoundaryType]:
         """
@@ -494,14 +634,14 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
             *self.__get_rheology_props(material))
 
         # Failure treatment
-        failure_treatment, failure_treatment_value, lump_mass_matrix = (
+        failure_treatment, failure_treatment_value, lump_mass_matrix, max_disc_number = (
             self.__get_failure_props(material))
         failure_criterion, failure_criterion_value, failure_index = (
             self.__get_failure_criterion_props(material))
 
         failure = FailureModelProps(failure_treatment, failure_treatment_value,
                                     lump_mass_matrix, failure_criterion, failure_criterion_value,
-                                    failure_index)
+                                    failure_index, max_disc_number)
 
         # Surface degradation behavior
         cohesive_model: Optional[CohesiveZoneModelProps] = self.__get_cohesive_model_props(material)
@@ -598,8 +738,13 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
                 params = [float(coef[p]) for p in params_key]
             # Returns the eos properties
             return MieGruneisenProps(*params)
+        if params['name'] == 'Tabulated':
+            table_path = self._datafile_dir / params['table']
+            interpolation = params.get('interpolation', 'bilinear')
+            return TabulatedEquationOfStateProps(str(table_path), interpolation)
 
-        raise NotImplementedError("Only MieGruneisen equation of state is implemented for now")
+        raise NotImplementedError("Only Mie-Gruneisen and Tabulated equations of state are "
+                                  "implemented for now")
 
     def __get_rheology_props(self, matter) -> Tuple[Optional[ShearModulusProps],
                                                     Optional[YieldStressProps],
@@ -639,7 +784,8 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
 
     @staticmethod
     def __get_failure_props(matter: Any) -> Tuple[Optional[str], Optional[float],
-                                                  Optional[EnrichedMassMatrixProps]]:
+                                                  Optional[EnrichedMassMatrixProps],
+                                                  Optional[int]]:
         """
         Returns the data needed to fill the FailureModel props
 
@@ -647,13 +793,17 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
             - failure_treatment_value : position of discontinuity in cracked element
                                         or imposed pressure
             - lump_mass_matrix : lumping strategy
+            - max_expected_discontinuities : number of discontinuities for which the
+                                             storage is allocated at the beginning
         """
         failure_data = matter.get('failure')
         if not failure_data:
-            return None, None, None
+            return None, None, None, None
 
         failure_treatment_data = matter['failure']['failure-treatment']
         failure_treatment = failure_treatment_data.get('name')
+        max_disc_number: Optional[int] = failure_treatment_data.get(
+            'max-expected-discontinuities')
 
         if failure_treatment is not None:
             # Failure treatment is either Enrichment or ImposedPressure
@@ -681,7 +831,7 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
         else:
             failure_treatment_value = 0.
             lump_mass_matrix = None
-        return failure_treatment, failure_treatment_value, lump_mass_matrix
+        return failure_treatment, failure_treatment_value, lump_mass_matrix, max_disc_number
 
     @staticmethod
     def __get_failure_criterion_props(matter) -> Tuple[
@@ -711,13 +861,20 @@ class DataContainer(metaclass=Singleton):  # pylint: disable=too-few-public-meth
             failure_criterion = HalfRodComparisonCriterionProps(failure_cell_index)
         elif fail_crit_name == "MaximalStress":
             failure_criterion = MaximalStressCriterionProps(fail_crit_value)
-        elif fail_crit_name == "NonLocalStress":
+        elif fail_crit_name in ("NonLocalStress", "ForcedNonLocalStress"):
             radius: Optional[int] = failure_criterion_data.get('radius')
-            failure_criterion = NonLocalStressCriterionProps(fail_crit_value, radius)
+            weighting: str = failure_criterion_data.get('weighting', "flat")
+            if fail_crit_name == "NonLocalStress":
+                failure_criterion = NonLocalStressCriterionProps(fail_crit_value, radius,
+                                                                 weighting)
+            else:
+                failure_criterion = ForcedNonLocalStressCriterionProps(fail_crit_value, radius,
+                                                                       weighting)
         else:
             raise ValueError(f"Unknown failure criterion {fail_crit_name}. "
                              "Please choose among (MinimumPressure, Damage, "
-                             "HalfRodComparison, MaximalStress")
+                             "HalfRodComparison, MaximalStress, NonLocalStress, "
+                             "ForcedNonLocalStress)")
 
         return failure_criterion, fail_crit_value, failure_cell_index
 
@@ -8,6 +8,7 @@ from typing import Type, Optional
 from xfv.src.data.type_checked_dataclass import TypeCheckedDataClass
 from xfv.src.equationsofstate.equationofstatebase import EquationOfStateBase
 from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.equationsofstate.tabulated import TabulatedEquationOfState
 
 
 @dataclass  # pylint: disable=missing-class-docstring
@@ -50,3 +51,15 @@ class MieGruneisenProps(EquationOfStateProps):
     def __post_init__(self):
         super().__post_init__()  # typecheck first
         self._ensure_strict_positivity('czero', 'rhozero')
+
+
+@dataclass  # pylint: disable=missing-class-docstring
+class TabulatedEquationOfStateProps(EquationOfStateProps):
+    table: str
+    interpolation: str
+    _eos_class = TabulatedEquationOfState
+    _eos_inst = None
+
+    def __post_init__(self):
+        super().__post_init__()  # typecheck first
+        self._ensure_value_in('interpolation', TabulatedEquationOfState.INTERPOLATIONS)
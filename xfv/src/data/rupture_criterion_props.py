@@ -13,6 +13,8 @@ from xfv.src.rupturecriterion.halfrodcomparison import HalfRodComparisonCriterio
 from xfv.src.rupturecriterion.maximalstress import MaximalStressCriterion
 from xfv.src.rupturecriterion.minimumpressure import MinimumPressureCriterion
 from xfv.src.rupturecriterion.nonlocalstress import NonLocalStressCriterion
+from xfv.src.rupturecriterion.forcednonlocalstress import ForcedNonLocalStressCriterion
+from xfv.src.rupturecriterion.nonlocal_kernels import WEIGHTING_FUNCTIONS
 
 
 @dataclass  # pylint: disable=missing-class-docstring
@@ -96,9 +98,19 @@ class MinimumPressureCriterionProps(RuptureCriterionProps):
 class NonLocalStressCriterionProps(RuptureCriterionProps):
     value: Optional[float]  # optional to personalize the error message
     radius: Optional[float]
+    weighting: str = "flat"
     _rupture_criterion_class = NonLocalStressCriterion
 
     def __post_init__(self):
         super().__post_init__()  # typecheck first
         self._ensure_defined('value', 'NonLocalStressCriterionProps',
-                             'failure/failure-criterion/value')  # ensures that exists
\ No newline at end of file
+                             'failure/failure-criterion/value')  # ensures that exists
+        self._ensure_defined('radius', 'NonLocalStressCriterionProps',
+                             'failure/failure-criterion/radius')
+        self._ensure_strict_positivity('radius')
+        self._ensure_value_in('weighting', tuple(WEIGHTING_FUNCTIONS))
+
+
+@dataclass  # pylint: disable=missing-class-docstring
+class ForcedNonLocalStressCriterionProps(NonLocalStressCriterionProps):
+    _rupture_criterion_class = ForcedNonLocalStressCriterion
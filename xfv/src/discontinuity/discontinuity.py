@@ -2,35 +2,155 @@
 """
 A module implementing the Discontinuity class
 """
+from typing import TYPE_CHECKING
 import numpy as np
-from xfv.src.fields.field import Field
-from xfv.src.data.enriched_mass_matrix_props import EnrichedMassMatrixProps
+from xfv.src.fields.stacked_field import StackedField
+from xfv.src.utilities.singleton import Singleton
 
+if TYPE_CHECKING:
+    # Not imported at runtime : the data package depends on this module
+    from xfv.src.data.enriched_mass_matrix_props import EnrichedMassMatrixProps
 
-class Discontinuity:
+# Struct of arrays storage of the discontinuities variables. Each variable is stored in a
+# buffer preallocated for the capacity of the registry (shape of one item, dtype).
+STACKED_VARIABLES = {
+    # Enriched variables
+    "enr_velocity_current": ((2, 1), float),
+    "enr_velocity_new": ((2, 1), float),
+    "enr_coordinates_current": ((2, 1), float),
+    "enr_coordinates_new": ((2, 1), float),
+    "enr_force": ((2, 1), float),
+    # Information about the discontinuities
+    "discontinuity_position": ((1,), float),
+    "ruptured_cell_id": ((1,), int),
+    "in_nodes": ((1,), int),
+    "out_nodes": ((1,), int),
+    # Inverse of the enriched mass matrix, split in 2x2 blocks
+    "inv_mass_matrix_classic_dof": ((2, 2), float),
+    "inv_mass_matrix_enriched_dof": ((2, 2), float),
+    "inv_mass_matrix_coupling_dof": ((2, 2), float),
+    # Damage indicators with cohesive zone model (current and new values)
+    "cohesive_force_current": ((1,), float),
+    "cohesive_force_new": ((1,), float),
+    "discontinuity_opening_current": ((1,), float),
+    "discontinuity_opening_new": ((1,), float),
+    "damage_variable_current": ((1,), float),
+    "damage_variable_new": ((1,), float),
+    # History of the cohesive zone model
+    "history_max_opening": ((1,), float),
+    "history_min_cohesive_force": ((1,), float),
+}
+
+
+class DiscontinuityRegistry(metaclass=Singleton):
     """
-    A class describing a discontinuity 1D
+    The discontinuities of a simulation (one registry per simulation context) and the
+    storage of their variables
     """
 
-    # A list of discontinuities
-    __discontinuity_list = []
+    def __init__(self):
+        self.discontinuities = []
+        self.buffers = {}
+        self.capacity = 0
+        # Views on the first discontinuity_number items of the buffers
+        self.views = {}
+        self._bind_views()
 
-    # Enriched variables
-    enr_velocity_current = np.zeros([], dtype=float)
-    enr_velocity_new = np.zeros([], dtype=float)
-    enr_coordinates_current = np.zeros([], dtype=float)
-    enr_coordinates_new = np.zeros([], dtype=float)
-    enr_force = np.zeros([], dtype=float)
+    def reserve(self, capacity: int):
+        """
+        Ensure that the storage can hold capacity discontinuities without reallocation.
+        Items of the existing discontinuities are copied and their views are bound again
+        on the new buffers.
 
-    # Information about the discontinuities
-    discontinuity_position = np.zeros([], dtype=float)
-    ruptured_cell_id = np.zeros([], dtype=int)
-    in_nodes = np.zeros([], dtype=int)
-    out_nodes = np.zeros([], dtype=int)
+        :param capacity: number of discontinuities the storage should be able to hold
+        """
+        if capacity <= self.capacity:
+            return
+        for name, (shape, dtype) in STACKED_VARIABLES.items():
+            buffer = np.zeros((capacity,) + shape, dtype=dtype)
+            old_buffer = self.buffers.get(name)
+            if old_buffer is not None:
+                buffer[:self.capacity] = old_buffer
+            self.buffers[name] = buffer
+        self.capacity = capacity
+        for index, disc in enumerate(self.discontinuities):
+            disc._bind_views(index)  # pylint: disable=protected-access
+        self._bind_views()
+
+    def register(self, disc) -> int:
+        """
+        Add a discontinuity to the registry and returns its index in the storage
+
+        :param disc: the new discontinuity
+        """
+        index = len(self.discontinuities)
+        if index == self.capacity:
+            # Amortized growth: the capacity is doubled
+            self.reserve(max(1, 2 * self.capacity))
+        self.discontinuities.append(disc)
+        self._bind_views()
+        return index
+
+    def _bind_views(self, names=STACKED_VARIABLES):
+        """
+        Bind the views on the items of the existing discontinuities
+
+        :param names: names of the variables whose views are bound (default all)
+        """
+        nb_disc = len(self.discontinuities)
+        for name in names:
+            if self.capacity:
+                self.views[name] = self.buffers[name][:nb_disc]
+            else:
+                # No storage yet
+                self.views[name] = np.zeros([], dtype=STACKED_VARIABLES[name][1])
+
+
+class _StackedVariablesAccess(type):
+    """
+    Metaclass giving access to the variables of all the discontinuities of the active
+    simulation context as class attributes (Discontinuity.enr_force for example)
+    """
+
+    def __getattr__(cls, name):
+        if name in STACKED_VARIABLES:
+            return DiscontinuityRegistry().views[name]
+        raise AttributeError("type object '{:s}' has no attribute '{:s}'".format(
+            cls.__name__, name))
+
+    def __setattr__(cls, name, value):
+        if name in STACKED_VARIABLES:
+            DiscontinuityRegistry().views[name] = value
+        else:
+            super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        if name in STACKED_VARIABLES:
+            # Back to the view on the storage
+            DiscontinuityRegistry()._bind_views((name,))  # pylint: disable=protected-access
+        else:
+            super().__delattr__(name)
+
+    def __dir__(cls):
+        return sorted(set(super().__dir__()).union(STACKED_VARIABLES))
+
+
+class Discontinuity(metaclass=_StackedVariablesAccess):
+    """
+    A class describing a discontinuity 1D
+
+    The discontinuities are registered in the DiscontinuityRegistry of the active simulation
+    context. The class attributes named after the keys of STACKED_VARIABLES are the views on
+    the variables of all these discontinuities and each discontinuity holds views on its
+    own item.
+    """
+    _stacked_variables = STACKED_VARIABLES
+    # Fields of each discontinuity built on the current and new values above
+    _stacked_fields = ("cohesive_force", "discontinuity_opening", "damage_variable")
 
     def __init__(self, cell_id: int, mask_in_nodes: np.array, mask_out_nodes: np.array,
                  discontinuity_position_in_ruptured_element: float,
-                 enriched_mass_matrix_props: EnrichedMassMatrixProps):
+                 enriched_mass_matrix_props: 'EnrichedMassMatrixProps'):
         """
         Initializing a single discontinuity after enrichment.
 
@@ -49,48 +169,11 @@ class Discontinuity:
             raise ValueError("""A node cannot be both inside and outside the discontinuity""")
 
         # Discontinuity registration
-        Discontinuity.__discontinuity_list.append(self)
-        self.__label = len(Discontinuity.__discontinuity_list)
+        self.__registry = DiscontinuityRegistry()
+        index = self.__registry.register(self)
+        self.__label = index + 1
         print("Building discontinuity number {:d}".format(self.__label))
-        init = np.zeros((1, 2, 1))
-        if self.__label == 1:
-            Discontinuity.enr_velocity_current = np.copy(init)
-            Discontinuity.enr_velocity_new = np.copy(init)
-            Discontinuity.enr_coordinates_current = np.copy(init)
-            Discontinuity.enr_coordinates_new = np.copy(init)
-            Discontinuity.enr_force = np.copy(init)
-            Discontinuity.discontinuity_position = np.zeros((1, 1))
-            Discontinuity.ruptured_cell_id = np.zeros((1, 1), dtype=int)
-            Discontinuity.in_nodes = np.zeros((1, 1), dtype=int)
-            Discontinuity.out_nodes = np.zeros((1, 1), dtype=int)
-        else:
-            Discontinuity.enr_velocity_current = np.append(
-                Discontinuity.enr_velocity_current, init, axis=0)
-            Discontinuity.enr_velocity_new = np.append(
-                Discontinuity.enr_velocity_new, init, axis=0)
-            Discontinuity.enr_coordinates_current = np.append(
-                Discontinuity.enr_coordinates_current, init, axis=0)
-            Discontinuity.enr_coordinates_new = np.append(
-                Discontinuity.enr_coordinates_new, init, axis=0)
-            Discontinuity.enr_force = np.append(Discontinuity.enr_force, init, axis=0)
-            Discontinuity.discontinuity_position = np.append(
-                Discontinuity.discontinuity_position, np.zeros((1, 1)), axis=0)
-            Discontinuity.ruptured_cell_id = np.append(
-                Discontinuity.ruptured_cell_id, np.zeros((1, 1), dtype=int), axis=0)
-            Discontinuity.in_nodes = np.append(
-                Discontinuity.in_nodes, np.zeros((1, 1), dtype=int), axis=0)
-            Discontinuity.out_nodes = np.append(
-                Discontinuity.out_nodes, np.zeros((1, 1), dtype=int), axis=0)
-        for ind, disc in enumerate(Discontinuity.discontinuity_list()):
-            disc.enr_velocity_current = Discontinuity.enr_velocity_current[ind]
-            disc.enr_velocity_new = Discontinuity.enr_velocity_new[ind]
-            disc.enr_coordinates_current = Discontinuity.enr_coordinates_current[ind]
-            disc.enr_coordinates_new = Discontinuity.enr_coordinates_new[ind]
-            disc.enr_force = Discontinuity.enr_force[ind]
-            disc.discontinuity_position = Discontinuity.discontinuity_position[ind]
-            disc.ruptured_cell_id = Discontinuity.ruptured_cell_id[ind]
-            disc.in_nodes = Discontinuity.in_nodes[ind]
-            disc.out_nodes = Discontinuity.out_nodes[ind]
+        self._bind_views(index)
 
         self.__mask_in_nodes = mask_in_nodes
         self.in_nodes[:] = np.where(self.__mask_in_nodes)[0]
@@ -107,30 +190,68 @@ class Discontinuity:
         # Indicators of discontinuity state
         self.__mass_matrix_updated = False
 
-        # Damage indicators with cohesive zone model
+        # Damage indicators with cohesive zone model (cohesive_force, discontinuity_opening and
+        # damage_variable fields are bound on the storage by _bind_views)
         # (Always created but null if no damage data in the XDATA.json file...)
-        self.cohesive_force = Field(1, current_value=0., new_value=0.)
-        self.discontinuity_opening = Field(1, current_value=0., new_value=0.)
-        self.damage_variable = Field(1, current_value=0., new_value=0.)
-        self.history_max_opening = 0.
-        self.history_min_cohesive_force = 1.e+30
+        self.history_max_opening[:] = 0.
+        self.history_min_cohesive_force[:] = 1.e+30
 
         # Creation of the enriched mass matrix
         self.mass_matrix_enriched = enriched_mass_matrix_props.build_enriched_mass_matrix_obj()
 
+    @classmethod
+    def reserve(cls, capacity: int):
+        """
+        Ensure that the storage can hold capacity discontinuities without reallocation
+
+        :param capacity: number of discontinuities the storage should be able to hold
+        """
+        DiscontinuityRegistry().reserve(capacity)
+
+    @classmethod
+    def stacked_variables(cls):
+        """
+        Returns the names of the variables stored for all the discontinuities at once
+        """
+        return tuple(cls._stacked_variables)
+
+    @classmethod
+    def capacity(cls):
+        """
+        Returns the number of discontinuities the storage can hold without reallocation
+        """
+        return DiscontinuityRegistry().capacity
+
+    def _bind_views(self, index: int):
+        """
+        Bind the attributes of the discontinuity on its item of the storage
+
+        :param index: index of the discontinuity in the storage
+        """
+        buffers = self.__registry.buffers
+        for name, buffer in buffers.items():
+            setattr(self, name, buffer[index])
+        for name in self._stacked_fields:
+            current = buffers[name + "_current"][index]
+            new = buffers[name + "_new"][index]
+            if name in self.__dict__:
+                getattr(self, name).bind(current, new)
+            else:
+                setattr(self, name, StackedField(current, new))
+
     @classmethod
     def discontinuity_number(cls):
         """
         Returns the number of existing discontinuities
         """
-        return len(Discontinuity.__discontinuity_list)
+        return len(DiscontinuityRegistry().discontinuities)
 
     @classmethod
     def discontinuity_list(cls):
         """
         Returns the list of all existing discontinuities
         """
-        return Discontinuity.__discontinuity_list
+        return DiscontinuityRegistry().discontinuities
 
     @classmethod
     def get_discontinuity_associated_with_cell(cls, cell_id: int):
@@ -212,9 +333,13 @@ class Discontinuity:
 
     def has_mass_matrix_been_computed(self):
         """
-        Set the __mass_matrix_updated boolean to True
+        Set the __mass_matrix_updated boolean to True and store the blocks of the inverse
+        of the enriched mass matrix with the ones of the other discontinuities
         """
         self.__mass_matrix_updated = True
+        (self.inv_mass_matrix_classic_dof[:], self.inv_mass_matrix_enriched_dof[:],
+         self.inv_mass_matrix_coupling_dof[:]) = \
+            self.mass_matrix_enriched.inverse_enriched_mass_matrix_blocks()
 
     def compute_discontinuity_new_opening(self, node_position: np.array):
         """
@@ -231,6 +356,24 @@ class Discontinuity:
         xd_new = (1 - epsilon) * enr_coord_d + epsilon * coord_d
         self.discontinuity_opening.new_value = (xd_new - xg_new)[0][0]
 
+    @classmethod
+    def compute_discontinuity_new_opening_arr(cls, node_position: np.array,
+                                              disc_ids=slice(None)):
+        """
+        Compute the opening of all (or selected) discontinuities at once
+
+        :param node_position: coordinates of the nodes
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
+        """
+        epsilon = Discontinuity.discontinuity_position[disc_ids]
+        coord_g = node_position[Discontinuity.in_nodes[disc_ids, 0]]
+        coord_d = node_position[Discontinuity.out_nodes[disc_ids, 0]]
+        enr_coord_g = Discontinuity.enr_coordinates_new[disc_ids, 0]  # x2-
+        enr_coord_d = Discontinuity.enr_coordinates_new[disc_ids, 1]  # x1+
+        xg_new = (1 - epsilon) * coord_g + epsilon * enr_coord_g
+        xd_new = (1 - epsilon) * enr_coord_d + epsilon * coord_d
+        Discontinuity.discontinuity_opening_new[disc_ids] = xd_new - xg_new
+
     def reinitialize_kinematics_after_contact(self):
         """
         Set the new velocity to the old one to cancel the increment that has lead to contact
@@ -249,3 +392,16 @@ class Discontinuity:
         self.cohesive_force.increment_values()
         self.damage_variable.increment_values()
         self.discontinuity_opening.increment_values()
+
+    @classmethod
+    def enr_increment_arr(cls):
+        """
+        Increment the variables of all the discontinuities at once
+        """
+        # Kinematics
+        Discontinuity.enr_velocity_current[:] = Discontinuity.enr_velocity_new
+        Discontinuity.enr_coordinates_current[:] = Discontinuity.enr_coordinates_new
+        # Cohesive model
+        Discontinuity.cohesive_force_current[:] = Discontinuity.cohesive_force_new
+        Discontinuity.damage_variable_current[:] = Discontinuity.damage_variable_new
+        Discontinuity.discontinuity_opening_current[:] = Discontinuity.discontinuity_opening_new
@@ -72,6 +72,39 @@ class DiscontinuityTest(unittest.TestCase):
         self.my_disc.has_mass_matrix_been_computed()
         np.testing.assert_equal(self.my_disc.mass_matrix_updated, True)
 
+    def test_storage_growth(self):
+        """
+        Test that the storage grows by doubling its capacity and that the views of the
+        discontinuities remain consistent with the class arrays
+        """
+        self.my_disc.enr_velocity_new[:] = [[1.], [2.]]
+        initial_number = Discontinuity.discontinuity_number()
+        initial_capacity = Discontinuity.capacity()
+        for _ in range(initial_capacity - initial_number + 1):
+            Discontinuity(2, np.array([False, False, True, False]),
+                          np.array([False, False, False, True]), 0.5, LumpSumMassMatrixProps())
+        number = Discontinuity.discontinuity_number()
+        self.assertEqual(Discontinuity.capacity(), 2 * initial_capacity)
+        self.assertEqual(Discontinuity.enr_velocity_new.shape, (number, 2, 1))
+        self.assertEqual(Discontinuity.ruptured_cell_id.shape, (number, 1))
+        index = self.my_disc.label - 1
+        np.testing.assert_equal(Discontinuity.enr_velocity_new[index], [[1.], [2.]])
+        np.testing.assert_equal(Discontinuity.in_nodes[number - 1], [2])
+        np.testing.assert_equal(Discontinuity.out_nodes[number - 1], [3])
+        Discontinuity.enr_force[index] = [[3.], [4.]]
+        np.testing.assert_equal(self.my_disc.enr_force, [[3.], [4.]])
+
+    def test_reserve(self):
+        """
+        Test that no reallocation happens once the storage has been reserved
+        """
+        Discontinuity.reserve(Discontinuity.discontinuity_number() + 5)
+        velocity = Discontinuity.enr_velocity_current
+        disc = Discontinuity(1, np.array([False, True, False, False]),
+                             np.array([False, False, True, False]), 0.5, LumpSumMassMatrixProps())
+        self.assertTrue(np.shares_memory(velocity, Discontinuity.enr_velocity_current))
+        self.assertTrue(np.shares_memory(disc.enr_velocity_current, velocity.base))
+
 
 if __name__ == '__main__':
     unittest.main()
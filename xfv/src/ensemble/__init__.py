@@ -0,0 +1,4 @@
+"""
+Package for the ensemble mode : many variants of a case advanced as one batched simulation
+"""
+from xfv.src.ensemble.ensemble_simulation import EnsembleSimulation
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Implementation of the EnsembleCell class
+"""
+from typing import List, Tuple
+import numpy as np
+
+from xfv.src.cell.one_dimension_cell import OneDimensionCell
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.fields.field import Field
+from xfv.src.fields.fieldsmanager import FieldManager
+from xfv.src.solver.functionstosolve.vnrenergyevolutionforveformulation import (
+    VnrEnergyEvolutionForVolumeEnergyFormulation)
+
+CELL_FIELDS = ("Density", "Pressure", "Energy", "Pseudo", "SoundVelocity")
+
+
+def select_eos_members(eos: MieGruneisen, rows: np.ndarray) -> MieGruneisen:
+    """
+    Returns the equation of state of some members of an ensemble
+
+    :param eos: equation of state whose parameters are scalars or arrays with one row per member
+    :param rows: indexes of the members to keep
+    """
+    if not any(np.ndim(val) for val in eos.eos_param):
+        return eos
+    return MieGruneisen(**{key: val[rows] if np.ndim(val) else val
+                           for key, val in eos.eos_param._asdict().items()})
+
+
+class EnsembleCell:  # pylint: disable=too-many-instance-attributes
+    """
+    A class for the cells of an ensemble of one dimension simulations sharing the same mesh.
+    The fields have a leading ensemble axis, their shape is (number of members, number of cells),
+    and are computed for all the members at once with the kernels of the classical (non
+    enriched) OneDimensionCell.
+    """
+
+    def __init__(self, number_of_members: int, number_of_elements: int):
+        """
+        Build the array of cells of the ensemble
+
+        :param number_of_members: number of members of the ensemble
+        :param number_of_elements: number of cells of the mesh
+        """
+        self._shape = (number_of_members, number_of_elements)
+        self._dt = np.zeros(self._shape, dtype=np.float64, order='C')
+        self._size_t = np.zeros(self._shape, dtype=np.float64, order='C')
+        self._size_t_plus_dt = np.zeros(self._shape, dtype=np.float64, order='C')
+        self._mass = np.zeros(self._shape, dtype=np.float64, order='C')
+        self._stress_xx = np.zeros(self._shape, dtype=np.float64, order='C')
+        self._fields_manager = FieldManager()
+        for name in CELL_FIELDS:
+            self._fields_manager[name] = Field(self._shape)
+        # Cells (mask or slice) and equation of state of each material
+        self.materials: List[Tuple[object, MieGruneisen]] = []
+        self._function_to_vanish = VnrEnergyEvolutionForVolumeEnergyFormulation()
+        # The Newton-Raphson iterations work on the cells picked by a mask, which does not fit
+        # the parameters of the members : the exact energy update is always used
+        self._exact_energy_update = True
+
+    @property
+    def number_of_members(self):
+        """
+        Number of members of the ensemble
+        """
+        return self._shape[0]
+
+    @property
+    def number_of_cells(self):
+        """
+        Number of cells of the mesh
+        """
+        return self._shape[1]
+
+    @property
+    def dt(self):  # pylint: disable=invalid-name
+        """
+        Critical time step in cells
+        """
+        return self._dt
+
+    @property
+    def size_t(self):
+        """
+        Size (length, area, volume) of the cells at time t
+        """
+        return self._size_t
+
+    @property
+    def size_t_plus_dt(self):
+        """
+        Size (length, area, volume) of the cells at time t + dt
+        """
+        return self._size_t_plus_dt
+
+    @property
+    def mass(self):
+        """
+        Mass of the cells
+        """
+        return self._mass
+
+    @property
+    def stress_xx(self):
+        """
+        Cauchy stress tensor in the cells. 1D : component xx
+        """
+        return self._stress_xx
+
+    @property
+    def density(self):
+        """
+        Density in the cells
+        """
+        return self._fields_manager["Density"]
+
+    @property
+    def pressure(self):
+        """
+        Pressure in the cells
+        """
+        return self._fields_manager["Pressure"]
+
+    @property
+    def energy(self):
+        """
+        Internal energy in the cells
+        """
+        return self._fields_manager["Energy"]
+
+    @property
+    def pseudo(self):
+        """
+        Artificial viscosity in the cells
+        """
+        return self._fields_manager["Pseudo"]
+
+    @property
+    def sound_velocity(self):
+        """
+        Sound velocity in the cells
+        """
+        return self._fields_manager["SoundVelocity"]
+
+    def initialize_fields(self, mask: np.ndarray, initial_values: dict):
+        """
+        Initialize the fields of some cells
+
+        :param mask: boolean array of the cells to initialize
+        :param initial_values: initial density, pressure and internal energy (rho_init,
+                               pression_init, energie_init), scalars or arrays with one row
+                               per member
+        """
+        for field, key in ((self.density, "rho_init"), (self.pressure, "pression_init"),
+                           (self.energy, "energie_init")):
+            field.current_value[:, mask] = initial_values[key]
+            field.new_value[:, mask] = initial_values[key]
+
+    def add_material(self, mask: np.ndarray, eos: MieGruneisen):
+        """
+        Declare the cells of a material
+
+        :param mask: boolean array of the cells of the material
+        :param eos: equation of state, whose parameters may be arrays with one row per member
+        """
+        if mask.any():
+            # A slice avoids the copies of the fields if the material fills the mesh
+            self.materials.append((slice(None) if mask.all() else mask, eos))
+
+    def compute_size(self, node_coord):
+        """
+        Computation of the cells initial length
+
+        :param node_coord: array with the nodes coordinates (number of members, number of nodes)
+        """
+        size = node_coord[:, 1:] - node_coord[:, :-1]
+        cell_error = (size < 0)
+        if cell_error.any():
+            raise ValueError("Length of cell {:} is negative !".format(
+                np.unique(np.where(cell_error)[1])))
+        self._size_t[:] = size
+
+    def compute_new_size(self, node_coord):
+        """
+        Computation of the cells length at time t+dt
+
+        :param node_coord: array with the nodes coordinates at time t+dt
+        """
+        size = node_coord[:, 1:] - node_coord[:, :-1]
+        cell_error = (size < 0)
+        if cell_error.any():
+            raise ValueError("Length of cell {:} is negative !".format(
+                np.unique(np.where(cell_error)[1])))
+        self._size_t_plus_dt[:] = size
+
+    def compute_mass(self, section: float):
+        """
+        Compute mass of the cells
+
+        :param section: section of the bar
+        """
+        self._mass = self.size_t * section * self.density.current_value
+
+    def compute_new_density(self):
+        """
+        Computation of the density of the cells at time t+dt using mass conservation principle
+        """
+        self.density.new_value = self.density.current_value * \
+                                 self.size_t / self.size_t_plus_dt
+
+    def compute_new_pseudo(self, delta_t: np.ndarray, a_pseudo: float, b_pseudo: float):
+        """
+        Computation of cells artificial viscosity at time t+dt
+
+        :param delta_t: time step of each member (number of members, 1)
+        :param a_pseudo: quadratic pseudo coefficient
+        :param b_pseudo: linear pseudo coefficient
+        """
+        self.pseudo.new_value = OneDimensionCell.compute_pseudo(
+            delta_t, self.density.current_value, self.density.new_value, self.size_t_plus_dt,
+            self.sound_velocity.current_value, a_pseudo, b_pseudo)
+
+    def compute_new_pressure(self):
+        """
+        Computation of the set (internal energy, pressure, sound velocity) for v-e formulation
+        """
+        for cells, eos in self.materials:
+            self.energy.new_value[:, cells], self.pressure.new_value[:, cells], \
+            self.sound_velocity.new_value[:, cells] = OneDimensionCell.apply_equation_of_state(
+                self, eos,
+                self.density.current_value[:, cells], self.density.new_value[:, cells],
+                self.pressure.current_value[:, cells], self.pressure.new_value[:, cells],
+                self.energy.current_value[:, cells], self.energy.new_value[:, cells],
+                self.pseudo.current_value[:, cells], self.sound_velocity.new_value[:, cells])
+
+    def compute_complete_stress_tensor(self):
+        """
+        Compute the Cauchy stress tensor (sum of pressure and artificial viscosity)
+        """
+        self._stress_xx = - (self.pressure.new_value + self.pseudo.new_value)
+
+    def compute_new_time_step(self, cfl: float, cfl_pseudo: float):
+        """
+        Computation of the time step in the cells at time t+dt
+
+        :param cfl: cfl number
+        :param cfl_pseudo: cfl linked to the shock treatment stability condition
+        """
+        self._dt = OneDimensionCell.compute_time_step(
+            cfl, cfl_pseudo, self.density.current_value, self.density.new_value,
+            self.size_t_plus_dt, self.sound_velocity.new_value, self.pseudo.current_value,
+            self.pseudo.new_value)
+
+    def increment_variables(self):
+        """
+        Increment cells variables from one iteration to another
+        """
+        self._fields_manager.increment_fields()
+        self._size_t[:] = self._size_t_plus_dt[:]
+
+    def select_members(self, rows: np.ndarray):
+        """
+        Keep only some members of the ensemble
+
+        :param rows: indexes of the members to keep
+        """
+        self._shape = (len(rows), self._shape[1])
+        self._dt = self._dt[rows]
+        self._size_t = self._size_t[rows]
+        self._size_t_plus_dt = self._size_t_plus_dt[rows]
+        self._mass = self._mass[rows]
+        self._stress_xx = self._stress_xx[rows]
+        fields_manager = FieldManager()
+        for name, field in self._fields_manager.items():
+            fields_manager[name] = Field(self._shape, field.current_value[rows],
+                                         field.new_value[rows])
+        self._fields_manager = fields_manager
+        self.materials = [(cells, select_eos_members(eos, rows)) for cells, eos in self.materials]
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Implementation of the EnsembleNode class
+"""
+import numpy as np
+
+
+class EnsembleNode:  # pylint: disable=too-many-instance-attributes
+    """
+    A class for the nodes of an ensemble of one dimension simulations sharing the same mesh.
+    The fields have a leading ensemble axis, their shape is (number of members, number of nodes).
+    """
+
+    def __init__(self, number_of_members: int, poz_init: np.ndarray, section: float = 1.):
+        """
+        :param number_of_members: number of members of the ensemble
+        :param poz_init: initial coordinates of the nodes (shared by all the members)
+        :param section: section of the bar
+        """
+        shape = (number_of_members, poz_init.size)
+        self._section = section
+        self._xt = np.empty(shape, dtype=np.float64, order='C')
+        self._xt[:] = poz_init.ravel()
+        self._xtpdt = np.copy(self._xt)
+        self._umundemi = np.zeros(shape, dtype=np.float64, order='C')
+        self._upundemi = np.zeros(shape, dtype=np.float64, order='C')
+        self._force = np.zeros(shape, dtype=np.float64, order='C')
+        self._masse = np.zeros(shape, dtype=np.float64, order='C')
+        self._inv_masse = np.zeros(shape, dtype=np.float64, order='C')
+
+    @property
+    def xt(self):  # pylint: disable=invalid-name
+        """
+        Positions of the nodes at time t
+        """
+        return self._xt
+
+    @property
+    def xtpdt(self):
+        """
+        Positions of the nodes at time t + dt
+        """
+        return self._xtpdt
+
+    @property
+    def umundemi(self):
+        """
+        Velocities of the nodes at time t - dt/2
+        """
+        return self._umundemi
+
+    @property
+    def upundemi(self):
+        """
+        Velocities of the nodes at time t + dt/2
+        """
+        return self._upundemi
+
+    @property
+    def masse(self):
+        """
+        Mass of the nodes
+        """
+        return self._masse
+
+    @property
+    def force(self):
+        """
+        Forces applied on the nodes
+        """
+        return self._force
+
+    @property
+    def section(self):
+        """
+        Surface associated with a node
+        """
+        return self._section
+
+    @property
+    def number_of_nodes(self):
+        """
+        Number of nodes of the mesh
+        """
+        return self._xt.shape[1]
+
+    def compute_mass(self, cell_mass: np.ndarray):
+        """
+        Compute the nodal masses by averaging the masses of the neighbouring cells
+        (Wilkins method) and their inverse
+
+        :param cell_mass: masses of the cells (number of members, number of cells)
+        """
+        self._masse[:] = 0.
+        self._masse[:, :-1] += cell_mass / 2
+        self._masse[:, 1:] += cell_mass / 2
+        self._inv_masse = 1. / self._masse
+
+    def compute_new_force(self, contrainte: np.ndarray):
+        """
+        Compute the forces acting on the nodes
+
+        :param contrainte: cauchy stress sigma xx (number of members, number of cells)
+        """
+        self._force = np.zeros_like(self._force)
+        tmp_force = contrainte * self.section
+        # For a node, force = stress on cell right - stress on cell left
+        self._force[:, :-1] += tmp_force
+        self._force[:, 1:] -= tmp_force
+
+    def compute_new_velocity(self, delta_t: np.ndarray):
+        """
+        Computes the node velocities at time t+dt/2
+
+        :param delta_t: staggered time step of each member (number of members, 1)
+        """
+        self._upundemi[:] = self._umundemi + self._inv_masse * self.force * delta_t
+
+    def apply_pressure(self, ind_node: int, pressure: np.ndarray):
+        """
+        Apply pressure on a given node
+
+        :param ind_node: node index to apply the pressure at
+        :param pressure: pressure applied for each member (number of members,)
+        """
+        self._force[:, ind_node] += pressure * self.section
+
+    def apply_velocity_boundary_condition(self, ind_node: int, velocity: np.ndarray):
+        """
+        Apply a velocity on a given node
+
+        :param ind_node: node index to apply the velocity at
+        :param velocity: velocity imposed for each member (number of members,)
+        """
+        self._upundemi[:, ind_node] = velocity
+
+    def compute_new_coodinates(self, delta_t: np.ndarray):
+        """
+        Computes the node coordinates at time t+dt
+
+        :param delta_t: time step of each member (number of members, 1)
+        """
+        self._xtpdt[:] = self.xt + self.upundemi * delta_t
+
+    def increment(self):
+        """
+        Update the node velocities and coordinates
+        """
+        self._umundemi[:] = self.upundemi[:]
+        self._xt[:] = self.xtpdt[:]
+
+    def select_members(self, rows: np.ndarray):
+        """
+        Keep only some members of the ensemble
+
+        :param rows: indexes of the members to keep
+        """
+        for name in ("_xt", "_xtpdt", "_umundemi", "_upundemi", "_force", "_masse",
+                     "_inv_masse"):
+            setattr(self, name, getattr(self, name)[rows])
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Implementing the EnsembleSimulation class
+
+An ensemble is a set of simulations of the same case (same mesh, same loading, same numerical
+parameters) whose members differ by the parameters of the equations of state and the initial
+values of the materials, for example for a Monte-Carlo study. The nodes and cells fields have a
+leading ensemble axis, so that each step of all the members is computed by the same NumPy calls
+instead of one process (and one interpreter loop) per member. Each member has its own time step
+and its own simulation time. A member is removed from the arrays once its final time is reached
+and its final fields are stored.
+
+Only the classical hydrodynamic path is available : Mie-Gruneisen equations of state, no
+elasticity, plasticity, porosity nor rupture.
+
+>>> with context:
+...     data = DataContainer("XDATA.json")
+...     ensemble = EnsembleSimulation(coordinates, [{"target": {"czero": 3900.}},
+...                                                 {"target": {"czero": 4000., "S1": 1.5}}])
+>>> ensemble.run()
+>>> ensemble.final_fields["Pressure"][1]
+"""
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from xfv.src.context.simulationcontext import SimulationContext, current_context
+from xfv.src.data.equation_of_state_props import MieGruneisenProps
+from xfv.src.ensemble.ensemble_cell import EnsembleCell
+from xfv.src.ensemble.ensemble_node import EnsembleNode
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen, MieGruneisenParameters
+from xfv.src.mesh.topology1d import Topology1D
+
+MATERIALS = ("target", "projectile")
+INITIAL_VALUES = ("velocity_init", "rho_init", "pression_init", "energie_init")
+FINAL_FIELDS = ("NodeVelocity", "NodeCoordinates", "CellSize", "Pressure", "Density",
+                "InternalEnergy", "SoundVelocity", "ArtificialViscosity")
+
+
+def _check_data(data):
+    """
+    Raise a ValueError if the case is not available in ensemble mode
+
+    :param data: data of the case
+    """
+    materials = [data.material_target]
+    if data.data_contains_a_projectile:
+        materials.append(data.material_projectile)
+    for material in materials:
+        model = material.constitutive_model
+        if not isinstance(model.eos, MieGruneisenProps):
+            raise ValueError("Only the Mie-Gruneisen equation of state is available "
+                             "in ensemble mode")
+        if model.elasticity_model is not None or model.plasticity_model is not None:
+            raise ValueError("Elasticity and plasticity are not available in ensemble mode")
+        if material.porosity_model is not None:
+            raise ValueError("Porosity models are not available in ensemble mode")
+    if data.material_target.failure_model.failure_treatment is not None:
+        raise ValueError("Rupture is not available in ensemble mode")
+    if data.numeric.consistent_mass_matrix_on_last_cells:
+        raise ValueError("The consistent mass matrix on the last cells is not available "
+                         "in ensemble mode")
+
+
+def _check_members(members: List[Dict[str, dict]]):
+    """
+    Raise a ValueError if the parameters of the members are not valid
+
+    :param members: the parameters of each member
+    """
+    if not members:
+        raise ValueError("The ensemble must have at least one member")
+    for member in members:
+        for material, params in member.items():
+            if material not in MATERIALS:
+                raise ValueError("Unknown material {:s} (possible values are {})"
+                                 .format(material, MATERIALS))
+            for key in params:
+                if key not in MieGruneisenParameters._fields + INITIAL_VALUES:
+                    raise ValueError("Unknown parameter {:s} of the {:s} (possible values are"
+                                     " {} and {})".format(key, material,
+                                                          MieGruneisenParameters._fields,
+                                                          INITIAL_VALUES))
+
+
+def _member_values(members: List[Dict[str, dict]], material_name: str, defaults: dict) -> dict:
+    """
+    Returns the values of the parameters of a material : the default value if no member
+    modifies it, otherwise an array with one row per member
+
+    :param members: the parameters of each member
+    :param material_name: name of the material
+    :param defaults: values of the parameters in the data of the case
+    """
+    values = dict(defaults)
+    for key in defaults:
+        if any(key in member.get(material_name, {}) for member in members):
+            values[key] = np.array([[member.get(material_name, {}).get(key, defaults[key])]
+                                    for member in members], dtype=np.float64)
+    return values
+
+
+class EnsembleSimulation:  # pylint: disable=too-many-instance-attributes
+    """
+    Ensemble of simulations of a case, advanced together
+    """
+
+    def __init__(self, initial_coordinates: np.ndarray, members: List[Dict[str, dict]],
+                 context: Optional[SimulationContext] = None):
+        """
+        :param initial_coordinates: initial coordinates of the nodes
+        :param members: parameters of each member, by material ("target" or "projectile"),
+                        that modify those of the data of the case (coefficients of the
+                        Mie-Gruneisen equation of state and initial values velocity_init,
+                        rho_init, pression_init and energie_init)
+        :param context: context of the simulation, whose data are those of the case
+                        (default the active one)
+        """
+        self.data = (current_context() if context is None else context).data
+        _check_data(self.data)
+        _check_members(members)
+        number_of_members = len(members)
+        nbr_nodes = np.size(initial_coordinates)
+        self.topology = Topology1D(nbr_nodes, nbr_nodes - 1)
+        self.nodes = EnsembleNode(number_of_members, np.ravel(initial_coordinates),
+                                  section=self.data.geometric.section)
+        self.cells = EnsembleCell(number_of_members, nbr_nodes - 1)
+        self.__init_materials(members)
+
+        self.left_boundary_condition = self.data.boundary_condition.left_BC
+        self.left_function = self.left_boundary_condition.law.build_custom_func()
+        self.right_boundary_condition = self.data.boundary_condition.right_BC
+        self.right_function = self.right_boundary_condition.law.build_custom_func()
+
+        # Indexes of the members still computed, in the order of the rows of the fields
+        self.members = np.arange(number_of_members)
+        # Time, time steps (one row per member still computed) and number of steps
+        initial_time_step = self.data.time.initial_time_step
+        self.time = np.zeros((number_of_members, 1))
+        self.dt = np.full((number_of_members, 1), initial_time_step)  # pylint: disable=invalid-name
+        # The first velocity increment is computed with dt/2 (velocities known at t=0)
+        self.dt_staggered = self.dt / 2
+        self.steps = np.zeros(number_of_members, dtype=int)
+        # Functions called with the ensemble at the end of each time step
+        self.step_callbacks: List[Callable[["EnsembleSimulation"], None]] = []
+        # Final fields of the members, one row per member
+        self.final_time = np.zeros(number_of_members)
+        self.final_steps = np.zeros(number_of_members, dtype=int)
+        self.final_fields = {
+            name: np.zeros((number_of_members, nbr_nodes if name.startswith("Node")
+                            else nbr_nodes - 1)) for name in FINAL_FIELDS}
+
+        self.cells.compute_size(self.nodes.xt)
+        self.cells.compute_mass(self.nodes.section)
+        self.nodes.compute_mass(self.cells.mass)
+
+    def __material_mask(self, node_mask: np.ndarray) -> np.ndarray:
+        """
+        Returns the cells of a material from its nodes (see Cell.initialize_cell_fields)
+
+        :param node_mask: boolean array of the nodes of the material
+        """
+        mask = np.zeros(self.cells.number_of_cells, dtype=bool)
+        node_indexes = np.where(node_mask)[0]
+        cells = np.unique(
+            self.topology.get_cells_in_contact_with_node(node_indexes)[1:-1].flatten())
+        # [1:-1] => elimination of the extremal nodes because their connectivity is incomplete
+        mask[cells] = True
+        return mask
+
+    def __init_materials(self, members: List[Dict[str, dict]]):
+        """
+        Initialize the equations of state, the cells fields and the nodes velocities
+        of the materials
+        """
+        poz_init = self.nodes.xt[0]
+        interface_position = self.data.geometric.initial_interface_position
+        node_masks = {"projectile": poz_init <= interface_position,
+                      "target": poz_init >= interface_position}
+        materials = {"target": self.data.material_target}
+        if self.data.data_contains_a_projectile:
+            materials["projectile"] = self.data.material_projectile
+        velocities = {"target": 0., "projectile": 0.}
+        # The cells are initialized with the target values, then with the projectile ones
+        # in the projectile cells (see Cell)
+        cell_masks = {"target": np.ones(self.cells.number_of_cells, dtype=bool)}
+        if "projectile" in materials:
+            cell_masks["projectile"] = self.__material_mask(node_masks["projectile"])
+        for name, material in materials.items():
+            eos_props = material.constitutive_model.eos
+            eos_values = _member_values(members, name,
+                                        asdict(eos_props, dict_factory=eos_props.dict_factory))
+            initial_values = _member_values(
+                members, name, {key: getattr(material.initial_values, key)
+                                for key in INITIAL_VALUES})
+            self.cells.initialize_fields(cell_masks[name], initial_values)
+            self.cells.add_material(self.__material_mask(node_masks[name]),
+                                    MieGruneisen(**eos_values))
+            velocities[name] = initial_values["velocity_init"]
+
+        # Nodes velocities (see XtendedFiniteVolume)
+        for name in ("projectile", "target"):
+            self.nodes.upundemi[:, node_masks[name]] = velocities[name]
+        if interface_position is not None:
+            if np.where(node_masks["target"])[0][0] != np.where(node_masks["projectile"])[0][-1]:
+                raise ValueError("Unable to find the node at the interface projectile / target")
+            node_interface = np.where(node_masks["target"])[0][0]
+            self.nodes.upundemi[:, [node_interface]] = \
+                0.5 * (velocities["target"] + velocities["projectile"])
+        self.nodes.umundemi[:] = self.nodes.upundemi
+
+    def __evaluate(self, function) -> np.ndarray:
+        """
+        Returns the values of a boundary function at the time of each member
+        """
+        return np.array([function.evaluate(time) for time in self.time[:, 0]])
+
+    def compute_step(self):
+        """
+        Advance all the members by one time step
+        """
+        data = self.data
+        nodes, cells = self.nodes, self.cells
+        nodes.compute_new_velocity(self.dt_staggered)
+        if self.left_boundary_condition.type_bc == "velocity":
+            nodes.apply_velocity_boundary_condition(0, self.__evaluate(self.left_function))
+        if self.right_boundary_condition.type_bc == "velocity":
+            nodes.apply_velocity_boundary_condition(-1, self.__evaluate(self.right_function))
+        nodes.compute_new_coodinates(self.dt)
+        cells.compute_new_size(nodes.xtpdt)
+        cells.compute_new_density()
+        cells.compute_new_pseudo(self.dt, data.numeric.a_pseudo, data.numeric.b_pseudo)
+        cells.compute_new_pressure()
+        cells.compute_complete_stress_tensor()
+        nodes.compute_new_force(cells.stress_xx)
+        if self.left_boundary_condition.type_bc == "pressure":
+            nodes.apply_pressure(0, self.__evaluate(self.left_function))
+        if self.right_boundary_condition.type_bc == "pressure":
+            nodes.apply_pressure(-1, -self.__evaluate(self.right_function))
+        if not data.time.is_time_step_constant:
+            cells.compute_new_time_step(data.numeric.cfl, data.numeric.cfl_pseudo)
+            dt_crit = cells.dt.min(axis=1, keepdims=True)
+        else:
+            dt_crit = np.full_like(self.dt, data.time.initial_time_step)
+        self.dt = np.minimum(self.dt, dt_crit)  # pylint: disable=invalid-name
+        nodes.increment()
+        cells.increment_variables()
+        self.time += self.dt
+        if not data.time.is_time_step_constant:
+            self.dt_staggered = 0.5 * (dt_crit + self.dt)
+            self.dt = dt_crit  # pylint: disable=invalid-name
+        else:
+            self.dt_staggered = self.dt
+        self.steps += 1
+
+    def __retire_members(self, rows: np.ndarray):
+        """
+        Store the final fields of the members of some rows and remove them from the arrays
+        """
+        members = self.members[rows]
+        self.final_time[members] = self.time[rows, 0]
+        self.final_steps[members] = self.steps[rows]
+        for name, value in (("NodeVelocity", self.nodes.upundemi),
+                            ("NodeCoordinates", self.nodes.xt),
+                            ("CellSize", self.cells.size_t),
+                            ("Pressure", self.cells.pressure.current_value),
+                            ("Density", self.cells.density.current_value),
+                            ("InternalEnergy", self.cells.energy.current_value),
+                            ("SoundVelocity", self.cells.sound_velocity.current_value),
+                            ("ArtificialViscosity", self.cells.pseudo.current_value)):
+            self.final_fields[name][members] = value[rows]
+        kept = np.ones(len(self.members), dtype=bool)
+        kept[rows] = False
+        kept = np.flatnonzero(kept)
+        self.members = self.members[kept]
+        self.nodes.select_members(kept)
+        self.cells.select_members(kept)
+        self.time, self.dt, self.dt_staggered = self.time[kept], self.dt[kept], \
+            self.dt_staggered[kept]
+        self.steps = self.steps[kept]
+
+    def run(self):
+        """
+        Advance the members until their final time
+        """
+        final_time = self.data.time.final_time
+        while self.members.size:
+            self.compute_step()
+            for callback in self.step_callbacks:
+                callback(self)
+            finished = np.flatnonzero(self.time[:, 0] >= final_time)
+            if finished.size:
+                self.__retire_members(finished)
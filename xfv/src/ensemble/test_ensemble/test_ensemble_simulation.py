@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+ensemble_simulation module unit tests
+"""
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.data.data_container import DataContainer
+from xfv.src.ensemble.ensemble_simulation import EnsembleSimulation
+from xfv.src.mesh.mesh1denriched import Mesh1dEnriched
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "../../../tests/0_UNITTEST")
+
+
+class EnsembleSimulationTest(unittest.TestCase):
+    """
+    Test case for the EnsembleSimulation class
+    """
+    def setUp(self):
+        self.context = SimulationContext("ensemble")
+        with self.context:
+            self.data = DataContainer(os.path.join(DATA_DIRECTORY, "XDATA_hydro.json"))
+        self.coordinates = np.loadtxt(os.path.join(DATA_DIRECTORY, "mesh.txt"), skiprows=2,
+                                      usecols=(1,))[:201]
+        self.members = [{"projectile": {"velocity_init": 500.}},
+                        {"projectile": {"velocity_init": 800.},
+                         "target": {"czero": 4100., "S2": 0.5, "rho_init": 8900.}},
+                        {"projectile": {"velocity_init": 650., "czero": 3500.},
+                         "target": {"S1": 1.6}}]
+
+    def test_single_member_identical_to_classical_mesh(self):
+        """
+        Test that a member without parameters of its own gives the results of the classical
+        mesh, computed by the same steps
+        """
+        ensemble = EnsembleSimulation(self.coordinates, [{}, self.members[0]],
+                                      context=self.context)
+        # The ensemble always uses the exact energy update
+        self.data.numeric.exact_energy_update = True
+        velocity = np.zeros([self.coordinates.size, 1])
+        mesh = Mesh1dEnriched(self.coordinates.reshape(-1, 1), velocity, context=self.context)
+        mesh.compute_cells_sizes()
+        mesh.compute_cells_masses()
+        mesh.compute_nodes_masses()
+        delta_t, dt_staggered = self.data.time.initial_time_step, \
+            self.data.time.initial_time_step / 2
+        with self.context, mock.patch.object(self.context, "use_internal_solver", True):
+            for _ in range(20):
+                mesh.compute_new_nodes_velocities(dt_staggered)
+                mesh.compute_new_nodes_coordinates(delta_t)
+                mesh.compute_new_cells_sizes(delta_t)
+                mesh.compute_new_cells_densities()
+                mesh.compute_new_cells_pseudo_viscosity(delta_t)
+                mesh.compute_new_cells_pressures(delta_t)
+                mesh.assemble_complete_stress_tensor()
+                mesh.compute_new_nodes_forces()
+                mesh.apply_pressure('left', 0.)
+                mesh.apply_pressure('right', 0.)
+                mesh.increment()
+                dt_staggered = delta_t
+                ensemble.compute_step()
+        np.testing.assert_array_equal(ensemble.nodes.xt[0], mesh.nodes.xt[:, 0])
+        np.testing.assert_array_equal(ensemble.nodes.upundemi[0], mesh.nodes.upundemi[:, 0])
+        np.testing.assert_array_equal(ensemble.cells.pressure.current_value[0],
+                                      mesh.cells.pressure.current_value)
+        np.testing.assert_array_equal(ensemble.cells.sound_velocity.current_value[0],
+                                      mesh.cells.sound_velocity.current_value)
+        self.assertTrue((ensemble.cells.pressure.current_value[1] > 0.).any())
+
+    def test_members_identical_to_single_runs(self):
+        """
+        Test that each member of an ensemble, with its own parameters and time step, gives
+        the results of its own run
+        """
+        self.data.time.final_time = 1.e-07
+        self.data.time.is_time_step_constant = False
+        ensemble = EnsembleSimulation(self.coordinates, self.members, context=self.context)
+        peaks = np.zeros(len(self.members))
+
+        def rear_surface_velocity(ensemble):
+            np.maximum.at(peaks, ensemble.members, ensemble.nodes.upundemi[:, 0])
+
+        ensemble.step_callbacks.append(rear_surface_velocity)
+        ensemble.run()
+        self.assertEqual(len(set(ensemble.final_steps)), len(self.members))
+        self.assertEqual(ensemble.members.size, 0)
+        for index, member in enumerate(self.members):
+            single = EnsembleSimulation(self.coordinates, [member], context=self.context)
+            single.run()
+            self.assertEqual(single.final_steps[0], ensemble.final_steps[index])
+            self.assertGreaterEqual(ensemble.final_time[index], 1.e-07)
+            for name, field in single.final_fields.items():
+                np.testing.assert_array_equal(field[0], ensemble.final_fields[name][index])
+        # The release wave does not reach the rear surface of the projectile
+        np.testing.assert_array_equal(peaks, [500., 800., 650.])
+
+    def test_wrong_members(self):
+        """
+        Test that the parameters of the members and the case are checked
+        """
+        for members in ([], [{"cible": {"czero": 4000.}}], [{"target": {"c0": 4000.}}]):
+            with self.assertRaises(ValueError):
+                EnsembleSimulation(self.coordinates, members, context=self.context)
+        context = SimulationContext("epp")
+        with context:
+            DataContainer(os.path.join(DATA_DIRECTORY, "XDATA_epp.json"))
+        with self.assertRaises(ValueError):
+            EnsembleSimulation(self.coordinates, [{}], context=context)
+
+
+if __name__ == '__main__':
+    unittest.main()
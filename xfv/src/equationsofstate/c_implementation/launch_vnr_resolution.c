@@ -0,0 +1,226 @@
+/*
+ * CPython extension solving the internal energy evolution of the VNR scheme
+ * ([v, e] formulation) with the Mie-Gruneisen equation of state.
+ *
+ * It is the compiled counterpart of the python NewtonRaphson solver applied on the
+ * VnrEnergyEvolutionForVolumeEnergyFormulation function : same increment, same
+ * convergence criterion and same operations order, cell by cell.
+ *
+ * The arrays are accessed through the buffer protocol (no copy) and must be
+ * C contiguous arrays of float64.
+ *
+ * The cells are independent : if the module is built with OpenMP, the cell loop is shared
+ * between threads (the GIL being released) and the results do not depend on the number
+ * of threads.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "miegruneisen.h"
+
+/* Same values as in xfv/src/solver/newtonraphson.py */
+#define EPSILON 1.0e-06
+#define PRECISION 1.0e-08
+#define NB_ITERATIONS_MAX 100
+/* Under this number of cells per thread, the threading overhead is not worth it */
+#define MIN_CELLS_PER_THREAD 512
+
+/*
+ * Solve the internal energy evolution of one cell.
+ * If linear_in_energy is not null, the pressure is supposed to be affine with respect to the
+ * internal energy (which is the case of the Mie-Gruneisen eos) and the exact solution
+ * is computed directly, otherwise the Newton algorithm is used.
+ * Returns 0 if the Newton algorithm has converged, 1 otherwise.
+ */
+static int solve_vnr_cell(MieGruneisenParameters_t *params, const double old_specific_volume,
+                          const double new_specific_volume, const double pressure,
+                          const double old_energy, double *new_energy, double *new_pressure,
+                          double *new_sound_speed, const int linear_in_energy)
+{
+        double nrj = old_energy, p_i = 0., dpsurde = 0., func = 0., dfunc = 0., delta = 0.;
+        double delta_v = new_specific_volume - old_specific_volume;
+        int nit = 0;
+
+        if (linear_in_energy) {
+            // p = p(v, 0) + dp/de * e
+            solveVolumeEnergy(params, new_specific_volume, 0., &p_i, &dpsurde, NULL);
+            nrj = (old_energy - (p_i + pressure) * delta_v * 0.5) / (1 + dpsurde * delta_v * 0.5);
+        } else {
+            for (nit = 0; nit < NB_ITERATIONS_MAX; nit++) {
+                solveVolumeEnergy(params, new_specific_volume, nrj, &p_i, &dpsurde, NULL);
+                // Function to vanish and its derivative with respect to internal energy
+                func = nrj + (p_i + pressure) * delta_v * 0.5 - old_energy;
+                dfunc = 1 + dpsurde * delta_v * 0.5;
+                delta = -func / dfunc;
+                if (!(fabs(func) >= EPSILON * fabs(delta) + PRECISION)) {
+                    break;
+                }
+                nrj += delta;
+            }
+        }
+        *new_energy = nrj;
+        // Eos call to determine final pressure and sound speed values
+        solveVolumeEnergy(params, new_specific_volume, nrj, new_pressure, &dpsurde, new_sound_speed);
+        return nit == NB_ITERATIONS_MAX;
+}
+
+/*
+ * Get a C contiguous float64 buffer of the given size (writable if asked)
+ */
+static int get_double_buffer(PyObject *obj, Py_buffer *view, const char *name, int writable,
+                             Py_ssize_t size)
+{
+        int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | (writable ? PyBUF_WRITABLE : 0);
+        if (PyObject_GetBuffer(obj, view, flags) < 0) {
+            return -1;
+        }
+        if (view->itemsize != sizeof(double) || view->format == NULL ||
+            strcmp(view->format, "d") != 0) {
+            PyErr_Format(PyExc_TypeError, "%s must be an array of float64", name);
+            PyBuffer_Release(view);
+            return -1;
+        }
+        if (size >= 0 && view->len / view->itemsize != size) {
+            PyErr_Format(PyExc_ValueError, "%s must be of size %zd", name, size);
+            PyBuffer_Release(view);
+            return -1;
+        }
+        return 0;
+}
+
+/*
+ * Returns the number of threads to use for size cells when nb_threads threads are asked
+ * (0 meaning all the available ones)
+ */
+static int get_threads_number(int nb_threads, Py_ssize_t size)
+{
+#ifdef _OPENMP
+        Py_ssize_t max_threads = size / MIN_CELLS_PER_THREAD;
+        if (nb_threads == 0) {
+            nb_threads = omp_get_num_procs();
+        }
+        if (nb_threads > max_threads) {
+            nb_threads = (int)max_threads;
+        }
+        return nb_threads > 1 ? nb_threads : 1;
+#else
+        (void)nb_threads;
+        (void)size;
+        return 1;
+#endif
+}
+
+static PyObject *launch_vnr_resolution(PyObject *self, PyObject *args)
+{
+        static const char *names[7] = {"old_specific_volume", "new_specific_volume", "pressure",
+                                       "old_energy", "new_energy", "new_pressure",
+                                       "new_sound_speed"};
+        MieGruneisenParameters_t params;
+        PyObject *arrays[7];
+        Py_buffer views[7];
+        double *data[7];
+        Py_ssize_t size = -1, i = 0, nb_non_conv = 0, first_non_conv = PY_SSIZE_T_MAX;
+        int nb_views = 0, ok = 1, nb_threads = 1, linear_in_energy = 0;
+
+        if (!PyArg_ParseTuple(args, "(dddddddd)OOOOOOO|ip:launch_vnr_resolution",
+                              &params.c_zero, &params.s1, &params.s2, &params.s3,
+                              &params.rho_zero, &params.gamma_zero, &params.coeff_b,
+                              &params.e_zero, &arrays[0], &arrays[1], &arrays[2], &arrays[3],
+                              &arrays[4], &arrays[5], &arrays[6], &nb_threads,
+                              &linear_in_energy)) {
+            return NULL;
+        }
+        if (nb_threads < 0) {
+            PyErr_SetString(PyExc_ValueError, "nb_threads must be positive");
+            return NULL;
+        }
+        params.solve = solveVolumeEnergy;
+
+        // The four first arrays are inputs, the three last ones outputs
+        for (nb_views = 0; nb_views < 7; nb_views++) {
+            if (get_double_buffer(arrays[nb_views], &views[nb_views], names[nb_views],
+                                  nb_views >= 4, size) < 0) {
+                ok = 0;
+                break;
+            }
+            size = views[nb_views].len / views[nb_views].itemsize;
+            data[nb_views] = (double *)views[nb_views].buf;
+        }
+
+        if (ok) {
+            nb_threads = get_threads_number(nb_threads, size);
+            Py_BEGIN_ALLOW_THREADS
+#ifdef _OPENMP
+            #pragma omp parallel for schedule(static) num_threads(nb_threads) \
+                reduction(+:nb_non_conv) reduction(min:first_non_conv)
+#endif
+            for (i = 0; i < size; i++) {
+                if (solve_vnr_cell(&params, data[0][i], data[1][i], data[2][i], data[3][i],
+                                   &data[4][i], &data[5][i], &data[6][i], linear_in_energy)) {
+                    if (i < first_non_conv) {
+                        first_non_conv = i;
+                    }
+                    nb_non_conv++;
+                }
+            }
+            Py_END_ALLOW_THREADS
+        }
+
+        while (nb_views > 0) {
+            PyBuffer_Release(&views[--nb_views]);
+        }
+        if (!ok) {
+            return NULL;
+        }
+        if (nb_non_conv) {
+            PyErr_Format(PyExc_ValueError,
+                         "Erreur de convergence du NR\n%zd cells have not converged "
+                         "(first one is cell %zd)", nb_non_conv, first_non_conv);
+            return NULL;
+        }
+        Py_RETURN_NONE;
+}
+
+static PyObject *openmp_enabled(PyObject *self, PyObject *Py_UNUSED(args))
+{
+#ifdef _OPENMP
+        Py_RETURN_TRUE;
+#else
+        Py_RETURN_FALSE;
+#endif
+}
+
+static PyMethodDef launch_vnr_resolution_methods[] = {
+        {"launch_vnr_resolution", launch_vnr_resolution, METH_VARARGS,
+         "launch_vnr_resolution(params, old_specific_volume, new_specific_volume, pressure, "
+         "old_energy, new_energy, new_pressure, new_sound_speed, nb_threads=1, "
+         "linear_in_energy=False)\n\n"
+         "Solve the internal energy evolution of the VNR scheme with the Mie-Gruneisen "
+         "equation of state.\n"
+         "params is the sequence (czero, S1, S2, S3, rhozero, grunzero, b, ezero) and pressure "
+         "already includes the artificial viscosity contribution.\n"
+         "new_energy, new_pressure and new_sound_speed are filled in place.\n"
+         "nb_threads is the number of threads sharing the cells (0 for all the available "
+         "processors) if the module has been built with OpenMP.\n"
+         "If linear_in_energy is True, the exact solution is computed instead of using the "
+         "Newton algorithm (the Mie-Gruneisen pressure is affine in internal energy)."},
+        {"openmp_enabled", openmp_enabled, METH_NOARGS,
+         "openmp_enabled()\n\nReturns True if the module has been built with OpenMP."},
+        {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef launch_vnr_resolution_module = {
+        PyModuleDef_HEAD_INIT,
+        "launch_vnr_resolution_c",
+        "Compiled VNR internal energy solver with the Mie-Gruneisen equation of state",
+        -1,
+        launch_vnr_resolution_methods
+};
+
+PyMODINIT_FUNC PyInit_launch_vnr_resolution_c(void)
+{
+        return PyModule_Create(&launch_vnr_resolution_module);
+}
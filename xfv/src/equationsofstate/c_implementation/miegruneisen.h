@@ -14,6 +14,11 @@ struct MieGruneisenParameters {
         void (*solve)(MieGruneisenParameters_t*, const double, const double, double *, double *, double *);
 };
 
+/*
+ * Given the specific volume and internal energy computes the pressure, the derivative of the
+ * pressure with respect to the internal energy (gamma_per_vol) and the sound speed.
+ * If c_son is NULL, the sound speed is not computed.
+ * If the square of the sound speed is negative, c_son is set to NaN.
+ */
 void solveVolumeEnergy(MieGruneisenParameters_t*, const double specific_volume, const double internal_energy, double *pressure, double *gamma_per_vol, double *c_son);
 
- 
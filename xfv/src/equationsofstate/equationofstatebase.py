@@ -9,6 +9,15 @@ class EquationOfStateBase(metaclass=ABCMeta):  # pylint: disable=too-few-public-
     """
     An interface for all equation of states
     """
+    @property
+    def is_linear_in_energy(self) -> bool:
+        """
+        True if, at fixed specific volume, the pressure is an affine function of the
+        internal energy. In this case the internal energy evolution of the VNR scheme
+        has an exact solution and the iterative solver is not needed.
+        """
+        return False
+
     @abstractmethod
     def solve_volume_energy(self, specific_volume, internal_energy, pressure,  # pylint: disable=too-many-arguments
                             derivative, vson=None):
@@ -53,24 +53,50 @@ class MieGruneisen(EquationOfStateBase):
     Mie Gruneisen equation of state
     """
 
+    # Number of float workspace buffers of the fused evaluation
+    _WORKSPACE_SIZE = 7
+
     def __init__(self, czero=3940.0, S1=1.489, S2=0., S3=0., rhozero=8930.0,  # pylint: disable=too-many-arguments
-                 grunzero=2.02, b=0.47, ezero=0.):
-        #
+                 grunzero=2.02, b=0.47, ezero=0., fused=True):
+        """
+        :param fused: if True the compression and release formulas are evaluated on all the
+                      cells in a single pass in preallocated workspace buffers, and the results
+                      are selected afterwards. Otherwise the cells are split into compression
+                      and release sub-arrays. Both modes give identical results.
+
+        The parameters may also be arrays of shape (number of members, 1) in order to evaluate
+        the equation of state of an ensemble of materials on fields of shape
+        (number of members, number of cells) (see xfv.src.ensemble). This is only possible
+        in fused mode.
+        """
         self.__param = MieGruneisenParameters(czero=czero, S1=S1, S2=S2, S3=S3,
                                               rhozero=rhozero, grunzero=grunzero,
                                               b=b, ezero=ezero)
+        if not fused and any(np.ndim(val) for val in self.__param):
+            raise ValueError("Parameters per ensemble member require the fused evaluation")
         self.__czero2 = self.__param.czero ** 2
         self.__dgam = self.__param.rhozero * (self.__param.grunzero - self.__param.b)
+        # The S2 (S3) terms are computed if one of the members at least needs them
+        self.__has_s2 = bool(np.any(self.__param.S2))
+        self.__has_s3 = bool(np.any(self.__param.S3))
+        self.__fused = fused
+        self.__workspace = np.zeros((self._WORKSPACE_SIZE, 0))
+        self.__bool_workspace = np.zeros(0, dtype=bool)
+        self.__workspace_views = (None, None, None)
 
     def __str__(self):
         message = "EquationOfState : {:s}".format(self.__class__.__name__) + os.linesep
         message += "Parameters : "
         for key, val in zip(self.__param._fields, self.__param):
-            message += os.linesep + " -- {:>20s} : {:>9.8g}".format(key, val)
+            if np.ndim(val):
+                message += os.linesep + " -- {:>20s} : {}".format(key, np.ravel(val))
+            else:
+                message += os.linesep + " -- {:>20s} : {:>9.8g}".format(key, val)
         return message
 
     def __repr__(self):
-        msg = ", ".join(["{:s}={:f}".format(k, v)
+        msg = ", ".join(["{:s}={}".format(k, np.ravel(v).tolist()) if np.ndim(v)
+                         else "{:s}={:f}".format(k, v)
                          for k, v in zip(self.__param._fields, self.__param)])
         return "MieGruneisen({:s})".format(msg)
 
@@ -82,6 +108,13 @@ class MieGruneisen(EquationOfStateBase):
         """
         return self.__param
 
+    @property
+    def is_linear_in_energy(self) -> bool:
+        """
+        The pressure is phi(v) + gamma(v) / v * (e - einth(v))
+        """
+        return True
+
     def solve_volume_energy(self, specific_volume, internal_energy, pressure,  # pylint: disable=too-many-arguments
                             derivative, vson=None):
         """
@@ -99,6 +132,129 @@ class MieGruneisen(EquationOfStateBase):
         :param vson: sound speed (out)
         :type vson: numpy.array
         """
+        if self.__fused:
+            self.__solve_volume_energy_fused(specific_volume, internal_energy, pressure,
+                                             derivative, vson)
+        else:
+            self.__solve_volume_energy_masked(specific_volume, internal_energy, pressure,
+                                              derivative, vson)
+
+    def __get_workspace(self, shape):
+        """
+        Returns the float workspace buffers and the boolean one as arrays of the given shape.
+        The buffers are reallocated only if they are too small and the views of the last
+        shape are kept.
+        """
+        if self.__workspace_views[0] != shape:
+            size = int(np.prod(shape))
+            if self.__workspace.shape[1] < size:
+                self.__workspace = np.zeros((self._WORKSPACE_SIZE, size))
+                self.__bool_workspace = np.zeros(size, dtype=bool)
+            self.__workspace_views = (shape,
+                                      [buf[:size].reshape(shape) for buf in self.__workspace],
+                                      self.__bool_workspace[:size].reshape(shape))
+        return self.__workspace_views[1:]
+
+    def __solve_volume_energy_fused(self, specific_volume, internal_energy, pressure,  # pylint: disable=too-many-arguments, too-many-locals, too-many-statements
+                                    derivative, vson):
+        """
+        Branchless evaluation : both compression and release formulas are computed on all
+        the cells in the workspace buffers, then the right one is selected.
+        The operations order is the one of the masked evaluation so that the results are
+        identical. The divisions that are meaningless on release cells are restricted to the
+        compression cells (where argument) to avoid spurious floating point warnings.
+        """
+        param = self.__param
+        (epsv, einth, phi, denom, work_1, work_2, work_3), comp_cells = \
+            self.__get_workspace(specific_volume.shape)
+        np.multiply(param.rhozero, specific_volume, out=epsv)
+        np.subtract(1, epsv, out=epsv)
+        np.greater(epsv, 0, out=comp_cells)
+        # gamma per volume
+        np.divide(1., specific_volume, out=derivative)
+        np.subtract(1, epsv, out=work_1)
+        work_1 *= param.grunzero
+        np.multiply(param.b, epsv, out=work_2)
+        work_1 += work_2
+        derivative *= work_1
+        # Compression
+        np.multiply(param.S1, epsv, out=denom)
+        np.subtract(1., denom, out=denom)
+        if self.__has_s2:
+            np.multiply(param.S2, epsv, out=work_1)
+            work_1 *= epsv
+            denom -= work_1
+            if self.__has_s3:
+                np.multiply(param.S3, epsv, out=work_1)
+                work_1 *= epsv
+                work_1 *= epsv
+                denom -= work_1
+        np.divide(1., denom, out=denom, where=comp_cells)
+        np.multiply(param.rhozero * self.__czero2, epsv, out=phi)
+        np.multiply(denom, denom, out=work_1)
+        work_1 *= phi
+        einth.fill(0.)
+        np.multiply(work_1, epsv, out=einth, where=comp_cells)
+        einth /= 2. * param.rhozero
+        einth += param.ezero
+        # Release
+        np.subtract(1., epsv, out=work_2)
+        phi /= work_2
+        np.copyto(phi, work_1, where=comp_cells)
+        np.subtract(internal_energy, einth, out=work_1)
+        work_1 *= derivative
+        np.add(phi, work_1, out=pressure)
+
+        if vson is None:
+            return
+        # Term common to compression and release : (dgam - gampervol) * (e - einth) / v
+        np.subtract(self.__dgam, derivative, out=work_1)
+        np.subtract(internal_energy, einth, out=work_2)
+        work_1 *= work_2
+        work_1 /= specific_volume
+        # Compression
+        if self.__has_s2:
+            np.multiply(2. * param.S2, epsv, out=work_2)
+            work_2 += param.S1
+            if self.__has_s3:
+                np.multiply(epsv, epsv, out=work_3)
+                work_3 *= 3. * param.S3
+                work_2 += work_3
+            redond_a = work_2
+        else:
+            redond_a = param.S1
+        np.multiply(epsv, redond_a, out=work_3)
+        work_3 *= denom
+        np.subtract(-1., work_3, out=work_3)
+        work_3 *= phi  # deinth
+        np.multiply(2., redond_a, out=work_2)
+        work_2 *= denom
+        vson.fill(0.)
+        np.divide(-1., epsv, out=vson, where=comp_cells)
+        vson -= work_2
+        np.multiply(phi, param.rhozero, out=work_2)
+        work_2 *= vson  # dphi
+        work_2 += work_1
+        work_3 *= derivative
+        work_2 -= work_3  # dpdv
+        # Release
+        np.multiply(specific_volume, specific_volume, out=work_3)
+        np.divide(-self.__czero2, work_3, out=work_3)
+        work_3 += work_1  # dpdv
+        np.copyto(work_3, work_2, where=comp_cells)
+        np.multiply(pressure, derivative, out=vson)
+        vson -= work_3
+        np.multiply(specific_volume, specific_volume, out=work_2)
+        vson *= work_2
+        np.sqrt(vson, out=vson)
+        np.greater_equal(vson, 10000., out=comp_cells)
+        vson[comp_cells] = 0.
+
+    def __solve_volume_energy_masked(self, specific_volume, internal_energy, pressure,  # pylint: disable=too-many-arguments
+                                     derivative, vson):
+        """
+        Evaluation on the compression and release sub-arrays
+        """
         epsv = 1 - self.__param.rhozero * specific_volume
         derivative[:] = 1. / specific_volume
         derivative *= (self.__param.grunzero * (1 - epsv) + self.__param.b * epsv)
@@ -194,28 +350,3 @@ class MieGruneisen(EquationOfStateBase):
         vson[:] = specific_volume ** 2 * (pressure * derivative - dpdv)
         vson[:] = np.sqrt(vson)
         vson[vson >= 10000.] = 0.
-
-if __name__ == "__main__":
-    import time
-    # pylint: disable=invalid-name
-    eos = MieGruneisen()
-    density = np.ndarray((1000,))
-    int_nrj = np.ndarray((1000,))
-    press = np.ndarray((1000,))
-    sound_speed = np.ndarray((1000,))
-    deriv = np.ndarray((1000,))
-
-    density[:] = 9000.
-    int_nrj[:] = 1.e+05
-    press[:] = 0.
-    sound_speed[:] = 0.
-    deriv[:] = 0.
-
-    spec_vol = 1. / density
-    start_time = time.perf_counter()
-    iter_number = 15000
-    for _ in range(iter_number):
-        eos.solve_volume_energy(spec_vol, int_nrj, press, deriv, sound_speed)
-    end_time = time.perf_counter()
-
-    print(f"{iter_number} iterations : {end_time - start_time} seconds")
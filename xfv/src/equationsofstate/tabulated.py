@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Implementing TabulatedEquationOfState class
+
+The equation of state is given by tables of the pressure and of the sound speed on a regular
+grid of specific volumes and internal energies. The tables are stored either :
+    - in a HDF5 file holding the datasets specific_volume, energy, pressure and sound_speed
+      (contiguous, not compressed) ;
+    - in a directory holding the files specific_volume.npy, energy.npy, pressure.npy and
+      sound_speed.npy.
+In both cases the pressure and sound speed tables are memory-mapped.
+
+>>> import tempfile
+>>> import numpy as np
+>>> from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+>>> table = compute_table(MieGruneisen(), np.linspace(9.e-05, 1.3e-04, 401),
+...                       np.linspace(0., 2.e+06, 201))
+>>> tmp_dir = tempfile.TemporaryDirectory()
+>>> table_path = Path(tmp_dir.name) / "eos_table.hdf5"
+>>> save_table(table_path, table)
+>>> my_eos = TabulatedEquationOfState(table_path, "bicubic")
+>>> tmp_dir.cleanup()
+"""
+import os
+from pathlib import Path
+from typing import Dict, Union
+
+import h5py
+import numpy as np
+
+from xfv.src.equationsofstate.equationofstatebase import EquationOfStateBase
+
+TABLE_FIELDS = ('specific_volume', 'energy', 'pressure', 'sound_speed')
+
+
+def compute_table(eos: EquationOfStateBase, specific_volume: np.ndarray,
+                  energy: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Returns the tables of pressure and sound speed of an equation of state on a grid
+
+    :param eos: the equation of state to tabulate
+    :param specific_volume: regularly spaced specific volumes (first axis of the tables)
+    :param energy: regularly spaced internal energies (second axis of the tables)
+    """
+    volumes, energies = np.meshgrid(specific_volume, energy, indexing='ij')
+    pressure = np.zeros(volumes.shape)
+    sound_speed = np.zeros(volumes.shape)
+    with np.errstate(invalid='ignore'):
+        eos.solve_volume_energy(volumes.ravel(), energies.ravel(), pressure.reshape(-1),
+                                np.zeros(volumes.size), sound_speed.reshape(-1))
+    return {'specific_volume': np.asarray(specific_volume, dtype=np.float64),
+            'energy': np.asarray(energy, dtype=np.float64),
+            'pressure': pressure, 'sound_speed': sound_speed}
+
+
+def save_table(path: Union[str, Path], table: Dict[str, np.ndarray]) -> None:
+    """
+    Save the tables in a HDF5 file or, if path has no suffix, in a directory of .npy files
+
+    :param path: path of the HDF5 file or of the directory
+    :param table: the tables (see compute_table)
+    """
+    path = Path(path)
+    if path.suffix:
+        with h5py.File(path, 'w') as file_out:
+            for name in TABLE_FIELDS:
+                file_out.create_dataset(name, data=table[name])
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        for name in TABLE_FIELDS:
+            np.save(path / (name + ".npy"), table[name])
+
+
+def _load_table(path: Path) -> Dict[str, np.ndarray]:
+    """
+    Returns the tables stored in path, the 2D ones being memory-mapped
+    """
+    if path.is_dir():
+        return {name: np.load(path / (name + ".npy"), mmap_mode='r') for name in TABLE_FIELDS}
+    table = {}
+    with h5py.File(path, 'r') as file_in:
+        for name in TABLE_FIELDS:
+            dataset = file_in[name]
+            offset = dataset.id.get_offset()
+            if offset is None or dataset.chunks is not None:
+                # Not mappable (chunked or empty dataset) : read in memory
+                table[name] = dataset[()]
+            else:
+                table[name] = np.memmap(path, mode='r', dtype=dataset.dtype,
+                                        shape=dataset.shape, offset=offset)
+    return table
+
+
+class TabulatedEquationOfState(EquationOfStateBase):
+    """
+    Equation of state interpolated in tables on a regular (specific volume, internal energy)
+    grid. The derivative of the pressure with respect to the internal energy is the one
+    of the interpolating function. Outside the tables, the values are extrapolated.
+    """
+    INTERPOLATIONS = ('bilinear', 'bicubic')
+
+    def __init__(self, table: Union[str, Path], interpolation: str = 'bilinear'):
+        """
+        :param table: path to the HDF5 file or directory of .npy files holding the tables
+        :param interpolation: bilinear or bicubic
+        """
+        if interpolation not in self.INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation {interpolation}. "
+                             f"Please choose among {self.INTERPOLATIONS}")
+        self.__path = Path(table)
+        self.__interpolation = interpolation
+        data = _load_table(self.__path)
+        self.__axes = []
+        for name in ('specific_volume', 'energy'):
+            axis = np.asarray(data[name], dtype=np.float64)
+            step = (axis[-1] - axis[0]) / (axis.size - 1)
+            if step <= 0 or not np.allclose(np.diff(axis), step, rtol=1.e-9, atol=0.):
+                raise ValueError(f"The {name} axis of the table {table} must be regularly "
+                                 "spaced and increasing")
+            self.__axes.append((axis[0], step, axis.size))
+        if min(size for _, _, size in self.__axes) < (4 if interpolation == 'bicubic' else 2):
+            raise ValueError(f"The table {table} is too small for {interpolation} interpolation")
+        shape = tuple(size for _, _, size in self.__axes)
+        # Flat views to gather the values of the stencils
+        self.__pressure = data['pressure'].reshape(-1)
+        self.__sound_speed = data['sound_speed'].reshape(-1)
+        if data['pressure'].shape != shape or data['sound_speed'].shape != shape:
+            raise ValueError(f"The tables of {table} must be of shape {shape}")
+
+    def __str__(self):
+        message = "EquationOfState : {:s}".format(self.__class__.__name__) + os.linesep
+        message += "Parameters : "
+        message += os.linesep + " -- {:>20s} : {}".format("table", self.__path)
+        message += os.linesep + " -- {:>20s} : {}".format("interpolation", self.__interpolation)
+        for name, (start, step, size) in zip(('specific volume', 'energy'), self.__axes):
+            message += os.linesep + " -- {:>20s} : [{:g}, {:g}] ({:d} points)".format(
+                name, start, start + step * (size - 1), size)
+        return message
+
+    def __repr__(self):
+        return "TabulatedEquationOfState(table={!r}, interpolation={!r})".format(
+            str(self.__path), self.__interpolation)
+
+    def __locate(self, axis, values, nb_ghosts):
+        """
+        Returns the index of the grid interval holding the values and the local
+        coordinate in this interval. The index is clipped so that the interpolation
+        stencil (nb_ghosts points on each side of the interval) stays in the table.
+        """
+        start, step, size = axis
+        position = (values - start) / step
+        index = np.clip(np.floor(position), nb_ghosts, size - 2 - nb_ghosts).astype(np.intp)
+        return index, position - index
+
+    def solve_volume_energy(self, specific_volume, internal_energy, pressure,  # pylint: disable=too-many-arguments
+                            derivative, vson=None):
+        """
+        Given the specific volume and internal energy computes the pressure, sound speed and
+        derivative of the pressure with respect to the internal energy
+
+        :param specific_volume: specific volume (in)
+        :type specific_volume: numpy.array
+        :param internal_energy: internal energy (in)
+        :type internal_energy: numpy.array
+        :param pressure: pressure (out)
+        :type pressure: numpy.array
+        :param derivative: derivative of pressure with respect to the internal energy (out)
+        :type derivative: numpy.array
+        :param vson: sound speed (out)
+        :type vson: numpy.array
+        """
+        if self.__interpolation == 'bilinear':
+            weights = self.__bilinear_weights
+            nb_ghosts = 0
+        else:
+            weights = self.__bicubic_weights
+            nb_ghosts = 1
+        i_v, t_v = self.__locate(self.__axes[0], specific_volume, nb_ghosts)
+        i_e, t_e = self.__locate(self.__axes[1], internal_energy, nb_ghosts)
+        w_v, _ = weights(t_v)
+        w_e, dw_e = weights(t_e)
+        size_e = self.__axes[1][2]
+        base = (i_v - nb_ghosts) * size_e + i_e - nb_ghosts
+        pressure[...] = 0.
+        derivative[...] = 0.
+        if vson is not None:
+            vson[...] = 0.
+        for k_v, weight_v in enumerate(w_v):
+            for k_e, (weight_e, dweight_e) in enumerate(zip(w_e, dw_e)):
+                flat_index = base + (k_v * size_e + k_e)
+                values = self.__pressure[flat_index]
+                pressure += weight_v * weight_e * values
+                derivative += weight_v * dweight_e * values
+                if vson is not None:
+                    vson += weight_v * weight_e * self.__sound_speed[flat_index]
+        derivative /= self.__axes[1][1]
+
+    @staticmethod
+    def __bilinear_weights(t):
+        """
+        Returns the weights of the 2 points of the linear interpolation at local
+        coordinate t and their derivatives with respect to t
+        """
+        return (1. - t, t), (-1., 1.)
+
+    @staticmethod
+    def __bicubic_weights(t):
+        """
+        Returns the weights of the 4 points of the cubic (Catmull-Rom) interpolation at
+        local coordinate t and their derivatives with respect to t
+        """
+        t_2 = t * t
+        weights = (0.5 * ((2. - t) * t - 1.) * t,
+                   0.5 * ((3. * t - 5.) * t_2 + 2.),
+                   0.5 * ((4. - 3. * t) * t + 1.) * t,
+                   0.5 * (t - 1.) * t_2)
+        derivatives = (0.5 * ((4. - 3. * t) * t - 1.),
+                       0.5 * (9. * t - 10.) * t,
+                       0.5 * ((8. - 9. * t) * t + 1.),
+                       0.5 * (3. * t - 2.) * t)
+        return weights, derivatives
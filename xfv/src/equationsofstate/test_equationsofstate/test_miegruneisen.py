@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+MieGruneisen module unit tests
+"""
+import unittest
+import numpy as np
+
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+
+
+class MieGruneisenTest(unittest.TestCase):
+    """
+    Test case for the MieGruneisen equation of state
+    """
+    def setUp(self):
+        """
+        States in compression, release and exactly at the reference density
+        """
+        rng = np.random.RandomState(5)
+        density = rng.uniform(5000., 14000., 1000)
+        density[:100] = 8129.
+        self.specific_volume = 1. / density
+        self.internal_energy = rng.uniform(-1.e+05, 2.e+06, 1000)
+        self.coefficients = [{'czero': 3980., 'S1': 1.58, 'S2': 0., 'S3': 0., 'rhozero': 8129.,
+                              'grunzero': 1.6, 'b': 0.5, 'ezero': 0.},
+                             {'czero': 3980., 'S1': 1.58, 'S2': 0.3, 'S3': 0., 'rhozero': 8129.,
+                              'grunzero': 1.6, 'b': 0.5, 'ezero': 10.},
+                             {'czero': 3980., 'S1': 1.58, 'S2': 0.3, 'S3': 0.1, 'rhozero': 8129.,
+                              'grunzero': 1.6, 'b': 0.5, 'ezero': 10.}]
+
+    def __solve(self, eos, size, with_vson=True):
+        """
+        Returns the pressure, derivative and sound speed computed by the eos on the
+        size first cells
+        """
+        pressure, derivative, vson = np.zeros(size), np.zeros(size), np.zeros(size)
+        with np.errstate(invalid='ignore'):
+            eos.solve_volume_energy(self.specific_volume[:size], self.internal_energy[:size],
+                                    pressure, derivative, vson if with_vson else None)
+        return pressure, derivative, vson
+
+    def test_solve_volume_energy(self):
+        """
+        Test of the solve_volume_energy method on reference values
+        """
+        eos = MieGruneisen(3980, 1.58, 0, 0, 8129, 1.6, 0.5, 0)
+        specific_volume = 1. / np.array([9000., 8500., 9500.])
+        internal_energy = np.array([1.0e+04, 1.0e+03, 1.0e+05])
+        pressure, derivative, vson = np.zeros(3), np.zeros(3), np.zeros(3)
+        eos.solve_volume_energy(specific_volume, internal_energy, pressure, derivative, vson)
+        np.testing.assert_allclose(pressure, [1.61115797e+10, 6.26727977e+09, 2.87613980e+10])
+        np.testing.assert_allclose(vson, [4871.9323597, 4365.09703163, 5394.94930993])
+        np.testing.assert_allclose(derivative, [13441.9, 13191.9, 13691.9])
+
+    def test_is_linear_in_energy(self):
+        """
+        Test that the pressure is an affine function of the internal energy, as advertised
+        """
+        eos = MieGruneisen(**self.coefficients[2])
+        self.assertTrue(eos.is_linear_in_energy)
+        size = self.specific_volume.size
+        p_zero, dpde = np.zeros(size), np.zeros(size)
+        eos.solve_volume_energy(self.specific_volume, np.zeros(size), p_zero, dpde)
+        pressure, derivative, _ = self.__solve(eos, size, with_vson=False)
+        np.testing.assert_array_equal(derivative, dpde)
+        np.testing.assert_allclose(pressure, p_zero + dpde * self.internal_energy,
+                                   rtol=1.e-10, atol=1.)
+
+    def test_fused_identical_to_masked(self):
+        """
+        Test that the fused evaluation gives the same results as the masked one,
+        with and without the sound speed and with several array sizes (workspace reuse)
+        """
+        for coefficients in self.coefficients:
+            fused_eos = MieGruneisen(**coefficients, fused=True)
+            masked_eos = MieGruneisen(**coefficients, fused=False)
+            for size in (1000, 10, 500):
+                for with_vson in (True, False):
+                    for fused, masked in zip(self.__solve(fused_eos, size, with_vson),
+                                             self.__solve(masked_eos, size, with_vson)):
+                        np.testing.assert_array_equal(fused, masked)
+
+    def test_fused_2d_arrays(self):
+        """
+        Test that the fused evaluation works on column arrays
+        """
+        eos = MieGruneisen()
+        shape = (self.specific_volume.size, 1)
+        pressure, derivative, vson = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        with np.errstate(invalid='ignore'):
+            eos.solve_volume_energy(self.specific_volume.reshape(shape),
+                                    self.internal_energy.reshape(shape),
+                                    pressure, derivative, vson)
+        for result, expected in zip((pressure, derivative, vson),
+                                    self.__solve(MieGruneisen(fused=False), shape[0])):
+            np.testing.assert_array_equal(result[:, 0], expected)
+
+    def test_parameters_per_member(self):
+        """
+        Test that parameters given as column arrays (one row per member of an ensemble) give
+        the same results as one equation of state per member
+        """
+        shape = (len(self.coefficients), 100)
+        specific_volume = self.specific_volume[:shape[1]] * np.ones(shape)
+        internal_energy = self.internal_energy[:shape[1]] * np.ones(shape)
+        eos = MieGruneisen(**{key: np.array([[coefficients[key]]
+                                             for coefficients in self.coefficients])
+                              for key in self.coefficients[0]})
+        pressure, derivative, vson = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        with np.errstate(invalid='ignore'):
+            eos.solve_volume_energy(specific_volume, internal_energy, pressure, derivative, vson)
+        for row, coefficients in enumerate(self.coefficients):
+            for result, expected in zip((pressure, derivative, vson),
+                                        self.__solve(MieGruneisen(**coefficients), shape[1])):
+                np.testing.assert_array_equal(result[row], expected)
+        self.assertIn("[3980. 3980. 3980.]", str(eos))
+        with self.assertRaises(ValueError):
+            MieGruneisen(czero=np.array([[3980.], [4000.]]), fused=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+tabulated module unit tests
+"""
+from pathlib import Path
+import tempfile
+import unittest
+import numpy as np
+
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.equationsofstate.tabulated import (TabulatedEquationOfState, compute_table,
+                                                save_table)
+
+
+class TabulatedEquationOfStateTest(unittest.TestCase):
+    """
+    Test case for the TabulatedEquationOfState class
+    """
+    def setUp(self):
+        """
+        Table of the Mie-Gruneisen eos stored in a HDF5 file and in a npy directory
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ref_eos = MieGruneisen()
+        self.table = compute_table(self.ref_eos, np.linspace(1. / 12000., 1. / 7000., 401),
+                                   np.linspace(-1.e+05, 3.e+06, 201))
+        self.hdf5_path = Path(self.tmp_dir.name) / "table.hdf5"
+        self.npy_path = Path(self.tmp_dir.name) / "table"
+        save_table(self.hdf5_path, self.table)
+        save_table(self.npy_path, self.table)
+        rng = np.random.RandomState(2)
+        self.specific_volume = 1. / rng.uniform(9000., 11500., 1000)
+        self.energy = rng.uniform(0., 2.e+06, 1000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def __solve(eos, specific_volume, energy):
+        """
+        Returns pressure, derivative and sound speed computed by eos
+        """
+        results = [np.zeros(specific_volume.shape) for _ in range(3)]
+        eos.solve_volume_energy(specific_volume, energy, *results)
+        return results
+
+    def test_grid_points(self):
+        """
+        Test that the values at the grid points are the tabulated ones
+        """
+        volumes, energies = np.meshgrid(self.table['specific_volume'][100:110],
+                                        self.table['energy'][50:60], indexing='ij')
+        for interpolation in TabulatedEquationOfState.INTERPOLATIONS:
+            eos = TabulatedEquationOfState(self.hdf5_path, interpolation)
+            pressure, _, vson = self.__solve(eos, volumes.ravel(), energies.ravel())
+            np.testing.assert_allclose(pressure, self.table['pressure'][100:110, 50:60].ravel(),
+                                       rtol=1.e-12)
+            np.testing.assert_allclose(vson, self.table['sound_speed'][100:110, 50:60].ravel(),
+                                       rtol=1.e-12)
+
+    def test_interpolation(self):
+        """
+        Test the interpolation between the grid points against the analytic eos
+        """
+        expected = self.__solve(self.ref_eos, self.specific_volume, self.energy)
+        for interpolation, rtol in (('bilinear', 1.e-4), ('bicubic', 1.e-6)):
+            eos = TabulatedEquationOfState(self.hdf5_path, interpolation)
+            pressure, derivative, _ = self.__solve(eos, self.specific_volume, self.energy)
+            np.testing.assert_allclose(pressure, expected[0], rtol=rtol)
+            np.testing.assert_allclose(derivative, expected[1], rtol=rtol)
+
+    def test_derivative_of_interpolation(self):
+        """
+        Test that the derivative is the one of the interpolating function
+        """
+        for interpolation in TabulatedEquationOfState.INTERPOLATIONS:
+            eos = TabulatedEquationOfState(self.hdf5_path, interpolation)
+            pressure, derivative, _ = self.__solve(eos, self.specific_volume, self.energy)
+            pressure_plus, _, _ = self.__solve(eos, self.specific_volume, self.energy + 1.)
+            np.testing.assert_allclose(pressure_plus - pressure, derivative, rtol=1.e-3)
+
+    def test_storage_formats(self):
+        """
+        Test that the HDF5 and npy storages give the same results
+        """
+        for interpolation in TabulatedEquationOfState.INTERPOLATIONS:
+            results = []
+            for path in (self.hdf5_path, self.npy_path):
+                eos = TabulatedEquationOfState(path, interpolation)
+                results.append(self.__solve(eos, self.specific_volume, self.energy))
+            for hdf5_result, npy_result in zip(*results):
+                np.testing.assert_array_equal(hdf5_result, npy_result)
+
+    def test_wrong_tables(self):
+        """
+        Test that an unknown interpolation or an irregular grid raise a ValueError
+        """
+        with self.assertRaises(ValueError):
+            TabulatedEquationOfState(self.hdf5_path, "linear")
+        self.table['energy'][3] += 1.
+        save_table(self.hdf5_path, self.table)
+        with self.assertRaises(ValueError):
+            TabulatedEquationOfState(self.hdf5_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,3 +3,4 @@ Package for field management modules
 """
 from xfv.src.fields.field import Field
 from xfv.src.fields.fieldsmanager import FieldManager
+from xfv.src.fields.stacked_field import StackedField
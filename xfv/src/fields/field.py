@@ -12,17 +12,18 @@ class Field:
 
     def __init__(self, size, current_value=0., new_value=0.):
         """
-        :param size: size of arrays (i.e nodes or cells number)
+        :param size: size of arrays (i.e nodes or cells number), or shape of arrays
+                     (i.e (number of members, nodes or cells number) for an ensemble)
         :param current_value: current field value
         :param new_value: future field value
 
-        :type size: int
+        :type size: int or tuple
         :type current_value: float or numpy.array
         :type new_value: float or numpy.array
         """
         self.__size = size
-        self.__current = np.empty([size], dtype=np.float64, order='C')
-        self.__future = np.empty([size], dtype=np.float64, order='C')
+        self.__current = np.empty(size, dtype=np.float64, order='C')
+        self.__future = np.empty(size, dtype=np.float64, order='C')
         self.__current[:] = current_value
         self.__future[:] = new_value
 
@@ -30,7 +31,7 @@ class Field:
         """
         :return: informations about the field
         """
-        return "{:s} of size {:d}".format(self.__class__.__name__, self.size)
+        return "{:s} of size {}".format(self.__class__.__name__, self.size)
 
     @property
     def size(self):
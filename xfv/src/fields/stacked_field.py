@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Implementing the StackedField class
+"""
+
+
+class StackedField:
+    """
+    Physical field of one item (for example a discontinuity) whose current and future values
+    are views on the item row of arrays stacking the values of all the items.
+    It has the same interface as the Field class.
+    """
+
+    def __init__(self, current_view, new_view):
+        """
+        :param current_view: view on the current value of the item in the stacked array
+        :param new_view: view on the future value of the item in the stacked array
+
+        :type current_view: numpy.array
+        :type new_view: numpy.array
+        """
+        self.__current = None
+        self.__future = None
+        self.bind(current_view, new_view)
+
+    def __str__(self):
+        """
+        :return: informations about the field
+        """
+        return "{:s} of size {:d}".format(self.__class__.__name__, self.size)
+
+    def bind(self, current_view, new_view):
+        """
+        Bind the field on new views (after a reallocation of the stacked arrays)
+
+        :param current_view: view on the current value of the item in the stacked array
+        :param new_view: view on the future value of the item in the stacked array
+        """
+        self.__current = current_view
+        self.__future = new_view
+
+    @property
+    def size(self):
+        """
+        :return: the size of the field
+        """
+        return self.__current.size
+
+    @property
+    def current_value(self):
+        """
+        :return: the current field value
+        :rtype: numpy.array
+        """
+        return self.__current
+
+    @current_value.setter
+    def current_value(self, value):
+        """
+        Set value as the current value of the field
+
+        :param value: new field value to set
+        :type value: float or numpy.array
+        """
+        self.__current[:] = value
+
+    @property
+    def new_value(self):
+        """
+        :return: the future field value
+        :rtype: numpy.array
+        """
+        return self.__future
+
+    @new_value.setter
+    def new_value(self, value):
+        """
+        Set value as the future value of the field
+
+        :param value: new field value to set
+        :type value: float or numpy.array
+        """
+        self.__future[:] = value
+
+    def increment_values(self):
+        """
+        Increment field values
+        """
+        self.__current[:] = self.__future[:]
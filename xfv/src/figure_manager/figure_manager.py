@@ -57,6 +57,13 @@ class FigureManager(metaclass=Singleton):
         self.__dump = dump
         self.interface = int(np.where(self.__mesh_instance.cells.cell_in_target)[0][0])
 
+    @property
+    def time_controler(self):
+        """
+        Returns the controler of the figures output (None if no figure is required)
+        """
+        return self.__time_ctrl
+
     def set_time_controler(self, deltat_t: float):
         """
         The figures will be updated every delta_t seconds
@@ -113,3 +113,13 @@ class EnrichedMassMatrix:
         """
         Print the mass matrix * (with aligned members)
         """
+
+    @abstractmethod
+    def inverse_enriched_mass_matrix_blocks(self):
+        """
+        Return the inverse of the mass matrix as three 2x2 blocks (classical dof, enriched dof
+        and coupling between classical and enriched dof) so that they can be stacked with the
+        ones of the other discontinuities
+
+        :return: tuple(classical dof block, enriched dof block, coupling block)
+        """
@@ -87,6 +87,17 @@ class EnrichedMassMatrixConsistent(EnrichedMassMatrix):
         return self._inv_enriched_mass_matrix[0:self._matrix_size - 2,
                                               self._matrix_size - 2:self._matrix_size]
 
+    def inverse_enriched_mass_matrix_blocks(self):
+        """
+        Return the inverse of the mass matrix as three 2x2 blocks (classical dof, enriched dof
+        and coupling between classical and enriched dof)
+
+        :return: tuple(classical dof block, enriched dof block, coupling block)
+        """
+        return (np.array(self.inverse_enriched_mass_matrix_classic_dof),
+                np.array(self.inverse_enriched_mass_matrix_enriched_dof),
+                np.array(self.inverse_enriched_mass_matrix_coupling_dof))
+
     def compute_enriched_mass_matrix_left_part(self, mass_0: float, mass_1: float, epsilon: float):
         """
         Compute the Hansbo mass matrix for the left part
@@ -52,6 +52,18 @@ class EnrichedMassMatrixLump(EnrichedMassMatrix):
         """
         return self._inv_enriched_mass_matrix[self._matrix_size - 2:self._matrix_size]
 
+    def inverse_enriched_mass_matrix_blocks(self):
+        """
+        Return the inverse of the mass matrix as three 2x2 blocks (classical dof, enriched dof
+        and coupling between classical and enriched dof). The lumped matrix is diagonal and
+        has no coupling terms
+
+        :return: tuple(classical dof block, enriched dof block, coupling block)
+        """
+        return (np.diag(np.ravel(self.inverse_enriched_mass_matrix_classic_dof)),
+                np.diag(np.ravel(self.inverse_enriched_mass_matrix_enriched_dof)),
+                np.zeros((2, 2)))
+
     def get_mass_matrix_left(self) -> np.array:
         """
         Accessor on the part of mass matrix concerning the left part of the cracked cell
@@ -6,7 +6,7 @@ Base class for one dimensional enriched mesh
 import numpy as np
 from xfv.src.cell.one_dimension_enriched_cell_hansbo import OneDimensionHansboEnrichedCell
 from xfv.src.node.one_dimension_enriched_node_hansbo import OneDimensionHansboEnrichedNode
-from xfv.src.data.data_container import DataContainer
+from xfv.src.context.simulationcontext import current_context
 from xfv.src.data.enriched_mass_matrix_props import ConsistentMassMatrixProps
 from xfv.src.mesh.topology1d import Topology1D
 from xfv.src.discontinuity.discontinuity import Discontinuity
@@ -18,16 +18,22 @@ from xfv.src.contact.contact_base import ContactBase
 class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-public-methods
     """
     This class defines a one dimensional mesh with potential enrichment
+
+    The mesh belongs to a simulation context which holds its data and its discontinuities.
+    This context has to be the active one when the mesh is computed.
     """
     # noinspection PyArgumentList
-    def __init__(self, initial_coordinates, initial_velocities):
+    def __init__(self, initial_coordinates, initial_velocities, context=None):
         """
         Construction of the mesh
 
         :param initial_coordinates: array for the node coordinates at initial time
         :param initial_velocities: array for the node velocities at initial time
+        :param context: context of the simulation (default the active one)
         """
-        self.data = DataContainer()  # pylint: disable=no-value-for-parameter
+        self.context = current_context() if context is None else context
+        self.context.mesh = self
+        self.data = self.context.data
         if np.shape(initial_coordinates) != np.shape(initial_velocities):
             message = "Initial velocity and coordinates vector doesn't have the same shape!"
             raise ValueError(message)
@@ -42,13 +48,14 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
         nbr_nodes = np.shape(initial_coordinates)[0]
         self.nodes = OneDimensionHansboEnrichedNode(nbr_nodes, initial_coordinates,
                                                     initial_velocities,
-                                                    section=self.data.geometric.section)
+                                                    section=self.data.geometric.section,
+                                                    context=self.context)
 
         # ---------------------------------------------
         # Cells creation
         # ---------------------------------------------
         nbr_cells = nbr_nodes - 1
-        self.cells = OneDimensionHansboEnrichedCell(nbr_cells)
+        self.cells = OneDimensionHansboEnrichedCell(nbr_cells, self.context)
 
         # ----------------------------------------------
         # Mass Matrix creation
@@ -74,6 +81,7 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
                                           self.nodes.nodes_in_projectile,
                                           self.__topology)
         self.mask_last_nodes_of_ref = None
+        self.__nb_disc_with_mass_matrix = 0
 
         # ---------------------------------------------
         # Cohesive zone model initialisation
@@ -134,13 +142,15 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
         :param delta_t: time step
         """
         self._compute_velocities_for_enrichment_not_concerned_nodes(delta_t)
-        # Compute velocity for enriched nodes
-        for disc in Discontinuity.discontinuity_list():
-            # Compute mass matrix for newly created discontinuities
+        # Compute mass matrix for newly created discontinuities
+        disc_list = Discontinuity.discontinuity_list()
+        for disc in disc_list[self.__nb_disc_with_mass_matrix:]:
             if not disc.mass_matrix_updated:
                 self._compute_discontinuity_mass_matrix(disc)
-            # Compute classical and enriched ddl velocity of enriched nodes
-            self._compute_velocities_for_disc(disc, delta_t)
+        self.__nb_disc_with_mass_matrix = len(disc_list)
+        # Compute classical and enriched ddl velocity of enriched nodes (all disc at once)
+        if disc_list:
+            self._compute_velocities_for_discs(delta_t)
         self.nodes.compute_complete_velocity_field()
 
     def _compute_velocities_for_enrichment_not_concerned_nodes(self, delta_t: float):
@@ -163,25 +173,19 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
                 self.mass_matrix.inverse_mass_matrix[self.mask_last_nodes_of_ref],
                 mask=self.mask_last_nodes_of_ref)
 
-    def _compute_velocities_for_disc(self, disc: Discontinuity, delta_t: float):
+    def _compute_velocities_for_discs(self, delta_t: float, disc_ids=slice(None)):
         """
-        Compute the new node velocities for the nodes belonging to a given discontinuity
+        Compute the new node velocities for the nodes belonging to all (or selected)
+        discontinuities at once
 
-        :param disc :current discontinuity
         :param delta_t: time step
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
         """
-        # Compute classical ddl velocity of enriched nodes
-        self.nodes.compute_new_velocity(
-            delta_t, disc.mask_disc_nodes,
-            disc.mass_matrix_enriched.inverse_enriched_mass_matrix_classic_dof)
-        # Compute enriched ddl velocity of enriched nodes
-        self.nodes.compute_enr_new_velocity(disc, delta_t)
-
-        if type(self.data.material_target.failure_model.lump_mass_matrix) == \
-                ConsistentMassMatrixProps:
-            # Compute the contribution of classical ddl on enriched ddl and the reverse
-            # (out of the diagonal terms of the mass matrix)
-            self.nodes.coupled_enrichment_terms_compute_new_velocity(disc, delta_t)
+        # The coupling terms (out of the diagonal terms of the mass matrix) only exist
+        # with the consistent mass matrix
+        coupling = type(self.data.material_target.failure_model.lump_mass_matrix) == \
+            ConsistentMassMatrixProps
+        self.nodes.compute_enriched_nodes_new_velocity_arr(delta_t, coupling, disc_ids)
 
     def _compute_discontinuity_mass_matrix(self, disc: Discontinuity):
         """
@@ -204,40 +208,41 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
 
         :param delta_t: time step
         """
-        disc_list = Discontinuity.discontinuity_list()
-        if len(disc_list) == 0:
+        if self.contact_model is None or not Discontinuity.discontinuity_number():
+            return
+
+        # The contact forces of all the discontinuities are computed from the same predicted
+        # kinematics and only the discontinuities in contact are corrected
+        contact_force_arr = self.contact_model.compute_contact_force_arr(self.nodes.upundemi,
+                                                                         delta_t)
+        in_contact = np.flatnonzero(contact_force_arr != 0.)
+        if not in_contact.size:
             return
 
-        if self.contact_model is not None:
-            # Theoretically, we should consider a global resolution of contact in all
-            # discontinuities. Here they are treated one after another. Better than nothing but
-            # may cause instabilities
-            nb_disc = len(disc_list)
-            contact_force_arr = np.ndarray((nb_disc,))
-            for ind, disc in enumerate(disc_list):
-                contact_force_arr[ind] = self.contact_model.compute_contact_force(
-                    self.nodes.upundemi, disc, delta_t)
-
-            self.nodes.apply_force_on_discontinuity_boundaries_arr(
-                contact_force_arr * self.nodes.section)
-
-            # Update the kinematics with contact correction
-            for disc in disc_list:
-                # Reinitialize the kinematics that lead to contact in order to recompute it
-                self.nodes.reinitialize_kinematics_after_contact(disc)
-                disc.reinitialize_kinematics_after_contact()
-
-                # Apply correction on the velocity field (only on disc nodes)
-                self._compute_velocities_for_disc(disc, delta_t)
-
-                # Theoretically, we should apply the velocity boundary condition here,
-                # but it is really not convenient to do this and fracture is not supposed
-                # to occur on the boundary cells. Thus, no boundary conditions is applied
-
-                # Apply correction on the node coordinates (only on disc nodes)
-                self.nodes.compute_new_coodinates(disc.mask_disc_nodes, delta_t)  # classical
-                self.nodes.enriched_nodes_compute_new_coordinates(disc, delta_t)  # enriched
-                disc.compute_discontinuity_new_opening(self.nodes.xtpdt)
+        self.nodes.apply_force_on_discontinuity_boundaries_arr(
+            contact_force_arr[in_contact] * self.nodes.section, in_contact)
+
+        # The velocity of the nodes of the discontinuities in contact changes, and so does
+        # the kinematics of the discontinuities sharing one of these nodes
+        contact_nodes = np.concatenate((Discontinuity.in_nodes[in_contact, 0],
+                                        Discontinuity.out_nodes[in_contact, 0]))
+        disc_ids = np.flatnonzero(np.isin(Discontinuity.in_nodes[:, 0], contact_nodes) |
+                                  np.isin(Discontinuity.out_nodes[:, 0], contact_nodes))
+
+        # Apply correction on the velocity field (only on disc nodes). The kinematics that
+        # lead to contact is recomputed from the velocities at the beginning of the time step
+        self._compute_velocities_for_discs(delta_t, disc_ids)
+
+        # Theoretically, we should apply the velocity boundary condition here,
+        # but it is really not convenient to do this and fracture is not supposed
+        # to occur on the boundary cells. Thus, no boundary conditions is applied
+
+        # Apply correction on the node coordinates (only on disc nodes)
+        disc_nodes = np.concatenate((Discontinuity.in_nodes[disc_ids, 0],
+                                     Discontinuity.out_nodes[disc_ids, 0]))
+        self.nodes.compute_new_coodinates(disc_nodes, delta_t)  # classical
+        self.nodes.enriched_nodes_compute_new_coordinates_arr(delta_t, disc_ids)  # enriched
+        Discontinuity.compute_discontinuity_new_opening_arr(self.nodes.xtpdt, disc_ids)
 
     def compute_new_nodes_coordinates(self, delta_t: float):
         """
@@ -247,10 +252,10 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
         """
         mask_all_nodes = np.ones([self.nodes.number_of_nodes], dtype=bool)
         self.nodes.compute_new_coodinates(mask_all_nodes, delta_t)
-        for disc in Discontinuity.discontinuity_list():
-            self.nodes.enriched_nodes_compute_new_coordinates(disc, delta_t)
+        if Discontinuity.discontinuity_number():
+            self.nodes.enriched_nodes_compute_new_coordinates_arr(delta_t)
             # Update discontinuity opening
-            disc.compute_discontinuity_new_opening(self.nodes.xtpdt)
+            Discontinuity.compute_discontinuity_new_opening_arr(self.nodes.xtpdt)
 
     def compute_cells_sizes(self):
         """
@@ -331,8 +336,8 @@ class Mesh1dEnriched:  # pylint:disable=too-many-instance-attributes, too-many-p
         self.nodes.increment()
         self.cells.increment_variables()
         self.cells.cell_enr_increment()  # enriched cell variables
-        for disc in Discontinuity.discontinuity_list():
-            disc.enr_increment()  # enriched node variables
+        if Discontinuity.discontinuity_number():
+            Discontinuity.enr_increment_arr()  # enriched node variables
 
     def apply_elasticity(self, delta_t, shear_modulus_model, mask_material):
         """
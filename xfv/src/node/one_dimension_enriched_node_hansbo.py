@@ -15,7 +15,7 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
     """
 
     def __init__(self, nbr_of_nodes: int, initial_positions: np.array,
-                 initial_velocities: np.array, section=1.):
+                 initial_velocities: np.array, section=1., context=None):
         """
         Build the class OneDimensionHansboEnrichedNode
 
@@ -23,8 +23,10 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
         :param initial_positions: initial coordinates of nodes
         :param initial_velocities: initial velocities of nodes
         :param section: section of the bar
+        :param context: context of the simulation (default the active one)
         """
-        super().__init__(nbr_of_nodes, initial_positions, initial_velocities, section=section)
+        super().__init__(nbr_of_nodes, initial_positions, initial_velocities, section=section,
+                         context=context)
         self._v_field = np.copy(self._upundemi)
 
     @property
@@ -83,6 +85,35 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
             disc.enr_velocity_current[:] + delta_t * \
             multiplication_masse(inv_matrix, disc.enr_force)
 
+    def compute_enriched_nodes_new_velocity_arr(self, delta_t: float, coupling: bool,
+                                                disc_ids=slice(None)):
+        """
+        Compute the new velocity of the classical and enriched degrees of freedom of the
+        enriched nodes for all (or selected) discontinuities at once, using the stacked
+        inverse enriched mass matrices of shape (nb_disc, 2, 2)
+
+        :param delta_t: time step
+        :param coupling: if True, the coupling terms between classical and enriched dof
+                         (non diagonal complete mass matrix) are taken into account
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
+        """
+        nodes = np.concatenate((Discontinuity.in_nodes[disc_ids],
+                                Discontinuity.out_nodes[disc_ids]), axis=1)
+        force = self._force[nodes]
+        enr_force = Discontinuity.enr_force[disc_ids]
+        velocity = self._umundemi[nodes] + \
+            np.matmul(Discontinuity.inv_mass_matrix_classic_dof[disc_ids], force) * delta_t
+        enr_velocity = Discontinuity.enr_velocity_current[disc_ids] + delta_t * \
+            np.matmul(Discontinuity.inv_mass_matrix_enriched_dof[disc_ids], enr_force)
+        if coupling:
+            inv_matrix = Discontinuity.inv_mass_matrix_coupling_dof[disc_ids]
+            enr_velocity += np.matmul(inv_matrix.transpose((0, 2, 1)), force) * delta_t
+            velocity += np.matmul(inv_matrix, enr_force) * delta_t
+        Discontinuity.enr_velocity_new[disc_ids] = enr_velocity
+        # A node shared by two discontinuities takes the velocity computed with the last one,
+        # as if discontinuities were treated one after another
+        self._upundemi[nodes] = velocity
+
     def coupled_enrichment_terms_compute_new_velocity(self, disc, delta_t):
         """
         Compute the coupled terms between classical and enriched dof due to non diagonal
@@ -163,6 +194,18 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
         """
         disc.enr_coordinates_new[:] = disc.enr_coordinates_current[:] + delta_t * disc.enr_velocity_new[:]
 
+    @staticmethod
+    def enriched_nodes_compute_new_coordinates_arr(delta_t: float, disc_ids=slice(None)):
+        """
+        Compute the new enriched nodes coordinates for all (or selected) discontinuities
+
+        :param delta_t: time step
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
+        """
+        Discontinuity.enr_coordinates_new[disc_ids] = \
+            Discontinuity.enr_coordinates_current[disc_ids] + \
+            delta_t * Discontinuity.enr_velocity_new[disc_ids]
+
     def compute_enriched_nodes_new_force(self, contrainte_xx: np.array, enr_contrainte_xx):
         """
         Compute the enriched force on enriched nodes and apply correction for classical
@@ -171,26 +214,28 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
         :param contrainte_xx: vecteur contrainte xx, array de taille (nb_cell, 1)
         :param enr_contrainte_xx: vecteur contrainte xx enrichie, array de taille (nb_cell, 1)
         """
-        for disc in Discontinuity.discontinuity_list():
-            # For each discontinuity, compute the contribution of the cracked cell to the classical
-            # node forces and compute the enriched node forces for the enriched nodes of
-            # the discontinuity
-            cell = disc.get_ruptured_cell_id
-            epsilon = disc.position_in_ruptured_element
+        if not Discontinuity.discontinuity_list():
+            return
+        # For each discontinuity, compute the contribution of the cracked cell to the classical
+        # node forces and compute the enriched node forces for the enriched nodes of
+        # the discontinuity (all discontinuities at once)
+        cells = Discontinuity.ruptured_cell_id[:, 0]
+        epsilon = Discontinuity.discontinuity_position[:, 0]
 
-            sigma_minus = contrainte_xx[cell]
-            sigma_plus = enr_contrainte_xx[cell]
+        sigma_minus = contrainte_xx[cells]
+        sigma_plus = enr_contrainte_xx[cells]
 
-            f_node_left_minus = sigma_minus * (1 - epsilon)
-            f_node_right_plus = - sigma_plus * epsilon
+        f_node_left_minus = sigma_minus * (1 - epsilon)
+        f_node_right_plus = - sigma_plus * epsilon
 
-            f_node_right_minus = - sigma_minus * epsilon
-            f_node_left_plus = sigma_plus * (1 - epsilon)
+        f_node_right_minus = - sigma_minus * epsilon
+        f_node_left_plus = sigma_plus * (1 - epsilon)
 
-            disc.enr_force[0] = f_node_right_minus * self.section  # F2-
-            disc.enr_force[1] = f_node_left_plus * self.section  # F1+
-            self._force[disc.mask_in_nodes] += f_node_left_minus * self.section  # F1-
-            self._force[disc.mask_out_nodes] += f_node_right_plus * self.section  # F2+
+        Discontinuity.enr_force[:, 0, 0] = f_node_right_minus * self.section  # F2-
+        Discontinuity.enr_force[:, 1, 0] = f_node_left_plus * self.section  # F1+
+        self._scatter_on_discontinuity_boundaries(
+            f_node_left_minus * self.section,  # F1-
+            f_node_right_plus * self.section)  # F2+
 
     def compute_enriched_nodes_cohesive_forces(self, cohesive_model):
         """
@@ -198,35 +243,47 @@ class OneDimensionHansboEnrichedNode(OneDimensionNode):
 
         :param cohesive_model: cohesive model
         """
-        disc_list = Discontinuity.discontinuity_list()
-        if not disc_list:
+        if not Discontinuity.discontinuity_list():
             return
-        nb_disc = len(disc_list)
 
-        applied_force_arr = np.ndarray((nb_disc,))
-        for ind, disc in enumerate(disc_list):
-            # Compute cohesive stress
-            cohesive_stress = cohesive_model.compute_cohesive_stress(disc)
-            disc.cohesive_force.new_value = cohesive_stress
-            applied_force_arr[ind] = self.section * cohesive_stress
+        # Compute cohesive stress of all the discontinuities at once
+        cohesive_stress = cohesive_model.compute_cohesive_stress_arr(
+            Discontinuity.discontinuity_opening_new[:, 0],
+            Discontinuity.history_max_opening[:, 0],
+            Discontinuity.history_min_cohesive_force[:, 0],
+            Discontinuity.damage_variable_new[:, 0])
+        Discontinuity.cohesive_force_new[:, 0] = cohesive_stress
 
-        self.apply_force_on_discontinuity_boundaries_arr(applied_force_arr)
+        self.apply_force_on_discontinuity_boundaries_arr(self.section * cohesive_stress)
 
-    def apply_force_on_discontinuity_boundaries_arr(self, force: np.ndarray) -> None:
+    def apply_force_on_discontinuity_boundaries_arr(self, force: np.ndarray,
+                                                    disc_ids=slice(None)) -> None:
         """
         Transport the force to apply on discontinuity boundaries on the classical and enriched nodes
 
         :param force: value of the force to apply
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
         """
-        epsilon_arr = Discontinuity.discontinuity_position
+        epsilon_arr = Discontinuity.discontinuity_position[disc_ids]
         f1 = ((1. - epsilon_arr).T * force).T  # F1 # pylint:disable=invalid-name
         f2 = (epsilon_arr.T * force).T  # F2 # pylint:disable=invalid-name
-        Discontinuity.enr_force[:, 0] += f2  # F2-
-        Discontinuity.enr_force[:, 1] -= f1  # F1+
-
-        nodes_in = Discontinuity.in_nodes.flatten()
-        nodes_out = Discontinuity.out_nodes.flatten()
-        nb_disc = len(Discontinuity.discontinuity_list())
-        for ind in range(nb_disc):
-            self._force[nodes_in[ind]] += f1[ind]  # F1-
-            self._force[nodes_out[ind]] -= f2[ind]  # F2+
+        Discontinuity.enr_force[disc_ids, 0] += f2  # F2-
+        Discontinuity.enr_force[disc_ids, 1] -= f1  # F1+
+
+        self._scatter_on_discontinuity_boundaries(f1, -f2, disc_ids)  # F1- and F2+
+
+    def _scatter_on_discontinuity_boundaries(self, force_in: np.ndarray, force_out: np.ndarray,
+                                             disc_ids=slice(None)) -> None:
+        """
+        Add the forces of the discontinuities to the classical nodes surrounding them.
+        The contributions are interleaved (in node then out node of each discontinuity) so that
+        a node shared by two discontinuities sums them in the discontinuities order.
+
+        :param force_in: force to add on the in node of each discontinuity
+        :param force_out: force to add on the out node of each discontinuity
+        :param disc_ids: indexes of the discontinuities to be considered (default all)
+        """
+        nodes = np.column_stack((Discontinuity.in_nodes[disc_ids, 0],
+                                 Discontinuity.out_nodes[disc_ids, 0]))
+        forces = np.column_stack((np.ravel(force_in), np.ravel(force_out)))
+        np.add.at(self._force[:, 0], nodes.ravel(), forces.ravel())
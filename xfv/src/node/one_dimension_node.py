@@ -4,7 +4,7 @@ Module defining the OneDimensionNode class
 """
 import numpy as np
 from xfv.src.mass_matrix.mass_matrix_utilities import multiplication_masse
-from xfv.src.data.data_container import DataContainer
+from xfv.src.context.simulationcontext import current_context
 from xfv.src.node import Node
 
 
@@ -13,7 +13,7 @@ class OneDimensionNode(Node):
     A class to manage all the nodes in a 1d mesh
     """
     def __init__(self, nbr_of_nodes, poz_init, vit_init,
-                 section=1.):
+                 section=1., context=None):
 
         super().__init__(nbr_of_nodes, position_initiale=poz_init,
                          dim=1, vitesse_initiale=vit_init)
@@ -24,7 +24,8 @@ class OneDimensionNode(Node):
         self._classical[:] = True
         self._enrichment_not_concerned = np.copy(self._classical)
 
-        interface_position = DataContainer().geometric.initial_interface_position
+        data = (current_context() if context is None else context).data
+        interface_position = data.geometric.initial_interface_position
         self.nodes_in_projectile = poz_init[:, 0] <= interface_position
         self.nodes_in_target = poz_init[:, 0] >= interface_position
         # the node in contact belongs both to the target and projectile
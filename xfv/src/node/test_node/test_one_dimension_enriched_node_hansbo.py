@@ -11,6 +11,7 @@ import numpy as np
 from xfv.src.discontinuity.discontinuity import Discontinuity
 from xfv.src.node.one_dimension_enriched_node_hansbo import OneDimensionHansboEnrichedNode
 from xfv.src.data.data_container import DataContainer
+from xfv.src.data.enriched_mass_matrix_props import ConsistentMassMatrixProps
 
 
 class OneDimensionEnrichedNodeHansboTest(unittest.TestCase):
@@ -45,14 +46,15 @@ class OneDimensionEnrichedNodeHansboTest(unittest.TestCase):
                   'enr_force': np.array([[1., ], [2., ]]),
                   'enr_velocity_new': np.zeros([2, 1])
                   }
-        patcher = mock.patch('xfv.src.discontinuity.discontinuity.Discontinuity',
-                             spec=Discontinuity, **config)
-        self.mock_discontinuity = patcher.start()
+        self.__patcher = mock.patch('xfv.src.discontinuity.discontinuity.Discontinuity',
+                                    spec=Discontinuity, **config)
+        self.mock_discontinuity = self.__patcher.start()
 
     def tearDown(self):
         """
         Operations to be done after completing all the tests in the class
         """
+        self.__patcher.stop()
         DataContainer.clear()
 
     def test_classical(self):
@@ -117,6 +119,50 @@ class OneDimensionEnrichedNodeHansboTest(unittest.TestCase):
         np.testing.assert_array_equal(self.mock_discontinuity.enr_velocity_new,
                                       np.array([[3., ], [3., ]]))
 
+    def test_compute_enriched_nodes_new_velocity_arr(self):
+        """
+        Test that the batched computation of the enriched nodes velocities gives the same
+        result as the discontinuity by discontinuity computation
+        """
+        # Real discontinuities are needed to fill the stacked storage
+        self.__patcher.stop()
+        nodes = OneDimensionHansboEnrichedNode(4, np.array([[0.], [1.], [2.], [3.]]),
+                                               np.zeros([4, 1]), section=1.0e-06)
+        nodes._force = np.array([[1.], [-2.], [3.], [4.]])
+        nodes._umundemi = np.array([[10.], [20.], [30.], [40.]])
+        discs = []
+        for cell in (0, 2):
+            mask_in = np.zeros(4, dtype=bool)
+            mask_out = np.zeros(4, dtype=bool)
+            mask_in[cell] = True
+            mask_out[cell + 1] = True
+            disc = Discontinuity(cell, mask_in, mask_out, 0.4, ConsistentMassMatrixProps())
+            disc.mass_matrix_enriched.compute_enriched_mass_matrix_left_part(2., 3., 0.4)
+            disc.mass_matrix_enriched.compute_enriched_mass_matrix_right_part(3., 5., 0.4)
+            disc.mass_matrix_enriched.assemble_enriched_mass_matrix(
+                "_enriched_mass_matrix_left_part", "_enriched_mass_matrix_right_part")
+            disc.mass_matrix_enriched.rearrange_dof_in_inv_mass_matrix()
+            disc.has_mass_matrix_been_computed()
+            disc.enr_force[:] = [[cell + 1.], [-cell - 2.]]
+            disc.enr_velocity_current[:] = [[cell + 5.], [cell - 7.]]
+            discs.append(disc)
+
+        for disc in discs:
+            nodes.compute_new_velocity(
+                1.e-3, disc.mask_disc_nodes,
+                disc.mass_matrix_enriched.inverse_enriched_mass_matrix_classic_dof)
+            nodes.compute_enr_new_velocity(disc, 1.e-3)
+            nodes.coupled_enrichment_terms_compute_new_velocity(disc, 1.e-3)
+        expected_velocity = np.copy(nodes.upundemi)
+        expected_enr_velocity = [np.copy(disc.enr_velocity_new) for disc in discs]
+
+        nodes._upundemi[:] = 0.
+        disc_ids = [disc.label - 1 for disc in discs]
+        nodes.compute_enriched_nodes_new_velocity_arr(1.e-3, True, disc_ids)
+        np.testing.assert_array_equal(nodes.upundemi, expected_velocity)
+        for disc, expected in zip(discs, expected_enr_velocity):
+            np.testing.assert_array_equal(disc.enr_velocity_new, expected)
+
     def test_enriched_nodes_compute_new_coordinates(self):
         """
         Test of the method enriched_nodes_compute_new_coordinates de la class
@@ -142,13 +188,16 @@ class OneDimensionEnrichedNodeHansboTest(unittest.TestCase):
         np.testing.assert_array_equal(self.my_nodes._xtpdt, np.array([[0., ], [1., ]]))
 
     @mock.patch.object(Discontinuity, "discontinuity_list", new_callable=mock.PropertyMock)
+    @mock.patch.object(Discontinuity, "ruptured_cell_id", new=np.array([[0]]))
+    @mock.patch.object(Discontinuity, "discontinuity_position", new=np.array([[0.25]]))
+    @mock.patch.object(Discontinuity, "in_nodes", new=np.array([[0]]))
+    @mock.patch.object(Discontinuity, "out_nodes", new=np.array([[1]]))
+    @mock.patch.object(Discontinuity, "enr_force", new=np.zeros([1, 2, 1]))
     def test_enriched_nodes_new_force(self, mock_disc_list):
         """
         Test of the method enriched_nodes_compute_new_force
         """
         Discontinuity.discontinuity_list.return_value = [self.mock_discontinuity]
-        self.mock_discontinuity.position_in_ruptured_element = 0.25
-        self.mock_discontinuity.get_ruptured_cell_id = 0
         contrainte_classique = np.array([2.])
         contrainte_enr = np.array([2.])
         self.my_nodes._force = np.array([[4., ], [2., ]])
@@ -156,28 +205,44 @@ class OneDimensionEnrichedNodeHansboTest(unittest.TestCase):
         self.my_nodes.compute_enriched_nodes_new_force(contrainte_classique, contrainte_enr)
 
         np.testing.assert_array_almost_equal(
-            self.mock_discontinuity.enr_force, np.array([[-0.5, ], [1.5, ]]))
+            Discontinuity.enr_force[0], np.array([[-0.5, ], [1.5, ]]))
         np.testing.assert_almost_equal(self.my_nodes._force, np.array([[5.5, ], [1.5, ]]))
 
-    @mock.patch.object(Discontinuity, "discontinuity_list", new_callable=mock.PropertyMock)
-    def test_apply_force_on_discontinuity_boundaries_arr(self, mock_disc_list):
+    @mock.patch.object(Discontinuity, "discontinuity_position", new=np.array([[0.5]]))
+    @mock.patch.object(Discontinuity, "in_nodes", new=np.array([[0]]))
+    @mock.patch.object(Discontinuity, "out_nodes", new=np.array([[1]]))
+    @mock.patch.object(Discontinuity, "enr_force", new=np.array([[[-100., ], [300., ]]]))
+    def test_apply_force_on_discontinuity_boundaries_arr(self):
         """
         Test of the method apply_force_on_discontinuity_boundaries
         """
-        Discontinuity.discontinuity_list.return_value = [self.mock_discontinuity]
         stress = np.array([50.])
         self.my_nodes._force = np.array([[200., ], [400., ]])
-        Discontinuity.discontinuity_position[-1] = 0.5
-        Discontinuity.enr_force[-1] = np.array([[-100., ], [300., ]])
-
-        # recreates the link between disc members and class members array because of mock
-        self.mock_discontinuity.enr_force = Discontinuity.enr_force[-1]
-        self.mock_discontinuity.discontinuity_position = Discontinuity.discontinuity_position[-1]
-
         self.my_nodes.apply_force_on_discontinuity_boundaries_arr(stress)
         np.testing.assert_almost_equal(self.my_nodes._force, np.array([[225., ], [375., ]]))
         np.testing.assert_array_almost_equal(
-            self.mock_discontinuity.enr_force, np.array([[-75., ], [275., ]]))
+            Discontinuity.enr_force[0], np.array([[-75., ], [275., ]]))
+
+    @mock.patch.object(Discontinuity, "discontinuity_list", new_callable=mock.PropertyMock)
+    @mock.patch.object(Discontinuity, "ruptured_cell_id", new=np.array([[0], [1]]))
+    @mock.patch.object(Discontinuity, "discontinuity_position", new=np.array([[0.25], [0.5]]))
+    @mock.patch.object(Discontinuity, "in_nodes", new=np.array([[0], [1]]))
+    @mock.patch.object(Discontinuity, "out_nodes", new=np.array([[1], [2]]))
+    @mock.patch.object(Discontinuity, "enr_force", new=np.zeros([2, 2, 1]))
+    def test_enriched_nodes_new_force_shared_node(self, mock_disc_list):
+        """
+        Test of the method enriched_nodes_compute_new_force with two discontinuities
+        sharing the node 1
+        """
+        Discontinuity.discontinuity_list.return_value = [self.mock_discontinuity] * 2
+        nodes = OneDimensionHansboEnrichedNode(3, np.array([[0.], [1.], [2.]]),
+                                               np.zeros([3, 1]), section=1.)
+        nodes._force = np.array([[4., ], [2., ], [1., ]])
+        nodes.compute_enriched_nodes_new_force(np.array([2., 4.]), np.array([2., 8.]))
+        np.testing.assert_array_almost_equal(
+            Discontinuity.enr_force, np.array([[[-0.5], [1.5]], [[-2.], [4.]]]))
+        # node 1 : 2. - 2. * 0.25 + 4. * 0.5 and node 2 : 1. - 8. * 0.5
+        np.testing.assert_almost_equal(nodes._force, np.array([[5.5, ], [3.5, ], [-3., ]]))
 
     @unittest.skip("Mod�le coh�sif pas revu")
     @mock.patch.object(Discontinuity, "discontinuity_list", new_callable=mock.PropertyMock)
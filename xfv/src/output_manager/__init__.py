@@ -1,7 +1,11 @@
 """
 Package for output management modules
 """
+from xfv.src.output_manager.hdf5settings import FlushPolicy, Hdf5Settings
 from xfv.src.output_manager.outputdatabase import OutputDatabase
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+from xfv.src.output_manager.asyncoutputdatabase import AsyncOutputDatabase
+from xfv.src.output_manager.probedatabase import ProbeDatabase, resolve_probe_ids
 from xfv.src.output_manager.outputmanager import OutputManager
 from xfv.src.output_manager.outputtimecontroler import OutputTimeControler
 from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
@@ -0,0 +1,208 @@
+"""
+Implementing the AsyncOutputDatabase class writing the hdf5 storage in a background thread
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+
+class _Snapshot:
+    """
+    A buffer of the ring : copy of the fields of one saved time
+    """
+
+    def __init__(self):
+        self.time = None
+        # Preallocated copies of the fields, by name. They are reused from one time to another
+        # and reallocated only if the shape of the field changes (enriched fields)
+        self.buffers = {}
+        # Names and attributes of the fields of the time, in the order of their addition
+        self.fields = []
+
+    def reset(self, time):
+        """
+        Start the snapshot of a new time
+
+        :param time: time to be added
+        """
+        self.time = time
+        self.fields = []
+
+    def store(self, f_name, values, attributes):
+        """
+        Copy the values of the field in its buffer
+
+        :param f_name: name of the field
+        :param values: values of the field
+        :param attributes: attributes of the dataset
+        """
+        values = np.asarray(values)
+        buffer = self.buffers.get(f_name)
+        if buffer is None or buffer.shape != values.shape or buffer.dtype != values.dtype:
+            buffer = self.buffers[f_name] = np.empty_like(values)
+        np.copyto(buffer, values)
+        self.fields.append((f_name, attributes))
+
+
+class AsyncOutputDatabase:
+    """
+    A class to store simulation fields in an hdf5 database (of any layout), the writing being
+    done by a background thread so that the simulation does not wait for the disk.
+
+    The fields of each saved time are copied in a bounded ring of preallocated buffers and
+    handed to the writer thread, which owns the hdf5 file. When all the buffers are waiting
+    to be written, the simulation waits for the writer (back-pressure). The buffers are
+    drained before the times of the database are read or modified and when it is closed.
+    """
+
+    def __init__(self, database, queue_size=4):
+        """
+        :param database: the database to be written (OutputDatabase or
+                         TimeSeriesOutputDatabase), owned by the writer thread
+        :param queue_size: number of buffers of the ring (times that can wait to be written)
+        """
+        if queue_size < 1:
+            raise ValueError("At least one buffer is required (queue_size >= 1)")
+        self.__database = database
+        self.__path = database.path
+        self.__ring = [_Snapshot() for _ in range(queue_size)]
+        self.__free = queue.Queue()
+        for index in range(queue_size):
+            self.__free.put(index)
+        self.__pending = queue.Queue()
+        self.__current = None
+        self.__error = None
+        self.__waits = 0
+        self.__nb_written = 0
+        self.__writer = threading.Thread(target=self.__write, daemon=True,
+                                         name="writer of {}".format(self.__path))
+        self.__writer.start()
+
+    @property
+    def path(self):
+        """
+        Returns the path to the database
+        """
+        return self.__path
+
+    @property
+    def waits(self):
+        """
+        Returns the number of times the simulation waited for a free buffer
+        """
+        return self.__waits
+
+    @property
+    def saved_times(self):
+        """
+        Returns the names of the times stored in the database
+        """
+        self.drain()
+        return self.__database.saved_times
+
+    def keep_times(self, time_names):
+        """
+        Remove from the database the times that are not in time_names (for example the
+        times written after the checkpoint a simulation is restarted from)
+
+        :param time_names: names of the times to be kept
+        """
+        self.drain()
+        self.__database.keep_times(time_names)
+
+    def declare_fields(self, fields):
+        """
+        Declare the fields that will be added to the written database
+
+        :param fields: dict of the (shape, dtype, attributes) of the fields by name
+        """
+        self.drain()
+        self.__database.declare_fields(fields)
+
+    def add_time(self, time):
+        """
+        Start the snapshot of the fields of a new time, the previous one being handed to
+        the writer
+
+        :param time: time to be added
+        """
+        self.__submit()
+        self.__check_error()
+        try:
+            index = self.__free.get_nowait()
+        except queue.Empty:
+            self.__waits += 1
+            index = self.__free.get()
+        self.__ring[index].reset(time)
+        self.__current = index
+
+    def add_field(self, f_name, values, **kwargs):
+        """
+        Copy the values of the field in the snapshot of the current time.
+        All extra keywords arguments are stored as attributes of the dataset
+
+        :param f_name: name of the field to be added
+        """
+        self.__ring[self.__current].store(f_name, values, kwargs)
+
+    def drain(self):
+        """
+        Wait until all the snapshots are written
+        """
+        self.__submit()
+        self.__pending.join()
+        self.__check_error()
+
+    def close(self):
+        """
+        Write the remaining snapshots, stop the writer and close the database
+        """
+        self.__submit()
+        self.__pending.put(None)
+        self.__writer.join()
+        self.__database.close()
+        print("Database {} written asynchronously : {:d} times, {:d} wait(s) for a free buffer"
+              .format(self.__path, self.__nb_written, self.__waits))
+        self.__check_error()
+
+    def __submit(self):
+        """
+        Hand the snapshot of the current time to the writer
+        """
+        if self.__current is not None:
+            self.__pending.put(self.__current)
+            self.__current = None
+
+    def __check_error(self):
+        """
+        Raise the error met by the writer, if any
+        """
+        if self.__error is not None:
+            raise RuntimeError("Unable to write the database {}".format(self.__path)) \
+                from self.__error
+
+    def __write(self):
+        """
+        Loop of the writer thread : write the snapshots handed by the simulation and give the
+        buffers back, until None is received
+        """
+        while True:
+            index = self.__pending.get()
+            try:
+                if index is None:
+                    return
+                if self.__error is None:
+                    snapshot = self.__ring[index]
+                    self.__database.add_time(snapshot.time)
+                    for f_name, attributes in snapshot.fields:
+                        self.__database.add_field(f_name, snapshot.buffers[f_name], **attributes)
+                    self.__nb_written += 1
+            except Exception as error:  # pylint: disable=broad-except
+                # The error is raised by the simulation thread at the next output
+                self.__error = error
+            finally:
+                if index is not None:
+                    self.__free.put(index)
+                self.__pending.task_done()
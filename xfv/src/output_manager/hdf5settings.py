@@ -0,0 +1,98 @@
+"""
+Implementing the Hdf5Settings class holding the flush policy and the hdf5 options of the
+output databases
+"""
+
+from dataclasses import dataclass
+import time
+from typing import Optional
+
+import h5py
+
+
+class FlushPolicy:
+    """
+    A class deciding when the file of a database is flushed : every flush_period outputs
+    and/or every flush_interval seconds (wall clock). Without any of them, the file is
+    flushed at each output.
+    """
+
+    def __init__(self, flush_period=None, flush_interval=None, clock=time.monotonic):
+        """
+        :param flush_period: number of outputs between two flushes
+        :param flush_interval: number of seconds between two flushes
+        :param clock: function returning the current time in seconds
+        """
+        if flush_period is not None and flush_period < 1:
+            raise ValueError("The flush period should be at least one output")
+        if flush_interval is not None and flush_interval < 0.:
+            raise ValueError("The flush interval should be positive")
+        if flush_period is None and flush_interval is None:
+            flush_period = 1
+        self.__period = flush_period
+        self.__interval = flush_interval
+        self.__clock = clock
+        self.__nb_outputs = 0
+        self.__last_flush = clock()
+        self.__nb_flushes = 0
+
+    @property
+    def nb_flushes(self):
+        """
+        Returns the number of flushes decided by the policy
+        """
+        return self.__nb_flushes
+
+    def is_due(self):
+        """
+        Count an output and returns True if the file has to be flushed
+        """
+        self.__nb_outputs += 1
+        now = self.__clock()
+        due = ((self.__period is not None and self.__nb_outputs >= self.__period) or
+               (self.__interval is not None and now - self.__last_flush >= self.__interval))
+        if due:
+            self.__nb_outputs = 0
+            self.__last_flush = now
+            self.__nb_flushes += 1
+        return due
+
+
+@dataclass
+class Hdf5Settings:
+    """
+    Flush policy and hdf5 options of an output database
+
+    :param flush_period: number of outputs between two flushes of the file
+    :param flush_interval: number of seconds between two flushes of the file
+    :param chunk_cache_size: size in bytes of the chunk cache of each dataset
+                             (1 MB by default in hdf5)
+    :param libver_latest: if True the file is written with the latest hdf5 file format
+    :param swmr: if True the file can be read while it is written (single writer
+                 multiple readers). Implies the latest hdf5 file format
+    """
+    flush_period: Optional[int] = None
+    flush_interval: Optional[float] = None
+    chunk_cache_size: Optional[int] = None
+    libver_latest: bool = False
+    swmr: bool = False
+
+    def open(self, path_to_hdf5, mode):
+        """
+        Open the hdf5 file with the options of the settings
+
+        :param path_to_hdf5: path to the database
+        :param mode: mode of opening of the file ('w', 'a'...)
+        """
+        options = {}
+        if self.chunk_cache_size is not None:
+            options["rdcc_nbytes"] = self.chunk_cache_size
+        if self.libver_latest or self.swmr:
+            options["libver"] = "latest"
+        return h5py.File(path_to_hdf5, mode, **options)
+
+    def flush_policy(self):
+        """
+        Returns a new flush policy of the settings
+        """
+        return FlushPolicy(self.flush_period, self.flush_interval)
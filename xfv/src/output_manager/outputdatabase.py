@@ -2,7 +2,7 @@
 Implementing the Hdf5Database class giving access to hdf5 storage
 """
 
-import h5py
+from xfv.src.output_manager.hdf5settings import Hdf5Settings
 
 
 class OutputDatabase:
@@ -10,10 +10,56 @@ class OutputDatabase:
     A class to store simulation fields in an hdf5 database
     """
 
-    def __init__(self, path_to_hdf5):
-        self.__db = h5py.File(path_to_hdf5, 'w')
+    def __init__(self, path_to_hdf5, append=False, settings=None):
+        """
+        :param path_to_hdf5: path to the database
+        :param append: if True the times already stored in the database are kept
+                       (restart of a simulation), else the database is overwritten
+        :param settings: flush policy and hdf5 options (Hdf5Settings). By default the file
+                         is flushed at each output
+        """
+        settings = settings if settings is not None else Hdf5Settings()
+        if settings.swmr:
+            # A group is created at each time, which is not possible in SWMR mode
+            raise ValueError("SWMR is only available with the time-series layout")
+        self.__path = path_to_hdf5
+        self.__db = settings.open(path_to_hdf5, 'a' if append else 'w')
+        self.__flush_policy = settings.flush_policy()
         self.__current_group = None
-        self.__nb_sav = 0
+        self.__nb_sav = len(self.__db)
+
+    @property
+    def path(self):
+        """
+        Returns the path to the database
+        """
+        return self.__path
+
+    @property
+    def saved_times(self):
+        """
+        Returns the names of the groups of the times stored in the database
+        """
+        return list(self.__db.keys())
+
+    def keep_times(self, time_names):
+        """
+        Remove from the database the times that are not in time_names (for example the
+        times written after the checkpoint a simulation is restarted from)
+
+        :param time_names: names of the groups of the times to be kept
+        """
+        for name in set(self.__db.keys()).difference(time_names):
+            del self.__db[name]
+        self.__nb_sav = len(self.__db)
+
+    def declare_fields(self, fields):
+        """
+        Declare the fields that will be added to the database. Nothing is done as the
+        datasets of each time are created in its group
+
+        :param fields: dict of the (shape, dtype, attributes) of the fields by name
+        """
 
     def add_time(self, time):
         """
@@ -21,7 +67,8 @@ class OutputDatabase:
 
         :param time: time to be added
         """
-        self.__db.flush()  # Flushing to print preceding time steps
+        if self.__flush_policy.is_due():
+            self.__db.flush()  # Flushing to print preceding time steps
         self.__current_group = self.__db.create_group("{:g}".format(time))
         self.__nb_sav += 1
 
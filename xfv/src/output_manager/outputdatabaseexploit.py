@@ -3,12 +3,27 @@ A module allowing exploitation of the Hdf5 output database
 """
 
 import sys
-from bisect import bisect
+from bisect import bisect, bisect_left
 import h5py
 import numpy as np
+from xfv.src.output_manager.timeseriesoutputdatabase import TIME_SERIES_LAYOUT, TIME_DATASET
 from xfv.src.output_manager.truefieldsbuilder import build_cell_true_field, build_node_true_field
 
 
+class FieldAtTime(np.ndarray):
+    """
+    Values of a field at one time read from a time series database, with the attributes
+    of its dataset (as the datasets of the databases with one group per time)
+    """
+    def __new__(cls, values, attrs):
+        obj = np.asarray(values).view(cls)
+        obj.attrs = attrs
+        return obj
+
+    def __array_finalize__(self, obj):
+        self.attrs = getattr(obj, "attrs", {})  # pylint: disable=attribute-defined-outside-init
+
+
 class OutputDatabaseExploit:
     """
     A class for exploiting the output stored in Hdf5 database
@@ -37,15 +52,62 @@ class OutputDatabaseExploit:
     field_type_converter["NodeStatus"] = ("NodeStatus", "None")
     field_type_converter["CellStatus"] = ("CellStatus", "None")
 
-    def __init__(self, path_to_db):
-        self.__db = h5py.File(path_to_db, 'r')
-        self.__saved_times = sorted([float(x) for x in list(self.__db.keys())])
+    def __init__(self, path_to_db, live=False):
+        """
+        :param path_to_db: path to the database, with one group per saved time or with the
+                           time series layout (see TimeSeriesOutputDatabase)
+        :param live: if True the database is read while it is written by a simulation (time
+                     series layout in SWMR mode). The times written since the opening are
+                     read by refresh
+        """
+        self.__live = live
+        if live:
+            self.__db = h5py.File(path_to_db, 'r', libver="latest", swmr=True)
+        else:
+            self.__db = h5py.File(path_to_db, 'r')
+        self.__time_series = self.__db.attrs.get("layout") == TIME_SERIES_LAYOUT
+        # Opened datasets and groups of the time series database and number of saved times
+        # at their last refresh
+        self.__items = {}
+        self.__items_nb_times = {}
+        if self.__time_series:
+            self.__saved_times = self.__db[TIME_DATASET][()].tolist()
+        else:
+            self.__saved_times = sorted([float(x) for x in list(self.__db.keys())])
         self.__nb_saved_times = len(self.saved_times)
-        self.__saved_fields = list(self.__db.values())[0].keys()
+        self.__update_saved_fields()
+
+    def __update_saved_fields(self):
+        """
+        Read the names of the fields stored in the database
+        """
+        if self.__time_series:
+            self.__saved_fields = [name for name in self.__db.keys() if name != TIME_DATASET]
+        else:
+            self.__saved_fields = list(self.__db.values())[0].keys()
         self.__saved_fields_type = \
             [k for k, v in list(OutputDatabaseExploit.field_type_converter.items())
              if v[0] in self.__saved_fields]
 
+    def refresh(self):
+        """
+        Read the times written since the opening of the database or the previous refresh,
+        when the database is read while it is written (live mode). Only the time dataset is
+        read : the datasets of the fields are refreshed when they are extracted.
+
+        :return: the list of the new saved times
+        """
+        if not (self.__live and self.__time_series):
+            return []
+        times = self.__db[TIME_DATASET]
+        times.refresh()
+        new_times = times[self.__nb_saved_times:].tolist()
+        if new_times:
+            self.__saved_times.extend(new_times)
+            self.__nb_saved_times = len(self.__saved_times)
+            self.__update_saved_fields()
+        return new_times
+
     @property
     def nb_saved_times(self):
         """
@@ -178,6 +240,9 @@ class OutputDatabaseExploit:
                       "Please specify a time in [{:15.9g}, {:15.9g}]"
                       .format(self.saved_times[0], self.saved_times[-1]), file=sys.stderr)
                 raise
+        if self.__time_series:
+            return self.__extract_time_series_at_time(
+                field_name, bisect_left(self.saved_times, ex_time))
         try:
             if ex_time != 0.:
                 field = self.__db[str(ex_time)][field_name]
@@ -193,6 +258,69 @@ class OutputDatabaseExploit:
             raise
         return field
 
+    def __extract_time_series_at_time(self, field_name, time_index):
+        """
+        Return the value of the field at the time of index time_index of a time series
+        database. Raise a KeyError if the field is not stored at this time (enriched
+        fields before the first discontinuity)
+
+        :param field_name: name of the field to be extracted
+        :param time_index: index of the time in the saved times
+        """
+        item = self.__time_series_item(field_name)
+        if isinstance(item, h5py.Group):
+            start, count = item["index"][time_index]
+            if count == 0:
+                raise KeyError("No value of the field {} at time {}".format(
+                    field_name, self.saved_times[time_index]))
+            values = item["values"][start:start + count]
+        else:
+            if time_index >= item.shape[0]:
+                raise KeyError("No value of the field {} at time {}".format(
+                    field_name, self.saved_times[time_index]))
+            values = item[time_index]
+        return FieldAtTime(values, dict(item.attrs))
+
+    def __time_series_item(self, field_name):
+        """
+        Return the dataset (or the group of an enriched field) of the field of a time series
+        database. In live mode, it is refreshed if times have been read since its last
+        refresh
+
+        :param field_name: name of the field
+        """
+        item = self.__items.get(field_name)
+        if item is None:
+            item = self.__items[field_name] = self.__db[field_name]
+        elif self.__live and self.__items_nb_times[field_name] != self.__nb_saved_times:
+            if isinstance(item, h5py.Group):
+                item["index"].refresh()
+                item["values"].refresh()
+            else:
+                item.refresh()
+        self.__items_nb_times[field_name] = self.__nb_saved_times
+        return item
+
+    def extract_field_history(self, field_name, item_index, first_time_index=0):
+        """
+        Return the saved times and the values of a field (with cell or node support) of one
+        item at these times. With the time series layout, only the values of the item are
+        read.
+
+        :param field_name: name of the field to be extracted ("ClassicalPressure"...)
+        :param item_index: index of the cell or of the node
+        :param first_time_index: index of the first saved time to be read (to read only
+                                 the times polled by refresh)
+        :return: tuple(times, values of the item at these times)
+        """
+        times = np.array(self.saved_times[first_time_index:])
+        if self.__time_series:
+            data_set = self.__time_series_item(field_name)
+            return times, data_set[first_time_index:self.__nb_saved_times,
+                                   item_index % data_set.shape[1]]
+        return times, np.array([self.extract_field_at_time(field_name, time)[item_index]
+                                for time in times])
+
     def extract_true_field_at_time(self, field_type, time):
         """
         Return the value of the true field at time time in a numpy array
@@ -7,6 +7,7 @@ import numpy as np
 from xfv.src.utilities.singleton import Singleton
 from xfv.src.output_manager.outputtimecontroler import OutputTimeControler
 from xfv.src.data.data_container import DataContainer
+from xfv.src.discontinuity.discontinuity import STACKED_VARIABLES
 
 
 DatabaseBuildInfos = namedtuple("DatabaseBuildInfos", ["database_object", "fields",
@@ -80,6 +81,8 @@ class OutputManager(metaclass=Singleton):
 
     def __init__(self):
         self.__db_build_infos = {}
+        # Names of the databases the fields have been declared to
+        self.__declared_databases = set()
 
     def register_database_time_ctrl(self, database_name, database_obj, delta_t):
         """
@@ -97,6 +100,14 @@ class OutputManager(metaclass=Singleton):
         dbinfos = DatabaseBuildInfos(database_obj, fields=[], time_controler=time_ctrl)
         self.__db_build_infos[database_name] = dbinfos
 
+    @property
+    def databases(self):
+        """
+        Returns a dict of the (database object, time controler) of each registered database
+        """
+        return {name: (infos.database_object, infos.time_controler)
+                for name, infos in self.__db_build_infos.items()}
+
     def register_field(self, field_name, field_support, field_attr_name, indexes=None,
                        database_names=None):
         """
@@ -166,6 +177,34 @@ class OutputManager(metaclass=Singleton):
                         self.register_field(field_infos.name, cells, field_infos.attr_name,
                                             database_names=[database_id], indexes=cell_indexes)
 
+    def register_probe_fields(self, database_id, variables, cells, nodes,  # pylint: disable=too-many-arguments
+                              cell_ids, node_ids):
+        """
+        Add the fields of probes to the manager : the classical fields are stored only at the
+        probed nodes and cells
+
+        :param database_id: identifier of the database of the probes
+        :param variables: names of the fields (keys of field_list)
+        :param cells: cells from which fields must be printed
+        :param nodes: nodes from which fields must be printed
+        :param cell_ids: ids of the probed cells
+        :param node_ids: ids of the probed nodes
+        """
+        for key in variables:
+            try:
+                field_infos = field_list[key]
+            except KeyError:
+                raise ValueError("The field {} can not be probed. Please choose among {}"
+                                 .format(key, list(field_list))) from None
+            owner, indexes = (nodes, node_ids) if field_infos.support == "nodes" \
+                else (cells, cell_ids)
+            if not len(indexes):
+                raise ValueError("The field {} of the probes {} is defined on the {} but no "
+                                 "{} is probed".format(key, database_id, field_infos.support,
+                                                       field_infos.support[:-1]))
+            self.register_field(field_infos.name, owner, field_infos.attr_name,
+                                database_names=[database_id], indexes=indexes)
+
     def update(self, time, iteration, eps, discontinuity_list):
         """
         If the current time given in argument is above the time of next output then
@@ -177,8 +216,12 @@ class OutputManager(metaclass=Singleton):
         Based on this remark, enr_fields have standard name "Additional..."
         Differentiation is made with test startswith(Additional)
         """
-        for build_infos in list(self.__db_build_infos.values()):
+        for db_name, build_infos in list(self.__db_build_infos.items()):
             if build_infos.time_controler.db_has_to_be_updated(time, iteration):
+                if db_name not in self.__declared_databases:
+                    build_infos.database_object.declare_fields(
+                        self.__field_layouts(build_infos.fields, eps))
+                    self.__declared_databases.add(db_name)
                 build_infos.database_object.add_time(time)
                 for field in build_infos.fields:
                     # Case : classical fields with cell or node support ------------------------
@@ -257,6 +300,35 @@ class OutputManager(metaclass=Singleton):
                             # todo : d'une discontinuite a l'autre
                     # end enriched disc field -----------------------
 
+    def __field_layouts(self, fields, eps):
+        """
+        Returns the (shape, dtype, attributes) of the fields stored by a database, by name.
+        The shape is the one of the field at one time, or of one of its rows (the id of the
+        cell followed by the values) for the enriched fields
+
+        :param fields: fields registered for the database
+        :param eps: position of the discontinuities in the ruptured cells
+        """
+        enr_attributes = {"support": "Discontinuity", "enrichment": "Hansbo",
+                          "discontinuity_position": eps}
+        layouts = {}
+        for field in fields:
+            if not field.name.startswith("Additional") and field.indexes is not None:
+                value = self.get_value_of_field(field, field.owner).__getitem__(field.indexes)
+                layouts[field.name] = (value.shape, value.dtype,
+                                       {"support": field.owner.__class__.__name__})
+            elif field.name.startswith("Additional"):
+                if field.owner is not None:
+                    item_shape = self.get_value_of_field(field, field.owner).shape[1:]
+                else:
+                    # Values of one discontinuity
+                    variable = field.attr_name[0] if len(field.attr_name) == 1 \
+                        else field.attr_name[0] + "_current"
+                    item_shape = STACKED_VARIABLES[variable][0]
+                layouts[field.name] = ((1 + int(np.prod(item_shape)),), np.dtype(np.float64),
+                                       enr_attributes)
+        return layouts
+
     def get_value_of_field(self, field: Field, owner) -> np.array:
         """
         Get the np.array associated to the field following all the attribute names list
@@ -1,6 +1,7 @@
 """
 Implementing the OutputTimeControler class
 """
+from typing import Optional, Tuple
 
 
 class OutputTimeControler:
@@ -30,6 +31,24 @@ class OutputTimeControler:
                 + " of the database {:s} with iteration period : {} or time period {}"
                 .format(self.__id, self.__iteration_period, self.__time_period))
 
+    @property
+    def next_output(self) -> Tuple[Optional[float], Optional[int]]:
+        """
+        Returns the time and the iteration of the next output (None if not controled)
+        """
+        return self.__next_output_time, self.__next_output_iteration
+
+    def set_next_output(self, time: Optional[float], iteration: Optional[int]):
+        """
+        Set the time and the iteration of the next output (for example to restart a
+        simulation from a checkpoint)
+
+        :param time: time of the next output (None if not controled)
+        :param iteration: iteration of the next output (None if not controled)
+        """
+        self.__next_output_time = time
+        self.__next_output_iteration = iteration
+
     def db_has_to_be_updated(self, time: float, iteration: int) -> bool:
         """
         Return True if the iteration or time requires to write fields in the database
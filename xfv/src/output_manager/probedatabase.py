@@ -0,0 +1,173 @@
+"""
+Implementing the ProbeDatabase class storing the fields of a few nodes and cells (probes)
+"""
+
+import h5py
+import numpy as np
+
+from xfv.src.output_manager.timeseriesoutputdatabase import TIME_SERIES_LAYOUT, TIME_DATASET, \
+    CHUNK_ITEMS
+
+
+class ProbeDatabase:
+    """
+    A class to store the fields of a few nodes and cells (probes), typically at each
+    iteration. The values are copied in preallocated buffers of buffer_size times, written
+    in the hdf5 database when they are full and when the database is closed.
+
+    The database has the time series layout (see TimeSeriesOutputDatabase) : one dataset of
+    shape (times, probes, ...) per field and the "time" dataset. The ids of the probed nodes
+    and cells are stored in the "node_ids" and "cell_ids" attributes of the database.
+    """
+
+    def __init__(self, path_to_hdf5, node_ids=(), cell_ids=(),  # pylint: disable=too-many-arguments
+                 buffer_size=10000, append=False):
+        """
+        :param path_to_hdf5: path to the database
+        :param node_ids: ids of the probed nodes
+        :param cell_ids: ids of the probed cells
+        :param buffer_size: number of times kept in memory before being written
+        :param append: if True the times already stored in the database are kept
+                       (restart of a simulation), else the database is overwritten
+        """
+        if buffer_size < 1:
+            raise ValueError("The buffers should hold at least one time (buffer_size >= 1)")
+        self.__path = path_to_hdf5
+        self.__db = h5py.File(path_to_hdf5, 'a' if append else 'w')
+        if len(self.__db) and self.__db.attrs.get("layout") != TIME_SERIES_LAYOUT:
+            self.__db.close()
+            raise ValueError("The database {} does not have the time series layout"
+                             .format(path_to_hdf5))
+        self.__db.attrs["layout"] = TIME_SERIES_LAYOUT
+        self.__db.attrs["node_ids"] = np.asarray(node_ids, dtype=np.int64)
+        self.__db.attrs["cell_ids"] = np.asarray(cell_ids, dtype=np.int64)
+        if TIME_DATASET not in self.__db:
+            self.__db.create_dataset(TIME_DATASET, shape=(0,), maxshape=(None,),
+                                     dtype=np.float64, chunks=(CHUNK_ITEMS,))
+        self.__written_times = [repr(float(time)) for time in self.__db[TIME_DATASET][()]]
+        self.__buffer_size = buffer_size
+        self.__times = np.empty(buffer_size)
+        # Buffers and attributes of the fields, by name
+        self.__buffers = {}
+        self.__attributes = {}
+        self.__nb_buffered = 0
+
+    @property
+    def path(self):
+        """
+        Returns the path to the database
+        """
+        return self.__path
+
+    @property
+    def saved_times(self):
+        """
+        Returns the names of the times stored in the database or in the buffers
+        """
+        return self.__written_times + [repr(float(time))
+                                       for time in self.__times[:self.__nb_buffered]]
+
+    def keep_times(self, time_names):
+        """
+        Remove from the database the times that are not in time_names (for example the
+        times written after the checkpoint a simulation is restarted from)
+
+        :param time_names: names of the times to be kept
+        """
+        self.__write()
+        kept = np.isin(self.__written_times, list(time_names))
+        for data_set in self.__db.values():
+            values = data_set[()][kept[:data_set.shape[0]]]
+            data_set.resize(values.shape[0], axis=0)
+            data_set[()] = values
+        self.__written_times = [name for name, keep in zip(self.__written_times, kept) if keep]
+
+    def declare_fields(self, fields):
+        """
+        Declare the fields that will be added to the database. Nothing is done as the
+        buffers are allocated at the first time
+
+        :param fields: dict of the (shape, dtype, attributes) of the fields by name
+        """
+
+    def add_time(self, time):
+        """
+        Add a time to the buffers, which are written if they are full. The fields are then
+        added at this time
+
+        :param time: time to be added
+        """
+        if self.__nb_buffered == self.__buffer_size:
+            self.__write()
+        self.__times[self.__nb_buffered] = time
+        self.__nb_buffered += 1
+
+    def add_field(self, f_name, values, **kwargs):
+        """
+        Copy the values of the field at the probes in its buffer.
+        All extra keywords arguments are stored as attributes of the dataset
+
+        :param f_name: name of the field to be added
+        """
+        values = np.asarray(values)
+        buffer = self.__buffers.get(f_name)
+        if buffer is None:
+            buffer = self.__buffers[f_name] = np.empty((self.__buffer_size,) + values.shape,
+                                                       dtype=values.dtype)
+            self.__attributes[f_name] = kwargs
+        buffer[self.__nb_buffered - 1] = values
+
+    def __write(self):
+        """
+        Append the buffered times to the datasets, the time dataset being the last one
+        """
+        if not self.__nb_buffered:
+            return
+        nb_written = len(self.__written_times)
+        for f_name, buffer in self.__buffers.items():
+            data_set = self.__db.get(f_name)
+            if data_set is None:
+                data_set = self.__db.create_dataset(
+                    f_name, shape=(nb_written,) + buffer.shape[1:],
+                    maxshape=(None,) + buffer.shape[1:], dtype=buffer.dtype,
+                    chunks=(min(self.__buffer_size, CHUNK_ITEMS),) + buffer.shape[1:])
+                for key, value in list(self.__attributes[f_name].items()):
+                    data_set.attrs[key] = value
+            data_set.resize(nb_written + self.__nb_buffered, axis=0)
+            data_set[nb_written:] = buffer[:self.__nb_buffered]
+        times = self.__db[TIME_DATASET]
+        times.resize(nb_written + self.__nb_buffered, axis=0)
+        times[nb_written:] = self.__times[:self.__nb_buffered]
+        self.__written_times += [repr(float(time)) for time in self.__times[:self.__nb_buffered]]
+        self.__nb_buffered = 0
+        self.__db.flush()
+
+    def close(self):
+        """
+        Write the buffered times and close the database
+        """
+        self.__write()
+        self.__db.close()
+
+
+def resolve_probe_ids(ids, coordinates, positions):
+    """
+    Returns the ids of the probed items (nodes or cells) : the given ids (negative ids
+    counting from the last item) followed by the ids of the items nearest to the given
+    coordinates
+
+    :param ids: ids of probed items
+    :param coordinates: coordinates of probes
+    :param positions: coordinates of the items
+    """
+    positions = np.asarray(positions).reshape(-1)
+    nb_items = len(positions)
+    resolved = []
+    for item_id in ids:
+        if not -nb_items <= item_id < nb_items:
+            raise ValueError("The probed item {:d} does not exist ({:d} items)"
+                             .format(item_id, nb_items))
+        resolved.append(item_id % nb_items)
+    for coordinate in coordinates:
+        resolved.append(int(np.argmin(np.abs(positions - coordinate))))
+    return np.array(resolved, dtype=np.int64)
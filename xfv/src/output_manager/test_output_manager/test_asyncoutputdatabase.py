@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+asyncoutputdatabase module unit tests
+"""
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+import unittest.mock as mock
+
+import h5py
+import numpy as np
+
+from xfv.src.output_manager.asyncoutputdatabase import AsyncOutputDatabase
+from xfv.src.output_manager.outputdatabase import OutputDatabase
+
+
+def fill_database(database, nb_times=5):
+    """
+    Write some times of a classical field and of an enriched field (whose size grows)
+    """
+    pressure = np.zeros(10)
+    for index in range(nb_times):
+        pressure[:] = index
+        database.add_time(index * 1.e-06)
+        database.add_field("ClassicalPressure", pressure, support="OneDimensionCell")
+        database.add_field("AdditionalPressure", np.full((index, 2), float(index)),
+                           support="Discontinuity", discontinuity_position=0.5)
+
+
+class AsyncOutputDatabaseTest(unittest.TestCase):
+    """
+    Test case for the AsyncOutputDatabase class
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = Path(self.directory.name) / "async.hdf5"
+
+    def test_same_database_as_synchronous(self):
+        """
+        Test that the database is identical to the one written synchronously
+        """
+        database = AsyncOutputDatabase(OutputDatabase(str(self.path)), queue_size=2)
+        fill_database(database)
+        database.close()
+        sync_path = Path(self.directory.name) / "sync.hdf5"
+        database = OutputDatabase(str(sync_path))
+        fill_database(database)
+        database.close()
+        with h5py.File(self.path, 'r') as async_db, h5py.File(sync_path, 'r') as sync_db:
+            self.assertEqual(list(async_db.keys()), list(sync_db.keys()))
+            for time in sync_db:
+                for name, dataset in sync_db[time].items():
+                    np.testing.assert_array_equal(async_db[time][name][()], dataset[()])
+                    self.assertEqual(dict(async_db[time][name].attrs), dict(dataset.attrs))
+
+    def test_back_pressure(self):
+        """
+        Test that the values are copied and that the simulation waits for a free buffer
+        when the writer is late
+        """
+        release = threading.Event()
+        add_time = OutputDatabase.add_time
+
+        def slow_add_time(database, time):
+            release.wait()
+            add_time(database, time)
+
+        with mock.patch.object(OutputDatabase, "add_time", slow_add_time):
+            database = AsyncOutputDatabase(OutputDatabase(str(self.path)), queue_size=2)
+            values = np.ones(3)
+            database.add_time(0.)
+            database.add_field("ClassicalPressure", values)
+            values[:] = 2.
+            database.add_time(1.)
+            database.add_field("ClassicalPressure", values)
+            # Both buffers are taken : the third time waits for the writer
+            third_time = threading.Thread(target=database.add_time, args=(2.,))
+            third_time.start()
+            third_time.join(0.2)
+            self.assertTrue(third_time.is_alive())
+            release.set()
+            third_time.join()
+            database.add_field("ClassicalPressure", values)
+            self.assertEqual(database.saved_times, ["0", "1", "2"])
+            database.close()
+        self.assertEqual(database.waits, 1)
+        with h5py.File(self.path, 'r') as h5_db:
+            np.testing.assert_array_equal(h5_db["0/ClassicalPressure"][()], np.ones(3))
+            np.testing.assert_array_equal(h5_db["2/ClassicalPressure"][()], np.full(3, 2.))
+
+    def test_writer_error(self):
+        """
+        Test that an error of the writer is raised by the simulation
+        """
+        with mock.patch.object(OutputDatabase, "add_field", side_effect=OSError("disk full")):
+            database = AsyncOutputDatabase(OutputDatabase(str(self.path)))
+            database.add_time(0.)
+            database.add_field("ClassicalPressure", np.ones(3))
+            with self.assertRaises(RuntimeError):
+                database.drain()
+            with self.assertRaises(RuntimeError):
+                database.close()
+
+    def test_wrong_queue_size(self):
+        """
+        Test that at least one buffer is required
+        """
+        with self.assertRaises(ValueError):
+            AsyncOutputDatabase(OutputDatabase(str(self.path)), queue_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
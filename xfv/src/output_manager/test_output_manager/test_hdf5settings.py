@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+hdf5settings module unit tests
+"""
+from pathlib import Path
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import h5py
+import numpy as np
+
+from xfv.src.output_manager.hdf5settings import FlushPolicy, Hdf5Settings
+from xfv.src.output_manager.outputdatabase import OutputDatabase
+from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+from xfv.src.output_manager.test_output_manager.test_timeseriesoutputdatabase import \
+    fill_database, FIELD_LAYOUTS
+
+
+class FlushPolicyTest(unittest.TestCase):
+    """
+    Test case for the FlushPolicy class
+    """
+    def setUp(self):
+        self.now = 0.
+
+    def clock(self):
+        """
+        Fake wall clock
+        """
+        return self.now
+
+    def test_default(self):
+        """
+        Test that the file is flushed at each output by default
+        """
+        policy = FlushPolicy()
+        self.assertEqual([policy.is_due() for _ in range(3)], [True, True, True])
+
+    def test_period(self):
+        """
+        Test the flush every flush_period outputs
+        """
+        policy = FlushPolicy(flush_period=3, clock=self.clock)
+        self.assertEqual([policy.is_due() for _ in range(7)],
+                         [False, False, True, False, False, True, False])
+        self.assertEqual(policy.nb_flushes, 2)
+
+    def test_interval(self):
+        """
+        Test the flush every flush_interval seconds, possibly combined with a period
+        """
+        policy = FlushPolicy(flush_interval=1., clock=self.clock)
+        dues = []
+        for self.now in (0.5, 0.9, 1.2, 1.5, 2.3):
+            dues.append(policy.is_due())
+        self.assertEqual(dues, [False, False, True, False, True])
+        policy = FlushPolicy(flush_period=2, flush_interval=10., clock=self.clock)
+        self.assertEqual([policy.is_due() for _ in range(4)], [False, True, False, True])
+
+    def test_wrong_values(self):
+        """
+        Test the errors on a null period and a negative interval
+        """
+        with self.assertRaises(ValueError):
+            FlushPolicy(flush_period=0)
+        with self.assertRaises(ValueError):
+            FlushPolicy(flush_interval=-1.)
+
+
+class Hdf5SettingsTest(unittest.TestCase):
+    """
+    Test case for the Hdf5Settings class and its use by the databases
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / "database.hdf5")
+
+    def test_open(self):
+        """
+        Test the options of the opening of the file
+        """
+        settings = Hdf5Settings(chunk_cache_size=16 * 1024 ** 2, libver_latest=True)
+        with settings.open(self.path, 'w') as h5_file:
+            self.assertNotEqual(h5_file.libver[0], "earliest")
+            self.assertEqual(h5_file.id.get_access_plist().get_cache()[2], 16 * 1024 ** 2)
+        with Hdf5Settings(swmr=True).open(self.path, 'w') as h5_file:
+            self.assertNotEqual(h5_file.libver[0], "earliest")
+
+    def test_flush_period(self):
+        """
+        Test that the database is flushed according to the policy
+        """
+        for database_class in (OutputDatabase, TimeSeriesOutputDatabase):
+            with mock.patch.object(h5py.File, "flush") as flush:
+                database = database_class(self.path, settings=Hdf5Settings(flush_period=3))
+                fill_database(database, nb_times=7)
+                self.assertEqual(flush.call_count, 2)
+                database.close()
+
+    def test_swmr(self):
+        """
+        Test that the time series database is read while it is written, the enriched
+        fields appearing after SWMR started
+        """
+        database = TimeSeriesOutputDatabase(self.path, settings=Hdf5Settings(swmr=True))
+        database.declare_fields(FIELD_LAYOUTS)
+        fill_database(database, nb_times=2)
+        with h5py.File(self.path, 'r', libver="latest", swmr=True) as reader:
+            self.assertEqual(reader["time"].shape, (1,))
+            fill_database(database, nb_times=3, first_time=2)
+            reader["time"].refresh()
+            reader["ClassicalPressure"].refresh()
+            self.assertEqual(reader["time"].shape, (4,))
+            np.testing.assert_array_equal(reader["ClassicalPressure"][3], np.arange(4.) * 3)
+        database.close()
+        groups_path = str(Path(self.directory.name) / "groups.hdf5")
+        database = OutputDatabase(groups_path)
+        fill_database(database, nb_times=5)
+        database.close()
+        series_db = OutputDatabaseExploit(self.path)
+        groups_db = OutputDatabaseExploit(groups_path)
+        for time in groups_db.saved_times:
+            np.testing.assert_array_equal(series_db.extract_true_field_at_time("Stress", time),
+                                          groups_db.extract_true_field_at_time("Stress", time))
+
+    def test_swmr_undeclared_field(self):
+        """
+        Test that a field can not be created once SWMR started, the file being left intact
+        """
+        database = TimeSeriesOutputDatabase(self.path, settings=Hdf5Settings(swmr=True))
+        fill_database(database, nb_times=2)
+        database.add_time(2.e-06)
+        with self.assertRaises(ValueError):
+            database.add_field("AdditionalPressure", np.array([[3, -2.]]))
+        database.close()
+        self.assertEqual(OutputDatabaseExploit(self.path).nb_saved_times, 3)
+
+    def test_swmr_groups_layout(self):
+        """
+        Test that SWMR is refused with one group per time
+        """
+        with self.assertRaises(ValueError):
+            OutputDatabase(self.path, settings=Hdf5Settings(swmr=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
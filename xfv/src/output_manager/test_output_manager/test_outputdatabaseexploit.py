@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+outputdatabaseexploit module unit tests (reading of a database while it is written)
+"""
+import multiprocessing
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+
+from xfv.src.output_manager.hdf5settings import Hdf5Settings
+from xfv.src.output_manager.outputdatabase import OutputDatabase
+from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+from xfv.src.output_manager.test_output_manager.test_timeseriesoutputdatabase import \
+    fill_database, FIELD_LAYOUTS
+from xfv.post_processing.tools.hdf5_postprocessing_tools import poll_field_evolution_for_item
+
+
+# Number of seconds the processes wait for each other before the test fails
+TIMEOUT = 60.
+
+
+def write_live_database(path, started, attached, written, done):  # pylint: disable=too-many-arguments
+    """
+    Write a database in SWMR mode in another process : two times without discontinuity, then
+    three times with an enriched cell once the reader is attached
+
+    :param path: path to the database
+    :param started: event set once SWMR started
+    :param attached: event waited for before the times with the enriched cell
+    :param written: event set once these times are written
+    :param done: event waited for before the database is closed
+    """
+    database = TimeSeriesOutputDatabase(path, settings=Hdf5Settings(swmr=True))
+    database.declare_fields(FIELD_LAYOUTS)
+    fill_database(database, nb_times=2)
+    started.set()
+    if attached.wait(TIMEOUT):
+        fill_database(database, nb_times=3, first_time=2)
+        written.set()
+        done.wait(TIMEOUT)
+    database.close()
+
+
+class OutputDatabaseExploitLiveProcessTest(unittest.TestCase):
+    """
+    Test case for the reading of a database written by another process
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / "live.hdf5")
+
+    def test_rupture_after_attachment(self):
+        """
+        Test that the enriched fields created after the reader is attached are read
+        """
+        context = multiprocessing.get_context("spawn")
+        started, attached, written, done = [context.Event() for _ in range(4)]
+        writer = context.Process(target=write_live_database,
+                                 args=(self.path, started, attached, written, done))
+        writer.start()
+        try:
+            self.assertTrue(started.wait(TIMEOUT))
+            reader = OutputDatabaseExploit(self.path, live=True)
+            self.assertEqual(reader.saved_times, [0.])
+            with self.assertRaises(KeyError):
+                reader.extract_field_at_time("AdditionalPressure", 0.)
+            attached.set()
+            self.assertTrue(written.wait(TIMEOUT))
+            self.assertEqual(reader.refresh(), [1.e-06, 2.e-06, 3.e-06])
+            with self.assertRaises(KeyError):
+                reader.extract_field_at_time("AdditionalPressure", 1.e-06)
+            np.testing.assert_array_equal(
+                reader.extract_field_at_time("AdditionalPressure", 3.e-06), [[3, -3.]])
+            np.testing.assert_array_equal(
+                reader.extract_true_field_at_time("Pressure", 3.e-06)[:, 1],
+                [0., 3., 6., 9., -3.])
+        finally:
+            done.set()
+            writer.join(TIMEOUT)
+        self.assertEqual(writer.exitcode, 0)
+
+
+class OutputDatabaseExploitLiveTest(unittest.TestCase):
+    """
+    Test case for the reading of a database in live mode
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / "live.hdf5")
+        self.database = TimeSeriesOutputDatabase(self.path, settings=Hdf5Settings(swmr=True))
+        self.database.declare_fields(FIELD_LAYOUTS)
+        fill_database(self.database, nb_times=2)
+        # SWMR starts at the third time
+        self.database.add_time(2.e-06)
+
+    def tearDown(self):
+        self.database.close()
+
+    def test_refresh(self):
+        """
+        Test that the times written since the opening are read by refresh, the time being
+        written being ignored
+        """
+        reader = OutputDatabaseExploit(self.path, live=True)
+        self.assertEqual(reader.saved_times, [0., 1.e-06])
+        np.testing.assert_array_equal(reader.extract_field_history("ClassicalPressure", 1)[1],
+                                      [0., 1.])
+        self.assertEqual(reader.refresh(), [])
+        # Fields of the third time, then fourth and fifth times with the enriched fields
+        # declared before the start of SWMR
+        self.database.add_field("ClassicalPressure", np.arange(4.) * 2,
+                                support="OneDimensionCell")
+        fill_database(self.database, nb_times=2, first_time=3)
+        self.database.add_time(5.e-06)
+        self.assertEqual(reader.refresh(), [2.e-06, 3.e-06, 4.e-06])
+        self.assertEqual(reader.nb_saved_times, 5)
+        self.assertIn("AdditionalPressure", reader.saved_fields)
+        times, values = reader.extract_field_history("ClassicalPressure", 1, 2)
+        np.testing.assert_array_equal(times, [2.e-06, 3.e-06, 4.e-06])
+        np.testing.assert_array_equal(values, [2., 3., 4.])
+        np.testing.assert_array_equal(
+            reader.extract_field_at_time("AdditionalPressure", 4.e-06), [[3, -4.]])
+        with self.assertRaises(KeyError):
+            reader.extract_field_at_time("AdditionalPressure", 2.e-06)
+
+    def test_poll_field_evolution(self):
+        """
+        Test the polling of the history of a node by the post processing tools
+        """
+        reader = OutputDatabaseExploit(self.path, live=True)
+        history = poll_field_evolution_for_item(reader, -1, "ClassicalNodeVelocity", 0)
+        np.testing.assert_array_equal(history, [[0., 0.], [1.e-06, 1.]])
+        self.database.add_field("ClassicalNodeVelocity", np.full(5, 2.),
+                                support="OneDimensionNode")
+        self.database.add_time(3.e-06)
+        history = poll_field_evolution_for_item(reader, -1, "ClassicalNodeVelocity", 2)
+        np.testing.assert_array_equal(history, [[2.e-06, 2.]])
+        history = poll_field_evolution_for_item(reader, -1, "ClassicalNodeVelocity", 3)
+        self.assertEqual(history.shape, (0, 2))
+
+    def test_groups_layout(self):
+        """
+        Test that a database with one group per time is not refreshed
+        """
+        groups_path = str(Path(self.directory.name) / "groups.hdf5")
+        database = OutputDatabase(groups_path)
+        fill_database(database, nb_times=2)
+        database.close()
+        reader = OutputDatabaseExploit(groups_path, live=True)
+        self.assertEqual(reader.refresh(), [])
+        self.assertEqual(reader.nb_saved_times, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
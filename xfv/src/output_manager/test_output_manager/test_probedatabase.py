@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+probedatabase module unit tests
+"""
+from pathlib import Path
+from types import SimpleNamespace
+import tempfile
+import unittest
+
+import h5py
+import numpy as np
+
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.data.data_container import ProbeProps
+from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.src.output_manager.outputmanager import OutputManager
+from xfv.src.output_manager.probedatabase import ProbeDatabase, resolve_probe_ids
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+
+
+def fill_probes(database, nb_times=6, first_time=0):
+    """
+    Write the fields of two probed nodes and one probed cell
+    """
+    for index in range(first_time, first_time + nb_times):
+        database.add_time(index / 1.e+06)
+        database.add_field("ClassicalNodeVelocity", np.array([[index], [-index]], dtype=float),
+                           support="OneDimensionNode")
+        database.add_field("ClassicalPressure", np.array([10. * index]),
+                           support="OneDimensionCell")
+
+
+class ProbeDatabaseTest(unittest.TestCase):
+    """
+    Test case for the ProbeDatabase class
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / "probes.hdf5")
+
+    def test_chunked_writing(self):
+        """
+        Test that the buffers are written when they are full and when the database is closed
+        """
+        database = ProbeDatabase(self.path, node_ids=[0, 4], cell_ids=[3], buffer_size=4)
+        fill_probes(database, nb_times=6)
+        self.assertEqual(len(database.saved_times), 6)
+        with h5py.File(self.path, 'r', swmr=True) as h5_db:
+            # Only the first buffer has been written
+            self.assertEqual(h5_db["time"].shape, (4,))
+            self.assertEqual(h5_db["ClassicalNodeVelocity"].shape, (4, 2, 1))
+        database.close()
+        with h5py.File(self.path, 'r') as h5_db:
+            np.testing.assert_array_equal(h5_db.attrs["node_ids"], [0, 4])
+            np.testing.assert_array_equal(h5_db.attrs["cell_ids"], [3])
+            self.assertEqual(h5_db["ClassicalPressure"].attrs["support"], "OneDimensionCell")
+        reader = OutputDatabaseExploit(self.path)
+        self.assertEqual(reader.saved_times, [index / 1.e+06 for index in range(6)])
+        times, values = reader.extract_field_history("ClassicalNodeVelocity", 1)
+        np.testing.assert_array_equal(times, [index / 1.e+06 for index in range(6)])
+        np.testing.assert_array_equal(np.reshape(values, 6), -np.arange(6.))
+        np.testing.assert_array_equal(reader.extract_field_at_time("ClassicalPressure", 2.e-06),
+                                      [20.])
+
+    def test_keep_times(self):
+        """
+        Test that the times after a checkpoint are replaced when a simulation is restarted
+        """
+        database = ProbeDatabase(self.path, node_ids=[0, 4], cell_ids=[3], buffer_size=3)
+        fill_probes(database, nb_times=4)
+        saved_times = database.saved_times
+        # Times computed after the checkpoint, then replaced
+        fill_probes(database, nb_times=2, first_time=10)
+        database.close()
+        database = ProbeDatabase(self.path, node_ids=[0, 4], cell_ids=[3], buffer_size=3,
+                                 append=True)
+        self.assertEqual(len(database.saved_times), 6)
+        database.keep_times(saved_times)
+        self.assertEqual(database.saved_times, saved_times)
+        fill_probes(database, nb_times=2, first_time=4)
+        database.close()
+        reader = OutputDatabaseExploit(self.path)
+        times, values = reader.extract_field_history("ClassicalPressure", 0)
+        np.testing.assert_array_equal(times, [index / 1.e+06 for index in range(6)])
+        np.testing.assert_array_equal(values, 10. * np.arange(6))
+
+    def test_wrong_options(self):
+        """
+        Test the errors on empty buffers and on a database of another layout
+        """
+        with self.assertRaises(ValueError):
+            ProbeDatabase(self.path, node_ids=[0], buffer_size=0)
+        with h5py.File(self.path, 'w') as h5_db:
+            h5_db.create_group("0.0")
+        with self.assertRaises(ValueError):
+            ProbeDatabase(self.path, node_ids=[0], append=True)
+        database = TimeSeriesOutputDatabase(self.path)
+        database.close()
+        ProbeDatabase(self.path, node_ids=[0], append=True).close()
+
+    def test_resolve_probe_ids(self):
+        """
+        Test the ids of the probes given by ids or by coordinates
+        """
+        positions = np.linspace(0., 1., 11).reshape(11, 1)
+        np.testing.assert_array_equal(resolve_probe_ids([0, -1], [0.52, 0.], positions),
+                                      [0, 10, 5, 0])
+        with self.assertRaises(ValueError):
+            resolve_probe_ids([11], [], positions)
+
+    def test_probe_props(self):
+        """
+        Test the checks of the probes properties
+        """
+        props = ProbeProps("probes", "probes.hdf5", ["NodeVelocity"], None, None, [-1], [],
+                           [], [])
+        self.assertEqual(props.iteration_period, 1)
+        with self.assertRaises(ValueError):
+            ProbeProps("probes", "probes.hdf5", ["NodeVelocity"], 1.e-06, 10, [-1], [], [], [])
+        with self.assertRaises(ValueError):
+            ProbeProps("probes", "probes.hdf5", ["NodeVelocity"], None, 1, [], [], [], [])
+        with self.assertRaises(ValueError):
+            ProbeProps("probes", "probes.hdf5", ["DiscontinuityOpening"], None, 1, [-1], [],
+                       [], [])
+        with self.assertRaises(ValueError):
+            ProbeProps("probes", "probes.hdf5", ["NodeVelocity"], None, 1, [-1], [], [], [],
+                       buffer_size=0)
+
+
+class OutputManagerProbesTest(unittest.TestCase):
+    """
+    Test case for the registration of the probes in the OutputManager
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / "probes.hdf5")
+        self.context = SimulationContext("probes")
+        self.context.__enter__()
+        self.addCleanup(self.context.__exit__, None, None, None)
+        self.nodes = SimpleNamespace(umundemi=np.zeros((5, 1)))
+        self.cells = SimpleNamespace(pressure=SimpleNamespace(current_value=np.zeros(4)))
+
+    def test_update(self):
+        """
+        Test that only the probed nodes and cells are stored at each iteration
+        """
+        output_mng = OutputManager()
+        database = ProbeDatabase(self.path, node_ids=[4], cell_ids=[0, 3], buffer_size=2)
+        output_mng.register_database_iteration_ctrl("probes", database, 1)
+        output_mng.register_probe_fields("probes", ["NodeVelocity", "Pressure"], self.cells,
+                                         self.nodes, np.array([0, 3]), np.array([4]))
+        for iteration in range(3):
+            self.nodes.umundemi[:, 0] = np.arange(5.) * iteration
+            self.cells.pressure.current_value[:] = -np.arange(4.) * iteration
+            output_mng.update(iteration * 1.e-08, iteration, 0., [])
+        output_mng.finalize()
+        reader = OutputDatabaseExploit(self.path)
+        self.assertEqual(reader.nb_saved_times, 3)
+        np.testing.assert_array_equal(reader.extract_field_history("ClassicalNodeVelocity", 0)[1]
+                                      .reshape(3), [0., 4., 8.])
+        np.testing.assert_array_equal(reader.extract_field_at_time("ClassicalPressure", 2.e-08),
+                                      [0., -6.])
+
+    def test_missing_probes(self):
+        """
+        Test the error on a cell field without any probed cell
+        """
+        output_mng = OutputManager()
+        database = ProbeDatabase(self.path, node_ids=[4])
+        output_mng.register_database_iteration_ctrl("probes", database, 1)
+        with self.assertRaises(ValueError):
+            output_mng.register_probe_fields("probes", ["Pressure"], self.cells, self.nodes,
+                                             np.array([], dtype=int), np.array([4]))
+        database.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+timeseriesoutputdatabase module unit tests
+"""
+from pathlib import Path
+import tempfile
+import unittest
+
+import h5py
+import numpy as np
+
+from xfv.src.output_manager.asyncoutputdatabase import AsyncOutputDatabase
+from xfv.src.output_manager.outputdatabase import OutputDatabase
+from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.src.output_manager.timeseriesoutputdatabase import TimeSeriesOutputDatabase
+
+
+_ENRICHED_ATTRIBUTES = {"support": "Discontinuity", "enrichment": "Hansbo",
+                        "discontinuity_position": 0.5}
+# Layouts of the fields written by fill_database (see declare_fields)
+FIELD_LAYOUTS = {
+    "NodeCoordinates": ((5, 1), np.dtype(float), {"support": "OneDimensionNode"}),
+    "ClassicalNodeVelocity": ((5,), np.dtype(float), {"support": "OneDimensionNode"}),
+    "CellSize": ((4,), np.dtype(float), {"support": "OneDimensionCell"}),
+    "CellStatus": ((4,), np.dtype(bool), {"support": "OneDimensionCell"}),
+    "ClassicalPressure": ((4,), np.dtype(float), {"support": "OneDimensionCell"}),
+    "ClassicalStress": ((4, 3), np.dtype(float), {"support": "OneDimensionCell"}),
+    "AdditionalPressure": ((2,), np.dtype(float), _ENRICHED_ATTRIBUTES),
+    "AdditionalStress": ((4,), np.dtype(float), _ENRICHED_ATTRIBUTES),
+    "AdditionalLeftSize": ((2,), np.dtype(float), _ENRICHED_ATTRIBUTES),
+    "AdditionalRightSize": ((2,), np.dtype(float), _ENRICHED_ATTRIBUTES),
+    "AdditionalNodeVelocity": ((3,), np.dtype(float), _ENRICHED_ATTRIBUTES),
+}
+
+
+def fill_database(database, nb_times=6, first_time=0):
+    """
+    Write the fields of a mesh of 4 cells, the last one being enriched from the third time
+    """
+    for index in range(first_time, first_time + nb_times):
+        database.add_time(index / 1.e+06)
+        database.add_field("NodeCoordinates", (np.linspace(0., 4., 5) + index).reshape(5, 1),
+                           support="OneDimensionNode")
+        database.add_field("ClassicalNodeVelocity", np.full(5, float(index)),
+                           support="OneDimensionNode")
+        database.add_field("CellSize", np.ones(4), support="OneDimensionCell")
+        database.add_field("CellStatus", np.arange(4) == 3 if index >= 2 else np.zeros(4, bool),
+                           support="OneDimensionCell")
+        database.add_field("ClassicalPressure", np.arange(4.) * index,
+                           support="OneDimensionCell")
+        database.add_field("ClassicalStress", np.arange(12.).reshape(4, 3) * index,
+                           support="OneDimensionCell")
+        if index >= 2:
+            database.add_field("AdditionalPressure", np.array([[3, -float(index)]]),
+                               support="Discontinuity", enrichment="Hansbo",
+                               discontinuity_position=0.5)
+            database.add_field("AdditionalStress", np.array([[3, index, 2. * index, 3. * index]]),
+                               support="Discontinuity", enrichment="Hansbo",
+                               discontinuity_position=0.5)
+            for name, size in (("AdditionalLeftSize", 0.4), ("AdditionalRightSize", 0.6)):
+                database.add_field(name, np.array([[3, size]]), support="Discontinuity",
+                                   enrichment="Hansbo", discontinuity_position=0.5)
+            database.add_field("AdditionalNodeVelocity",
+                               np.array([[3, float(index), -float(index)]]),
+                               support="Discontinuity", enrichment="Hansbo",
+                               discontinuity_position=0.5)
+
+
+class TimeSeriesOutputDatabaseTest(unittest.TestCase):
+    """
+    Test case for the TimeSeriesOutputDatabase class
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.groups_path = str(Path(self.directory.name) / "groups.hdf5")
+        self.series_path = str(Path(self.directory.name) / "series.hdf5")
+        database = OutputDatabase(self.groups_path)
+        fill_database(database)
+        database.close()
+
+    def assert_same_exploitation(self, groups_path, series_path):
+        """
+        Check that both databases are read identically
+        """
+        groups_db = OutputDatabaseExploit(groups_path)
+        series_db = OutputDatabaseExploit(series_path)
+        self.assertEqual(series_db.saved_times, groups_db.saved_times)
+        # The fields of the groups layout are the ones of the first time, without the
+        # enriched fields
+        self.assertLessEqual(set(groups_db.saved_fields), set(series_db.saved_fields))
+        for time in groups_db.saved_times:
+            for name in series_db.saved_fields:
+                try:
+                    field = groups_db.extract_field_at_time(name, time)
+                except KeyError:
+                    with self.assertRaises(KeyError):
+                        series_db.extract_field_at_time(name, time)
+                    continue
+                np.testing.assert_array_equal(series_db.extract_field_at_time(name, time)[:],
+                                              field[:])
+                self.assertEqual(dict(series_db.extract_field_at_time(name, time).attrs),
+                                 dict(field.attrs))
+            for field_type in ("Pressure", "Stress", "NodeVelocity"):
+                np.testing.assert_array_equal(
+                    series_db.extract_true_field_at_time(field_type, time),
+                    groups_db.extract_true_field_at_time(field_type, time))
+        for item in (0, 3, -1):
+            for expected, result in zip(groups_db.extract_field_history("ClassicalPressure", item),
+                                        series_db.extract_field_history("ClassicalPressure", item)):
+                np.testing.assert_array_equal(result, expected)
+
+    def test_same_exploitation_as_groups(self):
+        """
+        Test that the time series database is read as the one with one group per time
+        """
+        database = TimeSeriesOutputDatabase(self.series_path)
+        fill_database(database)
+        database.close()
+        self.assert_same_exploitation(self.groups_path, self.series_path)
+        with h5py.File(self.series_path, 'r') as h5_db:
+            self.assertEqual(h5_db["ClassicalStress"].shape, (6, 4, 3))
+            self.assertEqual(h5_db["AdditionalPressure/values"].shape, (4, 2))
+            np.testing.assert_array_equal(h5_db["AdditionalPressure/index"][:, 1],
+                                          [0, 0, 1, 1, 1, 1])
+
+    def test_no_enrichment_before_rupture(self):
+        """
+        Test that the enriched fields are missing before the discontinuity is created
+        """
+        database = TimeSeriesOutputDatabase(self.series_path)
+        fill_database(database)
+        database.close()
+        series_db = OutputDatabaseExploit(self.series_path)
+        with self.assertRaises(KeyError):
+            series_db.extract_field_at_time("AdditionalPressure", 1.e-06)
+        np.testing.assert_array_equal(
+            series_db.extract_field_at_time("AdditionalPressure", 3.e-06), [[3, -3.]])
+
+    def test_asynchronous_and_compressed(self):
+        """
+        Test the compression filters and the writing by a background thread
+        """
+        database = AsyncOutputDatabase(
+            TimeSeriesOutputDatabase(self.series_path, compression="gzip",
+                                     compression_level=4, shuffle=True), queue_size=2)
+        fill_database(database)
+        database.close()
+        self.assert_same_exploitation(self.groups_path, self.series_path)
+        with h5py.File(self.series_path, 'r') as h5_db:
+            self.assertEqual(h5_db["ClassicalPressure"].compression, "gzip")
+            self.assertTrue(h5_db["ClassicalPressure"].shuffle)
+
+    def test_keep_times(self):
+        """
+        Test that the times after a checkpoint are replaced when a simulation is restarted
+        """
+        database = TimeSeriesOutputDatabase(self.series_path)
+        fill_database(database, nb_times=4)
+        # Times written after the checkpoint, then replaced
+        fill_database(database, nb_times=2, first_time=10)
+        database.close()
+        database = TimeSeriesOutputDatabase(self.series_path, append=True)
+        saved_times = database.saved_times
+        self.assertEqual(len(saved_times), 6)
+        database.keep_times(saved_times[:4])
+        fill_database(database, nb_times=2, first_time=4)
+        database.close()
+        self.assert_same_exploitation(self.groups_path, self.series_path)
+
+    def test_wrong_options(self):
+        """
+        Test the errors on an unknown compression and on a database of another layout
+        """
+        with self.assertRaises(ValueError):
+            TimeSeriesOutputDatabase(self.series_path, compression="zstd")
+        with self.assertRaises(ValueError):
+            TimeSeriesOutputDatabase(self.groups_path, append=True)
+        database = TimeSeriesOutputDatabase(self.series_path)
+        database.add_time(0.)
+        database.add_field("ClassicalPressure", np.zeros(4))
+        database.add_time(1.)
+        with self.assertRaises(ValueError):
+            database.add_field("ClassicalPressure", np.zeros(5))
+        database.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
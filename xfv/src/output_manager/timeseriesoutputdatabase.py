@@ -0,0 +1,288 @@
+"""
+Implementing the TimeSeriesOutputDatabase class giving access to hdf5 storage of the fields
+as time series
+"""
+
+import h5py
+import numpy as np
+
+from xfv.src.output_manager.hdf5settings import Hdf5Settings
+
+# Value of the "layout" attribute of the root of the time series databases
+TIME_SERIES_LAYOUT = "time-series"
+# Name of the dataset of the saved times
+TIME_DATASET = "time"
+# Number of items (nodes, cells or rows of the enriched fields) in a chunk
+CHUNK_ITEMS = 1024
+COMPRESSIONS = (None, "gzip", "lzf")
+
+
+class TimeSeriesOutputDatabase:
+    """
+    A class to store simulation fields in an hdf5 database with one extendible dataset per
+    field, of shape (times, items, ...), chunked along the times and the items. The saved
+    times are stored in the "time" dataset. A time is appended to it once all its fields are
+    written (at the next time or at the closing), so that the rows of the datasets of the
+    times of the "time" dataset are complete when the file is read while it is written.
+
+    The number of rows of the enriched fields (Additional...) changes with the number of
+    discontinuities. Each of them is stored in a group holding the rows of all the times
+    in the "values" dataset, and the first row and the number of rows of each time in the
+    "index" dataset.
+
+    In SWMR mode, the file can be read while it is written. SWMR starts once the datasets of
+    the first time are created. As no dataset can be created in SWMR mode, the datasets of
+    the declared fields (see declare_fields) that are not written yet, such as the enriched
+    fields before the first discontinuity, are created before SWMR starts.
+    """
+
+    def __init__(self, path_to_hdf5, append=False,  # pylint: disable=too-many-arguments
+                 compression=None, compression_level=None, shuffle=False, chunk_times=8,
+                 settings=None):
+        """
+        :param path_to_hdf5: path to the database
+        :param append: if True the times already stored in the database are kept
+                       (restart of a simulation), else the database is overwritten
+        :param compression: compression filter of the datasets (None, "gzip" or "lzf")
+        :param compression_level: level of the gzip compression (0 to 9)
+        :param shuffle: if True the bytes are shuffled before the compression
+        :param chunk_times: number of times in a chunk
+        :param settings: flush policy and hdf5 options (Hdf5Settings). By default the file
+                         is flushed at each output
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {}. Please choose among {}"
+                             .format(compression, COMPRESSIONS))
+        self.__path = path_to_hdf5
+        self.__settings = settings if settings is not None else Hdf5Settings()
+        self.__flush_policy = self.__settings.flush_policy()
+        self.__db = self.__settings.open(path_to_hdf5, 'a' if append else 'w')
+        if len(self.__db) and self.__db.attrs.get("layout") != TIME_SERIES_LAYOUT:
+            self.__db.close()
+            raise ValueError("The database {} does not have the time series layout"
+                             .format(path_to_hdf5))
+        self.__db.attrs["layout"] = TIME_SERIES_LAYOUT
+        self.__filters = {"compression": compression, "shuffle": shuffle}
+        if compression == "gzip":
+            self.__filters["compression_opts"] = compression_level
+        self.__chunk_times = chunk_times
+        if TIME_DATASET not in self.__db:
+            self.__db.create_dataset(TIME_DATASET, shape=(0,), maxshape=(None,),
+                                     dtype=np.float64, chunks=(CHUNK_ITEMS,))
+        self.__times, self.__fields, self.__enriched_fields = self.__open_items()
+        self.__nb_sav = self.__times.shape[0]
+        # Time whose fields are being added, not yet appended to the time dataset
+        self.__current_time = None
+        # Shape (of one row for the enriched fields), dtype and attributes of the fields
+        # to be created before SWMR starts, by name
+        self.__declared_fields = {}
+
+    def __open_items(self):
+        """
+        Returns the time dataset, the datasets of the fields and the groups of the enriched
+        fields, by name (opening them by name at each output is costly)
+        """
+        fields, enriched_fields = {}, {}
+        for name, item in self.__db.items():
+            if isinstance(item, h5py.Group):
+                enriched_fields[name] = item
+            elif name != TIME_DATASET:
+                fields[name] = item
+        return self.__db[TIME_DATASET], fields, enriched_fields
+
+    @property
+    def path(self):
+        """
+        Returns the path to the database
+        """
+        return self.__path
+
+    @property
+    def saved_times(self):
+        """
+        Returns the names of the times stored in the database
+        """
+        times = self.__times[()].tolist()
+        if self.__current_time is not None:
+            times.append(self.__current_time)
+        return [repr(float(time)) for time in times]
+
+    def keep_times(self, time_names):
+        """
+        Remove from the database the times that are not in time_names (for example the
+        times written after the checkpoint a simulation is restarted from)
+
+        :param time_names: names of the times to be kept
+        """
+        self.__commit_time()
+        kept = np.isin(self.saved_times, list(time_names))
+        self.__nb_sav = int(np.count_nonzero(kept))
+        for item in self.__db.values():
+            if isinstance(item, h5py.Group):
+                index = item["index"][()]
+                rows = np.concatenate([np.arange(start, start + count)
+                                       for start, count in index[kept]] + [[]]).astype(int)
+                values = item["values"][()][rows]
+                item["values"].resize(rows.size, axis=0)
+                item["values"][()] = values
+                counts = index[kept, 1]
+                item["index"].resize(self.__nb_sav, axis=0)
+                item["index"][()] = np.stack([np.cumsum(counts) - counts, counts], axis=1)
+            else:
+                values = item[()][kept[:item.shape[0]]]
+                item.resize(values.shape[0], axis=0)
+                item[()] = values
+
+    def __commit_time(self):
+        """
+        Append the current time, whose fields are written, to the time dataset
+        """
+        if self.__current_time is not None:
+            self.__times.resize(self.__times.shape[0] + 1, axis=0)
+            self.__times[-1] = self.__current_time
+            self.__current_time = None
+
+    def declare_fields(self, fields):
+        """
+        Declare the fields that will be added to the database, so that their datasets are
+        created before SWMR starts
+
+        :param fields: dict of the (shape, dtype, attributes) of the fields by name. The shape
+                       is the one of the field at one time, or of one of its rows for the
+                       enriched fields
+        """
+        self.__declared_fields.update(fields)
+
+    def __create_declared_fields(self):
+        """
+        Create the datasets of the declared fields that do not exist yet
+        """
+        for f_name, (shape, dtype, attributes) in self.__declared_fields.items():
+            if f_name.startswith("Additional"):
+                if f_name not in self.__enriched_fields:
+                    self.__create_enriched_field(f_name, tuple(shape), dtype, attributes)
+            elif f_name not in self.__fields:
+                self.__create_field(f_name, tuple(shape), dtype, attributes)
+
+    def add_time(self, time):
+        """
+        Add a time to the database. The fields are then added at this time
+
+        :param time: time to be added
+        """
+        self.__commit_time()
+        if self.__flush_policy.is_due():
+            self.__db.flush()  # Flushing to print preceding time steps
+        if self.__settings.swmr and self.__nb_sav and not self.__db.swmr_mode:
+            self.__create_declared_fields()
+            self.__db.flush()
+            self.__db.swmr_mode = True
+        self.__nb_sav += 1
+        self.__current_time = time
+        for group in self.__enriched_fields.values():
+            # No row of the enriched field unless it is added at this time
+            index = group["index"]
+            index.resize(self.__nb_sav, axis=0)
+            index[-1] = (group["values"].shape[0], 0)
+
+    def add_field(self, f_name, values, **kwargs):
+        """
+        Store the values of the field at the current time.
+        All extra keywords arguments are stored as attributes of the dataset
+
+        :param f_name: name of the field to be added
+        """
+        values = np.asarray(values)
+        if f_name.startswith("Additional"):
+            self.__add_enriched_field(f_name, values, kwargs)
+            return
+        data_set = self.__fields.get(f_name)
+        if data_set is None:
+            data_set = self.__create_field(f_name, values.shape, values.dtype, kwargs)
+        if data_set.shape[1:] != values.shape:
+            raise ValueError("The shape {} of the field {} differs from the one of the "
+                             "previous times {}".format(values.shape, f_name, data_set.shape[1:]))
+        data_set.resize(self.__nb_sav, axis=0)
+        data_set[-1] = values
+
+    def __add_enriched_field(self, f_name, values, attributes):
+        """
+        Append the rows of the enriched field at the current time
+        """
+        group = self.__enriched_fields.get(f_name)
+        if group is None:
+            group = self.__create_enriched_field(f_name, values.shape[1:], values.dtype,
+                                                 attributes)
+        rows = group["values"]
+        start = rows.shape[0]
+        rows.resize(start + values.shape[0], axis=0)
+        rows[start:] = values
+        group["index"][-1] = (start, values.shape[0])
+
+    def __check_creation(self, f_name):
+        """
+        Raise an error if a dataset can not be created (SWMR mode)
+        """
+        if self.__db.swmr_mode:
+            raise ValueError("The field {} can not be created once SWMR started. Please "
+                             "declare it before the first time (declare_fields)".format(f_name))
+
+    def __create_field(self, f_name, shape, dtype, attributes):
+        """
+        Create the dataset of a field
+
+        :param f_name: name of the field
+        :param shape: shape of the field at one time
+        :param dtype: type of the values
+        :param attributes: attributes of the dataset
+        """
+        self.__check_creation(f_name)
+        data_set = self.__db.create_dataset(
+            f_name, shape=(0,) + shape, maxshape=(None,) + shape, dtype=dtype,
+            chunks=self.__chunks(shape, self.__chunk_times), **self.__filters)
+        for key, value in list(attributes.items()):
+            data_set.attrs[key] = value
+        self.__fields[f_name] = data_set
+        return data_set
+
+    def __create_enriched_field(self, f_name, row_shape, dtype, attributes):
+        """
+        Create the group of an enriched field, without any row
+
+        :param f_name: name of the field
+        :param row_shape: shape of one row of the field
+        :param dtype: type of the values
+        :param attributes: attributes of the group
+        """
+        self.__check_creation(f_name)
+        group = self.__db.create_group(f_name)
+        group.create_dataset("values", shape=(0,) + row_shape,
+                             maxshape=(None,) + row_shape, dtype=dtype,
+                             chunks=self.__chunks(row_shape, CHUNK_ITEMS), **self.__filters)
+        group.create_dataset("index", shape=(self.__nb_sav, 2), maxshape=(None, 2),
+                             dtype=np.int64, chunks=(CHUNK_ITEMS, 2), fillvalue=0,
+                             **self.__filters)
+        for key, value in list(attributes.items()):
+            group.attrs[key] = value
+        self.__enriched_fields[f_name] = group
+        return group
+
+    @staticmethod
+    def __chunks(item_shape, first_axis):
+        """
+        Returns the shape of the chunks of a dataset whose first axis is extendible
+
+        :param item_shape: shape of the field at one time (or of one row)
+        :param first_axis: size of the chunks along the extendible axis
+        """
+        if not item_shape:
+            return (first_axis,)
+        return (first_axis, max(1, min(item_shape[0], CHUNK_ITEMS))) + tuple(item_shape[1:])
+
+    def close(self):
+        """
+        Close the database
+        """
+        self.__commit_time()
+        self.__db.flush()
+        self.__db.close()
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized kernels for the computation of non local (radius windowed) averages
+
+In 1D the cells coordinates are (almost) sorted. Once sorted, the set of cells lying at a
+distance strictly lower than the radius from a given point is a contiguous window of the sorted
+array. The windows bounds are found with a binary search and the windowed sums are obtained by
+differences of prefix sums, so that the cost of a non local average is O(N log N) instead
+of O(N^2).
+
+The windows are cached by the NonLocalAverage objects and updated incrementally from one call
+to the other: as the nodes only move a little during a time step, the previous bounds are
+shifted by a few positions instead of being searched again. Non flat weighting functions are
+evaluated on the (cell, neighbour) pairs of the windows.
+"""
+import numpy as np
+
+
+def sort_coordinates(coordinates: np.array):
+    """
+    Return the permutation sorting the coordinates and the sorted coordinates
+
+    :param coordinates: coordinates of the points (may be unsorted)
+    :return: tuple(permutation, sorted coordinates). The permutation is None if the coordinates
+             are already sorted
+    """
+    if coordinates.size < 2 or np.all(coordinates[1:] >= coordinates[:-1]):
+        return None, coordinates
+    perm = np.argsort(coordinates, kind="stable")
+    return perm, coordinates[perm]
+
+
+def _refine_bounds(sorted_coord: np.array, query: np.array, radius: float,
+                   lower: np.array, upper: np.array):
+    """
+    Correct the bounds given by the binary search so that they match exactly the floating
+    point predicate |x_j - x_q| < radius (the predicate is monotonic on each side of the query
+    so that the correction only involves a few shifts of one position)
+
+    :param sorted_coord: sorted coordinates
+    :param query: coordinates of the query points
+    :param radius: radius of the window
+    :param lower: first index of the windows (modified in place)
+    :param upper: last index + 1 of the windows (modified in place)
+    """
+    size = sorted_coord.size
+
+    def _inside(index, mask):
+        return np.abs(sorted_coord[index[mask]] - query[mask]) < radius
+
+    # Extend the lower bound while the previous point is inside the window
+    todo = lower > 0
+    while todo.any():
+        todo[todo] = _inside(lower - 1, todo)
+        lower[todo] -= 1
+        todo &= lower > 0
+    # Shrink the lower bound while the first point is outside the window
+    todo = lower < upper
+    while todo.any():
+        todo[todo] = ~_inside(lower, todo)
+        lower[todo] += 1
+        todo &= lower < upper
+    # Extend the upper bound while the next point is inside the window
+    todo = upper < size
+    while todo.any():
+        todo[todo] = _inside(upper, todo)
+        upper[todo] += 1
+        todo &= upper < size
+    # Shrink the upper bound while the last point is outside the window
+    todo = upper > lower
+    while todo.any():
+        todo[todo] = ~_inside(upper - 1, todo)
+        upper[todo] -= 1
+        todo &= upper > lower
+
+
+def radius_windows(sorted_coord: np.array, query: np.array, radius: float,
+                   initial=None):
+    """
+    Compute, for each query point, the bounds [lower, upper[ of the window of the sorted
+    coordinates lying strictly inside the radius: |sorted_coord[j] - query| < radius
+
+    :param sorted_coord: sorted coordinates
+    :param query: coordinates of the query points
+    :param radius: radius of the window
+    :param initial: tuple(lower, upper) of previous bounds used as a starting point
+    :return: tuple(lower, upper) arrays of indexes in sorted_coord
+    """
+    if initial is None:
+        lower = np.searchsorted(sorted_coord, query - radius, side="left")
+        upper = np.searchsorted(sorted_coord, query + radius, side="right")
+        upper = np.maximum(upper, lower)
+        _refine_bounds(sorted_coord, query, radius, lower, upper)
+        return lower, upper
+
+    lower, upper = np.copy(initial[0]), np.copy(initial[1])
+    _refine_bounds(sorted_coord, query, radius, lower, upper)
+    # A non empty window is necessarily the right one. An empty window may come from previous
+    # bounds that do not intersect the new window: it is searched again
+    empty = lower == upper
+    if empty.any():
+        lower[empty], upper[empty] = radius_windows(sorted_coord, query[empty], radius)
+    return lower, upper
+
+
+def prefix_sums(values: np.array):
+    """
+    Return the prefix sums of values with a leading 0 so that
+    sum(values[lower:upper]) = result[upper] - result[lower]
+
+    :param values: values to be summed
+    """
+    result = np.zeros(values.size + 1, dtype=float)
+    np.cumsum(values, out=result[1:])
+    return result
+
+
+def flat_weight(distance_ratio: np.array):
+    """
+    Flat weighting function: every neighbour inside the radius has the same weight
+
+    :param distance_ratio: distance to the neighbours divided by the radius
+    """
+    return np.ones_like(distance_ratio)
+
+
+def linear_weight(distance_ratio: np.array):
+    """
+    Linear decay weighting function: w = 1 - d / radius
+
+    :param distance_ratio: distance to the neighbours divided by the radius
+    """
+    return 1. - distance_ratio
+
+
+def gaussian_weight(distance_ratio: np.array):
+    """
+    Gaussian weighting function, truncated at the radius, of standard deviation radius / 2
+
+    :param distance_ratio: distance to the neighbours divided by the radius
+    """
+    return np.exp(-2. * distance_ratio * distance_ratio)
+
+
+WEIGHTING_FUNCTIONS = {"flat": flat_weight,
+                       "linear": linear_weight,
+                       "gaussian": gaussian_weight}
+
+
+class RadiusWindows:
+    """
+    Cache of the radius windows of a set of query points in a set of (sorted) points
+    """
+    def __init__(self, radius: float):
+        """
+        :param radius: radius of the windows
+        """
+        self.radius = radius
+        self.ids = None
+        self.perm = None
+        self.sorted_coord = None
+        self.lower = None
+        self.upper = None
+
+    def update(self, coordinates: np.array, query: np.array, ids=None):
+        """
+        Update the windows for new coordinates of the points and of the query points
+
+        :param coordinates: coordinates of all the points
+        :param query: coordinates of the query points
+        :param ids: indexes of the points of the subset on which windows are built
+                    (all the points if None)
+        """
+        if ids is not None:
+            coordinates = coordinates[ids]
+        same_points = (self.lower is not None and self.lower.size == query.size and
+                       self.sorted_coord.size == coordinates.size and
+                       (ids is None) == (self.ids is None) and
+                       (ids is None or np.array_equal(ids, self.ids)))
+        if not same_points:
+            self.lower, self.upper = None, None
+        self.ids = ids
+
+        # The previous permutation is kept as long as it sorts the coordinates
+        if same_points and self.perm is not None:
+            sorted_coord = coordinates[self.perm]
+            if np.any(sorted_coord[1:] < sorted_coord[:-1]):
+                self.perm, sorted_coord = sort_coordinates(coordinates)
+        else:
+            self.perm, sorted_coord = sort_coordinates(coordinates)
+        self.sorted_coord = sorted_coord
+
+        initial = None if self.lower is None else (self.lower, self.upper)
+        self.lower, self.upper = radius_windows(sorted_coord, query, self.radius, initial)
+
+    def point_indexes(self):
+        """
+        Return the indexes (in the whole set of points) of the sorted points.
+        None means identity
+        """
+        if self.perm is None:
+            return self.ids
+        if self.ids is None:
+            return self.perm
+        return self.ids[self.perm]
+
+    def pairs(self):
+        """
+        Return the (query, sorted point) pairs of the windows, grouped by query
+
+        :return: tuple(query indexes, indexes in the sorted points)
+        """
+        counts = self.upper - self.lower
+        owners = np.repeat(np.arange(counts.size), counts)
+        starts = np.cumsum(counts) - counts
+        members = np.arange(owners.size) - np.repeat(starts - self.lower, counts)
+        return owners, members
+
+
+class NonLocalAverage:
+    """
+    Non local average, on radius windows, of fields defined on the cells and on the right part
+    of enriched cells
+    """
+    def __init__(self, radius: float, weighting: str = "flat"):
+        """
+        :param radius: radius of the non local average
+        :param weighting: name of the weighting function (flat, linear or gaussian)
+        """
+        try:
+            self.weight_function = WEIGHTING_FUNCTIONS[weighting]
+        except KeyError:
+            raise ValueError(f"Unknown weighting function {weighting}. "
+                             f"Please choose among ({', '.join(WEIGHTING_FUNCTIONS)})") from None
+        self.radius = radius
+        self.weighting = weighting
+        self._classical = RadiusWindows(radius)
+        self._additional = RadiusWindows(radius)
+
+    def _weighted_sums(self, windows: RadiusWindows, query: np.array, values: np.array):
+        """
+        Return the sums of the weighted values and the sums of the weights over the windows
+
+        :param windows: up to date windows
+        :param query: coordinates of the query points
+        :param values: values carried by all the points
+        """
+        indexes = windows.point_indexes()
+        sorted_values = values if indexes is None else values[indexes]
+        if self.weighting == "flat":
+            prefix = prefix_sums(sorted_values)
+            return (prefix[windows.upper] - prefix[windows.lower],
+                    (windows.upper - windows.lower).astype(float),
+                    np.sum(np.abs(sorted_values)))
+        owners, members = windows.pairs()
+        distance = np.abs(windows.sorted_coord[members] - query[owners])
+        weights = self.weight_function(distance / self.radius)
+        return (np.bincount(owners, weights * sorted_values[members], minlength=query.size),
+                np.bincount(owners, weights, minlength=query.size),
+                None)
+
+    @staticmethod
+    def _exact_sum(windows: RadiusWindows, values: np.array, index: int):
+        """
+        Return the sum over the window of the query index computed in the same order
+        (and with the same pairwise summation) as np.sum(values[mask_of_the_window])
+
+        :param windows: up to date windows
+        :param values: values carried by all the points
+        :param index: index of the query point
+        """
+        lower, upper = windows.lower[index], windows.upper[index]
+        indexes = windows.point_indexes()
+        if indexes is None:
+            return np.sum(values[lower:upper])
+        return np.sum(values[np.sort(indexes[lower:upper])])
+
+    def compute(self, coordinates: np.array, values: np.array, enr_coordinates: np.array,
+                enr_values: np.array, enriched: np.array, exact_around=None):
+        """
+        Compute for each cell i the non local mean:
+
+            mean_i = (sum_{j in A_i} w_ij values_j + sum_{j in B_i} w'_ij enr_values_j) /
+                     (sum_{j in A_i} w_ij + sum_{j in B_i} w'_ij)
+
+        with A_i = {j, |x_j - x_i| < radius}, B_i = {j enriched, |x_j - enr_x_i| < radius},
+        w_ij = w(|x_j - x_i| / radius) and w'_ij = w(|x_j - enr_x_i| / radius)
+
+        :param coordinates: cells coordinates
+        :param values: field on the cells (or on the left part of enriched cells)
+        :param enr_coordinates: coordinates of the right part of the enriched cells
+        :param enr_values: field on the right part of the enriched cells
+        :param enriched: mask of the enriched cells
+        :param exact_around: flat weighting only. If not None, the means that are close enough
+                             to this value for the rounding errors of the prefix sums to matter
+                             are computed again with the exact summation order of the brute
+                             force algorithm. Comparisons of the result with exact_around are
+                             thus bit-compatible with it.
+        :return: the non local means
+        """
+        coordinates = np.ravel(coordinates)
+        enr_coordinates = np.ravel(enr_coordinates)
+        values = np.ravel(values)
+        enr_values = np.ravel(enr_values)
+        enriched = np.ravel(enriched).astype(bool)
+
+        self._classical.update(coordinates, coordinates)
+        sums, weights, abs_total = self._weighted_sums(self._classical, coordinates, values)
+        enr_ids = np.where(enriched)[0]
+        if enr_ids.size:
+            # Note that the enriched coordinates of the classical cells are 0 so that the right
+            # parts near the origin contribute to their mean (as in the brute force algorithm)
+            self._additional.update(coordinates, enr_coordinates, ids=enr_ids)
+            enr_sums, enr_weights, enr_abs_total = self._weighted_sums(
+                self._additional, enr_coordinates, enr_values)
+            sums += enr_sums
+            weights += enr_weights
+            if abs_total is not None:
+                abs_total += enr_abs_total
+        mean = sums / weights
+
+        if exact_around is not None and abs_total is not None:
+            # Bound of the rounding errors of the prefix sums differences (and of the pairwise
+            # summation of the brute force algorithm)
+            eps = np.finfo(float).eps
+            tolerance = (8. * (coordinates.size + 2) * eps * abs_total / weights
+                         + 4. * eps * np.abs(mean))
+            for index in np.where(np.abs(mean - exact_around) <= tolerance)[0]:
+                total = self._exact_sum(self._classical, values, index)
+                if enr_ids.size:
+                    total += self._exact_sum(self._additional, enr_values, index)
+                mean[index] = total / weights[index]
+        return mean
+
+
+def nonlocal_stress_mean(coordinates: np.array, stress: np.array,
+                         enr_coordinates: np.array, enr_stress: np.array,
+                         enriched: np.array, radius: float, exact_around=None):
+    """
+    Compute for each cell i the non local (flat) stress mean without caching the windows.
+    See NonLocalAverage.compute
+
+    :param coordinates: cells coordinates
+    :param stress: stress of the cells (or of the left part of enriched cells)
+    :param enr_coordinates: coordinates of the right part of the enriched cells
+    :param enr_stress: stress of the right part of the enriched cells
+    :param enriched: mask of the enriched cells
+    :param radius: radius of the non local average
+    :param exact_around: see NonLocalAverage.compute
+    :return: the non local means
+    """
+    return NonLocalAverage(radius).compute(coordinates, stress, enr_coordinates, enr_stress,
+                                           enriched, exact_around=exact_around)
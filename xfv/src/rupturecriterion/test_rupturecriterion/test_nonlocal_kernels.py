@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the nonlocal_kernels module
+"""
+import unittest
+import numpy as np
+
+from xfv.src.rupturecriterion.nonlocal_kernels import (radius_windows, nonlocal_stress_mean,
+                                                       NonLocalAverage, WEIGHTING_FUNCTIONS)
+
+
+def brute_force_mean(coord, stress, enr_coord, enr_stress, enriched, radius):
+    """
+    O(N^2) reference algorithm of the non local stress mean
+    """
+    mean_stress = np.zeros(coord.size)
+    nbr_div = np.zeros(coord.size)
+    for i in range(coord.size):
+        cells_in_radius = np.abs(coord - coord[i]) < radius
+        enr_cells_in_radius = (np.abs(coord - enr_coord[i]) < radius) * enriched
+        mean_stress[i] += np.sum(stress[cells_in_radius]) \
+            + np.sum(enr_stress[enr_cells_in_radius])
+        nbr_div[i] = len(np.where(cells_in_radius)[0]) + len(np.where(enr_cells_in_radius)[0])
+    return mean_stress / nbr_div
+
+
+def brute_force_weighted_mean(coord, stress, enr_coord, enr_stress, enriched, radius,
+                              weight_function):
+    """
+    O(N^2) reference algorithm of the weighted non local mean
+    """
+    mean = np.zeros(coord.size)
+    for i in range(coord.size):
+        dist = np.abs(coord - coord[i])
+        enr_dist = np.abs(coord - enr_coord[i])
+        weights = np.where(dist < radius, weight_function(dist / radius), 0.)
+        enr_weights = np.where((enr_dist < radius) * enriched,
+                               weight_function(enr_dist / radius), 0.)
+        mean[i] = (np.sum(weights * stress) + np.sum(enr_weights * enr_stress)) / \
+            (np.sum(weights) + np.sum(enr_weights))
+    return mean
+
+
+class NonLocalKernelsTest(unittest.TestCase):
+    """
+    Comparison of the vectorized kernels with the brute force algorithm
+    """
+    def setUp(self):
+        """
+        Random mesh with a few enriched cells
+        """
+        self.rng = np.random.RandomState(12)
+        self.size = 300
+        self.coord = np.cumsum(self.rng.uniform(0.5e-4, 1.5e-4, self.size))
+        self.stress = self.rng.normal(1.e+09, 5.e+08, self.size)
+        self.enriched = np.zeros(self.size, dtype=bool)
+        self.enriched[[10, 150, 151, 290]] = True
+        self.enr_coord = np.zeros(self.size)
+        self.enr_coord[self.enriched] = self.coord[self.enriched] + 1.e-5
+        self.enr_stress = np.zeros(self.size)
+        self.enr_stress[self.enriched] = self.rng.normal(1.e+09, 5.e+08, 4)
+
+    def test_radius_windows(self):
+        """
+        Test of the radius_windows method, including points exactly at the radius distance
+        """
+        coord = np.arange(10.)
+        lower, upper = radius_windows(coord, np.array([0., 4.5, 5., 9.]), 1.)
+        np.testing.assert_array_equal(lower, [0, 4, 5, 9])
+        np.testing.assert_array_equal(upper, [1, 6, 6, 10])
+        for query in self.rng.uniform(-0.01, 0.04, 50):
+            lower, upper = radius_windows(self.coord, np.array([query]), 1.e-3)
+            expected = np.where(np.abs(self.coord - query) < 1.e-3)[0]
+            self.assertEqual(lower[0], expected[0] if expected.size else lower[0])
+            self.assertEqual(upper[0] - lower[0], expected.size)
+
+    def test_nonlocal_stress_mean_sorted(self):
+        """
+        Test of the non local mean on sorted coordinates
+        """
+        for radius in (1.e-4, 5.e-4, 2.e-3):
+            exact = brute_force_mean(self.coord, self.stress, self.enr_coord,
+                                     self.enr_stress, self.enriched, radius)
+            result = nonlocal_stress_mean(self.coord, self.stress, self.enr_coord,
+                                          self.enr_stress, self.enriched, radius)
+            np.testing.assert_allclose(result, exact, rtol=1.e-12)
+
+    def test_nonlocal_stress_mean_unsorted(self):
+        """
+        Test of the non local mean on slightly unsorted coordinates (2D column array)
+        """
+        coord = np.copy(self.coord)
+        coord[[20, 21]] = coord[[21, 20]]
+        coord[[200, 202]] = coord[[202, 200]]
+        exact = brute_force_mean(coord, self.stress, self.enr_coord,
+                                 self.enr_stress, self.enriched, 4.e-4)
+        result = nonlocal_stress_mean(coord.reshape((self.size, 1)), self.stress,
+                                      self.enr_coord, self.enr_stress, self.enriched, 4.e-4)
+        np.testing.assert_allclose(result, exact, rtol=1.e-12)
+
+    def test_nonlocal_stress_mean_exact_around(self):
+        """
+        Test that the comparison with the critical value is bit-compatible with the
+        brute force algorithm even for a mean equal to the critical value
+        """
+        coord = np.arange(10.) * 0.1
+        stress = np.array([0.1, 0.2, 0.3, 0.7, 0.1, 0.2, 0.3, 1.e+16, -1.e+16, 0.4])
+        no_enr = np.zeros(10, dtype=bool)
+        exact = brute_force_mean(coord, stress, np.zeros(10), np.zeros(10), no_enr, 0.25)
+        for critical in np.unique(exact):
+            result = nonlocal_stress_mean(coord, stress, np.zeros(10), np.zeros(10), no_enr,
+                                          0.25, exact_around=critical)
+            np.testing.assert_array_equal(result >= critical, exact >= critical)
+
+    def test_weighting_functions(self):
+        """
+        Test of the linear and gaussian weighting functions
+        """
+        for weighting in ("linear", "gaussian"):
+            exact = brute_force_weighted_mean(self.coord, self.stress, self.enr_coord,
+                                              self.enr_stress, self.enriched, 5.e-4,
+                                              WEIGHTING_FUNCTIONS[weighting])
+            result = NonLocalAverage(5.e-4, weighting).compute(
+                self.coord, self.stress, self.enr_coord, self.enr_stress, self.enriched)
+            np.testing.assert_allclose(result, exact, rtol=1.e-12)
+
+    def test_unknown_weighting_function(self):
+        """
+        Test that an unknown weighting function raises a ValueError
+        """
+        with self.assertRaises(ValueError):
+            NonLocalAverage(5.e-4, "cubic")
+
+    def test_incremental_update_of_windows(self):
+        """
+        Test that the cached windows, updated while the cells move and get enriched,
+        give the same result as a computation from scratch
+        """
+        average = NonLocalAverage(3.e-4)
+        coord = np.copy(self.coord)
+        enriched = np.zeros(self.size, dtype=bool)
+        for step in range(20):
+            coord += self.rng.normal(0., 2.e-5, self.size)
+            if step == 10:
+                enriched = self.enriched
+            exact = brute_force_mean(coord, self.stress, self.enr_coord,
+                                     self.enr_stress, enriched, 3.e-4)
+            result = average.compute(coord, self.stress, self.enr_coord,
+                                     self.enr_stress, enriched)
+            np.testing.assert_allclose(result, exact, rtol=1.e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,3 +3,5 @@ Package for solver modules
 """
 from xfv.src.solver.newtonraphsonbase import NewtonRaphsonBase
 from xfv.src.solver.newtonraphson import NewtonRaphson, ClassicalNewtonRaphsonIncrement
+from xfv.src.solver.warmstartednewtonraphson import (WarmStartedNewtonRaphson,
+                                                     NewtonRaphsonTelemetry)
@@ -12,6 +12,14 @@ class VnrEnergyEvolutionForVolumeEnergyFormulation(FunctionToSolveBase):
     Defines the evolution function of the internal energy that must vanish in VNR scheme
     [v, e] formulation
     """
+    # Rows of the compact workspace
+    _NEW_SPEC_VOL, _DELTA_V, _PRESSURE, _OLD_ENERGY, _P_I, _DPSURDE = range(6)
+
+    def __init__(self):
+        super().__init__()
+        self.__compact = np.zeros((6, 0))
+        self.__compact_size = 0
+
     def computeFunctionAndDerivative(self, var_value, mask):
         _mask = np.where(mask)
         nrj = var_value[_mask]
@@ -29,3 +37,71 @@ class VnrEnergyEvolutionForVolumeEnergyFormulation(FunctionToSolveBase):
         # Derivative of the function with respect to internal energy
         dfunc = 1 + dpsurde * delta_v * 0.5
         return func, dfunc
+
+    def compute_solution_linear_in_energy(self):
+        """
+        Return the exact solution of the internal energy evolution when the pressure
+        is an affine function of the internal energy (p = p(v, 0) + dp/de * e)
+        """
+        eos = self._variables['EquationOfState']
+        new_spec_vol = self._variables['NewSpecificVolume']
+        p_zero = np.ndarray(new_spec_vol.shape, dtype=np.float64, order='C')
+        dpsurde = np.ndarray(new_spec_vol.shape, dtype=np.float64, order='C')
+        eos.solve_volume_energy(new_spec_vol, np.zeros(new_spec_vol.shape), p_zero, dpsurde)
+        delta_v = new_spec_vol - self._variables['OldSpecificVolume']
+        return ((self._variables['OldEnergy'] -
+                 (p_zero + self._variables['Pressure']) * delta_v * 0.5) /
+                (1 + dpsurde * delta_v * 0.5))
+
+    def init_compact_variables(self):
+        """
+        Copy the variables into a persistent workspace holding only the cells that
+        have to be computed (all of them at first).
+        See compact_variables and compute_compact_function_and_derivative.
+        """
+        new_spec_vol = self._variables['NewSpecificVolume']
+        size = new_spec_vol.size
+        if self.__compact.shape[1] < size:
+            self.__compact = np.zeros((6, size))
+        self.__compact_size = size
+        compact = self.__compact[:, :size]
+        compact[self._NEW_SPEC_VOL] = new_spec_vol
+        np.subtract(new_spec_vol, self._variables['OldSpecificVolume'],
+                    out=compact[self._DELTA_V])
+        compact[self._PRESSURE] = self._variables['Pressure']
+        compact[self._OLD_ENERGY] = self._variables['OldEnergy']
+
+    def compact_variables(self, keep):
+        """
+        Keep only some cells in the compact workspace
+
+        :param keep: boolean mask on the cells currently in the compact workspace
+        """
+        kept = self.__compact[:, :self.__compact_size][:, keep]
+        self.__compact_size = kept.shape[1]
+        self.__compact[:, :self.__compact_size] = kept
+
+    def compute_compact_function_and_derivative(self, var_value, func, dfunc):
+        """
+        Compute the values of the function and its derivative on the cells of the compact
+        workspace, without temporary allocation of the eos results
+
+        :param var_value: value of the variable on the compact cells [in]
+        :param func: value of the function [out]
+        :param dfunc: value of the derivative of the function [out]
+        """
+        compact = self.__compact[:, :self.__compact_size]
+        p_i, dpsurde = compact[self._P_I], compact[self._DPSURDE]
+        delta_v = compact[self._DELTA_V]
+        self._variables['EquationOfState'].solve_volume_energy(
+            compact[self._NEW_SPEC_VOL], var_value, p_i, dpsurde)
+        # Function to vanish
+        np.add(p_i, compact[self._PRESSURE], out=func)
+        func *= delta_v
+        func *= 0.5
+        np.add(var_value, func, out=func)
+        func -= compact[self._OLD_ENERGY]
+        # Derivative of the function with respect to internal energy
+        np.multiply(dpsurde, delta_v, out=dfunc)
+        dfunc *= 0.5
+        dfunc += 1
@@ -25,9 +25,12 @@ class NewtonRaphson(NewtonRaphsonBase):
         """
         self._increment_method = increment_method_obj
 
-    def compute_solution(self, init_variable):
+    def compute_solution(self, init_variable, initial_guess=None):
         """
         Compute the solution through Newton-Raphson algorithm
+
+        :param init_variable: value of the variable at the beginning of the step
+        :param initial_guess: first iterate (init_variable if None)
         """
         # This case should never append but has been discovered in Unittests...
         if init_variable.size == 0:
@@ -40,7 +43,7 @@ class NewtonRaphson(NewtonRaphsonBase):
         non_conv = np.ndarray(var_i.shape, dtype=bool, order='C')
 
         # Newton's parameters initialization
-        var_i[:] = init_variable
+        var_i[:] = init_variable if initial_guess is None else initial_guess
         non_conv[:] = True
         is_conv = False
         nit = 0  # Number of iterations
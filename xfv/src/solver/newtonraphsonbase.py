@@ -28,9 +28,26 @@ class NewtonRaphsonBase(metaclass=ABCMeta):
         """
         return self.__nb_iterations_max
 
+    @property
+    def telemetry(self):
+        """
+        Returns the convergence statistics (None if not recorded)
+        """
+        return None
+
+    @property
+    def uses_initial_guess(self):
+        """
+        Returns True if the solver takes advantage of an initial guess close to the solution
+        """
+        return False
+
     @abstractmethod
-    def compute_solution(self, init_variable):
+    def compute_solution(self, init_variable, initial_guess=None):
         """
         Compute the solution
+
+        :param init_variable: value of the variable at the beginning of the step
+        :param initial_guess: first iterate (init_variable if None)
         """
         raise NotImplementedError
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+WarmStartedNewtonRaphson module unit tests
+"""
+import unittest
+import numpy as np
+
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.solver.functionstosolve.vnrenergyevolutionforveformulation import (
+    VnrEnergyEvolutionForVolumeEnergyFormulation)
+from xfv.src.solver.newtonraphson import NewtonRaphson
+from xfv.src.solver.warmstartednewtonraphson import (NewtonRaphsonTelemetry,
+                                                      WarmStartedNewtonRaphson)
+
+
+class WarmStartedNewtonRaphsonTest(unittest.TestCase):
+    """
+    Test case for the WarmStartedNewtonRaphson solver on the VNR internal energy evolution
+    """
+    def setUp(self):
+        rng = np.random.RandomState(11)
+        size = 500
+        density = rng.uniform(8000., 11000., size)
+        self.variables = {'EquationOfState': MieGruneisen(),
+                          'OldSpecificVolume': 1. / density,
+                          'NewSpecificVolume': 1. / (density * rng.uniform(0.98, 1.02, size)),
+                          'Pressure': rng.uniform(0., 2.e+10, size),
+                          'OldEnergy': rng.uniform(0., 1.e+06, size)}
+        self.function = VnrEnergyEvolutionForVolumeEnergyFormulation()
+
+    def __solve(self, solver, initial_guess=None):
+        """
+        Returns the solution of the internal energy evolution
+        """
+        self.function.set_variables(self.variables)
+        try:
+            if initial_guess is None:
+                return solver.compute_solution(self.variables['OldEnergy'])
+            return solver.compute_solution(self.variables['OldEnergy'], initial_guess)
+        finally:
+            self.function.eraseVariables()
+
+    def test_same_solution_as_newton_raphson(self):
+        """
+        Test that without initial guess the solution is the one of the NewtonRaphson solver
+        and that the workspaces may be reused with different sizes
+        """
+        solver = WarmStartedNewtonRaphson(self.function)
+        expected = self.__solve(NewtonRaphson(self.function))
+        np.testing.assert_array_equal(self.__solve(solver), expected)
+        self.variables = {key: value[:10] if isinstance(value, np.ndarray) else value
+                          for key, value in self.variables.items()}
+        np.testing.assert_array_equal(self.__solve(solver), expected[:10])
+
+    def test_initial_guess(self):
+        """
+        Test that a good initial guess reduces the number of iterations
+        """
+        solver = WarmStartedNewtonRaphson(self.function)
+        solution = self.__solve(solver)
+        solver.telemetry.end_step()
+        cold_histogram = solver.telemetry.histogram.copy()
+        cold_max_iterations = solver.telemetry.max_iterations
+        np.testing.assert_allclose(self.__solve(solver, solution), solution, rtol=1.e-12)
+        solver.telemetry.end_step()
+        warm_histogram = solver.telemetry.histogram - cold_histogram
+        self.assertEqual(cold_histogram.sum(), 500)
+        self.assertEqual(warm_histogram.sum(), 500)
+        self.assertLess(np.flatnonzero(warm_histogram)[-1], cold_max_iterations)
+        self.assertEqual(solver.telemetry.non_converged, 0)
+        self.assertEqual(solver.telemetry.nb_steps, 2)
+        self.assertEqual(solver.telemetry.max_iterations, cold_max_iterations)
+        self.assertEqual(solver.telemetry.max_iterations_step, 0)
+        self.assertIn("non converged cells : 0", solver.telemetry.summary())
+
+    def test_telemetry_aggregates(self):
+        """
+        Test that the telemetry only keeps running aggregates whatever the number of steps
+        """
+        telemetry = NewtonRaphsonTelemetry(10)
+        for step in range(1000):
+            telemetry.record(2, 5)
+            telemetry.record(7 if step == 400 else 3, 1)
+            telemetry.end_step()
+        self.assertEqual(telemetry.nb_steps, 1000)
+        self.assertEqual(telemetry.histogram.shape, (11,))
+        self.assertEqual(telemetry.histogram[2], 5000)
+        self.assertEqual(telemetry.histogram[3], 999)
+        self.assertEqual(telemetry.max_iterations, 7)
+        self.assertEqual(telemetry.max_iterations_step, 400)
+        self.assertFalse(telemetry.step_histogram.any())
+        self.assertIn("maximum of 7 iterations at step 400", telemetry.summary())
+
+    def test_non_convergence(self):
+        """
+        Test that a ValueError is raised and the non converged cells recorded if the
+        maximum number of iterations is reached
+        """
+        solver = WarmStartedNewtonRaphson(self.function, nb_iterations_max=1)
+        with self.assertRaises(ValueError):
+            self.__solve(solver)
+        solver.telemetry.end_step()
+        self.assertGreater(solver.telemetry.non_converged, 0)
+        self.assertEqual(solver.telemetry.non_converged + solver.telemetry.histogram.sum(), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
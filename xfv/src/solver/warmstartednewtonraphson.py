@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Implements the WarmStartedNewtonRaphson class and the NewtonRaphsonTelemetry class
+"""
+import os
+
+import numpy as np
+from xfv.src.solver.incrementmethods.classicalnewtonraphson import ClassicalNewtonRaphsonIncrement
+from xfv.src.solver.newtonraphsonbase import NewtonRaphsonBase
+from xfv.src.solver.newtonraphson import EPSILON, PRECISION
+
+
+class NewtonRaphsonTelemetry:
+    """
+    Convergence statistics of a Newton-Raphson solver : histogram of the number of
+    iterations needed by the cells to converge, number of non converged cells and
+    highest number of iterations reached by a step.
+    Only running aggregates are kept so that the memory used does not depend on the
+    number of time steps
+    """
+    def __init__(self, nb_iterations_max: int):
+        """
+        :param nb_iterations_max: maximum number of iterations of the solver
+        """
+        self.histogram = np.zeros(nb_iterations_max + 1, dtype=np.int64)
+        self.non_converged = 0
+        self.nb_steps = 0
+        # Highest number of iterations reached and first step where it was reached
+        self.max_iterations = -1
+        self.max_iterations_step = -1
+        self.step_histogram = np.zeros(nb_iterations_max + 1, dtype=np.int64)
+        self.step_non_converged = 0
+
+    def record(self, nb_iterations: int, nb_cells: int):
+        """
+        Record that nb_cells cells have converged in nb_iterations iterations
+
+        :param nb_iterations: number of iterations
+        :param nb_cells: number of cells
+        """
+        self.step_histogram[nb_iterations] += nb_cells
+
+    def record_non_converged(self, nb_cells: int):
+        """
+        Record that nb_cells cells have not converged
+
+        :param nb_cells: number of cells
+        """
+        self.step_non_converged += nb_cells
+
+    def end_step(self):
+        """
+        Close the statistics of the current time step and add them to the aggregates
+        """
+        reached = np.flatnonzero(self.step_histogram)
+        if reached.size and reached[-1] > self.max_iterations:
+            self.max_iterations = int(reached[-1])
+            self.max_iterations_step = self.nb_steps
+        self.histogram += self.step_histogram
+        self.non_converged += self.step_non_converged
+        self.nb_steps += 1
+        self.step_histogram[:] = 0
+        self.step_non_converged = 0
+
+    def summary(self) -> str:
+        """
+        Returns a summary of the statistics of the run
+        """
+        total = self.histogram.sum()
+        message = "Newton-Raphson convergence over {:d} steps ({:d} cell solves) :".format(
+            self.nb_steps, total)
+        for nb_iterations in np.flatnonzero(self.histogram):
+            message += os.linesep + " -- {:>3d} iteration(s) : {:>12d} ({:6.2f} %)".format(
+                nb_iterations, self.histogram[nb_iterations],
+                100. * self.histogram[nb_iterations] / total)
+        if self.max_iterations >= 0:
+            message += os.linesep + " -- maximum of {:d} iterations at step {:d}".format(
+                self.max_iterations, self.max_iterations_step)
+        message += os.linesep + " -- non converged cells : {:d}".format(self.non_converged)
+        return message
+
+
+class WarmStartedNewtonRaphson(NewtonRaphsonBase):
+    """
+    Newton-Raphson solver working on persistent workspaces :
+        - the cells that have converged are removed from the computation (compaction
+          of the active set), so that each iteration only computes the remaining cells
+        - the iterations start from an initial guess given by the caller (for example an
+          extrapolation of the previous steps)
+        - convergence statistics are recorded in a NewtonRaphsonTelemetry object
+
+    The function to vanish must implement init_compact_variables, compact_variables and
+    compute_compact_function_and_derivative.
+    Each cell follows the same iterations as with the NewtonRaphson solver, the
+    convergence criterion being the same.
+    """
+    def __init__(self, function_to_vanish, nb_iterations_max=100):
+        super().__init__(function_to_vanish, nb_iterations_max, ClassicalNewtonRaphsonIncrement())
+        # Rows : variable, function, derivative of the function
+        self.__workspace = np.zeros((3, 0))
+        # Position of the cells of the workspace in the solution
+        self.__cell_index = np.zeros(0, dtype=np.int64)
+        self.__telemetry = NewtonRaphsonTelemetry(nb_iterations_max)
+
+    @property
+    def telemetry(self):
+        """
+        Returns the convergence statistics
+        """
+        return self.__telemetry
+
+    @property
+    def uses_initial_guess(self):
+        """
+        The solver takes advantage of an initial guess close to the solution
+        """
+        return True
+
+    def __get_workspace(self, size):
+        """
+        Returns the workspace, reallocated only if too small
+        """
+        if self.__workspace.shape[1] < size:
+            self.__workspace = np.zeros((3, size))
+            self.__cell_index = np.zeros(size, dtype=np.int64)
+        return self.__workspace, self.__cell_index
+
+    def compute_solution(self, init_variable, initial_guess=None):
+        """
+        Compute the solution through Newton-Raphson algorithm
+
+        :param init_variable: value of the variable at the beginning of the step
+        :param initial_guess: first iterate (init_variable if None)
+        """
+        if init_variable.size == 0:
+            return init_variable
+
+        size = init_variable.size
+        solution = np.array(init_variable if initial_guess is None else initial_guess,
+                            dtype=np.float64, order='C')
+        workspace, cell_index = self.__get_workspace(size)
+        workspace[0, :size] = solution
+        cell_index[:size] = np.arange(size)
+        self.function.init_compact_variables()
+
+        nb_active = size
+        nit = 0  # Number of iterations
+        while nit < self.nb_iterations_max:
+            var_i, func_i, dfunc_i = workspace[:, :nb_active]
+            self.function.compute_compact_function_and_derivative(var_i, func_i, dfunc_i)
+            delta = self._increment_method.computeIncrement(func_i, dfunc_i)
+            non_conv = abs(func_i) >= EPSILON * abs(delta) + PRECISION
+            nb_non_conv = np.count_nonzero(non_conv)
+            if nb_non_conv < nb_active:
+                conv = ~non_conv
+                solution[cell_index[:nb_active][conv]] = var_i[conv]
+                self.__telemetry.record(nit, nb_active - nb_non_conv)
+            if nb_non_conv == 0:
+                return solution
+            # Compaction of the active set and increment
+            workspace[0, :nb_non_conv] = var_i[non_conv] + delta[non_conv]
+            if nb_non_conv < nb_active:
+                cell_index[:nb_non_conv] = cell_index[:nb_active][non_conv]
+                self.function.compact_variables(non_conv)
+            nb_active = nb_non_conv
+            nit += 1
+
+        # Error if non convergence
+        self.__telemetry.record_non_converged(nb_active)
+        msg = ("Erreur de convergence du NR\n"
+               f"func_i = {func_i}\n"
+               f"delta = {delta}\n"
+               f"nit = {nit}")
+        raise ValueError(msg)
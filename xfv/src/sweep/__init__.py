@@ -0,0 +1,3 @@
+"""
+Package for parameter sweep modules
+"""
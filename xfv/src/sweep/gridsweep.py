@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Sweep of a case on a grid of parameters, the variants being run by a pool of processes
+
+The grid is described in a JSON file :
+
+    {
+      "parameters": {
+        "matter/projectile/initialization/initial-velocity": [500.0, 654.0, 800.0],
+        "matter/target/failure/failure-criterion/value": [6e+9, 8e+9],
+        "mesh-refinement": [1, 2]
+      },
+      "retries": 1
+    }
+
+- each key of parameters is the path of a value of the XDATA.json file (the keys of the
+  blocks being separated by /, the items of a list being given by their index)
+- mesh-refinement : each cell of the mesh of the case is split in the given number of cells
+- retries : number of times a failed variant is run again (default 0)
+
+The variants (cartesian product of the values) are written in <work-directory>/<variant>
+and run by a pool of processes, each simulation running in its own SimulationContext.
+The results (wall time, number of steps, number of discontinuities, peak of the free
+surface velocity) are printed as the variants end and written in results.csv.
+
+Example: xfv-sweep <case-directory> grid.json --workers 4
+"""
+import argparse
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+from pathlib import Path
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.sweep.parametersweep import LOG_FILE, relocate_data
+from xfv.XtendedFiniteVolume import main as run_simulation
+
+MESH_REFINEMENT = "mesh-refinement"
+RESULTS_FILE = "results.csv"
+RESULT_COLUMNS = ("status", "attempts", "wall_time", "steps", "discontinuities",
+                  "free_surface_velocity_peak", "error")
+
+
+def read_grid(grid_file: Path) -> Dict[str, object]:
+    """
+    Returns the parameters (name -> list of values) and the number of retries of the grid file
+
+    :param grid_file: path to the JSON file describing the grid
+    """
+    with grid_file.open('r') as file_in:
+        grid = json.load(file_in)
+    parameters = grid.get("parameters")
+    if not parameters or not all(isinstance(values, list) and values
+                                 for values in parameters.values()):
+        raise ValueError("The grid file {} must give a non empty list of values for each "
+                         "parameter".format(grid_file))
+    if any(not isinstance(value, int) or value < 1
+           for value in parameters.get(MESH_REFINEMENT, [1])):
+        raise ValueError("The values of {} must be strictly positive integers"
+                         .format(MESH_REFINEMENT))
+    retries = grid.get("retries", 0)
+    if not isinstance(retries, int) or retries < 0:
+        raise ValueError("retries must be a positive integer")
+    return {"parameters": parameters, "retries": retries}
+
+
+def expand_grid(parameters: Dict[str, list]) -> List[Dict[str, object]]:
+    """
+    Returns the variants of the grid (cartesian product of the values of the parameters),
+    each variant being named after its index
+
+    :param parameters: the values of each parameter
+    """
+    names = list(parameters)
+    variants = []
+    for index, values in enumerate(itertools.product(*parameters.values())):
+        variant = {"name": "variant_{:04d}".format(index)}
+        variant.update(zip(names, values))
+        variants.append(variant)
+    return variants
+
+
+def set_value(data: dict, key: str, value):
+    """
+    Set the value of the XDATA item given by its path
+
+    :param data: content of the XDATA.json file (modified in place)
+    :param key: path of the item, the keys being separated by /
+    :param value: the new value
+    """
+    *parents, last = key.split("/")
+    container = data
+    try:
+        for name in parents:
+            container = container[int(name) if isinstance(container, list) else name]
+        if isinstance(container, list):
+            container[int(last)] = value
+        elif last in container:
+            container[last] = value
+        else:
+            raise KeyError(last)
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError("The parameter {} is not an item of the data of the case"
+                         .format(key)) from None
+
+
+def refine_mesh(coordinates: np.ndarray, refinement: int) -> np.ndarray:
+    """
+    Returns the coordinates of the nodes of the mesh whose cells are split in refinement cells
+
+    :param coordinates: coordinates of the nodes of the mesh
+    :param refinement: number of cells each cell is split in
+    """
+    fractions = np.arange(refinement) / refinement
+    starts = coordinates[:-1, np.newaxis]
+    refined = starts + fractions * np.diff(coordinates)[:, np.newaxis]
+    return np.append(refined.ravel(), coordinates[-1])
+
+
+def _write_mesh(path: Path, coordinates: np.ndarray):
+    """
+    Write the coordinates of the nodes in a mesh file (same format as generate_mesh)
+    """
+    with path.open('w') as file_out:
+        file_out.write('Mesh : initial coordinates of the nodes')
+        file_out.write(os.linesep)
+        file_out.write('Node Number    X coordinate [m]     Y coordinate [m]     Z coordinate [m]')
+        file_out.write(os.linesep)
+        for index, coordinate in enumerate(coordinates):
+            file_out.write('{}         {:+10.9e}'.format(index, coordinate))
+            file_out.write(os.linesep)
+
+
+def write_variant(directory: Path, data: dict, coordinates: np.ndarray, variant: dict):
+    """
+    Create the directory of a variant with its data and mesh files
+
+    :param directory: directory of the variant
+    :param data: content of the XDATA.json file of the case (with absolute paths)
+    :param coordinates: coordinates of the nodes of the mesh of the case
+    :param variant: the variant (name and values of the parameters)
+    """
+    variant_data = json.loads(json.dumps(data))
+    for key, value in variant.items():
+        if key not in ("name", MESH_REFINEMENT):
+            set_value(variant_data, key, value)
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / "XDATA.json").open('w') as file_out:
+        json.dump(variant_data, file_out, indent=2)
+    _write_mesh(directory / "mesh.txt",
+                refine_mesh(coordinates, variant.get(MESH_REFINEMENT, 1)))
+
+
+class FreeSurfaceVelocityPeak:  # pylint: disable=too-few-public-methods
+    """
+    Step callback recording the maximum of the velocity of the last node of the mesh
+    """
+    def __init__(self):
+        self.peak = -math.inf
+
+    def __call__(self, context: SimulationContext):
+        self.peak = max(self.peak, float(context.mesh.nodes.umundemi[-1, 0]))
+
+
+def _error_message(error: Exception) -> str:
+    """
+    Returns the type and the first line of the message of the error
+    """
+    lines = str(error).splitlines()
+    return "{}: {}".format(type(error).__name__, lines[0] if lines else "")
+
+
+def _init_worker():
+    """
+    Initialization of the processes of the pool
+    """
+    plt.switch_backend("Agg")
+
+
+def run_variant(directory: Path, threads: Optional[int] = None,
+                use_internal_solver: bool = False) -> Dict[str, object]:
+    """
+    Run the simulation of the variant in the current process and returns its results. The
+    output of the simulation is written in the LOG_FILE file of the directory.
+
+    :param directory: directory of the variant
+    :param threads: number of threads of the compiled internal energy solver
+    :param use_internal_solver: if True the internal energy is solved with the python solver
+    """
+    directory = directory.resolve()
+    context = SimulationContext(directory.name)
+    context.use_internal_solver = use_internal_solver
+    free_surface = FreeSurfaceVelocityPeak()
+    context.step_callbacks.append(free_surface)
+    result = {"status": "ok", "error": ""}
+    start_time = time.perf_counter()
+    initial_directory = os.getcwd()
+    # The output paths are relative to the working directory
+    os.chdir(directory)
+    try:
+        with (directory / LOG_FILE).open('w') as log, contextlib.redirect_stdout(log), \
+                contextlib.redirect_stderr(log):
+            try:
+                run_simulation(Path("."), threads, context=context)
+            except Exception as error:  # pylint: disable=broad-except
+                traceback.print_exc()
+                result.update(status="failed", error=_error_message(error))
+    finally:
+        os.chdir(initial_directory)
+    registry = context.discontinuities
+    result.update(wall_time=time.perf_counter() - start_time, steps=context.step,
+                  discontinuities=len(registry.discontinuities),
+                  free_surface_velocity_peak=free_surface.peak
+                  if math.isfinite(free_surface.peak) else math.nan)
+    return result
+
+
+def _format_result(name: str, result: Dict[str, object]) -> str:
+    """
+    Returns a line of the results table
+    """
+    if result["status"] != "ok":
+        return "{:<14s} {:<8s} {:>10.1f} s  {}".format(name, result["status"],
+                                                       result.get("wall_time", math.nan),
+                                                       result["error"])
+    return "{:<14s} {:<8s} {:>10.1f} s {:>10d} steps {:>5d} disc {:>10.2f} m/s".format(
+        name, result["status"], result["wall_time"], result["steps"],
+        result["discontinuities"], result["free_surface_velocity_peak"])
+
+
+def run_sweep(variants: List[dict], work_directory: Path, workers: Optional[int] = None,
+              retries: int = 0, use_internal_solver: bool = False,
+              threads: Optional[int] = None) -> Dict[str, Dict[str, object]]:
+    """
+    Run the variants with a pool of processes, printing their results as they end. The
+    failed variants are run again (at most retries times). Returns the results by variant.
+
+    :param variants: the variants (already written in the work directory)
+    :param work_directory: directory of the sweep
+    :param workers: number of processes (default the number of processors)
+    :param retries: number of times a failed variant is run again
+    :param use_internal_solver: if True the internal energy is solved with the python solver
+    :param threads: number of threads of the compiled internal energy solver
+    """
+    workers = workers if workers is not None else os.cpu_count()
+    results = {}
+    attempts = {variant["name"]: 0 for variant in variants}
+    pending = [variant["name"] for variant in variants]
+    while pending:
+        # A new pool is created if one of the processes died (the pool is then broken)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(run_variant, work_directory / name, threads,
+                                       use_internal_solver): name
+                       for name in pending}
+            pending = []
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                attempts[name] += 1
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    result = {"status": "failed", "error": "a process of the pool died"}
+                except Exception as error:  # pylint: disable=broad-except
+                    result = {"status": "failed", "error": _error_message(error)}
+                result["attempts"] = attempts[name]
+                if result["status"] != "ok" and attempts[name] <= retries:
+                    print("{:<14s} failed ({}), run again".format(name, result["error"]))
+                    pending.append(name)
+                    continue
+                results[name] = result
+                print("[{:d}/{:d}] {}".format(len(results), len(variants),
+                                              _format_result(name, result)), flush=True)
+    return results
+
+
+def write_results(path: Path, variants: List[dict], results: Dict[str, Dict[str, object]]):
+    """
+    Write the results table in a CSV file (one line per variant with its parameters)
+
+    :param path: path of the CSV file
+    :param variants: the variants
+    :param results: the results by variant
+    """
+    parameters = [key for key in variants[0] if key != "name"]
+    with path.open('w', newline='') as file_out:
+        writer = csv.writer(file_out)
+        writer.writerow(["name"] + parameters + list(RESULT_COLUMNS))
+        for variant in variants:
+            result = results[variant["name"]]
+            writer.writerow([variant["name"]] + [variant[key] for key in parameters] +
+                            [result.get(column, "") for column in RESULT_COLUMNS])
+
+
+def main(case_directory: Path, grid_file: Path, work_directory: Optional[Path] = None,  # pylint: disable=too-many-arguments
+         workers: Optional[int] = None, use_internal_solver: bool = False,
+         threads: Optional[int] = None) -> Dict[str, Dict[str, object]]:
+    """
+    Write the variants of the grid and run them. Returns the results by variant
+
+    :param case_directory: directory of the case
+    :param grid_file: path to the JSON file describing the grid
+    :param work_directory: directory of the runs (default <case-directory>/grid_sweep)
+    :param workers: number of processes (default the number of processors)
+    :param use_internal_solver: if True the internal energy is solved with the python solver
+    :param threads: number of threads of the compiled internal energy solver
+    """
+    case_directory = case_directory.resolve()
+    work_directory = (case_directory / "grid_sweep" if work_directory is None
+                      else work_directory).resolve()
+    grid = read_grid(grid_file)
+    variants = expand_grid(grid["parameters"])
+    with (case_directory / "XDATA.json").open('r') as file_in:
+        data = relocate_data(json.load(file_in), case_directory)
+    coordinates = np.loadtxt(case_directory / "mesh.txt", dtype=np.float64, skiprows=2,
+                             usecols=(1,))
+    for variant in variants:
+        write_variant(work_directory / variant["name"], data, coordinates, variant)
+    print("Running {:d} variants in {}".format(len(variants), work_directory), flush=True)
+
+    results = run_sweep(variants, work_directory, workers, grid["retries"],
+                        use_internal_solver, threads)
+    write_results(work_directory / RESULTS_FILE, variants, results)
+    print("Results written in {}".format(work_directory / RESULTS_FILE))
+    return results
+
+
+def command_line(arguments: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the xfv-sweep command. Returns the exit code (1 if a variant failed)
+
+    :param arguments: command line arguments (default sys.argv)
+    """
+    parser = argparse.ArgumentParser(prog="xfv-sweep", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("case_directory", type=Path, help="Path toward the data directory")
+    parser.add_argument("grid_file", type=Path, help="JSON file describing the grid")
+    parser.add_argument("--work-directory", type=Path, default=None,
+                        help="Directory of the runs (default <case-directory>/grid_sweep)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes (default the number of processors)")
+    parser.add_argument("--use-internal-solver", action="store_true",
+                        help="Do not use external library to solve internal energy evolution")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Number of threads of the compiled internal energy solver")
+    args = parser.parse_args(arguments)
+    results = main(args.case_directory, args.grid_file, args.work_directory, args.workers,
+                   args.use_internal_solver, args.threads)
+    return 0 if all(result["status"] == "ok" for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(command_line())
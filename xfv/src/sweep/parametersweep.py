@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweep on the cohesive and contact models from a common pre-fracture state
+
+The loading phase of a case does not depend on the cohesive zone model nor on the contact
+model of the discontinuities. It is computed once (prefix run), up to the beginning of the
+iteration of the first rupture, whose state is saved in a checkpoint. Each variant of the
+sweep is then restarted from this checkpoint with its own cohesive and contact parameters.
+
+The variants are described in a JSON file :
+
+    {
+      "variants": [
+        {"name": "strength_6e9",
+         "cohesive-model": {"coefficients": {"cohesive-strength": 6e+9}}},
+        {"name": "progressive",
+         "unloading-model": {"name": "progressiveunloading", "slope": 1e+16}},
+        {"name": "stiff_contact", "penalty-stiffness": 1e+18}
+      ]
+    }
+
+- cohesive-model : merged into the cohesive-model block of the target failure data
+- unloading-model : replaces the unloading-model block of the cohesive model
+- penalty-stiffness : penalty stiffness of the contact treatment
+
+Example: python -m xfv.src.sweep.parametersweep <case-directory> sweep.json
+"""
+import argparse
+import copy
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from xfv.src.checkpoint.checkpointmanager import CheckpointManager
+
+SWEEP_KEYS = ("cohesive-model", "unloading-model", "penalty-stiffness")
+PREFIX_NAME = "prefix"
+PREFIX_CHECKPOINT_PATH = "checkpoints"
+LOG_FILE = "xfv.log"
+# Root of the xfv package, added to the PYTHONPATH of the runs
+PACKAGE_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _merge(target: dict, overrides: dict):
+    """
+    Recursively merge the overrides into target
+    """
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _absolute_paths(data, case_directory: Path):
+    """
+    Replace the relative paths of the existing files of the case by absolute paths so
+    that the data can be used from another directory
+    """
+    if isinstance(data, dict):
+        return {key: _absolute_paths(value, case_directory) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_absolute_paths(value, case_directory) for value in data]
+    if isinstance(data, str) and not Path(data).is_absolute() and data:
+        path = case_directory / data
+        if path.exists():
+            return str(path.resolve())
+    return data
+
+
+def relocate_data(data: dict, case_directory: Path) -> dict:
+    """
+    Returns a copy of the data of the case whose relative paths (equation of state
+    coefficients, tables...) are made absolute. The output paths are kept relative
+    to the run directory.
+
+    :param data: content of the XDATA.json file
+    :param case_directory: directory of the case
+    """
+    relocated = {key: (copy.deepcopy(value) if key == 'output'
+                       else _absolute_paths(value, case_directory))
+                 for key, value in data.items()}
+    return relocated
+
+
+def apply_variant(data: dict, variant: dict) -> dict:
+    """
+    Returns a copy of the data modified by the variant
+
+    :param data: content of the XDATA.json file
+    :param variant: the variant (name and values of SWEEP_KEYS)
+    """
+    unknown_keys = set(variant).difference(("name",) + SWEEP_KEYS)
+    if unknown_keys:
+        raise ValueError("Unknown keys {} in the variant {}. Only the keys {} can be swept"
+                         .format(sorted(unknown_keys), variant.get("name"), SWEEP_KEYS))
+    data = copy.deepcopy(data)
+    matter = data['matter']
+    failure = matter.get('target', matter).get('failure', {})
+    if "cohesive-model" in variant or "unloading-model" in variant:
+        if "cohesive-model" not in failure:
+            raise ValueError("The variant {} modifies the cohesive model but the case has no "
+                             "cohesive model".format(variant.get("name")))
+        _merge(failure['cohesive-model'], variant.get("cohesive-model", {}))
+        if "unloading-model" in variant:
+            failure['cohesive-model']['unloading-model'] = copy.deepcopy(
+                variant["unloading-model"])
+    if "penalty-stiffness" in variant:
+        contact = failure.get('contact-treatment')
+        if contact is None or contact['name'].lower() != "penalty":
+            raise ValueError("The variant {} modifies the penalty stiffness but the contact "
+                             "treatment of the case is not Penalty".format(variant.get("name")))
+        contact['penalty-stiffness'] = variant["penalty-stiffness"]
+    return data
+
+
+def read_variants(sweep_file: Path) -> List[dict]:
+    """
+    Returns the variants of the sweep file, checking that their names are unique
+
+    :param sweep_file: path to the JSON file describing the variants
+    """
+    with sweep_file.open('r') as file_in:
+        variants = json.load(file_in)['variants']
+    names = [variant.get("name") for variant in variants]
+    if None in names or len(set(names)) != len(names) or PREFIX_NAME in names:
+        raise ValueError("Each variant must have a unique name (different from {})"
+                         .format(PREFIX_NAME))
+    return variants
+
+
+def _write_case(directory: Path, data: dict, mesh_file: Path):
+    """
+    Create the directory of a run with its data and mesh files
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / "XDATA.json").open('w') as file_out:
+        json.dump(data, file_out, indent=2)
+    shutil.copyfile(mesh_file, directory / "mesh.txt")
+
+
+def run_xfv(directory: Path, options: List[str]) -> int:
+    """
+    Run XtendedFiniteVolume in the directory (in a separate process, the output being
+    written in the LOG_FILE file) and returns its exit code
+
+    :param directory: directory of the run
+    :param options: command line options
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PACKAGE_ROOT),
+                                                      env.get("PYTHONPATH")]))
+    env.setdefault("MPLBACKEND", "Agg")
+    with (directory / LOG_FILE).open('w') as log:
+        return subprocess.run([sys.executable, "-m", "xfv.XtendedFiniteVolume", "."] + options,
+                              cwd=directory, env=env, stdout=log, stderr=subprocess.STDOUT,
+                              check=False).returncode
+
+
+def run_prefix(case_directory: Path, work_directory: Path, data: dict,
+               options: List[str]) -> Path:
+    """
+    Run the case up to the first rupture and returns the path of the checkpoint
+    saved at the beginning of the iteration of the first rupture
+
+    :param case_directory: directory of the case
+    :param work_directory: directory of the sweep
+    :param data: content of the XDATA.json file (with absolute paths)
+    :param options: command line options of the runs
+    """
+    prefix_directory = work_directory / PREFIX_NAME
+    data = copy.deepcopy(data)
+    data['output']['checkpoint'] = {"path": PREFIX_CHECKPOINT_PATH,
+                                    "before-first-rupture": True, "retention": 1}
+    _write_case(prefix_directory, data, case_directory / "mesh.txt")
+    return_code = run_xfv(prefix_directory, options + ["--stop-at-first-rupture"])
+    checkpoint = (prefix_directory / PREFIX_CHECKPOINT_PATH /
+                  CheckpointManager.PRE_RUPTURE_FILE)
+    if return_code != 0:
+        raise RuntimeError("The prefix run failed (see {})".format(prefix_directory / LOG_FILE))
+    if not checkpoint.exists():
+        raise RuntimeError("No rupture happened during the prefix run : the variants would "
+                           "all be identical to the case")
+    return checkpoint
+
+
+def copy_outputs(data: dict, source_directory: Path, directory: Path):
+    """
+    Copy the output databases and probes of a run in the directory of another one
+
+    :param data: content of the XDATA.json file
+    :param source_directory: directory of the run whose outputs are copied
+    :param directory: directory of the run restarted from these outputs
+    """
+    output = data['output']
+    for database in output['database'] + output.get('probes', []):
+        shutil.copyfile(source_directory / database['path'], directory / database['path'])
+
+
+def run_variant(case_directory: Path, work_directory: Path, data: dict,  # pylint: disable=too-many-arguments
+                variant: dict, checkpoint: Path, options: List[str]) -> Dict[str, object]:
+    """
+    Run a variant from the pre-fracture checkpoint and returns its name, directory,
+    exit code and wall time
+
+    :param case_directory: directory of the case
+    :param work_directory: directory of the sweep
+    :param data: content of the XDATA.json file (with absolute paths)
+    :param variant: the variant
+    :param checkpoint: checkpoint saved before the first rupture
+    :param options: command line options of the runs
+    """
+    directory = work_directory / variant["name"]
+    variant_data = apply_variant(data, variant)
+    if 'checkpoint' in variant_data['output']:
+        variant_data['output']['checkpoint']['before-first-rupture'] = False
+    _write_case(directory, variant_data, case_directory / "mesh.txt")
+    # The outputs of the loading phase are shared
+    copy_outputs(data, checkpoint.parents[1], directory)
+    start_time = time.perf_counter()
+    return_code = run_xfv(directory, options + ["--restart", str(checkpoint.resolve())])
+    return {"name": variant["name"], "directory": directory, "return_code": return_code,
+            "wall_time": time.perf_counter() - start_time}
+
+
+def main(case_directory: Path, sweep_file: Path, work_directory: Optional[Path] = None,
+         options: Optional[List[str]] = None) -> List[Dict[str, object]]:
+    """
+    Run the prefix of the case then each variant of the sweep file from its
+    pre-fracture checkpoint. Returns the results of the variants
+
+    :param case_directory: directory of the case
+    :param sweep_file: path to the JSON file describing the variants
+    :param work_directory: directory of the runs (default <case-directory>/sweep)
+    :param options: command line options of the runs (for example --use-internal-solver)
+    """
+    case_directory = case_directory.resolve()
+    work_directory = (case_directory / "sweep" if work_directory is None
+                      else work_directory).resolve()
+    options = [] if options is None else list(options)
+    with (case_directory / "XDATA.json").open('r') as file_in:
+        data = relocate_data(json.load(file_in), case_directory)
+    variants = read_variants(sweep_file)
+    for variant in variants:
+        apply_variant(data, variant)  # Check the variants before running anything
+
+    start_time = time.perf_counter()
+    checkpoint = run_prefix(case_directory, work_directory, data, options)
+    print("Prefix run done in {:.1f} s : {}".format(time.perf_counter() - start_time,
+                                                   checkpoint))
+    results = []
+    for variant in variants:
+        result = run_variant(case_directory, work_directory, data, variant, checkpoint, options)
+        status = "ok" if result["return_code"] == 0 else "FAILED ({:d})".format(
+            result["return_code"])
+        print("Variant {:s} : {:s} in {:.1f} s".format(result["name"], status,
+                                                     result["wall_time"]))
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    # pylint: disable=invalid-name
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("case_directory", type=Path, help="Path toward the data directory")
+    parser.add_argument("sweep_file", type=Path, help="JSON file describing the variants")
+    parser.add_argument("--work-directory", type=Path, default=None,
+                        help="Directory of the runs (default <case-directory>/sweep)")
+    parser.add_argument("--use-internal-solver", action="store_true",
+                        help="Do not use external library to solve internal energy evolution")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Number of threads of the compiled internal energy solver")
+    args = parser.parse_args()
+    run_options = ["--use-internal-solver"] if args.use_internal_solver else []
+    if args.threads is not None:
+        run_options += ["--threads", str(args.threads)]
+    sweep_results = main(args.case_directory, args.sweep_file, args.work_directory, run_options)
+    sys.exit(0 if all(result["return_code"] == 0 for result in sweep_results) else 1)
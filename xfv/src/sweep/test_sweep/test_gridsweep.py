@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+gridsweep module unit tests
+"""
+from pathlib import Path
+import csv
+import json
+import tempfile
+import unittest
+
+import numpy as np
+
+from xfv.src.sweep.gridsweep import (expand_grid, read_grid, refine_mesh, set_value,
+                                     write_results, write_variant)
+
+
+class GridSweepTest(unittest.TestCase):
+    """
+    Test case for the preparation of the variants of a grid sweep
+    """
+    def setUp(self):
+        self.data = {
+            "matter": {"projectile": {"initialization": {"initial-velocity": 654.0}},
+                       "target": {"failure": {"failure-criterion": {"name": "MaximalStress",
+                                                                    "value": 8e+9}}}},
+            "output": {"database": [{"identifier": "AllFieldsDb", "path": "all_fields.hdf5",
+                                     "time-period": 1e-06}]}}
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_grid(self, grid: dict) -> Path:
+        """
+        Write the grid in a JSON file
+        """
+        grid_file = self.path / "grid.json"
+        with grid_file.open('w') as file_out:
+            json.dump(grid, file_out)
+        return grid_file
+
+    def test_read_grid(self):
+        """
+        Test the reading of the grid file and its checks
+        """
+        grid = read_grid(self._write_grid({"parameters": {"mesh-refinement": [1, 2]},
+                                           "retries": 2}))
+        self.assertEqual(grid, {"parameters": {"mesh-refinement": [1, 2]}, "retries": 2})
+        for wrong_grid in ({"parameters": {}},
+                           {"parameters": {"numeric-parameters/cfl": []}},
+                           {"parameters": {"mesh-refinement": [0]}},
+                           {"parameters": {"mesh-refinement": [1]}, "retries": -1}):
+            with self.assertRaises(ValueError):
+                read_grid(self._write_grid(wrong_grid))
+
+    def test_expand_grid(self):
+        """
+        Test that the variants are the cartesian product of the values of the parameters
+        """
+        variants = expand_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+        self.assertEqual(len(variants), 6)
+        self.assertEqual(variants[0], {"name": "variant_0000", "a": 1, "b": "x"})
+        self.assertEqual(variants[5], {"name": "variant_0005", "a": 2, "b": "z"})
+
+    def test_set_value(self):
+        """
+        Test the modification of the items of the data given by their path
+        """
+        set_value(self.data, "matter/target/failure/failure-criterion/value", 6e+9)
+        set_value(self.data, "output/database/0/time-period", 1e-07)
+        self.assertEqual(self.data["matter"]["target"]["failure"]["failure-criterion"]["value"],
+                         6e+9)
+        self.assertEqual(self.data["output"]["database"][0]["time-period"], 1e-07)
+        for wrong_key in ("matter/target/failure/failure-criterion/valeur",
+                          "output/database/1/time-period", "output/database/first/path"):
+            with self.assertRaises(ValueError):
+                set_value(self.data, wrong_key, 0.)
+
+    def test_refine_mesh(self):
+        """
+        Test that each cell is split in cells of the same size
+        """
+        np.testing.assert_allclose(refine_mesh(np.array([0., 1., 3.]), 2),
+                                   [0., 0.5, 1., 2., 3.])
+        np.testing.assert_equal(refine_mesh(np.array([0., 1., 3.]), 1), [0., 1., 3.])
+
+    def test_write_variant(self):
+        """
+        Test that the data and mesh files of a variant are written
+        """
+        variant = {"name": "variant_0000", "mesh-refinement": 3,
+                   "matter/projectile/initialization/initial-velocity": 500.}
+        write_variant(self.path / variant["name"], self.data, np.linspace(0., 1.e-03, 11),
+                      variant)
+        with (self.path / "variant_0000" / "XDATA.json").open('r') as file_in:
+            data = json.load(file_in)
+        self.assertEqual(data["matter"]["projectile"]["initialization"]["initial-velocity"], 500.)
+        self.assertEqual(self.data["matter"]["projectile"]["initialization"]["initial-velocity"],
+                         654.)
+        coordinates = np.loadtxt(self.path / "variant_0000" / "mesh.txt", skiprows=2,
+                                 usecols=(1,))
+        np.testing.assert_allclose(coordinates, np.linspace(0., 1.e-03, 31))
+
+    def test_write_results(self):
+        """
+        Test the results table
+        """
+        variants = expand_grid({"numeric-parameters/cfl": [0.3, -1.]})
+        results = {"variant_0000": {"status": "ok", "attempts": 1, "wall_time": 1.5,
+                                    "steps": 10, "discontinuities": 2,
+                                    "free_surface_velocity_peak": 250., "error": ""},
+                   "variant_0001": {"status": "failed", "attempts": 2,
+                                    "error": "ValueError: -1.0 < 0!"}}
+        write_results(self.path / "results.csv", variants, results)
+        with (self.path / "results.csv").open('r') as file_in:
+            rows = list(csv.DictReader(file_in))
+        self.assertEqual(rows[0]["numeric-parameters/cfl"], "0.3")
+        self.assertEqual(rows[0]["steps"], "10")
+        self.assertEqual(rows[1]["status"], "failed")
+        self.assertEqual(rows[1]["steps"], "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+parametersweep module unit tests
+"""
+from pathlib import Path
+import json
+import tempfile
+import unittest
+
+from xfv.src.sweep.parametersweep import apply_variant, copy_outputs, read_variants, \
+    relocate_data
+
+
+class ParameterSweepTest(unittest.TestCase):
+    """
+    Test case for the preparation of the variants of a parameter sweep
+    """
+    def setUp(self):
+        self.data = {
+            "matter": {"target": {"failure": {
+                "cohesive-model": {
+                    "name": "linear",
+                    "coefficients": {"cohesive-strength": 8e+9, "critical-separation": 1e-4},
+                    "unloading-model": {"name": "lossofstiffnessunloading"}},
+                "contact-treatment": {"name": "Penalty", "penalty-stiffness": 1e+17}}}},
+            "output": {"database": [{"identifier": "AllFieldsDb", "path": "all_fields.hdf5"}]}}
+
+    def test_apply_variant(self):
+        """
+        Test that the variants modify the cohesive and contact models of a copy of the data
+        """
+        variant = apply_variant(self.data, {
+            "name": "variant", "cohesive-model": {"coefficients": {"cohesive-strength": 6e+9}},
+            "unloading-model": {"name": "progressiveunloading", "slope": 1e+16},
+            "penalty-stiffness": 1e+18})
+        failure = variant["matter"]["target"]["failure"]
+        self.assertEqual(failure["cohesive-model"]["coefficients"],
+                         {"cohesive-strength": 6e+9, "critical-separation": 1e-4})
+        self.assertEqual(failure["cohesive-model"]["unloading-model"],
+                         {"name": "progressiveunloading", "slope": 1e+16})
+        self.assertEqual(failure["contact-treatment"]["penalty-stiffness"], 1e+18)
+        # The data are not modified
+        self.assertEqual(self.data["matter"]["target"]["failure"]["contact-treatment"]
+                         ["penalty-stiffness"], 1e+17)
+
+    def test_apply_variant_errors(self):
+        """
+        Test that only the cohesive and contact models of the case can be modified
+        """
+        with self.assertRaises(ValueError):
+            apply_variant(self.data, {"name": "variant", "failure-criterion": {"value": 1.}})
+        del self.data["matter"]["target"]["failure"]["contact-treatment"]
+        with self.assertRaises(ValueError):
+            apply_variant(self.data, {"name": "variant", "penalty-stiffness": 1e+18})
+        del self.data["matter"]["target"]["failure"]["cohesive-model"]
+        with self.assertRaises(ValueError):
+            apply_variant(self.data, {"name": "variant",
+                                      "unloading-model": {"name": "lossofstiffnessunloading"}})
+
+    def test_relocate_data(self):
+        """
+        Test that the relative paths of the files of the case are made absolute,
+        except the output ones
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            case = Path(tmp_dir)
+            (case / "coefficients.json").touch()
+            (case / "all_fields.hdf5").touch()
+            self.data["matter"]["target"]["coefficients"] = "coefficients.json"
+            self.data["matter"]["target"]["name"] = "MissingFile"
+            relocated = relocate_data(self.data, case)
+            self.assertEqual(relocated["matter"]["target"]["coefficients"],
+                             str((case / "coefficients.json").resolve()))
+            self.assertEqual(relocated["matter"]["target"]["name"], "MissingFile")
+            self.assertEqual(relocated["output"], self.data["output"])
+
+    def test_copy_outputs(self):
+        """
+        Test that the databases and the probes of the prefix run are copied for a variant
+        """
+        self.data["output"]["probes"] = [{"identifier": "Probes", "path": "probes.hdf5",
+                                          "variables": ["NodeVelocity"], "nodes": [-1]}]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prefix, variant = Path(tmp_dir) / "prefix", Path(tmp_dir) / "variant"
+            prefix.mkdir()
+            variant.mkdir()
+            (prefix / "all_fields.hdf5").write_text("fields")
+            (prefix / "probes.hdf5").write_text("probes")
+            copy_outputs(self.data, prefix, variant)
+            self.assertEqual((variant / "all_fields.hdf5").read_text(), "fields")
+            self.assertEqual((variant / "probes.hdf5").read_text(), "probes")
+
+    def test_read_variants(self):
+        """
+        Test that the names of the variants must be unique
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sweep_file = Path(tmp_dir) / "sweep.json"
+            sweep_file.write_text(json.dumps({"variants": [{"name": "a"}, {"name": "b"}]}))
+            self.assertEqual([variant["name"] for variant in read_variants(sweep_file)],
+                             ["a", "b"])
+            sweep_file.write_text(json.dumps({"variants": [{"name": "a"}, {"name": "a"}]}))
+            with self.assertRaises(ValueError):
+                read_variants(sweep_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 """
 Package for utilities modules
 """
-from .profilingperso import timeit_file
+from .profilingperso import timeit_file, PhaseProfiler
 from .singleton import Singleton
 from .stress_invariants_calculation import compute_second_invariant, compute_trace
 from .testing import captured_output
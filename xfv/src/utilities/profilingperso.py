@@ -4,14 +4,19 @@
 A simple module for simple profiling
 """
 
+import json
 import os
 import sys
 from collections import OrderedDict
-from time import perf_counter, time, sleep
+from time import perf_counter, perf_counter_ns, time, sleep
 
 
 CUMUL_TIMES = OrderedDict()
 
+# Phases of the time loop of XtendedFiniteVolume
+PHASES = ("velocities", "contact", "sizes", "density", "porosity", "elasticity", "plasticity",
+          "pseudo", "pressure", "rupture", "forces", "time step", "output", "figures")
+
 
 def timeit_file(filename=None):
     """
@@ -77,6 +82,108 @@ def logit(func):
     return wrapper
 
 
+class PhaseProfiler:
+    """
+    A low overhead profiler of the phases of a loop. The time elapsed since the previous
+    lap (or start) is added to the phase given at each lap, so that consecutive laps cover
+    the whole loop.
+
+    >>> profiler = PhaseProfiler(("compute", "output"))
+    >>> profiler.start()
+    >>> for step in range(10):
+    ...     compute()
+    ...     profiler.lap("compute")
+    ...     write()
+    ...     profiler.lap("output")
+    ...     profiler.end_step()
+    >>> print(profiler.table())
+    """
+
+    def __init__(self, phases=PHASES):
+        """
+        :param phases: names of the phases
+        """
+        self.totals = OrderedDict((phase, 0) for phase in phases)
+        self.steps = 0
+        self.__last = perf_counter_ns()
+
+    def start(self):
+        """
+        Start the timing of the first phase
+        """
+        self.__last = perf_counter_ns()
+
+    def lap(self, phase: str):
+        """
+        End the timing of a phase (and start the one of the next phase)
+
+        :param phase: name of the phase that ends
+        """
+        now = perf_counter_ns()
+        self.totals[phase] += now - self.__last
+        self.__last = now
+
+    def end_step(self):
+        """
+        Count a step (loop iteration)
+        """
+        self.steps += 1
+
+    def results(self) -> dict:
+        """
+        Returns the total time (ns), the percentage of the total time and the mean time per
+        step (ns) of each phase, sorted by decreasing total time
+        """
+        total = sum(self.totals.values())
+        phases = OrderedDict()
+        for phase, duration in sorted(self.totals.items(), key=lambda item: -item[1]):
+            phases[phase] = {"total_ns": duration,
+                             "percent": 100. * duration / total if total else 0.,
+                             "per_step_ns": duration / self.steps if self.steps else 0.}
+        return {"steps": self.steps, "total_ns": total, "phases": phases}
+
+    def table(self) -> str:
+        """
+        Returns the table of the results
+        """
+        results = self.results()
+        lines = ["{:<12s} {:>12s} {:>8s} {:>16s}".format("Phase", "Total (s)", "%",
+                                                         "Per step (us)")]
+        for phase, result in results["phases"].items():
+            lines.append("{:<12s} {:>12.6f} {:>8.2f} {:>16.3f}".format(
+                phase, result["total_ns"] * 1.e-09, result["percent"],
+                result["per_step_ns"] * 1.e-03))
+        lines.append("{:<12s} {:>12.6f} {:>8.2f} {:>16.3f}".format(
+            "total", results["total_ns"] * 1.e-09, 100.,
+            results["total_ns"] * 1.e-03 / results["steps"] if results["steps"] else 0.))
+        return os.linesep.join(lines)
+
+    def write_json(self, path, **infos):
+        """
+        Write the results in a JSON file
+
+        :param path: path of the file
+        :param infos: other items written in the file (case, solver...)
+        """
+        with open(path, 'w') as file_out:
+            json.dump(dict(infos, **self.results()), file_out, indent=2)
+
+
+class NoPhaseProfiler(PhaseProfiler):
+    """
+    A profiler that does not measure anything (profiling disabled)
+    """
+
+    def start(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end_step(self):
+        pass
+
+
 if __name__ == "__main__":
     @timeit_file('toto.log')
     @logit
@@ -3,6 +3,9 @@
 Implementing Singleton metaclass
 From Python Cookbook 3rd edition Chapter 9.13 "Using metaclass to control instance creation"
 
+The instance is unique in a simulation context (see SimulationContext) : each context owns
+its own instance, the default context being used when none has been activated.
+
 >>> class Spam(object):
 ...     __metaclass__ = Singleton
 ...     def __init__(self):
@@ -16,34 +19,30 @@ True
 >>> a is c
 True
 """
+from xfv.src.context.simulationcontext import current_context
 
 
 class Singleton(type):
     """
-    A metaclass implementing singleton pattern
+    A metaclass implementing singleton pattern (one instance per simulation context)
     """
 
-    def __init__(self, *args, **kwargs):
-        """
-        Construction of singleton
-        """
-        self.__instance = None
-        super().__init__(*args, **kwargs)
-
     def __call__(self, *args, **kwargs):
         """
         Call of the singleton
         """
-        if self.__instance is None:
-            self.__instance = super().__call__(*args, **kwargs)
-        return self.__instance
+        context = current_context()
+        instance = context.get_instance(self)
+        if instance is None:
+            instance = super().__call__(*args, **kwargs)
+            context.set_instance(self, instance)
+        return instance
 
     def clear(self):
         """
-        Delete the singleton
+        Delete the singleton (of the active simulation context)
         """
-        del self.__instance
-        self.__instance = None
+        current_context().clear_instance(self)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+PhaseProfiler unit tests
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from xfv.src.utilities import profilingperso
+from xfv.src.utilities.profilingperso import PhaseProfiler, NoPhaseProfiler
+
+
+class PhaseProfilerTest(unittest.TestCase):
+    """
+    Test case for the PhaseProfiler class
+    """
+    def setUp(self):
+        # Fake clock : 10 ns, 30 ns and 60 ns elapsed in the phases of each step
+        clock = iter(range(0, 1000, 10))
+        ticks = []
+
+        def perf_counter_ns():
+            ticks.append(next(clock))
+            return sum(ticks)
+
+        patcher = mock.patch.object(profilingperso, "perf_counter_ns", perf_counter_ns)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _run(profiler):
+        """
+        Profile two steps of a loop of three phases
+        """
+        profiler.start()
+        for _ in range(2):
+            for phase in ("velocities", "pressure", "output"):
+                profiler.lap(phase)
+            profiler.end_step()
+
+    def test_results(self):
+        """
+        Test the accumulation of the times of the phases and their sorting
+        """
+        profiler = PhaseProfiler()
+        self._run(profiler)
+        results = profiler.results()
+        self.assertEqual(results["steps"], 2)
+        self.assertEqual(results["total_ns"], sum(profiler.totals.values()))
+        self.assertEqual(list(results["phases"])[:3], ["output", "pressure", "velocities"])
+        self.assertEqual(results["phases"]["velocities"]["total_ns"], profiler.totals["velocities"])
+        self.assertEqual(results["phases"]["output"]["per_step_ns"],
+                         profiler.totals["output"] / 2)
+        self.assertAlmostEqual(sum(result["percent"] for result in results["phases"].values()),
+                               100.)
+        self.assertEqual(results["phases"]["contact"]["total_ns"], 0)
+        table = profiler.table().splitlines()
+        self.assertTrue(table[1].startswith("output"))
+        self.assertTrue(table[-1].startswith("total"))
+
+    def test_write_json(self):
+        """
+        Test that the results are written in a JSON file with the other informations
+        """
+        profiler = PhaseProfiler()
+        self._run(profiler)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profiler.write_json(path, case="hydro")
+            with open(path, 'r') as file_in:
+                results = json.load(file_in)
+        self.assertEqual(results["case"], "hydro")
+        self.assertEqual(results["steps"], 2)
+        self.assertEqual(results["phases"]["pressure"]["total_ns"], profiler.totals["pressure"])
+
+    def test_no_profiler(self):
+        """
+        Test that the disabled profiler measures nothing
+        """
+        profiler = NoPhaseProfiler()
+        self._run(profiler)
+        self.assertEqual(profiler.results()["steps"], 0)
+        self.assertEqual(profiler.results()["total_ns"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
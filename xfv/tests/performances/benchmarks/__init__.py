@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of XVOF.
+
+The benchmarks follow the conventions of airspeed velocity (asv) : classes whose methods
+prefixed by time_ are timed, with optional setup / teardown methods, parameters (params and
+param_names attributes), a setup_cache method whose result is given as first argument to the
+other methods, and number / repeat / timeout attributes. A setup raising NotImplementedError
+skips the benchmark.
+
+They are run, recorded per commit and compared by run_benchmarks.py (see this script).
+"""
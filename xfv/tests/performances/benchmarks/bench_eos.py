@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks of the equations of state : scaling of the compiled internal energy solver
+with the number of threads and tabulated equation of state against the analytic
+Mie-Gruneisen one
+"""
+import atexit
+import functools
+from pathlib import Path
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+
+from xfv.src.cell import one_dimension_cell
+from xfv.src.cell.one_dimension_cell import OneDimensionCell
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.equationsofstate.tabulated import (TabulatedEquationOfState, compute_table,
+                                                save_table)
+from xfv.src.solver.functionstosolve.vnrenergyevolutionforveformulation import (
+    VnrEnergyEvolutionForVolumeEnergyFormulation)
+from xfv.src.solver.newtonraphson import NewtonRaphson
+
+from .common import check_solver
+
+EQUATIONS_OF_STATE = ["Mie-Gruneisen"] + ["Tabulated " + interpolation for interpolation
+                                          in TabulatedEquationOfState.INTERPOLATIONS]
+
+
+def shocked_state(cells: int, max_pressure: float, seed: int = 0):
+    """
+    Returns a shocked state (copper) of the cells : old and new densities, pressure (including
+    artificial viscosity) and old energy
+
+    :param cells: number of cells
+    :param max_pressure: upper bound of the pressures
+    :param seed: seed of the random generator
+    """
+    rng = np.random.RandomState(seed)
+    density = rng.uniform(8930., 11000., cells)
+    density_new = density * rng.uniform(0.99, 1.01, cells)
+    pressure = rng.uniform(0., max_pressure, cells)
+    energy = rng.uniform(0., 1.e+06, cells)
+    return density, density_new, pressure, energy
+
+
+@functools.lru_cache(maxsize=None)
+def eos_table(volume_points: int, energy_points: int) -> Path:
+    """
+    Returns the path to the table of the Mie-Gruneisen equation of state. The table is
+    computed once per process.
+
+    :param volume_points: number of specific volumes of the table
+    :param energy_points: number of internal energies of the table
+    """
+    directory = tempfile.mkdtemp(prefix="xvof_bench_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = Path(directory) / "table.hdf5"
+    save_table(path, compute_table(MieGruneisen(),
+                                   np.linspace(1. / 12000., 1. / 8000., volume_points),
+                                   np.linspace(-1.e+05, 3.e+06, energy_points)))
+    return path
+
+
+class TimeVnrThreads:
+    """
+    Compiled internal energy solver with respect to the number of threads of the simulation
+    context (0 for all the available processors)
+    """
+    params = ([10000, 100000], [1, 2, 4, 0])
+    param_names = ["cells", "threads"]
+
+    def setup(self, cells, threads):
+        """
+        Build the state of the cells and the context holding the number of threads
+        """
+        check_solver("compiled")
+        context = SimulationContext("vnr_threads")
+        one_dimension_cell.set_vnr_solver_threads(threads, context)
+        self.cell = SimpleNamespace(context=context, _exact_energy_update=False)
+        self.eos = MieGruneisen()
+        density, density_new, pressure, energy = shocked_state(cells, 5.e+10)
+        self.arrays = (density, density_new, pressure, np.zeros(cells), energy,
+                       np.zeros(cells), np.zeros(cells), np.zeros(cells))
+
+    def time_apply_equation_of_state(self, cells, threads):  # pylint: disable=unused-argument
+        """
+        New internal energy, pressure and sound speed of the cells
+        """
+        OneDimensionCell.apply_equation_of_state(self.cell, self.eos, *self.arrays)
+
+
+class TimeTabulatedEos:
+    """
+    Tabulated equation of state (table of 1001 x 501 points) against the analytic
+    Mie-Gruneisen one on 10000 cells : evaluation alone and resolution of the VNR internal
+    energy evolution (exact solution for Mie-Gruneisen, Newton-Raphson for the tables)
+    """
+    params = (EQUATIONS_OF_STATE,)
+    param_names = ["eos"]
+
+    def setup(self, eos):
+        """
+        Build the equation of state and the state of the cells
+        """
+        if eos == "Mie-Gruneisen":
+            self.eos = MieGruneisen()
+        else:
+            self.eos = TabulatedEquationOfState(eos_table(1001, 501), eos.split()[1])
+        density, density_new, pressure, energy = shocked_state(10000, 2.e+10)
+        self.variables = {'EquationOfState': self.eos, 'OldSpecificVolume': 1. / density,
+                          'NewSpecificVolume': 1. / density_new, 'Pressure': pressure,
+                          'OldEnergy': energy}
+        self.outputs = [np.zeros(10000) for _ in range(3)]
+
+    def time_solve_volume_energy(self, eos):  # pylint: disable=unused-argument
+        """
+        Pressure, its derivative with respect to the energy and sound speed
+        """
+        self.eos.solve_volume_energy(self.variables['NewSpecificVolume'],
+                                     self.variables['OldEnergy'], *self.outputs)
+
+    def time_solve_energy(self, eos):  # pylint: disable=unused-argument
+        """
+        Resolution of the internal energy evolution
+        """
+        function = VnrEnergyEvolutionForVolumeEnergyFormulation()
+        function.set_variables(self.variables)
+        if self.eos.is_linear_in_energy:
+            function.compute_solution_linear_in_energy()
+        else:
+            NewtonRaphson(function).compute_solution(self.variables['OldEnergy'])
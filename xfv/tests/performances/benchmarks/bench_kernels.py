@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks of the kernels of the time loop : equation of state, pressure of the cells,
+forces of the nodes and non local rupture criteria
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from xfv.src.equationsofstate.miegruneisen import MieGruneisen
+from xfv.src.rupturecriterion.forcednonlocalstress import ForcedNonLocalStressCriterion
+from xfv.src.rupturecriterion.nonlocalstress import NonLocalStressCriterion
+
+from .common import PERFORMANCES_DIR, SOLVERS, check_solver, simulation_state
+
+MESH_CASES = ("hydro_1000", "hydro_10000", "cohesive")
+
+
+def cells_coordinates(cells: int) -> np.ndarray:
+    """
+    Returns the coordinates of the centers of the cells of the performances mesh
+
+    :param cells: number of cells of the mesh (1000 or 10000)
+    """
+    nodes = np.loadtxt(PERFORMANCES_DIR / "mesh_{:d}.txt".format(cells), dtype=np.float64,
+                       skiprows=2, usecols=(1,))
+    return 0.5 * (nodes[1:] + nodes[:-1])
+
+
+class TimeSolveVolumeEnergy:
+    """
+    MieGruneisen.solve_volume_energy, half of the cells in compression, the other half in
+    release
+    """
+    params = ([1000, 10000], ["masked", "fused"])
+    param_names = ["cells", "mode"]
+
+    def setup(self, cells, mode):
+        """
+        Build the equation of state and the state of the cells
+        """
+        self.eos = MieGruneisen(fused=mode == "fused")
+        self.spec_vol = 1. / np.linspace(8000., 10000., cells)
+        self.int_nrj = np.full(cells, 1.e+05)
+        self.outputs = [np.zeros(cells) for _ in range(3)]
+
+    def time_solve_volume_energy(self, cells, mode):  # pylint: disable=unused-argument
+        """
+        Pressure, its derivative with respect to the energy and sound speed
+        """
+        self.eos.solve_volume_energy(self.spec_vol, self.int_nrj, *self.outputs)
+
+    def time_solve_volume_energy_without_sound_speed(self, cells, mode):  # pylint: disable=unused-argument
+        """
+        Pressure and its derivative with respect to the energy only
+        """
+        self.eos.solve_volume_energy(self.spec_vol, self.int_nrj, *self.outputs[:2])
+
+
+class _MeshStep:
+    """
+    Base class of the benchmarks on the mesh at the end of a run of the case : the new
+    coordinates, sizes, densities and artificial viscosities of a step are computed
+    """
+    def setup(self, case, *args):  # pylint: disable=unused-argument
+        """
+        Activate the context of the simulation and begin a new step
+        """
+        self.context, _ = simulation_state(case)
+        self.context.__enter__()
+        self.mesh = self.context.mesh
+        self.delta_t = self.context.data.time.initial_time_step
+        self.mesh.compute_new_nodes_velocities(self.delta_t)
+        self.mesh.compute_new_nodes_coordinates(self.delta_t)
+        self.mesh.compute_new_cells_sizes(self.delta_t)
+        self.mesh.compute_new_cells_densities()
+        self.mesh.compute_new_cells_pseudo_viscosity(self.delta_t)
+
+    def teardown(self, *args):  # pylint: disable=unused-argument
+        """
+        Deactivate the context of the simulation
+        """
+        self.context.__exit__(None, None, None)
+
+
+class TimeCells(_MeshStep):
+    """
+    Internal energy, pressure and sound speed of the cells (classical cells and both parts of
+    the enriched cells)
+    """
+    params = (list(MESH_CASES), list(SOLVERS))
+    param_names = ["case", "solver"]
+
+    def setup(self, case, solver):  # pylint: disable=arguments-differ
+        """
+        Select the solver and begin a new step
+        """
+        check_solver(solver)
+        super().setup(case)
+        self.previous_solver = self.context.use_internal_solver
+        self.context.use_internal_solver = solver == "python"
+
+    def teardown(self, case, solver):  # pylint: disable=arguments-differ
+        """
+        Restore the solver
+        """
+        self.context.use_internal_solver = self.previous_solver
+        super().teardown()
+
+    def time_compute_new_pressure(self, case, solver):  # pylint: disable=unused-argument
+        """
+        Computation of the new pressure of the cells
+        """
+        self.mesh.compute_new_cells_pressures(self.delta_t)
+
+
+class TimeNodes(_MeshStep):
+    """
+    Forces of the nodes (classical and enriched nodes)
+    """
+    params = (list(MESH_CASES),)
+    param_names = ["case"]
+
+    def setup(self, case):  # pylint: disable=arguments-differ
+        """
+        Begin a new step up to the stress tensor
+        """
+        super().setup(case)
+        self.mesh.compute_new_cells_pressures(self.delta_t)
+        self.mesh.assemble_complete_stress_tensor()
+
+    def time_compute_new_force(self, case):  # pylint: disable=unused-argument
+        """
+        Computation of the new forces of the nodes
+        """
+        self.mesh.compute_new_nodes_forces()
+
+
+class TimeNonLocalCriteria:
+    """
+    Non local stress criteria on the performances meshes, with a tensile stress peak in the
+    middle of the bar and a few enriched cells around it
+    """
+    params = (["NonLocalStress", "ForcedNonLocalStress"], ["flat", "linear", "gaussian"],
+              [1000, 10000])
+    param_names = ["criterion", "weighting", "cells"]
+
+    def setup(self, criterion, weighting, cells):
+        """
+        Build the criterion and the cells
+        """
+        coordinates = cells_coordinates(cells)
+        length = coordinates[-1] - coordinates[0]
+        radius = 10. * length / cells
+        build = NonLocalStressCriterion if criterion == "NonLocalStress" \
+            else ForcedNonLocalStressCriterion
+        self.criterion = build(1.e+09, radius, weighting)
+        center = coordinates[cells // 2]
+        stress = 1.2e+09 * np.exp(-((coordinates - center) / (20. * radius)) ** 2)
+        enriched = np.abs(coordinates - center) < 2. * radius
+        enr_coordinates = np.where(enriched, coordinates + 0.25 * length / cells, 0.)
+        self.cells = SimpleNamespace(
+            coordinates_x=coordinates.reshape(-1, 1), stress_xx=stress,
+            enr_coordinates_x=enr_coordinates.reshape(-1, 1),
+            enr_stress_xx=np.where(enriched, stress, 0.), enriched=enriched,
+            stress=stress.reshape(-1, 1))
+
+    def time_check_criterion(self, criterion, weighting, cells):  # pylint: disable=unused-argument
+        """
+        Check of the criterion on all the cells
+        """
+        self.criterion.check_criterion(self.cells)
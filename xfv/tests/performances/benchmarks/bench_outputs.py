@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks of the outputs : writing of the fields in the databases and reconstruction
+of the true fields from the databases. Runs of an output heavy case with the flush policies
+of the databases
+"""
+import contextlib
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+from xfv.src.output_manager.outputdatabase import OutputDatabase
+from xfv.src.output_manager.outputdatabaseexploit import OutputDatabaseExploit
+from xfv.src.output_manager.outputmanager import OutputManager
+
+from .common import prepare_case, run_case, simulation_state
+
+
+class TimeOutputManager:
+    """
+    OutputManager.update with all the fields of the case written at each call
+    """
+    params = (["hydro_10000", "cohesive"],)
+    param_names = ["case"]
+
+    def setup(self, case):
+        """
+        Register the fields of the mesh at the end of a run of the case in a new database
+        """
+        self.context, _ = simulation_state(case)
+        self.context.__enter__()
+        data = self.context.data
+        mesh = self.context.mesh
+        self.directory = Path(tempfile.mkdtemp(prefix="xvof_bench_"))
+        # The output manager of the run has been finalized
+        self.context.clear_instance(OutputManager)
+        self.output_manager = OutputManager()
+        self.output_manager.register_database_iteration_ctrl(
+            "Benchmark", OutputDatabase(str(self.directory / "benchmark.hdf5")), 1)
+        self.output_manager.register_all_fields(
+            data.material_target.failure_model.failure_treatment == "Enrichment",
+            mesh.cells, mesh.nodes, "Benchmark")
+        self.failure_treatment_value = data.material_target.failure_model.failure_treatment_value
+        self.discontinuities = mesh.get_discontinuity_list()
+        self.delta_t = data.time.initial_time_step
+        self.step = self.context.step
+
+    def teardown(self, case):  # pylint: disable=unused-argument
+        """
+        Close and remove the database
+        """
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            self.output_manager.finalize()
+        self.context.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_update(self, case):  # pylint: disable=unused-argument
+        """
+        Output of one time
+        """
+        self.step += 1
+        self.output_manager.update(self.step * self.delta_t, self.step,
+                                   self.failure_treatment_value, self.discontinuities)
+
+
+class TimeTrueFields:
+    """
+    Reconstruction of the true fields (classical and enriched degrees of freedom) from the
+    database of the enriched cohesive case, at its last saved time
+    """
+    params = (["Pressure", "Density", "Stress", "NodeVelocity"],)
+    param_names = ["field"]
+
+    def setup(self, field):  # pylint: disable=unused-argument
+        """
+        Open the database of the run of the enriched cohesive case
+        """
+        _, run_directory = simulation_state("cohesive")
+        self.database = OutputDatabaseExploit(str(run_directory / "all_fields.hdf5"))
+        self.time = self.database.saved_times[-1]
+
+    def time_extract_true_field_at_time(self, field):
+        """
+        Reconstruction of the true field
+        """
+        self.database.extract_true_field_at_time(field, self.time)
+
+
+# Flush policies and hdf5 options of the output databases (items of their XDATA blocks)
+OUTPUT_POLICIES = {
+    "flush-each-output": {},
+    "flush-every-50-outputs": {"flush-period": 50},
+    "flush-every-second": {"flush-interval": 1.},
+    "latest-format-64MB-cache": {"flush-period": 50, "libver-latest": True,
+                                 "chunk-cache-size": 64 * 1024 ** 2},
+    "swmr": {"swmr": True},
+    "asynchronous": {"flush-period": 50, "asynchronous": True},
+}
+
+
+class TimeOutputPolicies:
+    """
+    Full run of the output heavy case (all the fields written at each step) with each flush
+    policy, for both layouts of the databases
+    """
+    params = (list(OUTPUT_POLICIES), ["groups", "time-series"])
+    param_names = ["policy", "layout"]
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, policy, layout):
+        """
+        Write the case with the policy in a new directory
+        """
+        if OUTPUT_POLICIES[policy].get("swmr") and layout != "time-series":
+            raise NotImplementedError("SWMR is only available for the time-series layout")
+        self.directory = prepare_case("hydro_1000_outputs",
+                                      Path(tempfile.mkdtemp(prefix="xvof_bench_")),
+                                      dict(OUTPUT_POLICIES[policy], layout=layout))
+
+    def teardown(self, policy, layout):  # pylint: disable=unused-argument
+        """
+        Remove the directory of the run
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_run(self, policy, layout):  # pylint: disable=unused-argument
+        """
+        Full run of the case
+        """
+        run_case(self.directory)
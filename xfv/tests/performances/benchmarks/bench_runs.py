@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of full runs of the hydrodynamic, elasto-plastic and enriched cohesive cases
+"""
+from pathlib import Path
+import shutil
+import tempfile
+
+from .common import SOLVERS, check_solver, prepare_case, run_case
+
+
+class TimeFullRun:
+    """
+    Run of a case, from the reading of the data to the closing of the output databases
+    """
+    params = (["hydro", "hydro_10000", "epp", "cohesive"], list(SOLVERS))
+    param_names = ["case", "solver"]
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, case, solver):
+        """
+        Select the solver and write the case in a new directory
+        """
+        check_solver(solver)
+        self.directory = prepare_case(case, Path(tempfile.mkdtemp(prefix="xvof_bench_")))
+
+    def teardown(self, case, solver):  # pylint: disable=unused-argument
+        """
+        Remove the directory of the run
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_run(self, case, solver):  # pylint: disable=unused-argument
+        """
+        Full run of the case
+        """
+        run_case(self.directory, solver)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Cases and simulation states shared by the benchmarks
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Optional
+
+from xfv.XtendedFiniteVolume import main
+from xfv.src.cell import one_dimension_cell
+from xfv.src.context.simulationcontext import SimulationContext
+from xfv.src.sweep.parametersweep import relocate_data
+
+PERFORMANCES_DIR = Path(__file__).resolve().parent.parent
+INTEGRATION_DIR = PERFORMANCES_DIR.parent / "integration"
+
+# Cases of the benchmarks : data directory and modifications of its final time, mesh and
+# output period (the shortened runs are long enough to be timed reliably)
+CASES = {
+    "hydro": {"directory": INTEGRATION_DIR / "no_enrichment_hydro" / "cst_time_step"},
+    "hydro_1000": {"directory": PERFORMANCES_DIR / "no_enrichment_hydro" / "cst_time_step",
+                   "mesh": PERFORMANCES_DIR / "mesh_1000.txt", "final-time": 1.e-08},
+    "hydro_10000": {"directory": PERFORMANCES_DIR / "no_enrichment_hydro" / "cst_time_step",
+                    "mesh": PERFORMANCES_DIR / "mesh_10000.txt", "final-time": 1.e-08},
+    "epp": {"directory": INTEGRATION_DIR / "no_enrichment_epp" / "cst_time_step"},
+    # Enriched cohesive case, stopped once about fifteen cells are enriched
+    "cohesive": {"directory": INTEGRATION_DIR / "impact_czm_penalty" / "cst_time_step",
+                 "final-time": 1.9e-06, "iteration-period": 100},
+    # Output heavy case : all the fields of 1000 cells written at each of the 500 steps
+    "hydro_1000_outputs": {"directory": PERFORMANCES_DIR / "no_enrichment_hydro" / "cst_time_step",
+                           "mesh": PERFORMANCES_DIR / "mesh_1000.txt", "final-time": 5.e-08,
+                           "iteration-period": 1},
+}
+
+SOLVERS = ("python", "compiled")
+
+
+def compiled_solver_available() -> bool:
+    """
+    Returns True if a compiled internal energy solver (bundled or external) is available
+    """
+    return one_dimension_cell.COMPILED_SOLVER_AVAILABLE
+
+
+def check_solver(solver: str):
+    """
+    Raises NotImplementedError (the benchmark is skipped) if the internal energy solver is
+    the compiled one and it is not built
+
+    :param solver: "python" or "compiled"
+    """
+    if solver == "compiled" and not compiled_solver_available():
+        raise NotImplementedError("The compiled internal energy solver is not built")
+
+
+def prepare_case(case: str, run_directory: Path,
+                 database_items: Optional[dict] = None) -> Path:
+    """
+    Write the data and the mesh of the case in the run directory and returns it. The paths of
+    the data are made absolute so that the case can be run from this directory.
+
+    :param case: name of the case (key of CASES)
+    :param run_directory: directory of the run
+    :param database_items: items added to the blocks of the output databases (layout,
+                           flush policy...)
+    """
+    infos = CASES[case]
+    with (infos["directory"] / "XDATA.json").open('r') as file_in:
+        data = relocate_data(json.load(file_in), infos["directory"])
+    if "final-time" in infos:
+        data["time-management"]["final-time"] = infos["final-time"]
+    if "iteration-period" in infos:
+        for database in data["output"]["database"]:
+            database.pop("time-period", None)
+            database["iteration-period"] = infos["iteration-period"]
+    for database in data["output"]["database"]:
+        database.update(database_items or {})
+    run_directory.mkdir(parents=True, exist_ok=True)
+    with (run_directory / "XDATA.json").open('w') as file_out:
+        json.dump(data, file_out, indent=2)
+    shutil.copy(infos.get("mesh", infos["directory"] / "mesh.txt"), run_directory / "mesh.txt")
+    return run_directory
+
+
+def run_case(run_directory: Path, solver: str = "python") -> SimulationContext:
+    """
+    Run the case prepared in the run directory, silently, in a new context and returns this
+    context. The output databases are written in the run directory.
+
+    :param run_directory: directory of the run
+    :param solver: internal energy solver ("python" or "compiled")
+    """
+    context = SimulationContext(str(run_directory))
+    context.use_internal_solver = solver == "python"
+    cwd = os.getcwd()
+    os.chdir(run_directory)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return main(run_directory, context=context)
+    finally:
+        os.chdir(cwd)
+
+
+@functools.lru_cache(maxsize=None)
+def simulation_state(case: str):
+    """
+    Returns the context at the end of the run of the case with the python solver (and the
+    directory of the run holding its output database). The runs are done once per process.
+
+    :param case: name of the case (key of CASES)
+    """
+    run_directory = Path(tempfile.mkdtemp(prefix="xvof_bench_"))
+    atexit.register(shutil.rmtree, run_directory, ignore_errors=True)
+    context = run_case(prepare_case(case, run_directory))
+    return context, run_directory
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Run the benchmark suite of the benchmarks directory (full runs of the hydrodynamic,
+elasto-plastic and enriched cohesive cases and micro benchmarks of the kernels and outputs).
+
+The median time of each benchmark is appended to a history file (json lines) with the current
+git commit (suffixed by +dirty if the working tree is modified) and compared with the one of
+the last record of another commit (or of the commit given by --reference). The benchmarks
+slower than the reference by more than the threshold are flagged as regressions and the exit
+code is then 1.
+
+Example: python run_benchmarks.py --bench "TimeCells|TimeNodes" --threshold 0.1
+"""
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import math
+from pathlib import Path
+import pkgutil
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PERFORMANCES_DIR = Path(__file__).resolve().parent
+DEFAULT_HISTORY = PERFORMANCES_DIR / "benchmark_suite_history.jsonl"
+BENCHMARKS_PACKAGE = "benchmarks"
+
+
+def git_commit() -> str:
+    """
+    Returns the current git commit, suffixed by +dirty if the tracked files are modified
+    (or "unknown" if not available)
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PERFORMANCES_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=PERFORMANCES_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "+dirty" if status else commit
+
+
+def discover_benchmarks(pattern: str = None):
+    """
+    Returns the (name, class, method name) of the benchmarks whose name matches the pattern
+
+    :param pattern: regular expression searched in the names of the benchmarks
+                    (module.Class.time_method), all the benchmarks if None
+    """
+    sys.path.insert(0, str(PERFORMANCES_DIR))
+    package = importlib.import_module(BENCHMARKS_PACKAGE)
+    benchmarks = []
+    for module_info in sorted(pkgutil.iter_modules(package.__path__), key=lambda m: m.name):
+        module = importlib.import_module(BENCHMARKS_PACKAGE + "." + module_info.name)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__ or class_name.startswith("_"):
+                continue
+            for method_name in sorted(vars(cls)):
+                name = "{}.{}.{}".format(module_info.name, class_name, method_name)
+                if method_name.startswith("time_") and \
+                        (pattern is None or re.search(pattern, name)):
+                    benchmarks.append((name, cls, method_name))
+    return benchmarks
+
+
+def parameters_combinations(cls):
+    """
+    Returns the combinations of the parameters of the benchmark class
+
+    :param cls: class of the benchmark
+    """
+    params = getattr(cls, "params", [])
+    if params and not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def benchmark_key(name: str, params: tuple) -> str:
+    """
+    Returns the key of the results of a benchmark for a combination of its parameters
+    """
+    return "{}({})".format(name, ", ".join(repr(param) for param in params)) if params else name
+
+
+def time_benchmark(method, params: tuple, number: int, repeat: int, sample_time: float):
+    """
+    Returns the times of one call to the method (one per sample)
+
+    :param method: benchmark method
+    :param params: parameters of the method
+    :param number: number of calls per sample (0 to calibrate it so that a sample lasts
+                   sample_time)
+    :param repeat: number of samples
+    :param sample_time: duration of a sample when the number of calls is calibrated
+    """
+    if not number:
+        start = time.perf_counter()
+        method(*params)
+        elapsed = time.perf_counter() - start
+        number = max(1, min(10000, math.ceil(sample_time / max(elapsed, 1.e-09))))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            method(*params)
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def run_benchmark(cls, method_name: str, params: tuple, repeat: int, sample_time: float):
+    """
+    Returns the results of a benchmark for a combination of its parameters : median and
+    minimum time of one call, number of samples (None if the setup raises NotImplementedError)
+
+    :param cls: class of the benchmark
+    :param method_name: name of the timed method
+    :param params: parameters of the benchmark
+    :param repeat: number of samples if the class does not specify it
+    :param sample_time: duration of a sample if the class does not specify the number of calls
+    """
+    instance = cls()
+    try:
+        if hasattr(instance, "setup"):
+            instance.setup(*params)
+    except NotImplementedError:
+        return None
+    try:
+        samples = time_benchmark(getattr(instance, method_name), params,
+                                 getattr(cls, "number", 0), getattr(cls, "repeat", repeat),
+                                 sample_time)
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(*params)
+    return {"median": statistics.median(samples), "min": min(samples), "samples": len(samples)}
+
+
+def read_history(history: Path):
+    """
+    Returns the records of the history file (empty list if it does not exist)
+    """
+    if history is None or not history.exists():
+        return []
+    with history.open('r') as file_in:
+        return [json.loads(line) for line in file_in if line.strip()]
+
+
+def reference_results(records, commit: str, reference: str = None):
+    """
+    Returns the reference commit, the last recorded commit matching the reference (or different
+    from the current one if reference is None), and its results merged over its records (the
+    last record of a benchmark prevails). None, {} if there is none.
+
+    :param records: records of the history
+    :param commit: current commit
+    :param reference: reference commit (or prefix of it)
+    """
+    for record in reversed(records):
+        if (reference is not None and record["commit"].startswith(reference)) or \
+                (reference is None and record["commit"] != commit):
+            reference_commit = record["commit"]
+            break
+    else:
+        return None, {}
+    results = {}
+    for record in records:
+        if record["commit"] == reference_commit:
+            results.update(record["results"])
+    return reference_commit, results
+
+
+def find_regressions(results: dict, reference: dict, threshold: float):
+    """
+    Returns the ratio of the median times to the reference ones, and the keys of the
+    benchmarks slower than their reference by more than the threshold
+
+    :param results: results of the current run by benchmark key
+    :param reference: reference results by benchmark key
+    :param threshold: relative slowdown above which a benchmark is flagged (0.1 for 10%)
+    """
+    ratios = {key: result["median"] / reference[key]["median"]
+              for key, result in results.items()
+              if reference.get(key, {}).get("median")}
+    regressions = [key for key, ratio in ratios.items() if ratio > 1. + threshold]
+    return ratios, regressions
+
+
+def format_time(seconds: float) -> str:
+    """
+    Returns the time with an adapted unit
+    """
+    for unit, factor in (("s", 1.), ("ms", 1.e-03), ("us", 1.e-06)):
+        if seconds >= factor:
+            return "{:.3f} {}".format(seconds / factor, unit)
+    return "{:.1f} ns".format(seconds * 1.e+09)
+
+
+def main(pattern: str, threshold: float, repeat: int, sample_time: float,  # pylint: disable=too-many-arguments, too-many-locals
+         history: Path, reference: str) -> int:
+    """
+    Launch the benchmarks, append the results to the history file and returns 1 if some
+    regressions are found (0 otherwise)
+
+    :param pattern: regular expression selecting the benchmarks (all if None)
+    :param threshold: relative slowdown above which a benchmark is flagged
+    :param repeat: number of samples of the benchmarks that do not specify it
+    :param sample_time: duration of a sample of the benchmarks that do not specify their number
+                        of calls
+    :param history: path to the history file (None for no record)
+    :param reference: reference commit (last other commit of the history if None)
+    """
+    commit = git_commit()
+    records = read_history(history)
+    reference_commit, reference = reference_results(records, commit, reference)
+    print("Commit {} compared with {}".format(commit, reference_commit or "nothing"))
+    print("{:<80s} {:>12s} {:>12s} {:>7s}".format("benchmark", "time", "reference", "ratio"))
+    results = {}
+    regressions = []
+    for name, cls, method_name in discover_benchmarks(pattern):
+        for params in parameters_combinations(cls):
+            key = benchmark_key(name, params)
+            try:
+                result = run_benchmark(cls, method_name, params, repeat, sample_time)
+            except Exception as error:  # pylint: disable=broad-except
+                print("{:<80s} failed : {}".format(key, error))
+                continue
+            if result is None:
+                print("{:<80s} skipped".format(key))
+                continue
+            results[key] = result
+            ratios, flagged = find_regressions({key: result}, reference, threshold)
+            regressions += flagged
+            print("{:<80s} {:>12s} {:>12s} {:>7s} {}".format(
+                key, format_time(result["median"]),
+                format_time(reference[key]["median"]) if key in ratios else "-",
+                "{:.2f}".format(ratios[key]) if key in ratios else "-",
+                "REGRESSION" if flagged else ""))
+    if history is not None and results:
+        record = {"commit": commit,
+                  "date": datetime.datetime.now().isoformat(timespec='seconds'),
+                  "machine": platform.node(), "python": platform.python_version(),
+                  "results": results}
+        with history.open('a') as file_out:
+            file_out.write(json.dumps(record) + "\n")
+        print("Results appended to {}".format(history))
+    if regressions:
+        print("{:d} benchmark(s) slower than {} by more than {:.0%} :".format(
+            len(regressions), reference_commit, threshold))
+        for key in regressions:
+            print("    " + key)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    # pylint: disable=invalid-name
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", "-b", default=None,
+                        help="Regular expression selecting the benchmarks to run "
+                             "(module.Class.time_method)")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown above which a benchmark is flagged as a "
+                             "regression (0.1 by default, i.e 10%%)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of samples of each benchmark (unless specified by the "
+                             "benchmark)")
+    parser.add_argument("--sample-time", type=float, default=0.05,
+                        help="Duration [s] of a sample of the benchmarks whose number of calls "
+                             "is calibrated")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY,
+                        help="History file in which the results are appended")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Do not compare nor record the results")
+    parser.add_argument("--reference", default=None,
+                        help="Commit of the history the results are compared with (by default "
+                             "the last recorded commit different from the current one)")
+    args = parser.parse_args()
+    sys.exit(main(args.bench, args.threshold, args.repeat, args.sample_time,
+                  None if args.no_history else args.history, args.reference))